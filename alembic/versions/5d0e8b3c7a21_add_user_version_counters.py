@@ -0,0 +1,30 @@
+"""add monitors_version and status_version to users
+
+Revision ID: 5d0e8b3c7a21
+Revises: c41d7a9e2f13
+Create Date: 2026-10-19 11:40:02.517904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e8b3c7a21'
+down_revision: Union[str, Sequence[str], None] = 'c41d7a9e2f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('monitors_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('status_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'status_version')
+    op.drop_column('users', 'monitors_version')
@@ -0,0 +1,53 @@
+"""add monitor_events and anomaly_states tables
+
+Revision ID: a7c3e91d5b40
+Revises: 5d0e8b3c7a21
+Create Date: 2026-10-19 15:02:18.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91d5b40'
+down_revision: Union[str, Sequence[str], None] = '5d0e8b3c7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monitor_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('monitor_id', sa.Integer(), nullable=False),
+    sa.Column('ts', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('baseline_ms', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_monitor_events_monitor_ts', 'monitor_events', ['monitor_id', 'ts'], unique=False)
+    op.create_table('anomaly_states',
+    sa.Column('monitor_id', sa.Integer(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('var', sa.Float(), nullable=False),
+    sa.Column('fast', sa.Float(), nullable=False),
+    sa.Column('anomalous', sa.Boolean(), nullable=False),
+    sa.Column('streak', sa.SmallInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('monitor_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('anomaly_states')
+    op.drop_index('ix_monitor_events_monitor_ts', table_name='monitor_events')
+    op.drop_table('monitor_events')
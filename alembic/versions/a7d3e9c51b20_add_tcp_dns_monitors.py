@@ -0,0 +1,33 @@
+"""add tcp and dns monitor kinds
+
+Revision ID: a7d3e9c51b20
+Revises: f61c9a3e8b14
+Create Date: 2026-10-21 09:40:11.275318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9c51b20'
+down_revision: Union[str, Sequence[str], None] = 'f61c9a3e8b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('monitors', sa.Column('expect', sa.String(length=1000), nullable=True))
+    op.drop_constraint('ck_monitor_kind_valid', 'monitors', type_='check')
+    op.create_check_constraint('ck_monitor_kind_valid', 'monitors', "kind IN ('http','heartbeat','tcp','dns')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM monitors WHERE kind IN ('tcp','dns')")
+    op.drop_constraint('ck_monitor_kind_valid', 'monitors', type_='check')
+    op.create_check_constraint('ck_monitor_kind_valid', 'monitors', "kind IN ('http','heartbeat')")
+    op.drop_column('monitors', 'expect')
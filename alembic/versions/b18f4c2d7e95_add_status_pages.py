@@ -0,0 +1,52 @@
+"""add status_pages and status_page_monitors tables
+
+Revision ID: b18f4c2d7e95
+Revises: a7c3e91d5b40
+Create Date: 2026-10-19 17:26:51.093412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b18f4c2d7e95'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91d5b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('status_pages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(length=100), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('snapshot', sa.Text(), nullable=True),
+    sa.Column('snapshot_version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_index('ix_status_pages_user', 'status_pages', ['user_id'], unique=False)
+    op.create_table('status_page_monitors',
+    sa.Column('page_id', sa.Integer(), nullable=False),
+    sa.Column('monitor_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['page_id'], ['status_pages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('page_id', 'monitor_id', name='pk_status_page_monitors')
+    )
+    op.create_index('ix_status_page_monitors_monitor', 'status_page_monitors', ['monitor_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_status_page_monitors_monitor', table_name='status_page_monitors')
+    op.drop_table('status_page_monitors')
+    op.drop_index('ix_status_pages_user', table_name='status_pages')
+    op.drop_table('status_pages')
@@ -0,0 +1,60 @@
+"""soft delete of monitors and users
+
+Revision ID: b3e8f27c4d91
+Revises: a7d3e9c51b20
+Create Date: 2026-10-21 15:02:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f27c4d91'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e9c51b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('monitors', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('monitors', sa.Column('purged_rows', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_monitor_deleted', 'monitors', ['deleted_at'], postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+    op.create_index(
+        'ix_users_deleted', 'users', ['deleted_at'], postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+    # уникальные ограничения -> частичные уникальные индексы с теми же именами (только живые строки)
+    for table, name, columns in (
+        ('monitors', 'uq_monitor_user_url', ['user_id', 'url']),
+        ('monitors', 'uq_monitor_user_name', ['user_id', 'name']),
+        ('users', 'users_tg_id_key', ['tg_id']),
+        ('users', 'users_email_key', ['email']),
+    ):
+        op.drop_constraint(name, table, type_='unique')
+        op.create_index(name, table, columns, unique=True, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # недочищенные удалённые строки удаляются сразу (каскадом вместе с историей)
+    op.execute("DELETE FROM users WHERE deleted_at IS NOT NULL")
+    op.execute("DELETE FROM monitors WHERE deleted_at IS NOT NULL")
+    for table, name, columns in (
+        ('monitors', 'uq_monitor_user_url', ['user_id', 'url']),
+        ('monitors', 'uq_monitor_user_name', ['user_id', 'name']),
+        ('users', 'users_tg_id_key', ['tg_id']),
+        ('users', 'users_email_key', ['email']),
+    ):
+        op.drop_index(name, table_name=table)
+        op.create_unique_constraint(name, table, columns)
+    op.drop_index('ix_users_deleted', table_name='users')
+    op.drop_index('ix_monitor_deleted', table_name='monitors')
+    op.drop_column('users', 'deleted_at')
+    op.drop_column('monitors', 'purged_rows')
+    op.drop_column('monitors', 'deleted_at')
@@ -0,0 +1,33 @@
+"""add login_throttle table
+
+Revision ID: c41d7a9e2f13
+Revises: bee4975b3a9a
+Create Date: 2026-10-19 09:12:44.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7a9e2f13'
+down_revision: Union[str, Sequence[str], None] = 'bee4975b3a9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('login_throttle',
+    sa.Column('key', sa.String(length=300), nullable=False),
+    sa.Column('window_start', sa.BigInteger(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key', 'window_start', name='pk_login_throttle')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('login_throttle')
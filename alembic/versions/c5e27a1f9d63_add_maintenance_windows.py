@@ -0,0 +1,50 @@
+"""add maintenance_windows table and checks.maintenance
+
+Revision ID: c5e27a1f9d63
+Revises: b18f4c2d7e95
+Create Date: 2026-10-19 19:12:40.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e27a1f9d63'
+down_revision: Union[str, Sequence[str], None] = 'b18f4c2d7e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('maintenance_windows',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('monitor_id', sa.Integer(), nullable=True),
+    sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('recurrence', sa.String(length=16), nullable=True),
+    sa.Column('until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('mode', sa.String(length=8), server_default='skip', nullable=False),
+    sa.Column('reason', sa.String(length=200), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('ends_at > starts_at', name='ck_maintenance_window_order'),
+    sa.CheckConstraint("recurrence IN ('daily', 'weekly')", name='ck_maintenance_window_recurrence'),
+    sa.CheckConstraint("mode IN ('skip', 'tag')", name='ck_maintenance_window_mode'),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_maintenance_windows_user', 'maintenance_windows', ['user_id'], unique=False)
+    # NOT NULL с константой по умолчанию — без перезаписи таблицы (PostgreSQL 11+)
+    op.add_column('checks', sa.Column('maintenance', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('checks', 'maintenance')
+    op.drop_index('ix_maintenance_windows_user', table_name='maintenance_windows')
+    op.drop_table('maintenance_windows')
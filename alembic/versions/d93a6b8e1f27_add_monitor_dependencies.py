@@ -0,0 +1,45 @@
+"""add monitor_dependencies table, dependency events
+
+Revision ID: d93a6b8e1f27
+Revises: c5e27a1f9d63
+Create Date: 2026-10-19 21:04:17.336512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a6b8e1f27'
+down_revision: Union[str, Sequence[str], None] = 'c5e27a1f9d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monitor_dependencies',
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=False),
+    sa.CheckConstraint('child_id <> parent_id', name='ck_monitor_dependency_self'),
+    sa.ForeignKeyConstraint(['child_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['parent_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('child_id', 'parent_id', name='pk_monitor_dependencies')
+    )
+    op.create_index('ix_monitor_dependencies_parent', 'monitor_dependencies', ['parent_id'], unique=False)
+    # события suppressed/released не несут задержки
+    op.alter_column('monitor_events', 'latency_ms', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('monitor_events', 'baseline_ms', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('monitor_events', 'score', existing_type=sa.Float(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM monitor_events WHERE kind IN ('suppressed', 'released')")
+    op.alter_column('monitor_events', 'score', existing_type=sa.Float(), nullable=False)
+    op.alter_column('monitor_events', 'baseline_ms', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('monitor_events', 'latency_ms', existing_type=sa.Integer(), nullable=False)
+    op.drop_index('ix_monitor_dependencies_parent', table_name='monitor_dependencies')
+    op.drop_table('monitor_dependencies')
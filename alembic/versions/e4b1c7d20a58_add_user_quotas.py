@@ -0,0 +1,33 @@
+"""add per-user monitor quotas
+
+Revision ID: e4b1c7d20a58
+Revises: d93a6b8e1f27
+Create Date: 2026-10-19 23:41:05.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b1c7d20a58'
+down_revision: Union[str, Sequence[str], None] = 'd93a6b8e1f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL — значение по умолчанию из настроек (QUOTA_*)
+    op.add_column('users', sa.Column('quota_max_monitors', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('quota_min_interval_s', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('quota_probes_per_s', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'quota_probes_per_s')
+    op.drop_column('users', 'quota_min_interval_s')
+    op.drop_column('users', 'quota_max_monitors')
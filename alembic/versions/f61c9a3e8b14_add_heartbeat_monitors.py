@@ -0,0 +1,44 @@
+"""add monitor kind and heartbeats table
+
+Revision ID: f61c9a3e8b14
+Revises: e4b1c7d20a58
+Create Date: 2026-10-20 10:12:48.503917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f61c9a3e8b14'
+down_revision: Union[str, Sequence[str], None] = 'e4b1c7d20a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # существующие мониторы — http
+    op.add_column('monitors', sa.Column('kind', sa.String(length=16), server_default='http', nullable=False))
+    op.create_check_constraint('ck_monitor_kind_valid', 'monitors', "kind IN ('http','heartbeat')")
+    op.create_table('heartbeats',
+    sa.Column('monitor_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('grace_s', sa.Integer(), nullable=False),
+    sa.Column('last_ping_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('down', sa.Boolean(), server_default='false', nullable=False),
+    sa.CheckConstraint('grace_s BETWEEN 0 AND 86400', name='ck_heartbeat_grace_range'),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('monitor_id'),
+    sa.UniqueConstraint('token')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('heartbeats')
+    op.execute("DELETE FROM monitors WHERE kind <> 'http'")
+    op.drop_constraint('ck_monitor_kind_valid', 'monitors', type_='check')
+    op.drop_column('monitors', 'kind')
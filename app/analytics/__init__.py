@@ -0,0 +1,3 @@
+"""
+Numeric analytics over check history (NumPy-based; imported lazily by the API).
+"""
@@ -0,0 +1,97 @@
+# app/analytics/heatmap.py
+"""
+Latency heatmap (time bucket × latency bucket) over check history.
+
+Rows arrive as one PostgreSQL binary COPY buffer of `(ts, latency_ms, ok)` and are
+decoded straight into NumPy arrays (no per-row Python objects), then binned with a single
+`bincount` over a flattened (time, latency) index.
+
+NumPy is imported on first use so the API's cold start does not pay for it.
+"""
+
+from dataclasses import dataclass
+
+# Границы корзин задержки, мс: последняя корзина открыта справа
+LATENCY_EDGES_MS = (0, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# PostgreSQL хранит timestamptz как микросекунды от 2000-01-01 UTC
+_PG_EPOCH_US = 946_684_800 * 1_000_000
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER_LEN = len(_COPY_HEADER) + 8  # сигнатура + флаги + длина расширения заголовка
+
+
+@dataclass(slots=True)
+class Heatmap:
+    t0_us: int
+    bucket_s: int
+    counts: list[list[int]]
+    failures: list[int]
+    histogram: list[int]
+    total: int
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+
+
+def decode_copy(buf: bytes):
+    """
+    Decode a binary COPY of `(ts timestamptz, latency_ms int4, ok bool)` into arrays.
+
+    Every column is NOT NULL and fixed-width, so each tuple is exactly 27 bytes
+    (field count, then length+value per column) and the whole body maps onto one
+    structured dtype without a Python loop.
+
+    Returns:
+        (ts_us int64 — Unix microseconds, latency_ms int32, ok bool) NumPy arrays.
+    """
+    import numpy as np
+
+    if not buf.startswith(_COPY_HEADER):
+        raise ValueError("not a PostgreSQL binary COPY stream")
+    ext_len = int.from_bytes(buf[len(_COPY_HEADER) + 4:_COPY_HEADER_LEN], "big")
+    body = memoryview(buf)[_COPY_HEADER_LEN + ext_len:-2]  # без заголовка и трейлера (-1 as int16)
+    row = np.dtype([
+        ("nfields", ">i2"),
+        ("ts_len", ">i4"), ("ts", ">i8"),
+        ("lat_len", ">i4"), ("lat", ">i4"),
+        ("ok_len", ">i4"), ("ok", "u1"),
+    ])
+    rows = np.frombuffer(body, dtype=row)
+    ts_us = rows["ts"].astype(np.int64) + _PG_EPOCH_US
+    return ts_us, rows["lat"].astype(np.int32), rows["ok"].astype(bool)
+
+
+def build(ts_us, latency_ms, ok, *, t0_us: int, bucket_s: int, n_buckets: int) -> Heatmap:
+    """
+    Bin checks into `n_buckets` time buckets of `bucket_s` starting at `t0_us`.
+
+    Checks outside [t0, t0 + n_buckets * bucket_s) are ignored.
+    """
+    import numpy as np
+
+    edges = np.asarray(LATENCY_EDGES_MS, dtype=np.int32)
+    n_lat = len(edges)
+    t_idx = (ts_us - t0_us) // (bucket_s * 1_000_000)
+    inside = (t_idx >= 0) & (t_idx < n_buckets)
+    if not inside.all():
+        t_idx, latency_ms, ok = t_idx[inside], latency_ms[inside], ok[inside]
+    l_idx = np.searchsorted(edges, latency_ms, side="right") - 1
+    np.clip(l_idx, 0, n_lat - 1, out=l_idx)
+
+    counts = np.bincount(t_idx * n_lat + l_idx, minlength=n_buckets * n_lat).reshape(n_buckets, n_lat)
+    failures = np.bincount(t_idx, weights=~ok, minlength=n_buckets).astype(np.int64)
+    if latency_ms.size:
+        p50, p95, p99 = (float(v) for v in np.percentile(latency_ms, (50, 95, 99)))
+    else:
+        p50 = p95 = p99 = None
+    return Heatmap(
+        t0_us=t0_us,
+        bucket_s=bucket_s,
+        counts=counts.tolist(),
+        failures=failures.tolist(),
+        histogram=counts.sum(axis=0).tolist(),
+        total=int(latency_ms.size),
+        p50_ms=p50,
+        p95_ms=p95,
+        p99_ms=p99,
+    )
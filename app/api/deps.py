@@ -0,0 +1,285 @@
+# app/api/deps.py
+"""
+Shared FastAPI dependencies.
+
+`get_current_user` resolves the bearer token to a `UserOut` through two bounded caches:
+    - token cache: verified access-token claims (user id), expiring no later than `exp`;
+    - user cache: user snapshots by id, invalidated on patch/delete/deactivation
+      locally and across workers via the `user_invalidated` NOTIFY channel.
+A warm request therefore costs neither a JWT decode nor a DB round-trip.
+
+`throttle_login` sheds credential stuffing before any password hashing or user lookup.
+
+`get_db` / `get_read_db` hand out primary and replica sessions (see `app.core.db.ReplicaSet`).
+A commit by an authenticated user pins that user's reads to the primary for a few seconds
+(read-your-writes): locally at once and in other workers via the `db_primary_pinned`
+NOTIFY channel, sent in the committing transaction. Browsers also get a cookie.
+
+Caches and limiters are built on first use (`get_token_cache`, `get_user_cache`,
+`get_pinned_users`, `get_login_limiters`), so importing the API does not construct Settings.
+"""
+
+import random
+import time
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security.utils import get_authorization_scheme_param
+from pydantic import ValidationError
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.db import get_replicas, get_sessionmaker
+from app.core.rate_limit import SlidingWindowLimiter, retry_after, sliding_count
+from app.core.settings import get_settings
+from app.repositories import login_throttle as throttle_repo
+from app.repositories import users as users_repo
+from app.schemas.token import TokenPayload
+from app.schemas.user import UserOut
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+# Cookie «читать с primary до…»: выставляется после коммита (read-your-writes)
+STICKY_COOKIE = "db_primary_until"
+# Канал NOTIFY: payload — id пользователя, чьи чтения после коммита идут на primary
+PIN_CHANNEL = "db_primary_pinned"
+# Ключ «все пользователи»: после переподключения LISTEN уведомления могли потеряться
+_PIN_ALL = "*"
+
+
+@lru_cache
+def get_token_cache() -> TTLCache[str, int]:
+    # token -> user_id; TTL ограничен `exp` токена, поэтому часы — wall clock
+    settings = get_settings()
+    return TTLCache(maxsize=settings.AUTH_CACHE_MAX_TOKENS, ttl_s=settings.AUTH_CACHE_TTL_S, clock=time.time)
+
+
+@lru_cache
+def get_user_cache() -> TTLCache[int, UserOut]:
+    # user_id -> снимок пользователя (без хэша пароля)
+    settings = get_settings()
+    return TTLCache(maxsize=settings.AUTH_CACHE_MAX_USERS, ttl_s=settings.AUTH_CACHE_TTL_S)
+
+
+@lru_cache
+def get_pinned_users() -> TTLCache[int | str, bool]:
+    # user_id -> читать с primary; запись живёт DB_READ_YOUR_WRITES_S
+    settings = get_settings()
+    return TTLCache(maxsize=settings.AUTH_CACHE_MAX_USERS, ttl_s=settings.DB_READ_YOUR_WRITES_S)
+
+
+_credentials_error = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+# ========================== DB sessions ========================== #
+
+async def get_db(response: Response) -> AsyncSession:
+    """
+    Primary session for routes that may write.
+
+    After a successful commit the writer's subsequent reads are pinned to the primary
+    (read-your-writes), see `get_read_db`: by user id when `get_current_user` ran on this
+    session, and by a short-lived cookie for browsers.
+    """
+    async with get_sessionmaker()() as s:
+        if get_replicas().engines:
+            @event.listens_for(s.sync_session, "before_commit")
+            def _announce_pin(session) -> None:
+                # NOTIFY в той же транзакции: другие воркеры узнают о записи только после коммита
+                user_id = session.info.get("user_id")
+                if user_id is not None:
+                    session.execute(
+                        text("SELECT pg_notify(:channel, :payload)"), {"channel": PIN_CHANNEL, "payload": str(user_id)}
+                    )
+
+            @event.listens_for(s.sync_session, "after_commit")
+            def _pin_to_primary(session) -> None:
+                settings = get_settings()
+                user_id = session.info.get("user_id")
+                if user_id is not None:
+                    get_pinned_users().set(user_id, True)
+                until = int(time.time()) + settings.DB_READ_YOUR_WRITES_S
+                response.set_cookie(
+                    STICKY_COOKIE, str(until), max_age=settings.DB_READ_YOUR_WRITES_S, httponly=True, samesite="lax"
+                )
+        yield s
+
+
+def _is_pinned(request: Request) -> bool:
+    pinned_users = get_pinned_users()
+    if pinned_users.get(_PIN_ALL):
+        return True
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() == "bearer" and token:
+        try:
+            if pinned_users.get(_resolve_token(token)):
+                return True
+        except HTTPException:
+            pass  # неверный токен отклонит get_current_user
+    try:
+        return int(request.cookies.get(STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Session for read-only routes: a fresh-enough replica, else the primary.
+
+    Falls back to the primary while the caller is pinned after its own write (by the
+    bearer token's user id, or `STICKY_COOKIE`) or when every replica lags more than
+    `DB_REPLICA_MAX_LAG_S`.
+    """
+    maker = None
+    if get_replicas().engines and not _is_pinned(request):
+        maker = get_replicas().pick()
+    async with (maker or get_sessionmaker())() as s:
+        yield s
+
+
+def on_primary_pinned(payload: str) -> None:
+    """NOTIFY handler for `PIN_CHANNEL` (payload is the user id)."""
+    get_pinned_users().set(int(payload), True)
+
+
+def on_pin_listener_reconnect() -> None:
+    """Pins announced while LISTEN was down are lost: read everyone from the primary for a while."""
+    get_pinned_users().set(_PIN_ALL, True)
+
+
+# ========================== Current user ========================== #
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached user snapshot in this process."""
+    get_user_cache().pop(user_id)
+
+
+def on_user_invalidated(payload: str) -> None:
+    """NOTIFY handler for `users_repo.INVALIDATION_CHANNEL` (payload is the user id)."""
+    invalidate_user(int(payload))
+
+
+def _resolve_token(token: str) -> int:
+    token_cache = get_token_cache()
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    from jose import JWTError, jwt  # ленивый импорт: jose нужен только при промахе кэша
+
+    try:
+        settings = get_settings()
+        data = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+        payload = TokenPayload.model_validate(data)
+    except (JWTError, ValidationError):
+        raise _credentials_error
+    if payload.type != "access":
+        raise _credentials_error
+
+    user_id = int(payload.sub)
+    token_cache.set(token, user_id, ttl_s=payload.exp - time.time())
+    return user_id
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> UserOut:
+    """
+    Resolve the authenticated user from the `Authorization: Bearer` header.
+
+    Raises:
+        HTTPException 401: invalid/expired token or the user no longer exists.
+        HTTPException 403: user is inactive.
+    """
+    user_id = _resolve_token(token)
+    # по нему get_db закрепляет чтения пользователя за primary после коммита
+    db.info["user_id"] = user_id
+
+    user_cache = get_user_cache()
+    user = user_cache.get(user_id)
+    if user is None:
+        stamp = user_cache.stamp()
+        row = await users_repo.get_by_id(db, user_id=user_id)
+        if not row:
+            raise _credentials_error
+        user = UserOut.model_validate(row)
+        user_cache.set(user_id, user, stamp=stamp)
+
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
+    return user
+
+
+# ========================== Login throttling ========================== #
+
+@lru_cache
+def get_login_limiters() -> tuple[SlidingWindowLimiter, SlidingWindowLimiter]:
+    """In-process (per-IP, per-account) login limiters."""
+    settings = get_settings()
+    ip_limiter = SlidingWindowLimiter(
+        limit=settings.LOGIN_RATE_PER_IP, window_s=settings.LOGIN_RATE_WINDOW_S, max_keys=settings.LOGIN_RATE_MAX_KEYS
+    )
+    account_limiter = SlidingWindowLimiter(
+        limit=settings.LOGIN_RATE_PER_ACCOUNT, window_s=settings.LOGIN_RATE_WINDOW_S, max_keys=settings.LOGIN_RATE_MAX_KEYS
+    )
+    return ip_limiter, account_limiter
+
+
+def _too_many(retry_s: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(int(retry_s))},
+    )
+
+
+async def _shared_hit(limits: dict[str, int]) -> float | None:
+    """Count the attempt in the shared Postgres counters; return retry-after if over any limit."""
+    window_s = get_settings().LOGIN_RATE_WINDOW_S
+    now = time.time()
+    window = int(now // window_s)
+    async with get_sessionmaker()() as s:
+        counts = await throttle_repo.hit_many(s, keys=list(limits), window=window)
+        # Редкая уборка старых окон, чтобы таблица не росла
+        if random.random() < 0.01:
+            await throttle_repo.purge_before(s, window=window - 1)
+        await s.commit()
+
+    for key, limit in limits.items():
+        cur, prev = counts[key]
+        # `cur` уже включает текущую попытку
+        if sliding_count(cur - 1, prev, window_s, now) + 1 > limit:
+            return retry_after(cur - 1, prev, limit, window_s, now)
+    return None
+
+
+async def throttle_login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> None:
+    """
+    Reject login attempts over the per-IP or per-account rate with 429.
+
+    Runs before the user lookup and password verification. The IP limiter is checked first,
+    so a sprayer of random accounts is stopped without creating per-account state.
+    """
+    ip = request.client.host if request.client else "unknown"
+    account = form_data.username.strip().lower()
+
+    settings = get_settings()
+    ip_limiter, account_limiter = get_login_limiters()
+    retry_s = ip_limiter.hit(f"ip:{ip}") or account_limiter.hit(f"acct:{account}")
+    if retry_s is None and settings.LOGIN_RATE_LIMIT_BACKEND == "postgres":
+        retry_s = await _shared_hit({
+            f"ip:{ip}": settings.LOGIN_RATE_PER_IP,
+            f"acct:{account}": settings.LOGIN_RATE_PER_ACCOUNT,
+        })
+    if retry_s is not None:
+        raise _too_many(retry_s)
@@ -0,0 +1,43 @@
+# app/api/etag.py
+"""
+Strong ETags for monitor and status resources.
+
+ETags are derived from the owner's change counters (`users.monitors_version`,
+`users.status_version`) plus the request parameters, never from the body, so a
+conditional GET is answered with 304 after a single primary-key lookup and
+without loading any ORM rows or serializing anything.
+
+History pages (checks, events, heatmap) use their own keyset instead: cursor,
+limit and the id of the newest row on the page (one index probe), so older pages
+stay valid while new results arrive and `status_version` is left to latest-state
+reads.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from resource kind, counters and query parameters."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if `If-None-Match` lists this ETag (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    # no-cache: клиент и прокси могут хранить ответ, но обязаны перепроверять его через If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,45 @@
+# app/api/fast_json.py
+"""
+Fast JSON path for list and history endpoints.
+
+The regular path validates every ORM row into a Pydantic model in the router, then FastAPI
+validates the result against `response_model` again and serializes it. Rows read from our own
+DB are already valid, so here they are mapped to plain dicts and serialized straight to bytes
+with a `TypeAdapter` over a TypedDict schema (pydantic-core serializer, no validation).
+Routes keep `response_model` for OpenAPI; returning a `Response` makes FastAPI skip it.
+"""
+
+from operator import attrgetter
+from typing import Any, Iterable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already serialized JSON bytes."""
+    media_type = "application/json"
+
+
+class RowSerializer:
+    """
+    Serializer of ORM objects (or any attribute holders) into a JSON array.
+
+    Args:
+        row_type: TypedDict describing one item; its key order is the output field order.
+    """
+
+    def __init__(self, row_type: type) -> None:
+        self.fields = tuple(row_type.__annotations__)
+        self._get = attrgetter(*self.fields)
+        self._one = TypeAdapter(row_type)
+        self._many = TypeAdapter(list[row_type])
+
+    def to_dict(self, obj: Any) -> dict:
+        return dict(zip(self.fields, self._get(obj)))
+
+    def dump_one(self, obj: Any) -> bytes:
+        return self._one.dump_json(self.to_dict(obj))
+
+    def dump_many(self, objs: Iterable[Any]) -> bytes:
+        return self._many.dump_json([self.to_dict(o) for o in objs])
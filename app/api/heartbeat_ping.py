@@ -0,0 +1,210 @@
+# app/api/heartbeat_ping.py
+"""
+Heartbeat ping endpoint: GET/POST/HEAD /hb/{token}, called by cron jobs and other push monitors.
+
+Served by a plain ASGI middleware in front of the app rather than a FastAPI route: a ping
+must not pay for routing, dependency injection or the `request_logs` insert (the
+`BaseHTTPMiddleware` hop alone costs several times more than the whole ping). A warm ping
+is a token lookup in the token cache and one dict store in the last-seen table (both, like
+the rest of this module's state, are built on first use rather than at import):
+    - token -> monitor id comes from an SWR cache with single-flight loads; rotated tokens
+      are dropped on `heartbeat_token_revoked`;
+    - unknown tokens go to a separate small `MissCache`, so a scan of random tokens cannot
+      evict real ones, and lookups that find nothing are rate-limited per process: past
+      HEARTBEAT_MISS_RATE per second, tokens that are not cached get 429 without a query
+      until the window lets misses through again;
+    - the last-seen table keeps only the latest ping per monitor and writes the whole table every
+      HEARTBEAT_FLUSH_S in one statement (`heartbeats.record_pings`), however many pings
+      arrived. Pings not yet flushed are lost if the process dies; the prober's deadline
+      slack (PROBER_HEARTBEAT_SLACK_S) covers the flush delay.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from functools import lru_cache
+
+from app.core.cache import MissCache, SWRCache
+from app.core.db import get_sessionmaker
+from app.core.settings import get_settings
+from app.repositories import heartbeats as repo
+
+log = logging.getLogger(__name__)
+
+PING_PREFIX = "/hb/"
+# токен из heartbeats.new_token: 32 символа base64url; остальное — 404 без обращения к БД
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{32}")
+_ALLOWED = ("GET", "POST", "HEAD")
+
+
+async def _load_monitor_id(token: str) -> int | None:
+    # Всегда primary: токен только что создан или отозван — реплика может ещё отставать
+    async with get_sessionmaker()() as s:
+        return await repo.monitor_id_for_token(s, token=token)
+
+
+@lru_cache
+def get_token_cache() -> SWRCache[str, int]:
+    """token -> monitor id; unknown tokens are not stored here, see `get_unknown_tokens`."""
+    settings = get_settings()
+    return SWRCache(
+        _load_monitor_id,
+        maxsize=settings.HEARTBEAT_TOKEN_CACHE_SIZE,
+        fresh_s=settings.HEARTBEAT_TOKEN_FRESH_S,
+        max_stale_s=settings.HEARTBEAT_TOKEN_MAX_STALE_S,
+        cache_misses=False,
+    )
+
+
+@lru_cache
+def get_unknown_tokens() -> MissCache[str]:
+    """Tokens with no heartbeat, and the per-process budget of lookups that find nothing."""
+    settings = get_settings()
+    return MissCache(
+        maxsize=settings.HEARTBEAT_UNKNOWN_CACHE_SIZE,
+        ttl_s=settings.HEARTBEAT_UNKNOWN_TTL_S,
+        miss_rate=settings.HEARTBEAT_MISS_RATE,
+    )
+
+
+def on_token_revoked(payload: str) -> None:
+    """NOTIFY handler for `repo.HEARTBEAT_TOKEN_REVOKED_CHANNEL` (payload is the old token)."""
+    get_token_cache().invalidate(payload)
+
+
+def on_listener_reconnect() -> None:
+    """Revocations may have been lost: mark every cached token stale."""
+    get_token_cache().invalidate_all()
+
+
+class LastSeenTable:
+    """
+    Latest ping time per monitor in this process, flushed to `heartbeats` in batches.
+
+    Args:
+        flush_s: Flush period in seconds.
+    """
+
+    def __init__(self, flush_s: float) -> None:
+        self.flush_s = flush_s
+        self._seen: dict[int, float] = {}
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def record(self, monitor_id: int, ts: float) -> None:
+        self._seen[monitor_id] = ts
+
+    async def flush(self) -> int:
+        """Write the pings collected so far; on failure they are kept for the next attempt."""
+        batch, self._seen = self._seen, {}
+        if not batch:
+            return 0
+        try:
+            async with get_sessionmaker()() as s:
+                await repo.record_pings(s, pings=batch)
+                await s.commit()
+        except Exception:
+            for monitor_id, ts in batch.items():
+                if self._seen.get(monitor_id, 0.0) < ts:
+                    self._seen[monitor_id] = ts
+            raise
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_s)
+            try:
+                await self.flush()
+            except Exception:
+                log.exception("heartbeat flush failed, %d monitors pending", len(self._seen))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="heartbeat-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.exception("final heartbeat flush failed, %d monitors lost", len(self._seen))
+
+
+@lru_cache
+def get_last_seen() -> LastSeenTable:
+    return LastSeenTable(get_settings().HEARTBEAT_FLUSH_S)
+
+
+def _start(status: int, body_len: int, extra: tuple = ()) -> dict:
+    return {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(body_len).encode()),
+            (b"cache-control", b"no-store"),
+            *extra,
+        ],
+    }
+
+
+class HeartbeatPingMiddleware:
+    """
+    ASGI middleware answering `PING_PREFIX` paths itself; everything else goes to `app`.
+
+    Responses: 200 "OK" (ping recorded), 404 (unknown token), 405 (other methods),
+    429 (too many unknown tokens in this process, the token is not cached — retry later),
+    503 (token lookup failed, e.g. the database is down — the job may retry).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(PING_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method not in _ALLOWED:
+            await self._respond(send, method, 405, b"Method Not Allowed", ((b"allow", b"GET, POST, HEAD"),))
+            return
+        token = scope["path"][len(PING_PREFIX):].rstrip("/")
+        unknown = get_unknown_tokens()
+        if not _TOKEN_RE.fullmatch(token) or token in unknown:
+            await self._respond(send, method, 404, b"Not Found")
+            return
+        token_cache = get_token_cache()
+        if token not in token_cache and (wait := unknown.blocked_for()) > 0:
+            retry = str(math.ceil(wait)).encode()
+            await self._respond(send, method, 429, b"Too Many Requests", ((b"retry-after", retry),))
+            return
+        try:
+            monitor_id = await token_cache.get(token)
+        except Exception:
+            log.warning("heartbeat token lookup failed", exc_info=True)
+            await self._respond(send, method, 503, b"Service Unavailable", ((b"retry-after", b"5"),))
+            return
+        if monitor_id is None:
+            if (wait := unknown.add(token)) is not None:
+                log.warning("heartbeat: too many unknown tokens, lookups of uncached tokens paused for %.1f s", wait)
+            await self._respond(send, method, 404, b"Not Found")
+            return
+        get_last_seen().record(monitor_id, time.time())
+        await self._respond(send, method, 200, b"OK")
+
+    @staticmethod
+    async def _respond(send, method: str, status: int, body: bytes, extra: tuple = ()) -> None:
+        # тело запроса (например, вывод cron-задачи) не читается: сервер отбросит его сам
+        await send(_start(status, len(body), extra))
+        await send({"type": "http.response.body", "body": b"" if method == "HEAD" else body})
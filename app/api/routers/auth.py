@@ -8,9 +8,9 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.core.db import get_db
+from app.api.deps import get_db, throttle_login
 from app.core.security import (
-    hash_password, verify_password, needs_rehash,
+    hash_password_async, verify_password_async, needs_rehash,
     create_access_token, create_refresh_token
 )
 from app.schemas.user import UserRegisterIn
@@ -24,11 +24,11 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 async def register(payload: UserRegisterIn, db: AsyncSession = Depends(get_db)) -> Token:
     """
     Register a new user:
-    - hash password with Argon2id
+    - hash password with Argon2id (in the hashing pool; 503 if it is saturated)
     - store user
     - return access/refresh tokens
     """
-    hashed = hash_password(payload.password)
+    hashed = await hash_password_async(payload.password)
     try:
         user = await users_repo.create(
             db,
@@ -48,17 +48,18 @@ async def register(payload: UserRegisterIn, db: AsyncSession = Depends(get_db))
     )
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(throttle_login)])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)) -> Token:
     """
     Login:
+    - per-IP/per-account throttling (429) before any hashing or DB lookup
     - fetch user by email (from form_data.username)
-    - verify password
+    - verify password (in the hashing pool; 503 if it is saturated)
     - optional rehash
     - return tokens
     """
     user = await users_repo.get_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -69,7 +70,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
         raise HTTPException(status_code=403, detail="User is inactive")
 
     if needs_rehash(user.hashed_password):
-        user.hashed_password = hash_password(form_data.password)
+        user.hashed_password = await hash_password_async(form_data.password)
         await db.commit()
 
     return Token(
@@ -108,7 +109,7 @@ async def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await users_repo.get(db, id=int(token_payload.sub))
+    user = await users_repo.get_by_id(db, user_id=int(token_payload.sub))
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,9 +1,150 @@
-from fastapi import APIRouter
+# app/api/routers/checks.py
+"""
+HTTP router for probe results (check history).
+Read-only: served from a replica when one is configured and fresh enough.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_read_db
+from app.api.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.api.fast_json import RawJSONResponse, RowSerializer
+from app.schemas.check import CheckOut, CheckRow, LatencyHeatmap
+from app.schemas.user import UserOut
+from app.repositories import checks as repo
 
 router = APIRouter(prefix="/checks", tags=["checks"])
 
+_check_rows = RowSerializer(CheckRow)
+
+HEATMAP_DEFAULT_WINDOW = timedelta(days=7)
+HEATMAP_MAX_BUCKETS = 5000
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
 
 @router.post("/stub")
 async def create_monitor() -> str:
     return "This is a stub endpoint for creating a monitor."
 
+
+@router.get("/{monitor_id}", response_model=List[CheckOut])
+async def list_checks(
+    monitor_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+    before: datetime | None = None,
+    before_id: int | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> RawJSONResponse:
+    """
+    Check history of a monitor owned by the current user, newest first.
+
+    Query:
+        before: return only checks older than this timestamp (keyset cursor).
+        before_id: with `before`, the id of the last check of the previous page: the cursor
+            becomes `(ts, id)` and checks sharing that timestamp are not skipped.
+        limit: page size (default 100, max 1000).
+
+    Returns:
+        List[CheckOut]: history page (empty for foreign or unknown monitors),
+        serialized via the fast JSON path.
+        304 if `If-None-Match` matches the current ETag (same newest check on the page).
+
+    Notes:
+        The ETag is built from the page's own keyset (cursor, limit, newest check id), so
+        `before` pages keep validating while new checks arrive at the head.
+    """
+    newest = await repo.newest_id(
+        db, user_id=current_user.id, monitor_id=monitor_id, before=before, before_id=before_id
+    )
+    etag = make_etag("checks", current_user.id, monitor_id, before, before_id, limit, newest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = await repo.list_for_monitor(
+        db, user_id=current_user.id, monitor_id=monitor_id, before=before, before_id=before_id, limit=limit
+    )
+    return RawJSONResponse(_check_rows.dump_many(rows), headers=etag_headers(etag))
+
+
+@router.get("/{monitor_id}/heatmap", response_model=LatencyHeatmap)
+async def latency_heatmap(
+    monitor_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    bucket_s: int = Query(default=3600, ge=60, le=7 * 86400),
+) -> RawJSONResponse:
+    """
+    Latency heatmap (time × latency bucket) and histogram of a monitor owned by the current user.
+
+    Query:
+        since: window start (default: `until` minus 7 days); naive values are UTC.
+        until: window end (default: now).
+        bucket_s: time bucket width in seconds (60..604800); the window is aligned to it
+            and may not exceed 5000 buckets.
+
+    Returns:
+        LatencyHeatmap (all-zero for foreign or unknown monitors).
+        304 if `If-None-Match` matches the current ETag (same newest check in the window).
+
+    Notes:
+        History is fetched as one binary COPY of `(ts, latency_ms, ok)` and binned with
+        NumPy in a worker thread; no per-row Python objects are created.
+    """
+    until = _as_utc(until) if until else datetime.now(timezone.utc)
+    since = _as_utc(since) if since else until - HEATMAP_DEFAULT_WINDOW
+    end_s = -(-int(until.timestamp()) // bucket_s) * bucket_s
+    start_s = int(since.timestamp()) // bucket_s * bucket_s
+    n_buckets = (end_s - start_s) // bucket_s
+    if n_buckets <= 0:
+        raise HTTPException(status_code=422, detail="`since` must be earlier than `until`")
+    if n_buckets > HEATMAP_MAX_BUCKETS:
+        raise HTTPException(status_code=422, detail=f"Window too large: at most {HEATMAP_MAX_BUCKETS} buckets")
+
+    window_start = datetime.fromtimestamp(start_s, timezone.utc)
+    window_end = datetime.fromtimestamp(end_s, timezone.utc)
+    newest = await repo.newest_id(
+        db, user_id=current_user.id, monitor_id=monitor_id, since=window_start, until=window_end
+    )
+    etag = make_etag("heatmap", current_user.id, monitor_id, start_s, end_s, bucket_s, newest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    buf = await repo.copy_latency_columns(
+        db, user_id=current_user.id, monitor_id=monitor_id, since=window_start, until=window_end
+    )
+
+    from app.analytics import heatmap  # NumPy грузится только при первом запросе карты
+
+    def compute() -> heatmap.Heatmap:
+        return heatmap.build(
+            *heatmap.decode_copy(buf), t0_us=start_s * 1_000_000, bucket_s=bucket_s, n_buckets=n_buckets
+        )
+
+    hm = await asyncio.to_thread(compute)
+    body = LatencyHeatmap(
+        monitor_id=monitor_id,
+        since=window_start,
+        until=window_end,
+        bucket_s=bucket_s,
+        latency_edges_ms=list(heatmap.LATENCY_EDGES_MS),
+        counts=hm.counts,
+        failures=hm.failures,
+        histogram=hm.histogram,
+        total=hm.total,
+        p50_ms=hm.p50_ms,
+        p95_ms=hm.p95_ms,
+        p99_ms=hm.p99_ms,
+    )
+    return RawJSONResponse(body.model_dump_json(), headers=etag_headers(etag))
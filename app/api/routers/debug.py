@@ -0,0 +1,90 @@
+# app/api/routers/debug.py
+"""
+HTTP router for profiling artifacts and captured slow queries (see `app.core.profiling`).
+Mounted only when `PROFILE_TOKEN` is set; every endpoint requires `X-Profile-Token`.
+"""
+
+import asyncio
+import hmac
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.core.profiling import ProfileStore
+from app.core.settings import get_settings
+from app.schemas.profiling import ProfileOut, SlowQueryOut
+
+
+def require_profile_token(x_profile_token: str = Header(default="")) -> None:
+    """Reject requests without the profiling token (compared in constant time)."""
+    expected = get_settings().PROFILE_TOKEN
+    if not expected or not hmac.compare_digest(x_profile_token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profile token")
+
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_profile_token)])
+
+
+def _store(request: Request) -> ProfileStore:
+    return request.app.state.profiles
+
+
+@router.get("/profiles", response_model=List[ProfileOut])
+async def list_profiles(request: Request) -> List[ProfileOut]:
+    """
+    List stored profiles, newest first.
+
+    Returns:
+        Profile metadata; the number of SQL statements instead of the statements themselves.
+    """
+    return await asyncio.to_thread(_store(request).list)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    request: Request,
+    format: Literal["pstats", "text", "json"] = Query(default="pstats"),
+    sort: Literal["cumulative", "tottime", "calls"] = Query(default="cumulative"),
+    limit: int = Query(default=50, ge=1, le=1000),
+):
+    """
+    Download one profile.
+
+    Args:
+        profile_id: Id from `X-Profile-Id` or the list.
+        format: `pstats` — the raw cProfile dump (`python -m pstats`, snakeviz);
+            `text` — top `limit` functions sorted by `sort`;
+            `json` — metadata with every SQL statement and its timing.
+
+    Raises:
+        HTTPException 404: No such profile (rotated out or never stored).
+    """
+    store = _store(request)
+    if format == "text":
+        report = await asyncio.to_thread(store.report, profile_id, sort=sort, limit=limit)
+        if report is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return PlainTextResponse(report)
+    suffix, media_type = (".pstats", "application/octet-stream") if format == "pstats" else (".json", "application/json")
+    path = store.path(profile_id, suffix)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryOut])
+async def list_slow_queries(
+    request: Request,
+    limit: int = Query(default=100, ge=1, le=10_000),
+) -> List[SlowQueryOut]:
+    """
+    Recent statements slower than `SLOW_QUERY_MS` in this process, newest first.
+
+    Returns:
+        Up to `limit` entries; empty when slow-query capture is off.
+    """
+    timer = request.app.state.query_timer
+    if timer is None:
+        return []
+    return list(reversed(timer.slow))[:limit]
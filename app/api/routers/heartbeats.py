@@ -0,0 +1,183 @@
+# app/api/routers/heartbeats.py
+"""
+HTTP router for heartbeat (push) monitors.
+Keeps HTTP, auth, and transaction concerns here; delegates DB work to repository.
+
+The pings themselves are not routed here: GET/POST/HEAD /hb/{token} is answered by
+`app.api.heartbeat_ping.HeartbeatPingMiddleware` before the app. Heartbeat monitors are
+also listed, paused and deleted with the other monitors under /api/monitors.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.heartbeat_ping import PING_PREFIX
+from app.core.quota import QuotaExceeded, Usage, check_usage
+from app.core.settings import get_settings
+from app.models.heartbeat import Heartbeat
+from app.models.monitor import Monitor
+from app.schemas.heartbeat import HeartbeatCreate, HeartbeatOut, HeartbeatUpdate
+from app.schemas.user import UserOut
+from app.repositories import heartbeats as repo
+from app.repositories import users as users_repo
+
+router = APIRouter(prefix="/api/heartbeats", tags=["heartbeats"])
+
+
+def _ping_url(token: str) -> str:
+    return f"{get_settings().HEARTBEAT_BASE_URL.rstrip('/')}{PING_PREFIX}{token}"
+
+
+def _out(monitor: Monitor, heartbeat: Heartbeat) -> HeartbeatOut:
+    return HeartbeatOut(
+        id=monitor.id,
+        user_id=monitor.user_id,
+        name=monitor.name,
+        ping_url=monitor.url,
+        interval_s=monitor.interval_s,
+        grace_s=heartbeat.grace_s,
+        is_paused=monitor.is_paused,
+        last_ping_at=heartbeat.last_ping_at,
+        down=heartbeat.down,
+        created_at=monitor.created_at,
+    )
+
+
+@router.post("/", response_model=HeartbeatOut, status_code=status.HTTP_201_CREATED)
+async def create_heartbeat(
+    payload: HeartbeatCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> HeartbeatOut:
+    """
+    Create a heartbeat monitor for the current user.
+
+    Body:
+        HeartbeatCreate: name, expected period and grace.
+
+    Returns:
+        HeartbeatOut: created monitor with its secret `ping_url`.
+
+    Raises:
+        HTTPException 403: the user's monitor count quota would be exceeded
+            (heartbeats use no probe budget).
+        HTTPException 409: a monitor with this name already exists.
+    """
+    token = repo.new_token()
+    try:
+        monitor, heartbeat = await repo.create(
+            db,
+            user_id=current_user.id,
+            name=payload.name,
+            url=_ping_url(token),
+            token=token,
+            interval_s=payload.interval_s,
+            grace_s=payload.grace_s,
+        )
+        # проверка после записи: строка пользователя уже заблокирована (см. users_repo.get_quota)
+        quota, after = await users_repo.get_quota(db, user_id=current_user.id)
+        check_usage(quota, Usage(after.monitors - 1, after.probes_per_s), after)
+        await db.commit()
+    except QuotaExceeded as e:
+        await db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Monitor with this name already exists")
+
+    return _out(monitor, heartbeat)
+
+
+@router.get("/{monitor_id}", response_model=HeartbeatOut)
+async def get_heartbeat(
+    monitor_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> HeartbeatOut:
+    """
+    Get a heartbeat monitor owned by the current user.
+
+    Path:
+        monitor_id: target monitor id.
+
+    Returns:
+        HeartbeatOut (`last_ping_at` lags behind the actual pings by up to HEARTBEAT_FLUSH_S).
+
+    Raises:
+        HTTPException 404: heartbeat monitor not found or not owned by user.
+    """
+    found = await repo.get_for_user(db, user_id=current_user.id, monitor_id=monitor_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Heartbeat monitor not found")
+    return _out(*found)
+
+
+@router.patch("/{monitor_id}", response_model=HeartbeatOut)
+async def update_heartbeat(
+    monitor_id: int,
+    payload: HeartbeatUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> HeartbeatOut:
+    """
+    Partially update a heartbeat monitor owned by the current user.
+
+    Path:
+        monitor_id: target monitor id.
+
+    Body:
+        HeartbeatUpdate: name, period, grace and/or pause flag.
+
+    Returns:
+        HeartbeatOut.
+
+    Raises:
+        HTTPException 404: heartbeat monitor not found.
+        HTTPException 409: a monitor with this name already exists.
+    """
+    fields = payload.model_dump(exclude_unset=True, exclude_none=True)
+    grace_s = fields.pop("grace_s", None)
+    try:
+        found = await repo.patch(
+            db, user_id=current_user.id, monitor_id=monitor_id, monitor_fields=fields, grace_s=grace_s
+        )
+        if found is None:
+            raise HTTPException(status_code=404, detail="Heartbeat monitor not found")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Monitor with this name already exists")
+    return _out(*found)
+
+
+@router.post("/{monitor_id}/token", response_model=HeartbeatOut)
+async def rotate_heartbeat_token(
+    monitor_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> HeartbeatOut:
+    """
+    Replace the ping token of a heartbeat monitor owned by the current user.
+
+    The old ping URL stops working within seconds (API processes drop it from their
+    token caches on `heartbeat_token_revoked`).
+
+    Path:
+        monitor_id: target monitor id.
+
+    Returns:
+        HeartbeatOut with the new `ping_url`.
+
+    Raises:
+        HTTPException 404: heartbeat monitor not found.
+    """
+    token = repo.new_token()
+    found = await repo.rotate_token(
+        db, user_id=current_user.id, monitor_id=monitor_id, token=token, url=_ping_url(token)
+    )
+    if found is None:
+        raise HTTPException(status_code=404, detail="Heartbeat monitor not found")
+    await db.commit()
+    return _out(*found)
@@ -0,0 +1,110 @@
+# app/api/routers/maintenance.py
+"""
+HTTP router for maintenance windows.
+Keeps HTTP, auth, and transaction concerns here; delegates DB work to repository.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.schemas.maintenance_window import MaintenanceWindowCreate, MaintenanceWindowOut
+from app.schemas.user import UserOut
+from app.repositories import maintenance_windows as repo
+
+router = APIRouter(prefix="/api/maintenance-windows", tags=["maintenance"])
+
+_PERIODS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+
+@router.post("/", response_model=MaintenanceWindowOut, status_code=status.HTTP_201_CREATED)
+async def create_window(
+    payload: MaintenanceWindowCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> MaintenanceWindowOut:
+    """
+    Create a maintenance window for one monitor or for all monitors of the current user.
+
+    Body:
+        MaintenanceWindowCreate: time range, optional recurrence and mode.
+
+    Returns:
+        MaintenanceWindowOut: created window (running probers pick it up within seconds).
+
+    Raises:
+        HTTPException 404: monitor not found or not owned by user.
+        HTTPException 422: empty range, occurrence longer than its period, or `until` without recurrence.
+    """
+    if payload.ends_at <= payload.starts_at:
+        raise HTTPException(status_code=422, detail="ends_at must be after starts_at")
+    if payload.recurrence is None:
+        if payload.until is not None:
+            raise HTTPException(status_code=422, detail="until requires recurrence")
+    elif payload.ends_at - payload.starts_at > _PERIODS[payload.recurrence]:
+        raise HTTPException(status_code=422, detail=f"A {payload.recurrence} window cannot be longer than its period")
+
+    obj = await repo.create(
+        db,
+        user_id=current_user.id,
+        monitor_id=payload.monitor_id,
+        starts_at=payload.starts_at,
+        ends_at=payload.ends_at,
+        recurrence=payload.recurrence,
+        until=payload.until,
+        mode=payload.mode,
+        reason=payload.reason,
+    )
+    if obj is None:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    await db.commit()
+    return MaintenanceWindowOut.model_validate(obj)
+
+
+@router.get("/", response_model=List[MaintenanceWindowOut])
+async def list_windows(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+    monitor_id: int | None = None,
+    include_past: bool = False,
+) -> List[MaintenanceWindowOut]:
+    """
+    List maintenance windows of the current user.
+
+    Query:
+        monitor_id: only windows applying to this monitor (its own and user-wide ones).
+        include_past: also list finished one-off and expired recurring windows.
+
+    Returns:
+        List[MaintenanceWindowOut] ordered by start time.
+    """
+    rows = await repo.list_for_user(
+        db,
+        user_id=current_user.id,
+        now=None if include_past else datetime.now(timezone.utc),
+        monitor_id=monitor_id,
+    )
+    return [MaintenanceWindowOut.model_validate(r) for r in rows]
+
+
+@router.delete("/{window_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_window(
+    window_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> None:
+    """
+    Delete a maintenance window owned by the current user (ends it immediately if active).
+
+    Path:
+        window_id: target window id.
+
+    Raises:
+        HTTPException 404: window not found.
+    """
+    if not await repo.delete_for_user(db, user_id=current_user.id, window_id=window_id):
+        raise HTTPException(status_code=404, detail="Maintenance window not found")
+    await db.commit()
+    return None
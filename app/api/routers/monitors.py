@@ -4,36 +4,72 @@ HTTP router for Monitor CRUD.
 Keeps HTTP, auth, and transaction concerns here; delegates DB work to repository.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+from collections import Counter
+from datetime import datetime
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.core.db import get_db
-
-from app.schemas.monitor import MonitorCreate, MonitorUpdate, MonitorOut
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.api.fast_json import RawJSONResponse, RowSerializer
+from app.core.quota import QuotaExceeded, check_interval, check_usage
+
+from app.schemas.monitor import (
+    MonitorCreate, MonitorUpdate, MonitorOut,
+    MonitorSyncItem, MonitorSyncResult, MonitorSyncReport,
+    MonitorPage, MonitorRow, MonitorPageRow,
+    MonitorEventOut, MonitorEventRow,
+    MonitorDependenciesUpdate, MonitorDependenciesOut,
+)
 from app.schemas.user import UserOut
 from app.repositories import monitors as repo
+from app.repositories import monitor_events as events_repo
+from app.repositories import monitor_dependencies as dependencies_repo
+from app.repositories import users as users_repo
 
 router = APIRouter(prefix="/api/monitors", tags=["monitors"])
 
+_sync_items = TypeAdapter(List[MonitorSyncItem])
+_monitor_rows = RowSerializer(MonitorRow)
+_overview_page = TypeAdapter(MonitorPageRow)
+_event_rows = RowSerializer(MonitorEventRow)
+
+
+def _encode_cursor(created_at: datetime, monitor_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{monitor_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts, _, mid = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(ts), int(mid)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.post("/", response_model=MonitorOut, status_code=status.HTTP_201_CREATED)
 async def create_monitor(
     payload: MonitorCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserOut = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> MonitorOut:
     """
     Create a new monitor for the current user.
 
     Body:
-        MonitorCreate: validated payload with AnyHttpUrl, method, expected_status, intervals.
+        MonitorCreate: validated payload with the probe type and target (http URL,
+            tcp://host:port or dns: name), method, expected_status, intervals.
 
     Returns:
         MonitorOut: created monitor.
 
     Raises:
+        HTTPException 403: the user's monitor count, interval or probe budget quota would be exceeded.
         HTTPException 409: if URL already exists for this user.
     """
     url_str = str(payload.url)
@@ -51,8 +87,17 @@ async def create_monitor(
             expected_status=payload.expected_status,
             interval_s=payload.interval_s,
             timeout_ms=payload.timeout_ms,
+            kind=payload.kind,
+            expect=payload.expect,
         )
+        # проверка после записи: строка пользователя уже заблокирована (см. users_repo.get_quota)
+        quota, after = await users_repo.get_quota(db, user_id=current_user.id)
+        check_interval(quota, payload.interval_s)
+        check_usage(quota, after.remove(payload.interval_s), after)
         await db.commit()
+    except QuotaExceeded as e:
+        await db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
     except IntegrityError:
         await db.rollback()
         # race or DB unique constraint
@@ -63,11 +108,12 @@ async def create_monitor(
 
 @router.get("/", response_model=List[MonitorOut])
 async def list_monitors(
-    db: AsyncSession = Depends(get_db),
-    current_user: UserOut = Depends(...),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
     limit: int = 25,
     offset: int = 0,
-) -> List[MonitorOut]:
+) -> RawJSONResponse:
     """
     List monitors owned by the current user.
 
@@ -76,17 +122,157 @@ async def list_monitors(
         offset: pagination offset (default 0).
 
     Returns:
-        List[MonitorOut]: monitors page.
+        List[MonitorOut]: monitors page (serialized via the fast JSON path).
+        304 if `If-None-Match` matches the current ETag.
     """
+    monitors_version, _ = await users_repo.get_versions(db, user_id=current_user.id)
+    etag = make_etag("monitors", current_user.id, monitors_version, limit, offset)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     rows = await repo.list_for_user(db, user_id=current_user.id, limit=limit, offset=offset)
-    return [MonitorOut.model_validate(r) for r in rows]
+    return RawJSONResponse(_monitor_rows.dump_many(rows), headers=etag_headers(etag))
+
+
+@router.get("/overview", response_model=MonitorPage)
+async def list_monitors_overview(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    paused: bool | None = None,
+    failing: bool | None = None,
+    name_prefix: str | None = Query(default=None, max_length=200),
+) -> RawJSONResponse:
+    """
+    Dashboard list: cursor-paginated monitors with their latest check embedded.
+
+    Query:
+        cursor: `next_cursor` from the previous page (omit for the first page).
+        limit: page size (default 50, max 200).
+        paused: only paused / only active monitors.
+        failing: only monitors whose latest check failed (true) or did not fail (false).
+        name_prefix: only monitors whose name starts with this prefix.
+
+    Returns:
+        MonitorPage: items ordered by creation time and `next_cursor` (None on the last page);
+        each item carries `latency_anomaly` and `suppressed` from the monitor's latest events.
+        304 if `If-None-Match` matches the current ETag (no monitor changes and no new checks).
+        New checks change the ETag up to `PROBER_STATUS_VERSION_S` late (the prober
+        coalesces `status_version` bumps).
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    versions = await users_repo.get_versions(db, user_id=current_user.id)
+    etag = make_etag("overview", current_user.id, *versions, cursor, limit, paused, failing, name_prefix)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = await repo.list_page_with_status(
+        db, user_id=current_user.id, after=after, limit=limit + 1,
+        paused=paused, failing=failing, name_prefix=name_prefix,
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for m, ts, ok, status_code, latency_ms, error, event_kind, hold_kind in rows:
+        item = _monitor_rows.to_dict(m)
+        item["is_paused"] = m.is_paused
+        item["created_at"] = m.created_at
+        item["last_check"] = None if ts is None else {
+            "ts": ts, "ok": ok, "status_code": status_code, "latency_ms": latency_ms, "error": error,
+        }
+        item["latency_anomaly"] = event_kind == "latency_regression"
+        item["suppressed"] = hold_kind == "suppressed"
+        items.append(item)
+
+    next_cursor = _encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None
+    return RawJSONResponse(
+        _overview_page.dump_json({"items": items, "next_cursor": next_cursor}), headers=etag_headers(etag)
+    )
+
+
+@router.put("/sync", response_model=MonitorSyncReport)
+async def sync_monitors(
+    request: Request,
+    missing: Literal["delete", "pause", "keep"] = "delete",
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> MonitorSyncReport:
+    """
+    Declaratively sync the current user's monitors to the uploaded desired set.
+
+    Body:
+        JSON array of MonitorSyncItem, or NDJSON (one item per line) with
+        `Content-Type: application/x-ndjson`. Items are matched to existing monitors by name.
+
+    Query:
+        missing: what to do with existing monitors absent from the set (delete / pause / keep).
+
+    Returns:
+        MonitorSyncReport: per-action counts and a per-item result.
+
+    Raises:
+        HTTPException 403: the result would exceed the user's quotas (created/changed items
+            are checked against the minimum interval); nothing is applied.
+        HTTPException 409: a URL collides with another monitor, or a name with a heartbeat
+            monitor (those are not synced); nothing is applied.
+        422: invalid items or duplicate names/urls in the set, or a URL moving to another
+            name while its current monitor stays (swaps; renames with missing=pause/keep).
+    """
+    body = await request.body()
+    if "ndjson" in request.headers.get("content-type", ""):
+        body = b"[" + b",".join(line for line in body.splitlines() if line.strip()) + b"]"
+    try:
+        parsed = _sync_items.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+    items = [i.model_dump(mode="json") for i in parsed]
+    for field in ("name", "url"):
+        dupes = [v for v, n in Counter(i[field] for i in items).items() if n > 1]
+        if dupes:
+            raise HTTPException(status_code=422, detail=f"Duplicate {field} in the set: {dupes[:10]}")
+
+    try:
+        _, before = await users_repo.get_quota(db, user_id=current_user.id)
+        results = await repo.sync_for_user(db, user_id=current_user.id, items=items, missing=missing)
+        written = {name for name, action, _ in results if action in ("created", "updated")}
+        if written:
+            quota, after = await users_repo.get_quota(db, user_id=current_user.id)
+            for item in items:
+                if item["name"] in written:
+                    check_interval(quota, item["interval_s"])
+            check_usage(quota, before, after)
+        await db.commit()
+    except QuotaExceeded as e:
+        await db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
+    except repo.NameTaken as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except repo.UrlMoved as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Monitor url conflicts with another monitor")
+
+    counts = Counter(action for _, action, _ in results)
+    return MonitorSyncReport(
+        **counts,
+        items=[MonitorSyncResult(name=name, action=action, id=mid) for name, action, mid in results],
+    )
 
 
 @router.get("/{monitor_id}", response_model=MonitorOut)
 async def get_monitor(
     monitor_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: UserOut = Depends(...),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
 ) -> MonitorOut:
     """
     Get a single monitor by id limited to current user.
@@ -95,23 +281,138 @@ async def get_monitor(
         monitor_id: target monitor id.
 
     Returns:
-        MonitorOut.
+        MonitorOut, or 304 if `If-None-Match` matches the current ETag.
 
     Raises:
         HTTPException 404: monitor not found or not owned by user.
     """
+    monitors_version, _ = await users_repo.get_versions(db, user_id=current_user.id)
+    etag = make_etag("monitor", current_user.id, monitors_version, monitor_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     obj = await repo.get_by_id_for_user(db, user_id=current_user.id, monitor_id=monitor_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Monitor not found")
+    response.headers.update(etag_headers(etag))
     return MonitorOut.model_validate(obj)
 
 
+@router.get("/{monitor_id}/events", response_model=List[MonitorEventOut])
+async def list_monitor_events(
+    monitor_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+    before: datetime | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+) -> RawJSONResponse:
+    """
+    Events of a monitor owned by the current user (latency anomalies, dependency holds), newest first.
+
+    Query:
+        before: return only events older than this timestamp (keyset cursor).
+        limit: page size (default 50, max 500).
+
+    Returns:
+        List[MonitorEventOut]: events page (empty for foreign or unknown monitors).
+        304 if `If-None-Match` matches the current ETag (same newest event on the page).
+
+    Notes:
+        Events are written by the prober together with the checks that raised them and
+        are also announced on the `monitor_events` NOTIFY channel for alerting.
+        The ETag is built from the page's own keyset (cursor, limit, newest event id).
+    """
+    newest = await events_repo.newest_id(db, user_id=current_user.id, monitor_id=monitor_id, before=before)
+    etag = make_etag("events", current_user.id, monitor_id, before, limit, newest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = await events_repo.list_for_monitor(
+        db, user_id=current_user.id, monitor_id=monitor_id, before=before, limit=limit
+    )
+    return RawJSONResponse(_event_rows.dump_many(rows), headers=etag_headers(etag))
+
+
+@router.get("/{monitor_id}/dependencies", response_model=MonitorDependenciesOut)
+async def get_monitor_dependencies(
+    monitor_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> MonitorDependenciesOut:
+    """
+    Direct parents and children of a monitor owned by the current user.
+
+    Path:
+        monitor_id: target monitor id.
+
+    Returns:
+        MonitorDependenciesOut, or 304 if `If-None-Match` matches the current ETag.
+
+    Raises:
+        HTTPException 404: monitor not found or not owned by user.
+    """
+    monitors_version, _ = await users_repo.get_versions(db, user_id=current_user.id)
+    etag = make_etag("dependencies", current_user.id, monitors_version, monitor_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    found = await dependencies_repo.get_for_monitor(db, user_id=current_user.id, monitor_id=monitor_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    response.headers.update(etag_headers(etag))
+    return MonitorDependenciesOut(parent_ids=found[0], child_ids=found[1])
+
+
+@router.put("/{monitor_id}/dependencies", response_model=MonitorDependenciesOut)
+async def set_monitor_dependencies(
+    monitor_id: int,
+    payload: MonitorDependenciesUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> MonitorDependenciesOut:
+    """
+    Replace the parents of a monitor owned by the current user.
+
+    While any parent is confirmed down (or itself held by its own parent), the prober
+    does not probe this monitor and raises no alerts for it; holds are recorded as
+    `suppressed` / `released` events.
+
+    Path:
+        monitor_id: target (child) monitor id.
+
+    Body:
+        MonitorDependenciesUpdate: new parent ids (empty list removes all dependencies).
+
+    Returns:
+        MonitorDependenciesOut: the monitor's parents and children after the change.
+
+    Raises:
+        HTTPException 404: the monitor or a parent not found or not owned by user.
+        HTTPException 409: the change would create a dependency cycle; nothing is applied.
+    """
+    try:
+        parent_ids = await dependencies_repo.set_parents(
+            db, user_id=current_user.id, monitor_id=monitor_id, parent_ids=payload.parent_ids
+        )
+    except dependencies_repo.DependencyCycle as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    if parent_ids is None:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    _, child_ids = await dependencies_repo.get_for_monitor(db, user_id=current_user.id, monitor_id=monitor_id)
+    await db.commit()
+    return MonitorDependenciesOut(parent_ids=parent_ids, child_ids=child_ids)
+
+
 @router.patch("/{monitor_id}", response_model=MonitorOut)
 async def update_monitor(
     monitor_id: int,
     payload: MonitorUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserOut = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> MonitorOut:
     """
     Partially update a monitor owned by the current user.
@@ -126,18 +427,31 @@ async def update_monitor(
         MonitorOut.
 
     Raises:
+        HTTPException 403: a shorter interval or unpausing would exceed the user's quotas.
         HTTPException 404: monitor not found.
         HTTPException 409: unique url conflict.
     """
     fields = payload.model_dump(exclude_unset=True, exclude_none=True)
     if "url" in fields:
         fields["url"] = str(fields["url"])
+    # только интервал и снятие с паузы увеличивают нагрузку
+    quota_checked = "interval_s" in fields or fields.get("is_paused") is False
 
     try:
+        if quota_checked:
+            _, before = await users_repo.get_quota(db, user_id=current_user.id)
         obj = await repo.patch(db, user_id=current_user.id, monitor_id=monitor_id, fields=fields)
         if not obj:
             raise HTTPException(status_code=404, detail="Monitor not found")
+        if quota_checked:
+            quota, after = await users_repo.get_quota(db, user_id=current_user.id)
+            if "interval_s" in fields:
+                check_interval(quota, fields["interval_s"])
+            check_usage(quota, before, after)
         await db.commit()
+    except QuotaExceeded as e:
+        await db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Monitor with this url already exists")
@@ -149,7 +463,7 @@ async def update_monitor(
 async def delete_monitor(
     monitor_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserOut = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> None:
     """
     Delete a monitor owned by the current user.
@@ -0,0 +1,271 @@
+# app/api/routers/status_pages.py
+"""
+HTTP routers for status pages.
+
+`router` is the owner's CRUD under /api/status-pages. `public_router` serves GET /status/{slug}
+without auth from the snapshot cache: snapshots are rendered by writers (see
+`app.repositories.status_pages`) and announced on `status_page_changed`, so a warm request
+costs no DB query, no serialization and no ORM work — just the cached bytes or a 304.
+Unknown slugs are kept in a separate small cache with a per-process budget of lookups that
+find nothing, so probing random slugs neither evicts real pages nor floods the primary.
+Both caches are built on first use, not at import.
+"""
+
+import logging
+import math
+from functools import lru_cache
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.etag import etag_matches, make_etag
+from app.api.fast_json import RawJSONResponse
+from app.core.cache import MissCache, SWRCache
+from app.core.db import get_sessionmaker
+from app.core.settings import get_settings
+from app.models.status_page import StatusPage
+from app.repositories import status_pages as repo
+from app.schemas.status_page import (
+    SLUG_PATTERN, StatusPageCreate, StatusPageUpdate, StatusPageOut, StatusPageSnapshot,
+)
+from app.schemas.user import UserOut
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/status-pages", tags=["status pages"])
+public_router = APIRouter(prefix="/status", tags=["status pages"])
+
+
+async def _load_snapshot(slug: str) -> tuple[str, bytes] | None:
+    # Всегда primary: уведомление приходит после коммита на нём, реплика может ещё отставать
+    async with get_sessionmaker()() as s:
+        row = await repo.get_snapshot(s, slug=slug)
+    if row is None:
+        return None
+    page_id, version, body = row
+    return make_etag("status-page", page_id, version), body.encode()
+
+
+@lru_cache
+def get_snapshot_cache() -> SWRCache[str, tuple[str, bytes]]:
+    """slug -> (ETag, ready JSON); unknown slugs are not stored here, see `get_unknown_slugs`."""
+    settings = get_settings()
+    return SWRCache(
+        _load_snapshot,
+        maxsize=settings.STATUS_PAGE_CACHE_SIZE,
+        fresh_s=settings.STATUS_PAGE_FRESH_S,
+        max_stale_s=settings.STATUS_PAGE_MAX_STALE_S,
+        cache_misses=False,
+    )
+
+
+@lru_cache
+def get_unknown_slugs() -> MissCache[str]:
+    """Slugs with no page, and the per-process budget of lookups that find nothing."""
+    settings = get_settings()
+    return MissCache(
+        maxsize=settings.STATUS_PAGE_UNKNOWN_CACHE_SIZE,
+        ttl_s=settings.STATUS_PAGE_UNKNOWN_TTL_S,
+        miss_rate=settings.STATUS_PAGE_MISS_RATE,
+    )
+
+
+def on_status_page_changed(payload: str) -> None:
+    """NOTIFY handler for `repo.STATUS_PAGE_CHANGED_CHANNEL` (payload is the page slug)."""
+    # страница могла появиться под slug, который до этого запрашивали впустую
+    get_unknown_slugs().discard(payload)
+    get_snapshot_cache().invalidate(payload)
+
+
+def on_listener_reconnect() -> None:
+    """Notifications may have been lost: mark every snapshot stale and forget unknown slugs."""
+    get_unknown_slugs().clear()
+    get_snapshot_cache().invalidate_all()
+
+
+def _public_headers(etag: str) -> dict[str, str]:
+    # Публичный ответ: CDN и браузеры могут кэшировать его и отдавать устаревшим, пока перепроверяют
+    settings = get_settings()
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={int(settings.STATUS_PAGE_FRESH_S)}, "
+                         f"stale-while-revalidate={int(settings.STATUS_PAGE_MAX_STALE_S)}",
+    }
+
+
+def _check_monitor_ids(monitor_ids: list[int]) -> None:
+    if len(set(monitor_ids)) != len(monitor_ids):
+        raise HTTPException(status_code=422, detail="Duplicate monitor ids")
+    limit = get_settings().STATUS_PAGE_MAX_MONITORS
+    if len(monitor_ids) > limit:
+        raise HTTPException(status_code=422, detail=f"At most {limit} monitors per status page")
+
+
+async def _page_out(db: AsyncSession, page: StatusPage) -> StatusPageOut:
+    monitor_ids = await repo.monitor_ids_of(db, page_ids=[page.id])
+    return StatusPageOut(
+        id=page.id, slug=page.slug, title=page.title, monitor_ids=monitor_ids[page.id],
+        snapshot_version=page.snapshot_version, created_at=page.created_at,
+    )
+
+
+# ========================== Owner CRUD ========================== #
+
+@router.post("/", response_model=StatusPageOut, status_code=status.HTTP_201_CREATED)
+async def create_status_page(
+    payload: StatusPageCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> StatusPageOut:
+    """
+    Create a status page over the current user's monitors.
+
+    Body:
+        StatusPageCreate: slug, title and monitor ids in display order.
+
+    Returns:
+        StatusPageOut: created page (its snapshot is already published).
+
+    Raises:
+        HTTPException 409: slug is taken.
+        HTTPException 422: duplicate ids, or a monitor not found / not owned by the user.
+    """
+    _check_monitor_ids(payload.monitor_ids)
+    try:
+        page = await repo.create(
+            db, user_id=current_user.id, slug=payload.slug, title=payload.title, monitor_ids=payload.monitor_ids
+        )
+        if page is None:
+            await db.rollback()
+            raise HTTPException(status_code=422, detail="Unknown monitor ids")
+        out = await _page_out(db, page)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Status page with this slug already exists")
+    return out
+
+
+@router.get("/", response_model=List[StatusPageOut])
+async def list_status_pages(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> List[StatusPageOut]:
+    """
+    List status pages owned by the current user.
+
+    Returns:
+        List[StatusPageOut].
+    """
+    pages = await repo.list_for_user(db, user_id=current_user.id)
+    monitor_ids = await repo.monitor_ids_of(db, page_ids=[p.id for p in pages])
+    return [
+        StatusPageOut(
+            id=p.id, slug=p.slug, title=p.title, monitor_ids=monitor_ids[p.id],
+            snapshot_version=p.snapshot_version, created_at=p.created_at,
+        )
+        for p in pages
+    ]
+
+
+@router.patch("/{page_id}", response_model=StatusPageOut)
+async def update_status_page(
+    page_id: int,
+    payload: StatusPageUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> StatusPageOut:
+    """
+    Update title and/or monitors of a status page owned by the current user.
+
+    Path:
+        page_id: target page id.
+
+    Body:
+        StatusPageUpdate: partial fields to update.
+
+    Returns:
+        StatusPageOut.
+
+    Raises:
+        HTTPException 404: page not found.
+        HTTPException 422: duplicate ids, or a monitor not found / not owned by the user.
+    """
+    if payload.monitor_ids is not None:
+        _check_monitor_ids(payload.monitor_ids)
+    if await repo.get_for_user(db, user_id=current_user.id, page_id=page_id) is None:
+        raise HTTPException(status_code=404, detail="Status page not found")
+    page = await repo.patch(
+        db, user_id=current_user.id, page_id=page_id, title=payload.title, monitor_ids=payload.monitor_ids
+    )
+    if page is None:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail="Unknown monitor ids")
+    out = await _page_out(db, page)
+    await db.commit()
+    return out
+
+
+@router.delete("/{page_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_status_page(
+    page_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> None:
+    """
+    Delete a status page owned by the current user.
+
+    Path:
+        page_id: target page id.
+
+    Raises:
+        HTTPException 404: page not found.
+    """
+    if not await repo.delete_for_user(db, user_id=current_user.id, page_id=page_id):
+        raise HTTPException(status_code=404, detail="Status page not found")
+    await db.commit()
+    return None
+
+
+# ========================== Public page ========================== #
+
+@public_router.get("/{slug}", response_model=StatusPageSnapshot)
+async def get_status_page(
+    request: Request,
+    slug: str = Path(pattern=SLUG_PATTERN),
+) -> Response:
+    """
+    Public status page (no auth).
+
+    Path:
+        slug: public page id.
+
+    Returns:
+        StatusPageSnapshot: pre-rendered JSON from the in-process cache.
+        304 if `If-None-Match` matches the current ETag.
+
+    Raises:
+        HTTPException 404: no such page.
+        HTTPException 429: too many lookups of unknown slugs in this process and the page
+            is not cached; retry after `Retry-After` seconds.
+    """
+    unknown = get_unknown_slugs()
+    if slug in unknown:
+        raise HTTPException(status_code=404, detail="Status page not found")
+    cache = get_snapshot_cache()
+    if slug not in cache and (wait := unknown.blocked_for()) > 0:
+        raise HTTPException(
+            status_code=429, detail="Too many requests, try again later", headers={"Retry-After": str(math.ceil(wait))}
+        )
+    cached = await cache.get(slug)
+    if cached is None:
+        if (wait := unknown.add(slug)) is not None:
+            # /status/ не пишется в request_logs: без этого сообщения перебор не виден
+            log.warning("status pages: too many unknown slugs, lookups of uncached pages paused for %.1f s", wait)
+        raise HTTPException(status_code=404, detail="Status page not found")
+    etag, body = cached
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=_public_headers(etag))
+    return RawJSONResponse(body, headers=_public_headers(etag))
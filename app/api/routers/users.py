@@ -9,14 +9,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.core.db import get_db
-from app.core.security import hash_password
+from app.api.deps import get_current_user, get_db, get_read_db, invalidate_user
 from app.schemas.user import (
     UserRegisterIn,
     UserUpdateIn,
     UserOut,
+    UserQuotaOut,
 )
-from app.models import User
 from app.repositories import users as repo
 
 
@@ -25,7 +24,7 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 
 @router.get("/me", response_model=UserOut)
 async def get_own_profile(
-    current_user: User = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> UserOut:
     """
     Get current user's profile.
@@ -33,11 +32,29 @@ async def get_own_profile(
     return UserOut.model_validate(current_user)
 
 
+@router.get("/me/quota", response_model=UserQuotaOut)
+async def get_own_quota(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserOut = Depends(get_current_user),
+) -> UserQuotaOut:
+    """
+    Get current user's monitor quotas and how much of them is used.
+    """
+    quota, usage = await repo.get_quota(db, user_id=current_user.id)
+    return UserQuotaOut(
+        max_monitors=quota.max_monitors,
+        min_interval_s=quota.min_interval_s,
+        probes_per_s=quota.probes_per_s,
+        monitors=usage.monitors,
+        used_probes_per_s=round(usage.probes_per_s, 3),
+    )
+
+
 @router.get("/{user_id}", response_model=UserOut)
 async def get_user_by_id(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> UserOut:
     """
     Get user by id.
@@ -60,7 +77,7 @@ async def get_user_by_id(
 async def update_own_profile(
     payload: UserUpdateIn,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> UserOut:
     """
     Partially update current user's fields.
@@ -74,6 +91,7 @@ async def update_own_profile(
         # Обновляем текущего пользователя (current_user.id)
         updated_user = await repo.patch(db, user_id=current_user.id, fields=fields)
         await db.commit()
+        invalidate_user(current_user.id)
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -90,7 +108,7 @@ async def update_own_profile(
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_own_profile(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(...),
+    current_user: UserOut = Depends(get_current_user),
 ) -> None:
     """
     Delete current user's profile.
@@ -99,4 +117,5 @@ async def delete_own_profile(
     if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
     await db.commit()
+    invalidate_user(current_user.id)
     return None
@@ -0,0 +1,237 @@
+"""
+Small in-process caches shared by the API layer.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from app.core.rate_limit import SlidingWindowLimiter
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+log = logging.getLogger(__name__)
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache with a per-entry expiry.
+
+    - At most `maxsize` entries; the least recently used one is evicted first.
+    - Each entry lives `ttl_s` seconds unless a shorter TTL is passed to `set`.
+    - `stamp()`/`set(..., stamp=...)` protect against the "load, invalidate, store stale"
+      race: a value loaded before any invalidation is silently dropped.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def stamp(self) -> int:
+        """Invalidation counter to pass back into `set` after a slow load."""
+        return self._invalidations
+
+    def set(self, key: K, value: V, ttl_s: float | None = None, stamp: int | None = None) -> None:
+        if stamp is not None and stamp != self._invalidations:
+            return
+        ttl = self.ttl_s if ttl_s is None else min(ttl_s, self.ttl_s)
+        if ttl <= 0:
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._invalidations += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._invalidations += 1
+        self._data.clear()
+
+
+class SWRCache(Generic[K, V]):
+    """
+    Bounded LRU cache over an async loader with stale-while-revalidate and single-flight loads.
+
+    - An entry younger than `fresh_s` is returned as is.
+    - A stale entry (older than `fresh_s`, or invalidated) younger than `max_stale_s` is
+      returned immediately and one background reload is started.
+    - A miss or an entry older than `max_stale_s` waits for the load.
+    At most one load per key runs at a time; concurrent callers share it, so a burst of
+    requests for a cold or stale key costs one loader call. A failed background reload keeps
+    the stale value (and is logged); a failed foreground load raises in every waiter.
+
+    `invalidate(key)` marks a cached value stale and reloads it right away (callers keep
+    getting the old value until the new one is in); `invalidate_all()` only marks values
+    stale, so they are reloaded on demand rather than all at once. `None` from the loader
+    ("no such key") is cached too, unless `cache_misses` is off, but is dropped rather than
+    served stale on invalidation.
+    An invalidation that arrives while a load is running marks its result stale, so a value
+    read before the change is never kept as fresh.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[K], Awaitable[V | None]],
+        *,
+        maxsize: int,
+        fresh_s: float,
+        max_stale_s: float,
+        cache_misses: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.fresh_s = fresh_s
+        self.max_stale_s = max_stale_s
+        self.cache_misses = cache_misses
+        self._loader = loader
+        self._clock = clock
+        # key -> (loaded_at, value); инвалидация «состаривает» запись минимум до fresh_s
+        self._data: OrderedDict[K, tuple[float, V | None]] = OrderedDict()
+        self._loading: dict[K, asyncio.Task] = {}
+        self._invalidated: set[K] = set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    async def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is not None:
+            loaded_at, value = item
+            age = self._clock() - loaded_at
+            if age < self.max_stale_s:
+                self._data.move_to_end(key)
+                if age >= self.fresh_s:
+                    self._load(key)
+                return value
+        # shield: отмена одного ожидающего (клиент ушёл) не должна отменять общую загрузку
+        return await asyncio.shield(self._load(key))
+
+    def invalidate(self, key: K) -> None:
+        if self._mark_stale(key):
+            self._load(key)
+
+    def invalidate_all(self) -> None:
+        for key in list(self._data):
+            self._mark_stale(key)
+        self._invalidated.update(self._loading)
+
+    def _mark_stale(self, key: K) -> bool:
+        """Mark the cached value stale (drop a cached miss); True if a value is kept."""
+        if key in self._loading:
+            self._invalidated.add(key)
+        item = self._data.get(key)
+        if item is None:
+            return False
+        if item[1] is None:
+            del self._data[key]
+            return False
+        self._data[key] = (min(item[0], self._clock() - self.fresh_s), item[1])
+        return True
+
+    def _load(self, key: K) -> asyncio.Task:
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key))
+            self._loading[key] = task
+            task.add_done_callback(self._on_done)
+        return task
+
+    async def _run(self, key: K) -> V | None:
+        try:
+            value = await self._loader(key)
+        finally:
+            del self._loading[key]
+            stale = key in self._invalidated
+            self._invalidated.discard(key)
+        if value is None and (stale or not self.cache_misses):
+            self._data.pop(key, None)
+            return value
+        now = self._clock()
+        self._data[key] = (now - self.fresh_s if stale else now, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _on_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("cache load failed: %r", task.exception())
+
+
+class MissCache(Generic[K]):
+    """
+    Keys a public lookup did not find, kept apart from the cache of real values, and a
+    per-process budget for such lookups.
+
+    A scan of random keys then neither evicts real entries (pair it with an `SWRCache`
+    built with `cache_misses=False`) nor costs one query per request: known misses are
+    answered from here, and once more than `miss_rate` lookups per second have found
+    nothing, `blocked_for()` tells the caller to refuse keys it has not cached (429) until
+    the sliding window admits misses again.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    _KEY = "miss"
+
+    def __init__(self, *, maxsize: int, ttl_s: float, miss_rate: int, clock: Callable[[], float] = time.time) -> None:
+        self._keys: TTLCache[K, bool] = TTLCache(maxsize, ttl_s, clock=clock)
+        self._limiter = SlidingWindowLimiter(miss_rate, 1.0, max_keys=1, clock=clock)
+        self._clock = clock
+        self._blocked_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: K) -> bool:
+        return self._keys.get(key) is not None
+
+    def blocked_for(self) -> float:
+        """Seconds until lookups of uncached keys are allowed again (0 — allowed now)."""
+        return max(self._blocked_until - self._clock(), 0.0)
+
+    def add(self, key: K) -> float | None:
+        """Record a lookup that found nothing; seconds of blocking if it used up the budget."""
+        self._keys.set(key, True)
+        wait = self._limiter.hit(self._KEY)
+        if wait is not None:
+            self._blocked_until = self._clock() + wait
+        return wait
+
+    def discard(self, key: K) -> None:
+        """Forget a key that now exists (e.g. a page created under a slug probed before)."""
+        self._keys.pop(key)
+
+    def clear(self) -> None:
+        self._keys.clear()
@@ -1,10 +1,49 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+"""
+Database engines, sessions and the declarative Base.
+
+Engines are created on first use (`get_engine`, `get_sessionmaker`, `get_replicas`), so
+importing models — e.g. from Alembic or the worker — does not build connection pools.
+`engine`, `SessionLocal` and `replicas` stay importable as lazily created module attributes.
+This module does not depend on FastAPI; request-scoped dependencies live in `app.api.deps`.
+"""
+
+import asyncio
+import itertools
+import logging
+from functools import lru_cache
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import DeclarativeBase
-from .settings import settings
+from .settings import get_settings
+
+log = logging.getLogger(__name__)
+
+
+def _make_engine(url: str, *, pool_size: int, max_overflow: int, statement_timeout_ms: int) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,  # pool_pre_ping если соединение в пуле "уснуло" или умерло, движок перед использованием проверит его (ping)
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={"server_settings": {"statement_timeout": str(statement_timeout_ms)}},
+    )
 
 
-engine = create_async_engine(settings.database_url, pool_pre_ping=True) # pool_pre_ping если соединение в пуле "уснуло" или умерло, движок перед использованием проверит его (ping)
-SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+@lru_cache
+def get_engine() -> AsyncEngine:
+    settings = get_settings()
+    return _make_engine(
+        settings.database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+    )
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(get_engine(), expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -22,6 +61,98 @@ class Base(DeclarativeBase):
     ...
 
 
-async def get_db() -> AsyncSession:
-    async with SessionLocal() as s:
-        yield s
\ No newline at end of file
+class ReplicaSet:
+    """
+    Read replicas with staleness tracking.
+
+    A background task measures each replica's replay lag every `check_s` seconds.
+    `pick()` round-robins over replicas whose lag is within `max_lag_s`; if none qualifies
+    (all lagging or unreachable) it returns None and the caller falls back to the primary.
+    """
+
+    # 0, если реплика подключена к primary (WAL receiver в статусе streaming) и проиграла всё
+    # полученное WAL; иначе возраст последней проигранной транзакции (нет ни одной — бесконечность).
+    # Без проверки receiver'а остановленная репликация выглядела бы как нулевой лаг: receive LSN
+    # замирает и совпадает с replay LSN. Статус receiver'а виден только ролям с pg_read_all_stats
+    # (pg_monitor); без них он NULL и простаивающая реплика считается отстающей — запросы идут на primary.
+    # На не-реплике (pg_is_in_recovery() = false) лаг считается нулевым.
+    LAG_SQL = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0::float8 "
+        "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+        "AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0::float8 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity'::float8) END"
+    )
+
+    def __init__(self, urls: list[str], *, max_lag_s: float, check_s: float) -> None:
+        settings = get_settings()
+        self.engines = [
+            _make_engine(
+                url,
+                pool_size=settings.DB_REPLICA_POOL_SIZE,
+                max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+                statement_timeout_ms=settings.DB_REPLICA_STATEMENT_TIMEOUT_MS,
+            )
+            for url in urls
+        ]
+        self.sessionmakers = [async_sessionmaker(e, expire_on_commit=False) for e in self.engines]
+        self.max_lag_s = max_lag_s
+        self.check_s = check_s
+        # до первого замера реплики считаются недоступными
+        self.lag_s: list[float] = [float("inf")] * len(self.engines)
+        self._rr = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    async def _measure(self, i: int) -> None:
+        try:
+            async with self.engines[i].connect() as conn:
+                self.lag_s[i] = float((await conn.execute(self.LAG_SQL)).scalar_one())
+        except Exception:
+            log.warning("replica %d is unreachable", i, exc_info=True)
+            self.lag_s[i] = float("inf")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*(self._measure(i) for i in range(len(self.engines))))
+            await asyncio.sleep(self.check_s)
+
+    def start(self) -> None:
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="replica-lag")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for e in self.engines:
+            await e.dispose()
+
+    def pick(self) -> async_sessionmaker | None:
+        fresh = [i for i, lag in enumerate(self.lag_s) if lag <= self.max_lag_s]
+        if not fresh:
+            return None
+        return self.sessionmakers[fresh[next(self._rr) % len(fresh)]]
+
+
+@lru_cache
+def get_replicas() -> ReplicaSet:
+    settings = get_settings()
+    return ReplicaSet(
+        settings.replica_urls,
+        max_lag_s=settings.DB_REPLICA_MAX_LAG_S,
+        check_s=settings.DB_REPLICA_LAG_CHECK_S,
+    )
+
+
+def __getattr__(name: str):
+    # Ленивые атрибуты модуля: движки создаются при первом обращении, а не при импорте
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    if name == "replicas":
+        return get_replicas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
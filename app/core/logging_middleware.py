@@ -1,7 +1,7 @@
 import time
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from app.core.db import SessionLocal
+from app.core.db import get_sessionmaker
 from app.models.request_log import RequestLog
 
 
@@ -26,9 +26,18 @@ class DBLoggingMiddleware(BaseHTTPMiddleware):
 
     Таким образом, логирование происходит «прозрачно» для всей логики API
     и не влияет на работу самих эндпоинтов.
+
+    Пути с префиксами из `skip_prefixes` не логируются: например, публичные страницы
+    статуса, которые при всплеске трафика должны обходиться без обращений к БД.
     """
 
+    def __init__(self, app, skip_prefixes: tuple[str, ...] = ()) -> None:
+        super().__init__(app)
+        self.skip_prefixes = skip_prefixes
+
     async def dispatch(self, request: Request, call_next):
+        if self.skip_prefixes and request.url.path.startswith(self.skip_prefixes):
+            return await call_next(request)
         t0 = time.perf_counter()
         # Передаём запрос дальше в цепочку (эндпоинт или следующую middleware)
         response = await call_next(request)
@@ -36,7 +45,7 @@ class DBLoggingMiddleware(BaseHTTPMiddleware):
         # Извлекаем IP клиента, если возможно
         ip = request.client.host if request.client else None
         # Асинхронно записываем лог в базу в будущем отправлять метрики в Prometheus
-        async with SessionLocal() as s:
+        async with get_sessionmaker()() as s:
             s.add(RequestLog(
                 method=request.method,
                 path=str(request.url.path),
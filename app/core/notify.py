@@ -0,0 +1,119 @@
+"""
+Postgres LISTEN/NOTIFY plumbing shared by the API and the worker.
+
+Notifications are sent with `pg_notify` inside the writer's transaction, so listeners
+only see them after commit (and never for rolled back changes). Each process keeps one
+dedicated asyncpg connection for LISTEN and fans payloads out to in-process handlers.
+"""
+
+import asyncio
+import logging
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[str], None]
+
+
+async def notify(db: AsyncSession, channel: str, payload: str) -> None:
+    """
+    Queue a notification in the current transaction.
+
+    Args:
+        db: Async SQLAlchemy session (the notification is delivered on its commit).
+        channel: LISTEN channel name.
+        payload: Text payload (Postgres limit is ~8000 bytes).
+    """
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+async def listening_peers(db: AsyncSession, *, prefix: str) -> list[str]:
+    """
+    Names of processes whose LISTEN connection is up, by `application_name`.
+
+    Args:
+        db: Async SQLAlchemy session.
+        prefix: Application name prefix (see `NotificationListener(application_name=...)`).
+
+    Returns:
+        Names with the prefix stripped, one per connected listener.
+    """
+    res = await db.execute(
+        text(
+            "SELECT DISTINCT substr(application_name, length(:prefix) + 1) FROM pg_stat_activity "
+            "WHERE starts_with(application_name, :prefix)"
+        ),
+        {"prefix": prefix},
+    )
+    return list(res.scalars().all())
+
+
+class NotificationListener:
+    """
+    Long-lived LISTEN connection with automatic reconnect.
+
+    Handlers are plain callables invoked on the event loop with the payload string;
+    they must be fast and must not block. `on_reconnect` hooks run after every
+    (re)connect: notifications sent while we were disconnected are lost, so caches
+    relying on them should be dropped there.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay_s: float = 1.0, application_name: str | None = None) -> None:
+        self._dsn = dsn
+        self._reconnect_delay_s = reconnect_delay_s
+        # имя в pg_stat_activity: по нему другие процессы видят, кто сейчас слушает
+        self._server_settings = {"application_name": application_name} if application_name else None
+        self._handlers: dict[str, list[Handler]] = {}
+        self._reconnect_hooks: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, handler: Handler, on_reconnect: Callable[[], None] | None = None) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+        if on_reconnect is not None:
+            self._reconnect_hooks.append(on_reconnect)
+
+    def _dispatch(self, conn, pid: int, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                log.exception("notification handler failed for channel %s", channel)
+
+    async def _run(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self._dsn, server_settings=self._server_settings)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _c: closed.set())
+                for channel in self._handlers:
+                    await conn.add_listener(channel, self._dispatch)
+                for hook in self._reconnect_hooks:
+                    hook()
+                await closed.wait()
+                log.warning("LISTEN connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("LISTEN connection failed, retrying in %.1fs", self._reconnect_delay_s)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self._reconnect_delay_s)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
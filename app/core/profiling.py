@@ -0,0 +1,261 @@
+"""
+Opt-in request profiling and slow SQL capture.
+
+Both are off by default and then cost nothing: `main.create_app` adds no middleware and
+`lifespan` registers no engine hooks unless `PROFILE_TOKEN`, `PROFILE_SAMPLE_RATE` or
+`SLOW_QUERY_MS` is set.
+
+Profiles: a request carrying `X-Profile: <PROFILE_TOKEN>`, or picked at random with
+probability `PROFILE_SAMPLE_RATE`, runs under cProfile. The result is stored in
+`PROFILE_DIR` as `<id>.pstats` (`pstats.Stats`, snakeviz, ...) next to `<id>.json` with the
+route, status, duration and every SQL statement the request issued with its timing; the
+response carries `X-Profile-Id`. Only one request is profiled at a time (cProfile hooks
+the whole thread), and a profile also contains whatever else the event loop ran meanwhile
+— under load, prefer the per-statement timings in the JSON.
+
+Slow queries: `before/after_cursor_execute` hooks time every statement; those slower than
+`SLOW_QUERY_MS` are logged and kept in a bounded in-memory buffer, each with the route
+that issued it and the shape of its parameters (types and array lengths, never values).
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import math
+import pstats
+import random
+import re
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+import asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Ограничения артефактов: текст запроса и число запросов в одном профиле
+MAX_STATEMENT_CHARS = 2000
+MAX_PROFILE_QUERIES = 1000
+
+_PROFILE_ID_RE = re.compile(r"[0-9]{10}-[0-9a-f]{8}")
+
+
+@dataclass(slots=True)
+class RequestContext:
+    method: str
+    scope: dict
+    # все запросы к БД — только у профилируемого запроса
+    queries: list[dict] | None = None
+
+    @property
+    def route(self) -> str:
+        # шаблон маршрута (/api/monitors/{monitor_id}) известен после маршрутизации
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope["path"]
+
+
+_request: ContextVar[RequestContext | None] = ContextVar("profiling_request", default=None)
+
+
+def _type(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shape(parameters, executemany: bool = False) -> str:
+    """Types of bound parameters without their values: `(int, str, list[500])`, `{id: int}`, `200 x (...)`."""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {param_shape(rows[0])}" if rows else "0 rows"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_type(v)}" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(_type(v) for v in parameters or ()) + ")"
+
+
+class QueryTimer:
+    """
+    Engine hooks timing every statement.
+
+    Statements of a profiled request go into its profile; statements slower than
+    `threshold_ms` (0 — none) into `slow`, newest last, at most `buffer_size`.
+    """
+
+    def __init__(self, *, threshold_ms: float, buffer_size: int) -> None:
+        self.threshold_ms = threshold_ms if threshold_ms > 0 else math.inf
+        self.slow: deque[dict] = deque(maxlen=buffer_size)
+        self._engines: list[AsyncEngine] = []
+
+    def install(self, engine: AsyncEngine) -> None:
+        if engine in self._engines:
+            return
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+        self._engines.append(engine)
+
+    def remove_all(self) -> None:
+        for engine in self._engines:
+            event.remove(engine.sync_engine, "before_cursor_execute", self._before)
+            event.remove(engine.sync_engine, "after_cursor_execute", self._after)
+        self._engines.clear()
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        # время — на контексте выполнения: при ошибке запроса он просто пропадает
+        context._profiling_t0 = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        ms = (time.perf_counter() - context._profiling_t0) * 1000
+        ctx = _request.get()
+        profiled = ctx is not None and ctx.queries is not None and len(ctx.queries) < MAX_PROFILE_QUERIES
+        if ms < self.threshold_ms and not profiled:
+            return
+        record = {
+            "ms": round(ms, 3),
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "params": param_shape(parameters, executemany),
+        }
+        if profiled:
+            ctx.queries.append(record)
+        if ms >= self.threshold_ms:
+            route = f"{ctx.method} {ctx.route}" if ctx is not None else None
+            self.slow.append({"ts": time.time(), "route": route, **record})
+            log.warning(
+                "slow query: %.1f ms on %s: %s %s", ms, route or "-", " ".join(statement.split())[:200], record["params"]
+            )
+
+
+class ProfileStore:
+    """Profile artifacts in a directory: `<id>.pstats` and `<id>.json`, at most `max_artifacts` pairs."""
+
+    def __init__(self, directory: str | Path, *, max_artifacts: int) -> None:
+        self.directory = Path(directory)
+        self.max_artifacts = max_artifacts
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, meta: dict) -> None:
+        """Write one profile and drop the oldest beyond `max_artifacts` (blocking: run in a thread)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / f"{profile_id}.pstats")
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(meta, ensure_ascii=False))
+        metas = sorted(self.directory.glob("*.json"))
+        for old in metas[:max(len(metas) - self.max_artifacts, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".pstats").unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Metadata of stored profiles, newest first (without per-statement timings)."""
+        out = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            meta["queries"] = len(meta.get("queries", ()))
+            out.append(meta)
+        return out
+
+    def path(self, profile_id: str, suffix: str) -> Path | None:
+        """`<id><suffix>` if such a profile exists; ids are validated, so no path tricks."""
+        if not _PROFILE_ID_RE.fullmatch(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    def report(self, profile_id: str, *, sort: str = "cumulative", limit: int = 50) -> str | None:
+        """Top functions of a profile as `pstats` text."""
+        path = self.path(profile_id, ".pstats")
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware: marks each request for `QueryTimer` and profiles the chosen ones.
+
+    Profiling needs a `store`; without one (slow-query capture only) requests are just marked.
+    """
+
+    def __init__(self, app, *, token: str = "", sample_rate: float = 0.0, store: ProfileStore | None = None) -> None:
+        self.app = app
+        self.token = token.encode()
+        self.sample_rate = sample_rate if store is not None else 0.0
+        self.store = store if self.token or self.sample_rate > 0 else None
+        self._busy = False
+
+    def _trigger(self, scope) -> str | None:
+        if self.store is None or self._busy:
+            return None
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER and hmac.compare_digest(value, self.token):
+                    return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        ctx = RequestContext(scope["method"], scope, [] if trigger else None)
+        reset = _request.set(ctx)
+        try:
+            if trigger is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send, ctx, trigger)
+        finally:
+            _request.reset(reset)
+
+    async def _profile(self, scope, receive, send, ctx: RequestContext, trigger: str) -> None:
+        profile_id = self.store.new_id()
+        status = 500
+
+        async def send_with_id(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", ()), (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        t0 = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self._busy = False
+            meta = {
+                "id": profile_id,
+                "created_at": time.time(),
+                "trigger": trigger,
+                "method": ctx.method,
+                "path": scope["path"],
+                "route": ctx.route,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+                "queries": ctx.queries,
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, profiler, meta)
+            except OSError:
+                log.warning("failed to store profile %s", profile_id, exc_info=True)
@@ -0,0 +1,71 @@
+"""
+Per-user monitor quotas.
+
+A user may own at most `max_monitors` monitors, none probed more often than every
+`min_interval_s` seconds, and their active (not paused) monitors together may need at
+most `probes_per_s` probes per second (the sum of 1 / interval_s). Limits are per-user
+overrides in `users.quota_*`; NULL means the `QUOTA_*` setting.
+
+A write is rejected only if it leaves the user over a limit *and* makes that excess
+worse, so a user who is already over (e.g. after the limit was lowered) can still pause,
+slow down or delete monitors to get back under it. The usage after a write is read under
+the user's row lock; the usage before it may be read without one, which can only blur the
+"makes it worse" exemption for a user who is already over a limit.
+"""
+
+from dataclasses import dataclass
+
+from app.core.settings import get_settings
+
+# запас на погрешность суммы 1 / interval_s
+_EPS = 1e-9
+
+
+class QuotaExceeded(Exception):
+    """The write would exceed one of the user's monitor quotas."""
+
+
+@dataclass(frozen=True, slots=True)
+class Quota:
+    max_monitors: int
+    min_interval_s: int
+    probes_per_s: float
+
+    @classmethod
+    def resolve(
+        cls, max_monitors: int | None, min_interval_s: int | None, probes_per_s: float | None
+    ) -> "Quota":
+        """Effective quota from the user's overrides (None — the settings default)."""
+        settings = get_settings()
+        return cls(
+            max_monitors=settings.QUOTA_MAX_MONITORS if max_monitors is None else max_monitors,
+            min_interval_s=settings.QUOTA_MIN_INTERVAL_S if min_interval_s is None else min_interval_s,
+            probes_per_s=settings.QUOTA_PROBES_PER_S if probes_per_s is None else probes_per_s,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Usage:
+    monitors: int
+    probes_per_s: float
+
+    def remove(self, interval_s: int) -> "Usage":
+        """Usage without one active monitor (e.g. before it was created)."""
+        return Usage(self.monitors - 1, self.probes_per_s - 1.0 / interval_s)
+
+
+def check_interval(quota: Quota, interval_s: int) -> None:
+    """Reject a monitor probed more often than the quota allows."""
+    if interval_s < quota.min_interval_s:
+        raise QuotaExceeded(f"interval_s must be at least {quota.min_interval_s} s for this account")
+
+
+def check_usage(quota: Quota, before: Usage, after: Usage) -> None:
+    """Reject a write that leaves the user over a limit and increases the excess."""
+    if after.monitors > quota.max_monitors and after.monitors > before.monitors:
+        raise QuotaExceeded(f"Monitor quota exceeded: at most {quota.max_monitors} monitors")
+    if after.probes_per_s > quota.probes_per_s + _EPS and after.probes_per_s > before.probes_per_s + _EPS:
+        raise QuotaExceeded(
+            f"Probe budget exceeded: active monitors would need {after.probes_per_s:.2f} probes/s, "
+            f"at most {quota.probes_per_s:g} allowed"
+        )
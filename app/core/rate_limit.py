@@ -0,0 +1,81 @@
+"""
+Sliding-window rate limiting for credential endpoints.
+
+The estimate uses the classic two-bucket sliding window: hits in the current fixed window
+plus hits of the previous window weighted by how much of it still overlaps the sliding one.
+State per key is three numbers, and the key map is an LRU bounded by `max_keys`, so memory
+stays constant no matter how many distinct accounts/IPs an attacker sprays.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def sliding_count(cur: int, prev: int, window_s: float, now: float) -> float:
+    """Sliding-window estimate from the current and previous fixed-window counters."""
+    elapsed = (now % window_s) / window_s
+    return cur + prev * (1.0 - elapsed)
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window limiter with a bounded key map.
+
+    Args:
+        limit: Allowed hits per `window_s` per key.
+        window_s: Window length in seconds.
+        max_keys: Max tracked keys; least recently seen keys are evicted first.
+    """
+
+    def __init__(self, limit: int, window_s: float, max_keys: int, clock: Callable[[], float] = time.time) -> None:
+        self.limit = limit
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> [window_index, cur_hits, prev_hits]
+        self._state: OrderedDict[str, list[int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def hit(self, key: str) -> float | None:
+        """
+        Register one attempt for `key`.
+
+        Returns:
+            None if allowed, otherwise seconds until the next attempt may pass.
+            Rejected attempts are not counted, so a blocked client recovers on schedule.
+        """
+        now = self._clock()
+        window = int(now // self.window_s)
+        st = self._state.get(key)
+        if st is None:
+            st = [window, 0, 0]
+            self._state[key] = st
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+            if st[0] != window:
+                # сдвиг окна: текущее становится предыдущим (или обнуляется, если прошло > 1 окна)
+                st[2] = st[1] if st[0] == window - 1 else 0
+                st[1] = 0
+                st[0] = window
+
+        if sliding_count(st[1], st[2], self.window_s, now) + 1 > self.limit:
+            return retry_after(st[1], st[2], self.limit, self.window_s, now)
+        st[1] += 1
+        return None
+
+
+def retry_after(cur: int, prev: int, limit: int, window_s: float, now: float) -> float:
+    """Seconds until the sliding estimate drops enough to admit one more hit."""
+    window_end = (now // window_s + 1) * window_s
+    if cur + 1 > limit or prev == 0:
+        return max(1.0, window_end - now)
+    # prev * (1 - elapsed) + cur + 1 <= limit  ->  elapsed >= 1 - (limit - cur - 1) / prev
+    need = 1.0 - (limit - cur - 1) / prev
+    wait = need * window_s - (now % window_s)
+    return float(max(1, math.ceil(wait)))
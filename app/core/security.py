@@ -1,32 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from jose import jwt
-from passlib.context import CryptContext
-from app.core.settings import settings
+from functools import lru_cache
+from app.core.settings import get_settings
 
-# создаем контекст с Argon2id
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    argon2__memory_cost=65536,  # 64 MB
-    argon2__time_cost=3,
-    argon2__parallelism=2,
-    argon2__type="ID"
-)
+# passlib и jose импортируются лениво: они нужны только auth-эндпоинтам,
+# а их загрузка заметно удлиняет холодный старт процесса.
+
+
+@lru_cache
+def get_pwd_context():
+    """Создаёт контекст с Argon2id при первом обращении."""
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        argon2__memory_cost=65536,  # 64 MB
+        argon2__time_cost=3,
+        argon2__parallelism=2,
+        argon2__type="ID"
+    )
 
 
 def hash_password(plain: str) -> str:
     """Возвращает Argon2id-хэш с параметрами из контекста."""
-    return pwd_context.hash(plain)
+    return get_pwd_context().hash(plain)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Проверяет пароль, независимо от используемой схемы (bcrypt/argon2)."""
-    return pwd_context.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
 
 
 def needs_rehash(hashed: str) -> bool:
     """Проверяет, нужно ли пересчитать хэш пароля с новыми параметрами Argon2id."""
-    return pwd_context.needs_update(hashed)
+    return get_pwd_context().needs_update(hashed)
+
+
+class HashingPoolSaturated(Exception):
+    """Пул хэширования переполнен: запрос нужно отклонить (503), а не ставить в очередь."""
+
+
+class HashingPool:
+    """
+    Bounded worker pool for password hashing and verification.
+
+    bcrypt/Argon2 are deliberately slow and CPU-bound; running them on the event loop
+    stalls every other request of the worker. The C backends release the GIL, so a small
+    thread pool gives real parallelism while the loop stays responsive.
+
+    At most `workers + queue_limit` jobs are admitted at once; anything beyond that is
+    rejected immediately with `HashingPoolSaturated` instead of growing an unbounded queue.
+    A slot is freed when the job itself finishes (or is cancelled before it starts), not
+    when its caller goes away: a client that disconnects mid-hash keeps its slot until the
+    thread is done, so dropped connections cannot pile up jobs behind the bound.
+    """
+
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        self._capacity = workers + queue_limit
+        self._workers = workers
+        self._admitted = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def admitted(self) -> int:
+        """Jobs currently running or waiting in the pool."""
+        return self._admitted
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` in the pool.
+
+        Raises:
+            HashingPoolSaturated: if the pool and its queue are already full.
+        """
+        # Счётчик меняется только из event loop, поэтому блокировка не нужна.
+        if self._admitted >= self._capacity:
+            raise HashingPoolSaturated()
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        self._admitted += 1
+        # слот освобождает сама задача (из потока пула — через loop), а не отменённый вызывающий
+        future.add_done_callback(lambda _: self._release_from(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release_from(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # loop уже закрыт (остановка процесса) — считать больше некому
+            pass
+
+    def _release(self) -> None:
+        self._admitted -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache
+def get_hashing_pool() -> HashingPool:
+    """Пул создаётся при первом обращении, а не при импорте (настройки читаются тогда же)."""
+    settings = get_settings()
+    return HashingPool(workers=settings.HASH_WORKERS, queue_limit=settings.HASH_QUEUE_LIMIT)
+
+
+async def hash_password_async(plain: str) -> str:
+    """`hash_password` в пуле хэширования; бросает HashingPoolSaturated при перегрузке."""
+    return await get_hashing_pool().run(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """`verify_password` в пуле хэширования; бросает HashingPoolSaturated при перегрузке."""
+    return await get_hashing_pool().run(verify_password, plain, hashed)
 
 
 def _exp(minutes: int = 15) -> int:
@@ -34,6 +128,9 @@ def _exp(minutes: int = 15) -> int:
 
 
 def create_access_token(subject: str | int) -> str:
+    from jose import jwt
+
+    settings = get_settings()
     to_encode = {
         "sub": str(subject),
         "type": "access",
@@ -43,6 +140,9 @@ def create_access_token(subject: str | int) -> str:
 
 
 def create_refresh_token(subject: str | int) -> str:
+    from jose import jwt
+
+    settings = get_settings()
     to_encode = {
         "sub": str(subject),
         "type": "refresh",
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Literal
@@ -16,9 +17,16 @@ class Settings(BaseSettings):
         DB_PASS (str): Database password.
         DB_NAME (str): Database name to connect to.
         API_DEBUG (bool): Flag for enabling debug mode in the API.
+        DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_STATEMENT_TIMEOUT_MS: primary engine pool and timeout.
+        DB_REPLICAS (str): Comma-separated `host:port` list of read replicas (empty — no replicas).
+        DB_REPLICA_POOL_SIZE / DB_REPLICA_MAX_OVERFLOW / DB_REPLICA_STATEMENT_TIMEOUT_MS: per-replica engine settings.
+        DB_REPLICA_MAX_LAG_S (float): Replicas lagging more than this are skipped.
+        DB_REPLICA_LAG_CHECK_S (float): How often replica lag is measured.
+        DB_READ_YOUR_WRITES_S (int): After a commit the client reads from the primary for this long.
 
     Properties:
         database_url (str): Assembled async connection URL for SQLAlchemy with asyncpg driver.
+        replica_urls (list[str]): Connection URLs of the read replicas.
     """
 
     # ========================== Data Base ========================== #
@@ -29,12 +37,38 @@ class Settings(BaseSettings):
     DB_NAME: str
     API_DEBUG: bool = False
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+
+    # ========================== Read replicas ========================== #
+    DB_REPLICAS: str = ""
+    DB_REPLICA_POOL_SIZE: int = 5
+    DB_REPLICA_MAX_OVERFLOW: int = 10
+    DB_REPLICA_STATEMENT_TIMEOUT_MS: int = 10_000
+    DB_REPLICA_MAX_LAG_S: float = 5.0
+    DB_REPLICA_LAG_CHECK_S: float = 2.0
+    DB_READ_YOUR_WRITES_S: int = 5
+
     model_config = SettingsConfigDict(env_file=BASE_DIR / ".env", env_file_encoding="utf-8")
 
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def database_dsn(self) -> str:
+        """Plain libpq DSN for raw asyncpg connections (LISTEN/NOTIFY, COPY)."""
+        return f"postgresql://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def replica_urls(self) -> list[str]:
+        urls = []
+        for hostport in filter(None, (h.strip() for h in self.DB_REPLICAS.split(","))):
+            host, _, port = hostport.partition(":")
+            urls.append(f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{host}:{port or 5432}/{self.DB_NAME}")
+        return urls
+
 
     # ========================== JWT ========================== #
     JWT_SECRET: str
@@ -42,7 +76,156 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Кэш текущего пользователя: проверенные токены и строки User.
+    # TTL записи токена никогда не превышает его `exp`.
+    AUTH_CACHE_TTL_S: int = 60
+    AUTH_CACHE_MAX_TOKENS: int = 10_000
+    AUTH_CACHE_MAX_USERS: int = 10_000
+
+    # Ограничение частоты /auth/login до хэширования и запросов к БД.
+    # memory — в пределах процесса; postgres — общие счётчики для всех воркеров
+    # (локальный лимитер при этом остаётся первой ступенью).
+    LOGIN_RATE_LIMIT_BACKEND: Literal["memory", "postgres"] = "memory"
+    LOGIN_RATE_WINDOW_S: int = 60
+    LOGIN_RATE_PER_ACCOUNT: int = 10
+    LOGIN_RATE_PER_IP: int = 50
+    LOGIN_RATE_MAX_KEYS: int = 100_000  # на каждый из лимитеров (аккаунт/IP)
+
+
+    # ========================== Status pages ========================== #
+    # Публичные страницы отдаются из кэша готовых снимков (stale-while-revalidate):
+    # моложе FRESH_S — как есть; до MAX_STALE_S — сразу, с фоновым обновлением; старше — ждём загрузку.
+    # Изменения приходят по NOTIFY status_page_changed, TTL лишь страхует от потерянных уведомлений.
+    STATUS_PAGE_FRESH_S: float = 10.0
+    STATUS_PAGE_MAX_STALE_S: float = 300.0
+    STATUS_PAGE_CACHE_SIZE: int = 10_000     # страниц в кэше процесса
+    STATUS_PAGE_MAX_MONITORS: int = 100      # мониторов на одной странице
+    # Несуществующие slug — в отдельном кэше; промахов (запросов к БД без результата) не больше
+    # STATUS_PAGE_MISS_RATE в секунду на процесс, сверх — 429 без запроса для незакешированных страниц
+    STATUS_PAGE_UNKNOWN_CACHE_SIZE: int = 10_000
+    STATUS_PAGE_UNKNOWN_TTL_S: float = 30.0
+    STATUS_PAGE_MISS_RATE: int = 50
+
+    # ========================== Monitor quotas ========================== #
+    # Значения по умолчанию; у пользователя могут быть свои (колонки users.quota_*, NULL — отсюда).
+    # Нагрузка — сумма 1 / interval_s по активным мониторам, в проверках в секунду.
+    QUOTA_MAX_MONITORS: int = 1_000
+    QUOTA_MIN_INTERVAL_S: int = 10
+    QUOTA_PROBES_PER_S: float = 20.0
+
+    # ========================== Heartbeats ========================== #
+    # Пинги /hb/<token> не пишутся в БД по одному: процесс держит время последнего пинга
+    # каждого монитора в памяти и сохраняет их одной пачкой раз в HEARTBEAT_FLUSH_S.
+    HEARTBEAT_BASE_URL: str = "http://localhost:8000"   # внешний адрес API для ссылок пинга
+    HEARTBEAT_FLUSH_S: float = 1.0
+    # Токен -> монитор; отзыв токена приходит по NOTIFY
+    HEARTBEAT_TOKEN_CACHE_SIZE: int = 100_000
+    HEARTBEAT_TOKEN_FRESH_S: float = 60.0
+    HEARTBEAT_TOKEN_MAX_STALE_S: float = 600.0
+    # Неизвестные токены — в отдельном кеше; промахов (запросов к БД без результата) не больше
+    # HEARTBEAT_MISS_RATE в секунду на процесс, сверх — 429 без запроса для незакешированных токенов
+    HEARTBEAT_UNKNOWN_CACHE_SIZE: int = 10_000
+    HEARTBEAT_UNKNOWN_TTL_S: float = 60.0
+    HEARTBEAT_MISS_RATE: int = 50
+
+    # ========================== Profiling ========================== #
+    # Всё выключено по умолчанию и тогда ничего не стоит (нет ни middleware, ни хуков движка).
+    # Запрос с заголовком `X-Profile: <PROFILE_TOKEN>` или доля PROFILE_SAMPLE_RATE случайных
+    # запросов выполняется под cProfile; артефакты — в PROFILE_DIR (не больше PROFILE_MAX_ARTIFACTS),
+    # скачиваются через /debug/profiles с заголовком `X-Profile-Token`. Пустой токен — без /debug.
+    PROFILE_TOKEN: str = ""
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: Path = BASE_DIR / "var" / "profiles"
+    PROFILE_MAX_ARTIFACTS: int = 100
+    # Запросы к БД дольше SLOW_QUERY_MS (0 — не отслеживать) пишутся в лог и в буфер
+    # последних SLOW_QUERY_BUFFER штук с маршрутом и типами параметров (без значений)
+    SLOW_QUERY_MS: float = 0.0
+    SLOW_QUERY_BUFFER: int = 1000
+
+    # ========================== Password hashing ========================== #
+    # Хэширование выполняется в отдельном пуле потоков, чтобы не блокировать event loop.
+    HASH_WORKERS: int = 2          # число потоков, считающих хэши параллельно
+    HASH_QUEUE_LIMIT: int = 32     # сколько задач может ждать в очереди, дальше — 503
+
+
+    # ========================== Prober (worker) ========================== #
+    PROBER_CONCURRENCY: int = 200      # одновременных проверок в одном воркере
+    PROBER_BATCH_SIZE: int = 500       # результатов в одной пачке вставки в checks
+    PROBER_FLUSH_S: float = 1.0        # максимальная задержка записи результатов
+    # status_version владельцев (ETag обзора мониторов) поднимается не чаще раза в столько секунд
+    PROBER_STATUS_VERSION_S: float = 5.0
+    # Расписание обновляется по NOTIFY monitors_changed; полная сверка по контрольной сумме — редко
+    PROBER_SYNC_DEBOUNCE_S: float = 0.05
+    PROBER_RECONCILE_S: float = 300.0
+    # После рестарта расписание восстанавливается по времени последних проверок;
+    # просроченные мониторы равномерно распределяются по этому окну, а не проверяются разом
+    PROBER_CATCHUP_S: float = 60.0
+    PROBER_WORKER_ID: str = ""         # имя воркера; пусто — hostname-pid
+    # Воркер проверяет мониторы с id % PROBER_SHARD_COUNT == PROBER_SHARD_INDEX
+    PROBER_SHARD_INDEX: int = 0
+    PROBER_SHARD_COUNT: int = 1
+
+    # Подтверждение падения: повторные проверки другими воркерами и через новое соединение.
+    # Падение записывается, только если большинство проверок (включая исходную) неуспешны.
+    PROBER_CONFIRM_VOTES: int = 2          # сколько повторных проверок ждать
+    PROBER_CONFIRM_GRACE_S: float = 2.0    # ожидание голосов сверх timeout_ms монитора
+    PROBER_CONFIRM_CONCURRENCY: int = 50   # отдельные слоты, не занимающие PROBER_CONCURRENCY
+
+    # Полосы приоритета и контроль перегрузки: short (interval_s <= PROBER_SHORT_INTERVAL_S)
+    # обслуживается первой; long ограничена PROBER_LONG_CONCURRENCY слотами. Пока задержка
+    # старта проверок выше PROBER_LAG_TARGET_S, интервалы long растягиваются до PROBER_MAX_STRETCH раз.
+    PROBER_SHORT_INTERVAL_S: int = 60
+    PROBER_LONG_CONCURRENCY: int = 50
+    PROBER_LAG_TARGET_S: float = 2.0
+    PROBER_MAX_STRETCH: float = 4.0
+    PROBER_METRICS_PORT: int = 0       # порт /metrics (Prometheus); 0 — не поднимать
+
+    # Аномалии задержки: EWMA среднего и дисперсии log(задержки) по успешным проверкам.
+    # Регрессия — PROBER_ANOMALY_CONFIRM проверок подряд с z > PROBER_ANOMALY_Z
+    # и не меньше чем на PROBER_ANOMALY_MIN_DELTA_MS медленнее нормы.
+    PROBER_ANOMALY_ALPHA: float = 0.05
+    PROBER_ANOMALY_Z: float = 4.0
+    PROBER_ANOMALY_MIN_DELTA_MS: float = 50.0
+    PROBER_ANOMALY_WARMUP: int = 30          # проверок до первых решений
+    PROBER_ANOMALY_CONFIRM: int = 3
+    PROBER_ANOMALY_CHECKPOINT_S: float = 60.0  # как часто сохранять состояние детектора
+
+    # Окна обслуживания держатся в памяти как интервалы на этот горизонт вперёд
+    # (повторяющиеся разворачиваются заново, когда половина горизонта прошла)
+    PROBER_MAINTENANCE_HORIZON_S: float = 2 * 86_400.0
+
+    # Heartbeat-монитор считается пропустившим пинг через interval_s + grace_s после последнего
+    # пинга плюс этот запас: пинги доходят до БД с задержкой до HEARTBEAT_FLUSH_S
+    PROBER_HEARTBEAT_SLACK_S: float = 5.0
+
+    # Очистка истории удалённых мониторов: пачки по PROBER_PURGE_BATCH строк, каждая в своей
+    # транзакции; очистка занимает не больше PROBER_PURGE_DUTY доли времени (остальное — паузы).
+    # Строка монитора удаляется не раньше PROBER_PURGE_GRACE_S после удаления (результаты
+    # уже начатых проверок ещё могут дописываться); без работы — проверка раз в PROBER_PURGE_IDLE_S.
+    PROBER_PURGE_BATCH: int = 5000
+    PROBER_PURGE_DUTY: float = 0.2
+    PROBER_PURGE_GRACE_S: float = 120.0
+    PROBER_PURGE_IDLE_S: float = 30.0
+
+    # Локальный журнал результатов на время недоступности или медленной БД: неудачная пачка
+    # и буфер, доросший до PROBER_SPOOL_SPILL_AT результатов, пишутся в сегменты по
+    # PROBER_SPOOL_SEGMENT_BYTES в PROBER_SPOOL_DIR/shard-<индекс>; после восстановления
+    # дописываются в checks через COPY. Больше PROBER_SPOOL_MAX_BYTES — удаляются старейшие
+    # сегменты; 0 — без журнала (результаты ждут в памяти).
+    PROBER_SPOOL_DIR: Path = BASE_DIR / "var" / "spool"
+    PROBER_SPOOL_MAX_BYTES: int = 1 << 30
+    PROBER_SPOOL_SEGMENT_BYTES: int = 4 << 20
+    PROBER_SPOOL_SPILL_AT: int = 5000
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Settings are built on first use, not at import: tools that only need models stay fast."""
+    return Settings()
 
-settings = Settings()
 
-# print(settings.database_url)
\ No newline at end of file
+def __getattr__(name: str):
+    # Обратная совместимость: `from app.core.settings import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
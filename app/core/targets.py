@@ -0,0 +1,86 @@
+"""
+Probe targets of non-HTTP monitors, stored in `monitors.url`.
+
+    tcp://host:port                      — TCP connect (IPv6 literals in brackets);
+    dns:name[?type=A]                    — resolve `name` with the system resolver;
+    dns://server[:port]/name[?type=MX]   — ask the nameserver at IP `server` directly.
+
+The `dns:` form follows RFC 4501 (`type` and `class` query parameters, `;` or `&` as
+separator; only class IN is supported). Parsing is shared by request validation and the
+prober, so a stored target always parses.
+"""
+
+import ipaddress
+from dataclasses import dataclass
+from urllib.parse import unquote, urlsplit
+
+# Типы записей, которые умеет сравнивать DNS-проверка
+DNS_RECORD_TYPES = ("A", "AAAA", "CNAME", "MX", "NS", "TXT", "SOA", "SRV", "CAA", "PTR")
+
+
+@dataclass(frozen=True, slots=True)
+class DnsTarget:
+    server: str | None   # IP сервера имён; None — системный резолвер
+    port: int
+    name: str
+    rdtype: str
+
+
+def _port(value: int | None, default: int | None = None) -> int:
+    if value is None:
+        if default is None:
+            raise ValueError("port is required")
+        return default
+    if not 0 < value < 65536:
+        raise ValueError("port must be within 1..65535")
+    return value
+
+
+def parse_tcp(url: str) -> tuple[str, int]:
+    """
+    Split a `tcp://host:port` target.
+
+    Raises:
+        ValueError: not a valid TCP target.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "tcp" or not parts.hostname:
+        raise ValueError("TCP target must look like tcp://host:port")
+    if parts.path not in ("", "/") or parts.query or parts.fragment or parts.username:
+        raise ValueError("TCP target must not have a path, query or credentials")
+    return parts.hostname, _port(parts.port)
+
+
+def parse_dns(url: str) -> DnsTarget:
+    """
+    Split a `dns:` target (see module docstring).
+
+    Raises:
+        ValueError: not a valid DNS target.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "dns" or parts.fragment:
+        raise ValueError("DNS target must look like dns:name?type=A or dns://server/name?type=A")
+    server = None
+    if parts.netloc:
+        server = parts.hostname
+        try:
+            ipaddress.ip_address(server or "")
+        except ValueError:
+            raise ValueError("DNS server must be an IP address") from None
+    port = _port(parts.port, 53)
+    name = unquote(parts.path.removeprefix("/") if parts.netloc else parts.path).rstrip(".")
+    if not name or "/" in name or len(name) > 253:
+        raise ValueError("DNS target must contain a domain name")
+
+    rdtype = "A"
+    for param in filter(None, parts.query.replace("&", ";").split(";")):
+        key, _, value = param.partition("=")
+        key, value = key.lower(), value.upper()
+        if key == "type" and value in DNS_RECORD_TYPES:
+            rdtype = value
+        elif key == "class" and value == "IN":
+            continue
+        else:
+            raise ValueError(f"Unsupported DNS query parameter {param!r} (types: {', '.join(DNS_RECORD_TYPES)})")
+    return DnsTarget(server, port, name, rdtype)
@@ -1,7 +1,16 @@
-from sqlalchemy.orm import DeclarativeBase
-class Base(DeclarativeBase): ...
+from app.core.db import Base
 from .user import User
 from .monitor import Monitor
 from .check import Check
 from .request_log import RequestLog
-__all__ = ["Base", "User", "Monitor", "Check", "RequestLog"]
+from .login_throttle import LoginThrottle
+from .monitor_event import MonitorEvent
+from .anomaly_state import AnomalyState
+from .status_page import StatusPage, StatusPageMonitor
+from .maintenance_window import MaintenanceWindow
+from .monitor_dependency import MonitorDependency
+from .heartbeat import Heartbeat
+__all__ = [
+    "Base", "User", "Monitor", "Check", "RequestLog", "LoginThrottle", "MonitorEvent", "AnomalyState",
+    "StatusPage", "StatusPageMonitor", "MaintenanceWindow", "MonitorDependency", "Heartbeat",
+]
@@ -0,0 +1,57 @@
+from sqlalchemy import Integer, SmallInteger, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class AnomalyState(Base):
+    """
+    Контрольная точка детектора аномалий задержки (app/prober/anomaly.py).
+
+    Одна строка на монитор: состояние EWMA, которое воркер держит в памяти и
+    периодически сохраняет, чтобы после рестарта не набирать статистику заново.
+    """
+
+    __tablename__ = "anomaly_states"
+
+    monitor_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Монитор, к которому относится состояние."
+    )
+    samples: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        doc="Число учтённых успешных проверок (для прогрева)."
+    )
+    mean: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        doc="EWMA логарифма задержки."
+    )
+    var: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        doc="EWMA дисперсии логарифма задержки."
+    )
+    fast: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        doc="Быстрая EWMA логарифма задержки (контрольная карта)."
+    )
+    anomalous: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        doc="Флаг: монитор сейчас в состоянии регрессии задержки."
+    )
+    streak: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+        doc="Число подряд идущих проверок в пользу смены состояния."
+    )
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        doc="Время сохранения контрольной точки."
+    )
@@ -53,6 +53,13 @@ class Check(Base):
         Text,
         doc="Описание ошибки, если запрос завершился сбоем или тайм-аутом."
     )
+    maintenance: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default="false",
+        doc="Проверка выполнена в окне обслуживания (режим tag); оповещения по ней не отправляются."
+    )
     monitor: Mapped["Check"] = relationship(
         "Monitor",
         back_populates="checks",
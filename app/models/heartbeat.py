@@ -0,0 +1,50 @@
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+class Heartbeat(Base):
+    """
+    Параметры heartbeat-монитора (push): задача (cron и т.п.) сама пингует /hb/<token>.
+
+    Одна строка на монитор с `kind = 'heartbeat'`. Пропуском считается отсутствие пинга
+    дольше `interval_s` монитора плюс `grace_s`. `last_ping_at` обновляется пачками из
+    памяти API-процессов (не на каждый пинг); `down` выставляет воркер проверок, чтобы
+    API знал, о каком пинге сообщить сразу (NOTIFY heartbeat_recovered).
+    """
+
+    __tablename__ = "heartbeats"
+
+    monitor_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Монитор, к которому относятся параметры."
+    )
+    token: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        unique=True,
+        doc="Секретный токен из адреса пинга."
+    )
+    grace_s: Mapped[int] = mapped_column(
+        Integer,
+        default=60,
+        nullable=False,
+        doc="Допустимое опоздание пинга сверх периода, в секундах."
+    )
+    last_ping_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Время последнего сохранённого пинга; None — пингов ещё не было."
+    )
+    down: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default="false",
+        nullable=False,
+        doc="Флаг: воркер зафиксировал пропуск, пинга после него ещё не было."
+    )
+
+    __table_args__ = (
+        CheckConstraint("grace_s BETWEEN 0 AND 86400", name="ck_heartbeat_grace_range"),
+    )
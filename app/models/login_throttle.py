@@ -0,0 +1,36 @@
+from sqlalchemy import String, Integer, BigInteger, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+class LoginThrottle(Base):
+    """
+    Счётчики попыток входа для общего (межворкерного) режима ограничения частоты.
+
+    Одна строка — число попыток для ключа (`acct:<email>` или `ip:<addr>`)
+    в фиксированном окне `window_start`. Скользящее окно вычисляется по текущему
+    и предыдущему окну; старые окна периодически удаляются.
+    """
+
+    __tablename__ = "login_throttle"
+
+    key: Mapped[str] = mapped_column(
+        String(300),
+        nullable=False,
+        doc="Ключ ограничения: аккаунт или IP-адрес."
+    )
+    window_start: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        doc="Номер фиксированного окна (unix time // длина окна)."
+    )
+    hits: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        doc="Число попыток в этом окне."
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("key", "window_start", name="pk_login_throttle"),
+    )
@@ -0,0 +1,75 @@
+from sqlalchemy import String, DateTime, ForeignKey, Index, CheckConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class MaintenanceWindow(Base):
+    """
+    Окно обслуживания: разовое или повторяющееся (ежедневно/еженедельно).
+
+    Относится к одному монитору (`monitor_id`) или ко всем мониторам пользователя
+    (`monitor_id` пустой). В режиме `skip` проверки в окне не выполняются, в режиме
+    `tag` выполняются, но результаты помечаются `checks.maintenance`, а оповещения
+    (аномалии, смена статуса на страницах статуса) подавляются.
+
+    Воркер держит все актуальные окна в памяти (app/prober/maintenance.py) и не
+    обращается к этой таблице на каждую проверку.
+    """
+
+    __tablename__ = "maintenance_windows"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True,
+        doc="Первичный ключ окна."
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Владелец окна."
+    )
+    monitor_id: Mapped[int | None] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        doc="Монитор; пусто — окно действует для всех мониторов пользователя."
+    )
+    starts_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        doc="Начало окна (для повторяющихся — начало первого вхождения)."
+    )
+    ends_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        doc="Конец окна (для повторяющихся — конец первого вхождения)."
+    )
+    recurrence: Mapped[str | None] = mapped_column(
+        String(16),
+        doc="Повторение: daily, weekly или пусто (разовое окно). Период считается в UTC."
+    )
+    until: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True),
+        doc="Повторения не начинаются позже этого момента; пусто — бессрочно."
+    )
+    mode: Mapped[str] = mapped_column(
+        String(8),
+        nullable=False,
+        default="skip",
+        server_default="skip",
+        doc="skip — не проверять; tag — проверять и помечать результаты."
+    )
+    reason: Mapped[str | None] = mapped_column(
+        String(200),
+        doc="Комментарий (что обслуживается)."
+    )
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        doc="Дата и время создания окна."
+    )
+
+    __table_args__ = (
+        Index("ix_maintenance_windows_user", "user_id"),
+        CheckConstraint("ends_at > starts_at", name="ck_maintenance_window_order"),
+        CheckConstraint("recurrence IN ('daily', 'weekly')", name="ck_maintenance_window_recurrence"),
+        CheckConstraint("mode IN ('skip', 'tag')", name="ck_maintenance_window_mode"),
+    )
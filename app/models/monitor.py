@@ -1,10 +1,16 @@
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, Index, UniqueConstraint
+from sqlalchemy import String, Integer, BigInteger, Boolean, DateTime, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.db import Base
 from typing import List
 from app.models.user import User
 
+# Типы мониторов (колонка kind)
+HTTP, HEARTBEAT, TCP, DNS = "http", "heartbeat", "tcp", "dns"
+# Типы, которые проверяет воркер по расписанию
+PROBED_KINDS = (HTTP, TCP, DNS)
+
+
 class Monitor(Base):
     """
     Модель мониторинга.
@@ -14,6 +20,16 @@ class Monitor(Base):
     с какой периодичностью выполнять запрос и что делать при паузе.
 
     `user_id` связывает монитор с владельцем (`User`).
+
+    `kind` — тип монитора: `http` проверяется воркером, `heartbeat` сам присылает пинги
+    (параметры — в `Heartbeat`, `url` — адрес для пинга, `interval_s` — ожидаемый период).
+    `tcp` и `dns` тоже проверяются воркером, но без HTTP: цель в `url` — `tcp://host:port`
+    или `dns:name?type=A` (см. `app.core.targets`), `method` и `expected_status` не используются,
+    а `expect` задаёт ожидаемый баннер или набор DNS-записей.
+
+    Удаление мягкое: `deleted_at` ставится сразу (монитор пропадает из API и расписания,
+    имя и URL освобождаются), а история проверок вычищается фоновыми пачками
+    (`app.prober.reaper`); строка удаляется последней, когда история пуста.
     """
 
     __tablename__ = "monitors"
@@ -37,6 +53,13 @@ class Monitor(Base):
         nullable=False,
         doc="URL-адрес, который требуется проверять."
     )
+    kind: Mapped[str] = mapped_column(
+        String(16),
+        default="http",
+        server_default="http",
+        nullable=False,
+        doc="Тип монитора: http, tcp, dns (проверяются воркером) или heartbeat (присылает пинги сам)."
+    )
     method: Mapped[str] = mapped_column(
         String(10),
         default="GET",
@@ -49,6 +72,12 @@ class Monitor(Base):
         nullable=False,
         doc="Ожидаемый HTTP-код ответа, при котором монитор считается успешным."
     )
+    expect: Mapped[str | None] = mapped_column(
+        String(1000),
+        nullable=True,
+        doc="tcp: подстрока, которую должен содержать баннер сервера; dns: ожидаемые записи через запятую. "
+            "Пусто — достаточно соединения / ответа."
+    )
     interval_s: Mapped[int] = mapped_column(
         Integer,
         default=60,
@@ -72,6 +101,18 @@ class Monitor(Base):
         server_default=func.now(),
         doc="Дата и время создания монитора."
     )
+    deleted_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Время удаления (NULL — монитор жив). Удалённый монитор ждёт очистки истории."
+    )
+    purged_rows: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Сколько строк истории удалённого монитора уже вычищено (прогресс очистки)."
+    )
     checks: Mapped[List["Check"]] = relationship(
         "Check",
         back_populates="monitor",
@@ -89,7 +130,10 @@ class Monitor(Base):
         CheckConstraint("interval_s BETWEEN 10 AND 86400", name="ck_monitor_interval_range"),
         CheckConstraint("timeout_ms BETWEEN 100 AND 60000", name="ck_monitor_timeout_range"),
         CheckConstraint("method IN ('GET','POST','HEAD','PUT','DELETE')", name="ck_monitor_method_valid"),
-        UniqueConstraint("user_id", "url", name="uq_monitor_user_url"),
-        UniqueConstraint("user_id", "name", name="uq_monitor_user_name"),
+        CheckConstraint("kind IN ('http','heartbeat','tcp','dns')", name="ck_monitor_kind_valid"),
+        # уникальность — только среди живых мониторов: удалённый не держит имя и URL до очистки
+        Index("uq_monitor_user_url", "user_id", "url", unique=True, postgresql_where=text("deleted_at IS NULL")),
+        Index("uq_monitor_user_name", "user_id", "name", unique=True, postgresql_where=text("deleted_at IS NULL")),
         Index("ix_monitor_user_created", "user_id", "created_at"),
+        Index("ix_monitor_deleted", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
     )
\ No newline at end of file
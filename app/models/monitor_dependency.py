@@ -0,0 +1,33 @@
+from sqlalchemy import ForeignKey, Index, PrimaryKeyConstraint, CheckConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+class MonitorDependency(Base):
+    """
+    Зависимость монитора от родительского (шлюз, хост БД и т.п.).
+
+    Пока родитель подтверждённо недоступен (или сам приостановлен из-за своего родителя),
+    дочерние мониторы не проверяются и не поднимают оповещений. Граф ацикличен
+    (проверяется при записи); оба монитора принадлежат одному пользователю.
+    """
+
+    __tablename__ = "monitor_dependencies"
+
+    child_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Зависимый (дочерний) монитор."
+    )
+    parent_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Монитор, от которого он зависит."
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("child_id", "parent_id", name="pk_monitor_dependencies"),
+        CheckConstraint("child_id <> parent_id", name="ck_monitor_dependency_self"),
+        # обход к потомкам: проверка циклов и загрузка графа
+        Index("ix_monitor_dependencies_parent", "parent_id"),
+    )
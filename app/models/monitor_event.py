@@ -0,0 +1,59 @@
+from sqlalchemy import BigInteger, Integer, Float, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class MonitorEvent(Base):
+    """
+    Событие монитора, обнаруженное воркером проверок.
+
+    Аномалии задержки: `latency_regression` — задержка устойчиво вышла за пределы
+    обычной для монитора, `latency_recovered` — вернулась в норму (или новый уровень
+    стал нормой). Зависимости: `suppressed` — проверки приостановлены, потому что
+    недоступен родительский монитор, `released` — родитель снова доступен (поля
+    задержки у этих событий пустые). Источник для уведомлений и статусных эндпоинтов.
+    """
+
+    __tablename__ = "monitor_events"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        doc="Первичный ключ события."
+    )
+    monitor_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Внешний ключ на монитор."
+    )
+    ts: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        doc="Время проверки, на которой событие было зафиксировано."
+    )
+    kind: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False,
+        doc="Тип события (latency_regression, latency_recovered, suppressed, released)."
+    )
+    latency_ms: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Задержка проверки, вызвавшей событие, в миллисекундах (аномалии)."
+    )
+    baseline_ms: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Обычная задержка монитора (EWMA) на момент события, в миллисекундах."
+    )
+    score: Mapped[float | None] = mapped_column(
+        Float,
+        nullable=True,
+        doc="Отклонение от нормы в стандартных отклонениях (z-оценка по логарифму задержки)."
+    )
+
+    __table_args__ = (
+        Index("ix_monitor_events_monitor_ts", "monitor_id", "ts"),
+    )
@@ -0,0 +1,85 @@
+from sqlalchemy import String, Integer, BigInteger, Text, DateTime, ForeignKey, Index, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class StatusPage(Base):
+    """
+    Публичная страница статуса для группы мониторов.
+
+    Доступна без авторизации по `slug`. Отдаётся не из таблиц проверок, а из
+    готового JSON-снимка `snapshot`, который пересчитывается при каждом изменении
+    статуса входящих в неё мониторов (и при правке самой страницы или мониторов).
+    """
+
+    __tablename__ = "status_pages"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True,
+        doc="Первичный ключ страницы."
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Владелец страницы."
+    )
+    slug: Mapped[str] = mapped_column(
+        String(100),
+        unique=True,
+        nullable=False,
+        doc="Публичный идентификатор страницы в URL (/status/<slug>)."
+    )
+    title: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        doc="Заголовок страницы."
+    )
+    snapshot: Mapped[str | None] = mapped_column(
+        Text,
+        doc="Готовый JSON страницы (StatusPageSnapshot), отдаётся как есть."
+    )
+    snapshot_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Номер версии снимка (для ETag и сброса кэшей)."
+    )
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        doc="Дата и время создания страницы."
+    )
+
+    __table_args__ = (
+        Index("ix_status_pages_user", "user_id"),
+    )
+
+
+class StatusPageMonitor(Base):
+    """Монитор на странице статуса; `position` задаёт порядок вывода."""
+
+    __tablename__ = "status_page_monitors"
+
+    page_id: Mapped[int] = mapped_column(
+        ForeignKey("status_pages.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Страница статуса."
+    )
+    monitor_id: Mapped[int] = mapped_column(
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Монитор, выводимый на странице."
+    )
+    position: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        doc="Порядковый номер монитора на странице."
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("page_id", "monitor_id", name="pk_status_page_monitors"),
+        # поиск страниц по монитору при смене его статуса
+        Index("ix_status_page_monitors_monitor", "monitor_id"),
+    )
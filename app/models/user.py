@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, Boolean
+from sqlalchemy import String, Integer, BigInteger, DateTime, Boolean, Float, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.db import Base
@@ -12,6 +12,8 @@ class User(Base):
     `tg_id` — идентификатор пользователя в Telegram (уникален).
     `email` — адрес, на который отправляются уведомления.
     `created_at` — дата регистрации в системе.
+    `deleted_at` — время удаления профиля: пользователь сразу исчезает (вход, API, расписание),
+    а строка удаляется после очистки истории всех его мониторов.
     """
 
     __tablename__ = "users"
@@ -22,13 +24,11 @@ class User(Base):
     )
     tg_id: Mapped[int] = mapped_column(
         Integer,
-        unique=True,
         nullable=False,
         doc="Уникальный Telegram ID пользователя."
     )
     email: Mapped[str] = mapped_column(
         String(250),
-        unique=True,
         nullable=False,
         doc="Электронная почта для оповещений и идентификации."
     )
@@ -48,9 +48,51 @@ class User(Base):
         default=True,
         doc="Статус активности пользователя."
     )
+    deleted_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Время удаления профиля (NULL — пользователь не удалён)."
+    )
+    monitors_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Счётчик изменений мониторов пользователя (для ETag списков и карточек мониторов)."
+    )
+    status_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Счётчик новых результатов проверок мониторов пользователя (для ETag обзора последних состояний; поднимается воркером не чаще PROBER_STATUS_VERSION_S)."
+    )
+    quota_max_monitors: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Максимум мониторов (NULL — QUOTA_MAX_MONITORS из настроек)."
+    )
+    quota_min_interval_s: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Минимальный интервал проверки, в секундах (NULL — QUOTA_MIN_INTERVAL_S)."
+    )
+    quota_probes_per_s: Mapped[float | None] = mapped_column(
+        Float,
+        nullable=True,
+        doc="Бюджет проверок в секунду по активным мониторам (NULL — QUOTA_PROBES_PER_S); "
+            "он же вес пользователя в справедливой очереди проверок."
+    )
     monitors = relationship(
         "Monitor",
         back_populates="user",
         cascade="all, delete-orphan",
         doc="Список мониторов, принадлежащих пользователю."
-    )
\ No newline at end of file
+    )
+
+    __table_args__ = (
+        # tg_id и email уникальны среди неудалённых: удалённый профиль их не держит
+        Index("users_tg_id_key", "tg_id", unique=True, postgresql_where=text("deleted_at IS NULL")),
+        Index("users_email_key", "email", unique=True, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_users_deleted", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
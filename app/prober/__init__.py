@@ -0,0 +1,6 @@
+"""
+Background prober: schedules monitors and records check results.
+
+Runs in the worker process (`worker.py`) and never imports the API layer (FastAPI, jose,
+passlib); the API in turn never imports this package or httpx.
+"""
@@ -0,0 +1,108 @@
+# app/prober/admission.py
+"""
+Admission control for regular probes.
+
+Regular probes are split into two priority lanes by interval, each with a fixed number
+of slots: `long` (interval_s > `short_interval_s`) owns `long_concurrency` of the
+`concurrency` slots, `short` owns the rest and is served first. Short probes may borrow
+idle long-lane slots while no long-lane probe is due. Confirmation re-checks have their
+own slots in `Confirmer`.
+
+When probes back up, the controller does not let every schedule slip. It measures the
+start lag of each lane and, while lag exceeds `lag_target_s`, stretches long-lane
+intervals (up to `max_stretch`×): the long lane needs fewer slots and the short lane can
+borrow them. A long-lane probe that is already late by more than a whole stretched
+interval is skipped and rescheduled (shed). Both decisions are exported as metrics.
+"""
+
+from app.prober.metrics import Metrics
+from app.prober.scheduler import MonitorSpec
+
+SHORT, LONG = 0, 1
+LANE_NAMES = ("short", "long")
+
+
+class AdmissionControl:
+    def __init__(
+        self,
+        *,
+        concurrency: int,
+        long_concurrency: int,
+        short_interval_s: int,
+        lag_target_s: float,
+        max_stretch: float,
+        metrics: Metrics,
+    ) -> None:
+        self.concurrency = concurrency
+        self.long_concurrency = long_concurrency
+        self.short_interval_s = short_interval_s
+        self.lag_target_s = lag_target_s
+        self.max_stretch = max_stretch
+        self.metrics = metrics
+        self.inflight = [0, 0]
+        self.lag_s = [0.0, 0.0]  # EWMA задержки старта проверок относительно due
+        self.stretch = 1.0       # множитель интервалов long-полосы
+
+        metrics.describe("prober_probes_total", "counter", "Regular probes started, by lane.")
+        metrics.describe("prober_shed_total", "counter", "Probes skipped because they were too late, by lane.")
+        metrics.describe("prober_inflight", "gauge", "Probes in flight, by lane.")
+        metrics.describe("prober_lag_seconds", "gauge", "Probe start lag behind schedule, by lane.")
+        metrics.describe("prober_interval_stretch", "gauge", "Multiplier applied to long-lane intervals.")
+
+    def lane_of(self, spec: MonitorSpec) -> int:
+        return SHORT if spec.interval_s <= self.short_interval_s else LONG
+
+    def free(self, lane: int, long_waiting: bool = True) -> int:
+        """
+        Slots available to `lane` now.
+
+        Args:
+            lane: SHORT or LONG.
+            long_waiting: Whether a long-lane probe is due; if not, short may borrow long's idle slots.
+        """
+        total_free = self.concurrency - sum(self.inflight)
+        if lane == LONG:
+            free = self.long_concurrency - self.inflight[LONG]
+        elif long_waiting:
+            free = self.concurrency - self.long_concurrency - self.inflight[SHORT]
+        else:
+            free = total_free
+        return max(min(free, total_free), 0)
+
+    def admit(self, lane: int, due: float, spec: MonitorSpec, now: float) -> bool:
+        """Decide whether a popped probe starts now (True) or is shed (False)."""
+        lag = max(now - due, 0.0)
+        self.lag_s[lane] = 0.8 * self.lag_s[lane] + 0.2 * lag
+        if lane == LONG and lag > spec.interval_s * self.stretch:
+            self.metrics.inc("prober_shed_total", lane=LANE_NAMES[lane])
+            return False
+        self.inflight[lane] += 1
+        self.metrics.inc("prober_probes_total", lane=LANE_NAMES[lane])
+        return True
+
+    def done(self, lane: int) -> None:
+        self.inflight[lane] -= 1
+
+    def interval(self, spec: MonitorSpec, lane: int) -> float:
+        return spec.interval_s * self.stretch if lane == LONG else spec.interval_s
+
+    def adjust(self, backlog_s: list[float]) -> None:
+        """
+        Periodic controller step (~1/s).
+
+        Args:
+            backlog_s: Per lane, how overdue the earliest waiting probe is (0 if none).
+        """
+        lag = [max(ewma, backlog) for ewma, backlog in zip(self.lag_s, backlog_s)]
+        pressure = max(lag)
+        # без новых стартов в полосе её оценка задержки затухает
+        self.lag_s = [ewma * 0.5 for ewma in self.lag_s]
+        if pressure > self.lag_target_s:
+            self.stretch = min(self.max_stretch, self.stretch * 1.25)
+        elif pressure < self.lag_target_s / 2:
+            self.stretch = max(1.0, self.stretch / 1.1)
+
+        self.metrics.set("prober_interval_stretch", self.stretch)
+        for lane, name in enumerate(LANE_NAMES):
+            self.metrics.set("prober_inflight", self.inflight[lane], lane=name)
+            self.metrics.set("prober_lag_seconds", round(lag[lane], 3), lane=name)
@@ -0,0 +1,202 @@
+# app/prober/anomaly.py
+"""
+Streaming latency anomaly detection, O(1) per check.
+
+Each monitor keeps an exponentially weighted mean and variance of log(1 + latency_ms)
+of its successful checks (the baseline) — latency is heavy-tailed and regressions are
+multiplicative, so the log scale makes one threshold fit a 20 ms API and a 2 s page
+alike. No history is ever queried: the state is updated in place from the check that
+just finished.
+
+Detection is an EWMA control chart: a fast EWMA of recent checks (λ = 0.3) is compared
+with the baseline in units of its own standard deviation. `confirm` consecutive checks
+with a score above `z_threshold`, each at least `min_delta_ms` slower than the baseline,
+raise a `latency_regression` event; `confirm` consecutive checks below `z_threshold / 2`
+(hysteresis) raise `latency_recovered`.
+
+Robustness: inputs are winsorized at ±2.5 sd (Huber), so a lone spike moves the chart
+by less than 2 sd and cannot trip it on its own. The baseline is fully updated only while
+the chart is in control (score <= `z_threshold / 2`); otherwise only its mean drifts, at
+`alpha / 10`, so a regression cannot dissolve into the baseline, yet a permanent level
+shift is eventually accepted and reported as recovered (the new level became normal).
+
+State lives in parallel `array` columns indexed by a per-monitor slot (~30 bytes per
+monitor plus the id→slot dict) and is checkpointed to `anomaly_states` by the runner.
+"""
+
+import math
+from array import array
+from datetime import datetime
+
+REGRESSION = "latency_regression"
+RECOVERED = "latency_recovered"
+
+# Нижняя граница стандартного отклонения в лог-шкале (~5 %): у очень стабильных
+# мониторов дисперсия почти нулевая, и без неё любой шум давал бы огромный z
+_SD_FLOOR = 0.05
+_STREAK_MAX = 127
+# Быстрая EWMA последних проверок сравнивается с медленной нормой (контрольная карта EWMA);
+# её стандартное отклонение — sd * sqrt(λ / (2 - λ))
+FAST_ALPHA = 0.3
+_FAST_SD = math.sqrt(FAST_ALPHA / (2 - FAST_ALPHA))
+CLIP_SD = 2.5  # граница винзоризации входа, в sd нормы
+
+
+class LatencyAnomalyDetector:
+    def __init__(self, *, alpha: float, z_threshold: float, min_delta_ms: float, warmup: int, confirm: int) -> None:
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_delta_ms = min_delta_ms
+        self.warmup = warmup
+        self.confirm = confirm
+        self._slot: dict[int, int] = {}
+        self._free: list[int] = []
+        self._samples = array("l")
+        self._mean = array("d")
+        self._var = array("d")
+        self._fast = array("d")
+        self._anomalous = array("b")
+        self._streak = array("b")
+        self._dirty: set[int] = set()
+        self.anomalous = 0  # мониторов в состоянии регрессии
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def _alloc(self, monitor_id: int) -> int:
+        if self._free:
+            i = self._free.pop()
+            self._samples[i], self._mean[i], self._var[i], self._fast[i] = 0, 0.0, 0.0, 0.0
+            self._anomalous[i], self._streak[i] = 0, 0
+        else:
+            i = len(self._samples)
+            self._samples.append(0)
+            self._mean.append(0.0)
+            self._var.append(0.0)
+            self._fast.append(0.0)
+            self._anomalous.append(0)
+            self._streak.append(0)
+        self._slot[monitor_id] = i
+        return i
+
+    def forget(self, monitor_id: int) -> bool:
+        """
+        Drop a monitor's state (removed from the schedule or its target changed).
+
+        Returns:
+            True if the monitor was in regression: the caller closes it (no `latency_recovered`
+            will come from here any more).
+        """
+        i = self._slot.pop(monitor_id, None)
+        if i is None:
+            return False
+        flagged = bool(self._anomalous[i])
+        self.anomalous -= self._anomalous[i]
+        self._free.append(i)
+        self._dirty.discard(monitor_id)
+        return flagged
+
+    def observe(self, monitor_id: int, latency_ms: int, ts: datetime) -> dict | None:
+        """
+        Feed one successful check.
+
+        Returns:
+            A `monitor_events` row (dict) when the monitor's state flips, else None.
+        """
+        i = self._slot.get(monitor_id)
+        if i is None:
+            i = self._alloc(monitor_id)
+        self._dirty.add(monitor_id)
+        x = math.log1p(latency_ms)
+        n = self._samples[i]
+        mean, var = self._mean[i], self._var[i]
+        self._samples[i] = n + 1
+
+        if n < self.warmup:
+            # на прогреве — обычное среднее и дисперсия первых наблюдений
+            a = max(self.alpha, 1.0 / (n + 1))
+            diff = x - mean
+            self._mean[i] = self._fast[i] = mean + a * diff
+            self._var[i] = (1 - a) * (var + diff * a * diff)
+            return None
+
+        sd = math.sqrt(var) + _SD_FLOOR
+        # выброс учитывается как значение на границе ±CLIP_SD
+        x = min(max(x, mean - CLIP_SD * sd), mean + CLIP_SD * sd)
+        fast = self._fast[i] = self._fast[i] + FAST_ALPHA * (x - self._fast[i])
+        score = (fast - mean) / (sd * _FAST_SD)
+        flagged = self._anomalous[i]
+        if flagged:
+            towards_flip = score < self.z_threshold / 2
+        else:
+            # порог в мс — по самой проверке: быстрая EWMA ограничена винзоризацией
+            towards_flip = score > self.z_threshold and latency_ms - math.expm1(mean) > self.min_delta_ms
+        streak = min(self._streak[i] + 1, _STREAK_MAX) if towards_flip else 0
+        event = None
+        if streak >= self.confirm:
+            self._anomalous[i] = 1 - flagged
+            self.anomalous += 1 - 2 * flagged
+            streak = 0
+            event = {
+                "monitor_id": monitor_id,
+                "ts": ts,
+                "kind": RECOVERED if flagged else REGRESSION,
+                "latency_ms": latency_ms,
+                "baseline_ms": round(math.expm1(mean)),
+                "score": round(score, 2),
+            }
+        self._streak[i] = streak
+
+        if self._anomalous[i] or score > self.z_threshold / 2:
+            # регрессия или подозрение на неё: дисперсия заморожена, среднее ползёт
+            # к новому уровню в 10 раз медленнее — иначе регрессия «растворилась» бы в норме
+            self._mean[i] = mean + self.alpha / 10 * (x - mean)
+        else:
+            diff = x - mean
+            incr = self.alpha * diff
+            self._mean[i] = mean + incr
+            self._var[i] = (1 - self.alpha) * (var + diff * incr)
+        return event
+
+    def restore(self, rows) -> int:
+        """
+        Load checkpointed state for monitors not tracked yet.
+
+        Args:
+            rows: Iterable of (monitor_id, samples, mean, var, fast, anomalous, streak).
+
+        Returns:
+            Number of monitors restored.
+        """
+        restored = 0
+        for monitor_id, samples, mean, var, fast, anomalous, streak in rows:
+            if monitor_id in self._slot:
+                continue
+            i = self._alloc(monitor_id)
+            self._samples[i], self._mean[i], self._var[i], self._fast[i] = samples, mean, var, fast
+            self._anomalous[i], self._streak[i] = int(anomalous), min(streak, _STREAK_MAX)
+            self.anomalous += int(anomalous)
+            restored += 1
+        return restored
+
+    def take_dirty(self) -> list[dict]:
+        """State of monitors changed since the last call, as `anomaly_states` rows."""
+        dirty, self._dirty = self._dirty, set()
+        rows = []
+        for monitor_id in dirty:
+            i = self._slot.get(monitor_id)
+            if i is not None:
+                rows.append({
+                    "monitor_id": monitor_id,
+                    "samples": self._samples[i],
+                    "mean": self._mean[i],
+                    "var": self._var[i],
+                    "fast": self._fast[i],
+                    "anomalous": bool(self._anomalous[i]),
+                    "streak": self._streak[i],
+                })
+        return rows
+
+    def mark_dirty(self, monitor_ids) -> None:
+        """Re-queue monitors whose checkpoint failed to save."""
+        self._dirty.update(mid for mid in monitor_ids if mid in self._slot)
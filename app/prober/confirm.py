@@ -0,0 +1,230 @@
+# app/prober/confirm.py
+"""
+Quorum confirmation of failed probes.
+
+A single failure may be our own network blip (a dead keep-alive connection, a local
+DNS hiccup), so before a monitor is recorded as down the failure is re-checked:
+    - the origin worker picks `votes` responders among the other live workers by
+      rendezvous hashing of (request id, worker id) and publishes a confirmation request
+      naming them on `probe_confirm`;
+    - only the named workers re-probe the target and answer on `probe_vote`;
+    - the origin also re-probes once itself over a fresh connection.
+
+Live workers are those whose LISTEN connection is up (`application_name` is
+`PEER_PREFIX` + worker id, see `notify.listening_peers`); the list is re-read every
+`PEERS_TTL_S`. A failure thus costs at most `votes` peer probes however many workers run.
+
+The first `votes` answers (or whatever arrived by `timeout_ms + grace_s`) are tallied.
+The failure is recorded only if a strict majority of the re-checks failed too; otherwise
+a successful re-check is recorded instead. With no peers running, the local
+fresh-connection vote alone decides.
+
+Re-probes run in their own lane (`concurrency` slots, fresh connections) and never take
+slots from regular probes: the caller releases its admission slot before confirming. A
+peer drops requests while its lane is full, and answers still waiting for a slot when the
+origin's deadline passes are skipped.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.notify import NotificationListener, listening_peers, notify
+from app.prober.http_probe import ProbeResult
+from app.prober.net_probe import probe
+from app.prober.scheduler import MonitorSpec
+
+log = logging.getLogger(__name__)
+
+CONFIRM_CHANNEL = "probe_confirm"
+VOTE_CHANNEL = "probe_vote"
+# application_name LISTEN-соединения воркера: PEER_PREFIX + worker_id
+PEER_PREFIX = "prober:"
+PEERS_TTL_S = 10.0
+
+
+def responders(req: str, peers: list[str], k: int) -> list[str]:
+    """The `k` peers with the highest rendezvous hash of (req, peer): a stable, even spread."""
+    def score(peer: str) -> bytes:
+        return hashlib.blake2b(f"{req}:{peer}".encode(), digest_size=8).digest()
+
+    return sorted(peers, key=score, reverse=True)[:k]
+
+
+def decide(original: ProbeResult, votes: list[ProbeResult]) -> ProbeResult:
+    """Result to record: the original failure if most re-checks failed (or none answered), else a successful one."""
+    failed = sum(not v.ok for v in votes)
+    if not votes or failed * 2 > len(votes):
+        return original
+    return next(v for v in votes if v.ok)
+
+
+@dataclasses.dataclass(slots=True)
+class _Pending:
+    need: int
+    votes: list[ProbeResult] = dataclasses.field(default_factory=list)
+    done: asyncio.Event = dataclasses.field(default_factory=asyncio.Event)
+
+
+class Confirmer:
+    def __init__(
+        self,
+        worker_id: str,
+        sessionmaker: async_sessionmaker,
+        *,
+        votes: int,
+        grace_s: float,
+        concurrency: int,
+    ) -> None:
+        self.worker_id = worker_id
+        self._sessionmaker = sessionmaker
+        self.votes = votes
+        self.grace_s = grace_s
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency)
+        # без keep-alive: каждая повторная проверка идёт через новое соединение
+        self._client = httpx.AsyncClient(
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=0),
+            headers={"User-Agent": "APIHealthChecker/0.1"},
+        )
+        self._pending: dict[str, _Pending] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.inflight = 0
+        # ответы другим воркерам: запущенные и ждущие слота
+        self._answering = 0
+        self.dropped = 0
+        self._peers: list[str] = []
+        self._peers_at = float("-inf")
+
+    def attach(self, listener: NotificationListener) -> None:
+        listener.subscribe(CONFIRM_CHANNEL, self._on_request)
+        listener.subscribe(VOTE_CHANNEL, self._on_vote)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    async def _live_peers(self) -> list[str]:
+        if time.monotonic() - self._peers_at > PEERS_TTL_S:
+            try:
+                async with self._sessionmaker() as s:
+                    peers = await listening_peers(s, prefix=PEER_PREFIX)
+                self._peers = [p for p in peers if p != self.worker_id]
+                self._peers_at = time.monotonic()
+            except Exception:
+                log.warning("could not list live workers, using the previous list", exc_info=True)
+        return self._peers
+
+    async def confirm(self, spec: MonitorSpec, failed: ProbeResult) -> ProbeResult:
+        """Re-check a failed probe and return the result that should be recorded."""
+        req = uuid.uuid4().hex
+        timeout_s = spec.timeout_ms / 1000 + self.grace_s
+        chosen = responders(req, await self._live_peers(), self.votes)
+        # голосов не больше, чем тех, кто может ответить (выбранные воркеры и локальная проверка)
+        pending = self._pending[req] = _Pending(need=min(self.votes, len(chosen) + 1))
+        try:
+            if chosen:
+                try:
+                    await self._publish(CONFIRM_CHANNEL, {
+                        "req": req, "origin": self.worker_id, "responders": chosen,
+                        "deadline": time.time() + timeout_s, "spec": dataclasses.asdict(spec),
+                    })
+                except Exception:
+                    log.warning("could not ask peers to confirm monitor %d, using the local vote only", spec.id, exc_info=True)
+            self._spawn(self._local_vote(req, spec))
+            try:
+                await asyncio.wait_for(pending.done.wait(), timeout=timeout_s)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            del self._pending[req]
+
+        votes = pending.votes[: self.votes]
+        result = decide(failed, votes)
+        log.info(
+            "monitor %d: %d/%d re-checks failed, recorded as %s",
+            spec.id, sum(not v.ok for v in votes), len(votes), "down" if result is failed else "up",
+        )
+        return result
+
+    # ---------- origin side ----------
+
+    def _add_vote(self, req: str, vote: ProbeResult) -> None:
+        pending = self._pending.get(req)
+        if pending is None:
+            return  # запрос уже решён или истёк
+        pending.votes.append(vote)
+        if len(pending.votes) >= pending.need:
+            pending.done.set()
+
+    async def _local_vote(self, req: str, spec: MonitorSpec) -> None:
+        self._add_vote(req, await self._reprobe(spec))
+
+    def _on_vote(self, payload: str) -> None:
+        msg = json.loads(payload)
+        if msg["origin"] != self.worker_id:
+            return
+        vote = msg["result"]
+        vote["ts"] = datetime.fromisoformat(vote["ts"])
+        self._add_vote(msg["req"], ProbeResult(**vote))
+
+    # ---------- peer side ----------
+
+    def _on_request(self, payload: str) -> None:
+        msg = json.loads(payload)
+        if self.worker_id not in msg["responders"]:
+            return
+        if self._answering >= self.concurrency:
+            # своя полоса занята: ответ всё равно не успел бы к сроку
+            self.dropped += 1
+            return
+        self._answering += 1
+        self._spawn(self._answer(msg["req"], msg["origin"], msg["deadline"], MonitorSpec(**msg["spec"])))
+
+    async def _answer(self, req: str, origin: str, deadline: float, spec: MonitorSpec) -> None:
+        try:
+            vote = await self._reprobe(spec, deadline)
+        finally:
+            self._answering -= 1
+        if vote is None:
+            self.dropped += 1
+            return
+        result = dataclasses.asdict(vote)
+        result["ts"] = vote.ts.isoformat()
+        try:
+            await self._publish(VOTE_CHANNEL, {"req": req, "origin": origin, "voter": self.worker_id, "result": result})
+        except Exception:
+            log.warning("could not send confirmation vote for monitor %d", spec.id, exc_info=True)
+
+    # ---------- plumbing ----------
+
+    async def _reprobe(self, spec: MonitorSpec, deadline: float | None = None) -> ProbeResult | None:
+        async with self._slots:
+            if deadline is not None and time.time() >= deadline:
+                return None  # источник уже подвёл итог
+            self.inflight += 1
+            try:
+                return await probe(self._client, spec)
+            finally:
+                self.inflight -= 1
+
+    async def _publish(self, channel: str, message: dict) -> None:
+        async with self._sessionmaker() as s:
+            await notify(s, channel, json.dumps(message))
+            await s.commit()
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
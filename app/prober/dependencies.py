@@ -0,0 +1,142 @@
+# app/prober/dependencies.py
+"""
+In-memory monitor dependency graph: which monitors are held because a parent is down.
+
+A monitor is *blocked* when it is confirmed down itself or *suppressed*, i.e. at least one
+of its parents is blocked. Each node keeps the count of its blocked parents, so a state
+change of one monitor only walks the part of its subtree whose blocked state actually
+flips — O(affected subtree), independent of the graph size. Edges only connect monitors
+of the same owner, so a per-user refresh rebuilds just that owner's component.
+
+The graph covers all shards (it is small): a child probed here may hang off a parent probed
+by another worker, whose flips arrive via `set_down` from the `monitor_state` channel.
+"""
+
+from typing import Iterable
+
+# события monitor_events: проверки приостановлены из-за родителя / возобновлены
+SUPPRESSED, RELEASED = "suppressed", "released"
+
+
+class DependencyGraph:
+    """
+    Blocked/suppressed state propagation over parent -> child edges.
+
+    Mutating methods return the suppression transitions they caused as
+    `(monitor_id, suppressed)` pairs, in propagation order.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    def __init__(self) -> None:
+        self._children: dict[int, list[int]] = {}
+        self._parents: dict[int, list[int]] = {}
+        self._nodes_of_user: dict[int, set[int]] = {}
+        self._down: set[int] = set()              # подтверждённо недоступные родители
+        self._blocked_parents: dict[int, int] = {}  # узел -> число заблокированных родителей
+        self.suppressed: set[int] = set()
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._children.values())
+
+    def has_children(self, monitor_id: int) -> bool:
+        return monitor_id in self._children
+
+    def is_blocked(self, monitor_id: int) -> bool:
+        return monitor_id in self._down or monitor_id in self.suppressed
+
+    def replace_all(self, edges: Iterable[tuple[int, int, int]], down: Iterable[int]) -> list[tuple[int, bool]]:
+        """Drop everything and load `edges` of (user_id, parent_id, child_id); `down` — monitors known to be down."""
+        return self.replace_users(list(self._nodes_of_user), edges, down)
+
+    def replace_users(
+        self, user_ids: Iterable[int], edges: Iterable[tuple[int, int, int]], down: Iterable[int]
+    ) -> list[tuple[int, bool]]:
+        """
+        Re-load the components of these owners.
+
+        `edges` must be all current edges of exactly them (and of the new owners in a full
+        reload); `down` — monitors currently known to be down (others are ignored).
+        """
+        user_ids = set(user_ids)
+        before = set()
+        for user_id in user_ids:
+            for node in self._nodes_of_user.pop(user_id, ()):
+                if node in self.suppressed:
+                    before.add(node)
+                    self.suppressed.discard(node)
+                self._children.pop(node, None)
+                self._parents.pop(node, None)
+                self._blocked_parents.pop(node, None)
+                self._down.discard(node)
+        touched = set()
+        for user_id, parent, child in edges:
+            user_ids.add(user_id)
+            self._children.setdefault(parent, []).append(child)
+            self._parents.setdefault(child, []).append(parent)
+            nodes = self._nodes_of_user.setdefault(user_id, set())
+            nodes.add(parent)
+            nodes.add(child)
+            touched.add(parent)
+            touched.add(child)
+        self._down.update(n for n in down if n in touched and n in self._children)
+
+        after = self._propagate_component(touched)
+        return [(n, False) for n in before - after] + [(n, True) for n in after - before]
+
+    def _propagate_component(self, nodes: set[int]) -> set[int]:
+        # Кан: узел решается, когда решены все его родители; узлы цикла (запись их не допускает)
+        # остаются незаблокированными
+        pending = {n: len(self._parents.get(n, ())) for n in nodes}
+        ready = [n for n, k in pending.items() if k == 0]
+        suppressed = set()
+        while ready:
+            node = ready.pop()
+            blocked = node in self._down or node in suppressed
+            for child in self._children.get(node, ()):
+                if blocked:
+                    self._blocked_parents[child] = self._blocked_parents.get(child, 0) + 1
+                    suppressed.add(child)
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+        self.suppressed |= suppressed
+        return suppressed
+
+    def set_down(self, monitor_id: int, down: bool) -> list[tuple[int, bool]]:
+        """Record a confirmed up/down flip of a parent and propagate it to its subtree."""
+        if monitor_id not in self._children:
+            return []
+        was_blocked = self.is_blocked(monitor_id)
+        if down:
+            self._down.add(monitor_id)
+        else:
+            self._down.discard(monitor_id)
+        if self.is_blocked(monitor_id) == was_blocked:
+            return []
+        return self._propagate(monitor_id, blocked=down)
+
+    def _propagate(self, root: int, *, blocked: bool) -> list[tuple[int, bool]]:
+        # все узлы, чьё состояние меняется, меняются в одну сторону: счётчик каждого ребра
+        # учитывается ровно один раз, поэтому ромбы (несколько путей) считаются верно
+        step = 1 if blocked else -1
+        out = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for child in self._children.get(node, ()):
+                was_blocked = self.is_blocked(child)
+                count = self._blocked_parents.get(child, 0) + step
+                if count:
+                    self._blocked_parents[child] = count
+                else:
+                    self._blocked_parents.pop(child, None)
+                if (count > 0) != (child in self.suppressed):
+                    if count > 0:
+                        self.suppressed.add(child)
+                    else:
+                        self.suppressed.discard(child)
+                    out.append((child, count > 0))
+                if self.is_blocked(child) != was_blocked:
+                    stack.append(child)
+        return out
@@ -0,0 +1,148 @@
+# app/prober/heartbeats.py
+"""
+Deadlines of heartbeat (push) monitors: a min-heap of timers, no polling queries.
+
+A heartbeat monitor is due for evaluation when its deadline passes: `interval_s + grace_s`
+after its latest ping (or its creation, if it never pinged), plus `slack_s` for pings still
+sitting in the API processes' memory. The runner then reads the latest pings of all due
+monitors in one query: those that pinged meanwhile are re-armed from the new ping, the
+others are missed. While a monitor is down it is re-evaluated every `interval_s`, and a
+ping announced on `heartbeat_recovered` pulls its deadline to now.
+
+Like the probe schedule (`app.prober.scheduler`), deadlines live in a dict and heap entries
+that no longer match it are skipped lazily; the heap is rebuilt when stale entries dominate.
+A timer can only be moved earlier while armed (`arm` keeps the earlier deadline); a popped
+monitor is re-armed by the runner after its evaluation.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.prober.http_probe import NETWORK_ERROR_STATUS, ProbeResult
+
+# Пинг получен — успешная проверка; пропуск записывается как тайм-аут
+PING_STATUS = 200
+MISSED_STATUS = NETWORK_ERROR_STATUS
+
+
+@dataclass(frozen=True, slots=True)
+class HeartbeatSpec:
+    """What the prober needs to know about one heartbeat monitor."""
+    id: int
+    user_id: int
+    interval_s: int
+    grace_s: int
+    created_at: float   # Unix-время создания: срок первого пинга отсчитывается от него
+
+
+class HeartbeatTimers:
+    """
+    Heartbeat monitors of this worker with their evaluation deadlines.
+
+    A monitor is either armed (has a deadline) or being evaluated (popped by `pop_due`
+    and not yet re-armed); `arm` of a removed monitor is a no-op.
+    """
+
+    def __init__(self, slack_s: float) -> None:
+        self.slack_s = slack_s
+        self._specs: dict[int, HeartbeatSpec] = {}
+        self._by_user: dict[int, set[int]] = {}
+        self._deadline: dict[int, float] = {}
+        self._heap: list[tuple[float, int]] = []
+        # последний пинг, уже записанный как проверка (Unix-время)
+        self.recorded: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, monitor_id: int) -> bool:
+        return monitor_id in self._specs
+
+    def get(self, monitor_id: int) -> HeartbeatSpec | None:
+        return self._specs.get(monitor_id)
+
+    def ids(self) -> set[int]:
+        return set(self._specs)
+
+    def ids_of_user(self, user_id: int) -> set[int]:
+        return set(self._by_user.get(user_id, ()))
+
+    def deadline(self, spec: HeartbeatSpec, last_seen: float | None) -> float:
+        """When a monitor last seen at `last_seen` (None — never) counts as missed."""
+        return (spec.created_at if last_seen is None else last_seen) + spec.interval_s + spec.grace_s + self.slack_s
+
+    def upsert(self, spec: HeartbeatSpec, at: float) -> None:
+        old = self._specs.get(spec.id)
+        if old is not None:
+            self._by_user[old.user_id].discard(spec.id)
+            if not self._by_user[old.user_id]:
+                del self._by_user[old.user_id]
+        self._specs[spec.id] = spec
+        self._by_user.setdefault(spec.user_id, set()).add(spec.id)
+        self.arm(spec.id, at)
+
+    def remove(self, monitor_id: int) -> None:
+        spec = self._specs.pop(monitor_id, None)
+        self._deadline.pop(monitor_id, None)
+        self.recorded.pop(monitor_id, None)
+        if spec is not None:
+            ids = self._by_user[spec.user_id]
+            ids.discard(monitor_id)
+            if not ids:
+                del self._by_user[spec.user_id]
+
+    def arm(self, monitor_id: int, at: float) -> None:
+        """Evaluate the monitor at `at` (or earlier, if it is already armed for sooner)."""
+        if monitor_id not in self._specs:
+            return
+        cur = self._deadline.get(monitor_id)
+        if cur is not None and cur <= at:
+            return
+        self._deadline[monitor_id] = at
+        heapq.heappush(self._heap, (at, monitor_id))
+        if len(self._heap) > 2 * len(self._deadline) + 1024:
+            self._heap = [(d, m) for m, d in self._deadline.items()]
+            heapq.heapify(self._heap)
+
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int) -> list[HeartbeatSpec]:
+        """Pop up to `limit` monitors whose deadline passed; they stay unarmed until `arm`."""
+        out: list[HeartbeatSpec] = []
+        while len(out) < limit:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, monitor_id = heapq.heappop(self._heap)
+            del self._deadline[monitor_id]
+            out.append(self._specs[monitor_id])
+        return out
+
+    def _drop_stale(self) -> None:
+        heap, deadline = self._heap, self._deadline
+        while heap and deadline.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+
+def ping_result(spec: HeartbeatSpec, ping_at: datetime) -> ProbeResult:
+    """A received ping as a `checks` row (timestamped with the ping itself)."""
+    return ProbeResult(monitor_id=spec.id, ts=ping_at, latency_ms=0, status_code=PING_STATUS, ok=True)
+
+
+def miss_result(spec: HeartbeatSpec, now: float, last_seen: float | None) -> ProbeResult:
+    """A missed deadline as a failed `checks` row."""
+    if last_seen is None:
+        error = f"No ping received since the monitor was created (expected every {spec.interval_s} s)"
+    else:
+        error = f"No ping for {int(now - last_seen)} s (expected every {spec.interval_s} s, grace {spec.grace_s} s)"
+    return ProbeResult(
+        monitor_id=spec.id,
+        ts=datetime.fromtimestamp(now, tz=timezone.utc),
+        latency_ms=0,
+        status_code=MISSED_STATUS,
+        ok=False,
+        error=error,
+    )
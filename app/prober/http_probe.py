@@ -0,0 +1,62 @@
+# app/prober/http_probe.py
+"""
+HTTP probe: one request per monitor, result mapped to a `checks` row.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import httpx
+
+from app.prober.scheduler import MonitorSpec
+
+# Код для сетевых ошибок и тайм-аутов: `checks.status_code` обязателен и ограничен 100..599
+NETWORK_ERROR_STATUS = 599
+
+
+@dataclass(slots=True)
+class ProbeResult:
+    """One probe outcome, shaped like a `checks` row."""
+    monitor_id: int
+    ts: datetime
+    latency_ms: int
+    status_code: int
+    ok: bool
+    error: str | None = None
+    maintenance: bool = False
+
+
+def make_client(concurrency: int) -> httpx.AsyncClient:
+    """Shared client for regular probes: keep-alive pool sized to the worker's concurrency."""
+    return httpx.AsyncClient(
+        follow_redirects=False,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        headers={"User-Agent": "APIHealthChecker/0.1"},
+    )
+
+
+async def probe_http(client: httpx.AsyncClient, spec: MonitorSpec) -> ProbeResult:
+    """
+    Probe `spec.url` with `spec.method` within `spec.timeout_ms`.
+
+    Returns:
+        ProbeResult with `ok` = (status == expected_status); transport errors and
+        timeouts are reported as status 599 with the error text.
+    """
+    ts = datetime.now(tz=timezone.utc)
+    t0 = time.perf_counter()
+    try:
+        resp = await client.request(spec.method, spec.url, timeout=spec.timeout_ms / 1000)
+        status_code, error = resp.status_code, None
+    except httpx.HTTPError as e:
+        status_code, error = NETWORK_ERROR_STATUS, f"{type(e).__name__}: {e}"[:1000]
+    latency_ms = int((time.perf_counter() - t0) * 1000)
+    return ProbeResult(
+        monitor_id=spec.id,
+        ts=ts,
+        latency_ms=latency_ms,
+        status_code=status_code,
+        ok=error is None and status_code == spec.expected_status,
+        error=error,
+    )
@@ -0,0 +1,164 @@
+# app/prober/maintenance.py
+"""
+In-memory interval index of maintenance windows for the probe hot path.
+
+Window definitions (one-off or daily/weekly recurring, per monitor or for all of a user's
+monitors) are expanded into concrete occurrences over a rolling horizon, merged per target
+and per mode into disjoint sorted intervals, and kept as two parallel arrays (starts, ends).
+"Is this monitor in maintenance now" is then a `bisect` in the monitor's and its owner's
+arrays — O(log k), no DB query and no per-window loop.
+
+Updates are incremental: `replace_users` rebuilds only the given owners' entries (on
+`monitors_changed` for that user). `extend` re-expands everything from the definitions
+kept in memory once the horizon runs short; it never touches the DB.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable
+
+# skip — проверка не выполняется; tag — выполняется, результат помечается, оповещения подавляются
+SKIP, TAG = "skip", "tag"
+
+_PERIOD_S = {"daily": 86_400.0, "weekly": 7 * 86_400.0}
+
+
+@dataclass(frozen=True, slots=True)
+class WindowSpec:
+    """One maintenance window definition (timestamps are Unix seconds, UTC)."""
+    id: int
+    user_id: int
+    monitor_id: int | None      # None — все мониторы пользователя
+    starts_at: float            # начало (для повторяющихся — первого вхождения)
+    ends_at: float
+    recurrence: str | None      # None | "daily" | "weekly"
+    until: float | None         # повторения не начинаются позже этого момента
+    mode: str
+
+
+def occurrences(w: WindowSpec, since: float, until: float) -> Iterable[tuple[float, float]]:
+    """Occurrences of `w` overlapping [since, until)."""
+    period = _PERIOD_S.get(w.recurrence) if w.recurrence else None
+    if period is None:
+        if w.ends_at > since and w.starts_at < until:
+            yield w.starts_at, w.ends_at
+        return
+    k = max(0, int((since - w.ends_at) // period) + 1) if w.ends_at <= since else 0
+    start, end = w.starts_at + k * period, w.ends_at + k * period
+    stop = until if w.until is None else min(until, w.until)
+    while start < stop:
+        yield start, end
+        start += period
+        end += period
+
+
+def _merge(intervals: list[tuple[float, float]]) -> tuple[list[float], list[float]]:
+    intervals.sort()
+    starts: list[float] = []
+    ends: list[float] = []
+    for s, e in intervals:
+        if ends and s <= ends[-1]:
+            ends[-1] = max(ends[-1], e)
+        else:
+            starts.append(s)
+            ends.append(e)
+    return starts, ends
+
+
+def _covers(entry: tuple[list[float], list[float]], t: float) -> bool:
+    starts, ends = entry
+    i = bisect_right(starts, t) - 1
+    return i >= 0 and t < ends[i]
+
+
+class MaintenanceIndex:
+    """
+    Point-in-time lookup of maintenance windows by monitor and owner.
+
+    Args:
+        horizon_s: How far ahead recurring windows are expanded.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    def __init__(self, horizon_s: float = 2 * 86_400.0) -> None:
+        self.horizon_s = horizon_s
+        self._defs: dict[int, list[WindowSpec]] = {}  # user_id -> окна
+        # (mode, by_monitor, by_user): id монитора / пользователя -> (starts, ends); SKIP проверяется первым
+        self._index = tuple((mode, {}, {}) for mode in (SKIP, TAG))
+        self._keys_of_user: dict[int, list[tuple[dict, int]]] = {}
+        self._size = 0
+        self.built_from = 0.0
+        self.built_until = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(ws) for ws in self._defs.values())
+
+    def replace_all(self, windows: Iterable[WindowSpec], now: float) -> None:
+        """Drop everything and index `windows` (full reload)."""
+        self._defs.clear()
+        self._clear_index()
+        for w in windows:
+            self._defs.setdefault(w.user_id, []).append(w)
+        self.built_from, self.built_until = now, now + self.horizon_s
+        for user_id in self._defs:
+            self._build_user(user_id)
+
+    def replace_users(self, user_ids: Iterable[int], windows: Iterable[WindowSpec]) -> None:
+        """Re-index only these owners; `windows` must be all current windows of exactly them."""
+        user_ids = set(user_ids)
+        for user_id in user_ids:
+            self._defs.pop(user_id, None)
+            for table, key in self._keys_of_user.pop(user_id, ()):
+                del table[key]
+                self._size -= 1
+        for w in windows:
+            self._defs.setdefault(w.user_id, []).append(w)
+        for user_id in user_ids & self._defs.keys():
+            self._build_user(user_id)
+
+    def extend(self, now: float) -> bool:
+        """Re-expand all windows over [now, now + horizon) once half the horizon is used up."""
+        if now < self.built_until - self.horizon_s / 2:
+            return False
+        self.built_from, self.built_until = now, now + self.horizon_s
+        self._clear_index()
+        for user_id in self._defs:
+            self._build_user(user_id)
+        return True
+
+    def _clear_index(self) -> None:
+        for _, by_monitor, by_user in self._index:
+            by_monitor.clear()
+            by_user.clear()
+        self._keys_of_user.clear()
+        self._size = 0
+
+    def _build_user(self, user_id: int) -> None:
+        # (mode, окно на пользователя?, id монитора/пользователя) -> вхождения
+        buckets: dict[tuple[str, bool, int], list[tuple[float, float]]] = {}
+        for w in self._defs[user_id]:
+            key = (w.mode, True, user_id) if w.monitor_id is None else (w.mode, False, w.monitor_id)
+            buckets.setdefault(key, []).extend(occurrences(w, self.built_from, self.built_until))
+        tables = {mode: (by_monitor, by_user) for mode, by_monitor, by_user in self._index}
+        keys = []
+        for (mode, per_user, target), intervals in buckets.items():
+            if intervals:
+                table = tables[mode][per_user]
+                table[target] = _merge(intervals)
+                keys.append((table, target))
+        self._size += len(keys)
+        self._keys_of_user[user_id] = keys
+
+    def lookup(self, monitor_id: int, user_id: int, t: float) -> str | None:
+        """Maintenance mode in force for the monitor at `t` (SKIP wins over TAG), or None."""
+        if not self._size:
+            return None
+        for mode, by_monitor, by_user in self._index:
+            entry = by_monitor.get(monitor_id)
+            if entry is not None and _covers(entry, t):
+                return mode
+            entry = by_user.get(user_id)
+            if entry is not None and _covers(entry, t):
+                return mode
+        return None
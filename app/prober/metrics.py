@@ -0,0 +1,66 @@
+# app/prober/metrics.py
+"""
+Prober metrics in the Prometheus text format.
+
+The worker has no web framework, so `serve` exposes `/metrics` with a bare
+`asyncio.start_server` handler. Values are plain floats set or incremented in place by
+the prober; rendering happens only when scraped.
+"""
+
+import asyncio
+from collections import defaultdict
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._values: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._types: dict[str, str] = {}
+        self._help: dict[str, str] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._types[name] = kind
+        self._help[name] = help_text
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self._values[name][tuple(sorted(labels.items()))] = value
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._values[name]
+        series[key] = series.get(key, 0.0) + value
+
+    def get(self, name: str, **labels: str) -> float:
+        return self._values[name].get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> str:
+        lines = []
+        for name, series in self._values.items():
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types[name]}")
+            for labels, value in series.items():
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{name}{{{label_str}}} {value:g}" if label_str else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if request_line.split(b" ")[1:2] == [b"/metrics"]:
+                body, status = self.render().encode(), b"200 OK"
+            else:
+                body, status = b"not found\n", b"404 Not Found"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, port: int, host: str = "0.0.0.0") -> asyncio.Server:
+        return await asyncio.start_server(self._handle, host, port)
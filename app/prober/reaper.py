@@ -0,0 +1,106 @@
+# app/prober/reaper.py
+"""
+Background purge of the history of deleted monitors (see `app.repositories.purge`).
+
+Each worker purges the deleted monitors of its own shard, oldest deletion first: batches
+of `batch_size` rows, one short transaction each, with a pause after every batch so that
+purging takes at most `duty` of the wall time (a batch that took 50 ms at duty 0.2 is
+followed by 200 ms of rest). Probes and the check writer keep their share of the database
+however large the backlog. A monitor's row is deleted once its history is empty and
+`grace_s` has passed since its deletion; deleted users go (on shard 0) once they own no
+monitor rows any more.
+
+Progress is kept in `monitors.purged_rows` and exported as `prober_purged_rows_total` and
+`prober_purge_backlog` (deleted monitors of this shard still waiting).
+"""
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.prober.metrics import Metrics
+from app.repositories import purge as purge_repo
+
+log = logging.getLogger(__name__)
+
+
+class HistoryReaper:
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        *,
+        batch_size: int,
+        duty: float,
+        grace_s: float,
+        idle_s: float,
+        metrics: Metrics,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> None:
+        self._sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self.duty = min(max(duty, 0.01), 1.0)
+        self.grace_s = grace_s
+        self.idle_s = idle_s
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.metrics = metrics
+        metrics.describe("prober_purged_rows_total", "counter", "History rows of deleted monitors purged.")
+        metrics.describe("prober_purge_backlog", "gauge", "Deleted monitors of this shard waiting for purge (up to 100 per pass).")
+
+    async def _throttle(self, elapsed: float) -> None:
+        if self.duty < 1.0:
+            await asyncio.sleep(elapsed * (1.0 - self.duty) / self.duty)
+
+    async def purge_monitor(self, monitor_id: int) -> int:
+        """Purge one deleted monitor's history batch by batch; returns rows deleted."""
+        total = 0
+        while True:
+            t0 = time.perf_counter()
+            async with self._sessionmaker() as s:
+                n = await purge_repo.purge_batch(s, monitor_id=monitor_id, batch_size=self.batch_size)
+                await s.commit()
+            total += n
+            self.metrics.inc("prober_purged_rows_total", n)
+            if n < self.batch_size:
+                return total
+            await self._throttle(time.perf_counter() - t0)
+
+    async def run_once(self, limit: int = 100) -> tuple[int, int]:
+        """
+        One pass over the pending monitors of this shard.
+
+        Returns:
+            (rows purged, monitor and user rows deleted).
+        """
+        async with self._sessionmaker() as s:
+            pending = await purge_repo.pending(
+                s, shard_index=self.shard_index, shard_count=self.shard_count, limit=limit
+            )
+        rows = finalized = 0
+        for monitor_id, _, _ in pending:
+            rows += await self.purge_monitor(monitor_id)
+            async with self._sessionmaker() as s:
+                finalized += await purge_repo.finalize_monitor(s, monitor_id=monitor_id, grace_s=self.grace_s)
+                await s.commit()
+        self.metrics.set("prober_purge_backlog", len(pending) - finalized)
+        # пользователи не шардированы: их строки удаляет один воркер
+        if self.shard_index == 0:
+            async with self._sessionmaker() as s:
+                finalized += await purge_repo.finalize_users(s)
+                await s.commit()
+        return rows, finalized
+
+    async def run(self) -> None:
+        while True:
+            try:
+                rows, finalized = await self.run_once()
+            except Exception:
+                log.exception("history purge failed")
+                rows = finalized = 0
+            if rows or finalized:
+                log.info("purged %d history rows, deleted %d rows of deleted monitors and users", rows, finalized)
+            else:
+                await asyncio.sleep(self.idle_s)
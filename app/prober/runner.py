@@ -0,0 +1,695 @@
+# app/prober/runner.py
+"""
+Prober main loop: keeps the probe schedule in sync with `monitors`, runs due probes under
+a concurrency cap and hands the results to the batched writer. The pieces it wires up:
+
+    - `scheduler`, `admission`: due-time heap, and priority lanes shared between users by
+      weighted fair queuing under overload;
+    - `http_probe`, `net_probe`: HTTP, TCP-connect and DNS probes;
+    - `confirm`: failures are re-probed by peer workers before they count;
+    - `maintenance`: windows that skip probes or tag their results;
+    - `dependencies`: children of a down parent are held, not probed;
+    - `heartbeats`: deadline timers for push monitors, which are never probed;
+    - `anomaly`: latency regressions, checkpointed to `anomaly_states`;
+    - `writer`, `spool`: batched writes, spilled to local disk while the DB is down;
+    - `reaper`: background purge of deleted monitors' history.
+
+Schedule sync is incremental: writes emit `monitors_changed` (payload: owner id) and only
+that user's monitors, windows and dependencies are re-read. A full reload happens when the
+LISTEN connection (re)connects, since events may have been lost, and when the periodic
+checksum reconciliation finds that the schedule differs from the table.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.db import get_sessionmaker
+from app.core.notify import NotificationListener
+from app.core.settings import Settings, get_settings
+from app.prober.admission import LANE_NAMES, LONG, SHORT, AdmissionControl
+from app.prober.anomaly import LatencyAnomalyDetector
+from app.prober.confirm import PEER_PREFIX, Confirmer
+from app.prober.dependencies import RELEASED, SUPPRESSED, DependencyGraph
+from app.prober.heartbeats import HeartbeatSpec, HeartbeatTimers, miss_result, ping_result
+from app.prober.http_probe import ProbeResult, make_client
+from app.prober.maintenance import SKIP, TAG, MaintenanceIndex, WindowSpec
+from app.prober.metrics import Metrics
+from app.prober.net_probe import probe
+from app.prober.reaper import HistoryReaper
+from app.prober.scheduler import MonitorSpec, Scheduler
+from app.prober.spool import CheckSpool
+from app.prober.writer import CheckWriter
+from app.repositories import anomaly_states as anomaly_repo
+from app.repositories import heartbeats as heartbeats_repo
+from app.repositories import maintenance_windows as maintenance_repo
+from app.repositories import monitor_dependencies as dependencies_repo
+from app.repositories import monitors as monitors_repo
+from app.repositories import users as users_repo
+
+log = logging.getLogger(__name__)
+
+
+class Prober:
+    def __init__(self, settings: Settings, sessionmaker: async_sessionmaker) -> None:
+        self.settings = settings
+        self._sessionmaker = sessionmaker
+        self.metrics = Metrics()
+        self.admission = AdmissionControl(
+            concurrency=settings.PROBER_CONCURRENCY,
+            long_concurrency=settings.PROBER_LONG_CONCURRENCY,
+            short_interval_s=settings.PROBER_SHORT_INTERVAL_S,
+            lag_target_s=settings.PROBER_LAG_TARGET_S,
+            max_stretch=settings.PROBER_MAX_STRETCH,
+            metrics=self.metrics,
+        )
+        # вес пользователя в справедливой очереди — его бюджет проверок (переопределённые значения)
+        self.budgets: dict[int, float] = {}
+        self.scheduler = Scheduler(lanes=len(LANE_NAMES), lane_of=self.admission.lane_of, weight_of=self._weight_of)
+        spool = None
+        if settings.PROBER_SPOOL_MAX_BYTES > 0:
+            spool = CheckSpool(
+                settings.PROBER_SPOOL_DIR / f"shard-{settings.PROBER_SHARD_INDEX}",
+                segment_bytes=settings.PROBER_SPOOL_SEGMENT_BYTES,
+                max_bytes=settings.PROBER_SPOOL_MAX_BYTES,
+                metrics=self.metrics,
+            )
+        self.writer = CheckWriter(
+            sessionmaker,
+            batch_size=settings.PROBER_BATCH_SIZE,
+            flush_s=settings.PROBER_FLUSH_S,
+            spool=spool,
+            spill_at=settings.PROBER_SPOOL_SPILL_AT,
+            status_version_s=settings.PROBER_STATUS_VERSION_S,
+        )
+        self.worker_id = settings.PROBER_WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.confirmer = Confirmer(
+            self.worker_id,
+            sessionmaker,
+            votes=settings.PROBER_CONFIRM_VOTES,
+            grace_s=settings.PROBER_CONFIRM_GRACE_S,
+            concurrency=settings.PROBER_CONFIRM_CONCURRENCY,
+        )
+        self.anomaly = LatencyAnomalyDetector(
+            alpha=settings.PROBER_ANOMALY_ALPHA,
+            z_threshold=settings.PROBER_ANOMALY_Z,
+            min_delta_ms=settings.PROBER_ANOMALY_MIN_DELTA_MS,
+            warmup=settings.PROBER_ANOMALY_WARMUP,
+            confirm=settings.PROBER_ANOMALY_CONFIRM,
+        )
+        self.metrics.describe("prober_anomaly_events_total", "counter", "Latency anomaly events raised, by kind.")
+        self.maintenance = MaintenanceIndex(horizon_s=settings.PROBER_MAINTENANCE_HORIZON_S)
+        self.metrics.describe(
+            "prober_maintenance_probes_total", "counter", "Probes skipped or tagged by maintenance windows, by mode."
+        )
+        self.dependencies = DependencyGraph()
+        self.metrics.describe(
+            "prober_suppressed_probes_total", "counter", "Probes held because a parent monitor is down."
+        )
+        self.heartbeats = HeartbeatTimers(slack_s=settings.PROBER_HEARTBEAT_SLACK_S)
+        self.metrics.describe("prober_heartbeat_misses_total", "counter", "Missed heartbeat deadlines recorded.")
+        self._heartbeat_wake = asyncio.Event()
+        self.reaper = HistoryReaper(
+            sessionmaker,
+            batch_size=settings.PROBER_PURGE_BATCH,
+            duty=settings.PROBER_PURGE_DUTY,
+            grace_s=settings.PROBER_PURGE_GRACE_S,
+            idle_s=settings.PROBER_PURGE_IDLE_S,
+            metrics=self.metrics,
+            shard_index=settings.PROBER_SHARD_INDEX,
+            shard_count=settings.PROBER_SHARD_COUNT,
+        )
+        # мониторы, последний записанный результат которых — подтверждённое падение;
+        # повторные падения таких мониторов не перепроверяются
+        self.down: set[int] = set()
+        # мониторы, последний записанный результат которых успешен (вместе с down — известное
+        # состояние; смена состояния или первый результат перерисовывают страницы статуса)
+        self.up: set[int] = set()
+        # идёт перепроверка падения: монитор -> пришёл ли за это время более новый результат
+        self._confirming: dict[int, bool] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._client = None
+        # отложенная синхронизация расписания: полная или по изменившимся пользователям
+        self._full_sync = False
+        self._dirty_users: set[int] = set()
+        self._sync_wake = asyncio.Event()
+
+    async def reload(self, user_ids: set[int] | None = None) -> None:
+        """
+        Sync the schedule with the `monitors` table: add new, update changed, drop paused/deleted.
+        Heartbeat monitors go to `self.heartbeats`, armed at their deadline after the latest ping.
+
+        With `user_ids` only those owners' monitors are re-read and diffed. Maintenance
+        windows, dependency edges and probe budgets of the same owners (or all of them) are
+        re-read into `self.maintenance`, `self.dependencies` and `self.budgets`.
+
+        New monitors keep their cadence: the next probe is due `interval_s` after the latest
+        recorded check. Overdue ones (e.g. after a restart) must not all fire at once:
+            - interval <= PROBER_CATCHUP_S: skip the missed probes and keep the phase
+              (next `last_ts + k * interval_s` slot), so the old even spread is preserved;
+            - longer intervals: spread evenly over the catch-up window, most overdue first;
+            - never checked: random point within min(interval, catch-up window).
+        """
+        async with self._sessionmaker() as s:
+            rows = await monitors_repo.list_active(
+                s,
+                shard_index=self.settings.PROBER_SHARD_INDEX,
+                shard_count=self.settings.PROBER_SHARD_COUNT,
+                with_last_check=True,
+                user_ids=None if user_ids is None else list(user_ids),
+            )
+            windows = [
+                WindowSpec(
+                    window_id, user_id, monitor_id, starts_at.timestamp(), ends_at.timestamp(),
+                    recurrence, until.timestamp() if until is not None else None, mode,
+                )
+                for window_id, user_id, monitor_id, starts_at, ends_at, recurrence, until, mode in
+                await maintenance_repo.list_current(
+                    s, now=datetime.now(timezone.utc), user_ids=None if user_ids is None else list(user_ids)
+                )
+            ]
+            edges, down_parents = await dependencies_repo.load_graph(
+                s, user_ids=None if user_ids is None else list(user_ids)
+            )
+            budgets = await users_repo.probe_budgets(s, user_ids=None if user_ids is None else list(user_ids))
+            heartbeats = await heartbeats_repo.list_active(
+                s,
+                shard_index=self.settings.PROBER_SHARD_INDEX,
+                shard_count=self.settings.PROBER_SHARD_COUNT,
+                user_ids=None if user_ids is None else list(user_ids),
+            )
+
+        now = time.time()
+        if user_ids is None:
+            known = self.scheduler.ids()
+            self.maintenance.replace_all(windows, now)
+            self.budgets = budgets
+        else:
+            known = set().union(*(self.scheduler.ids_of_user(u) for u in user_ids))
+            self.maintenance.replace_users(user_ids, windows)
+            for user_id in user_ids:
+                self.budgets.pop(user_id, None)
+            self.budgets.update(budgets)
+        window = self.settings.PROBER_CATCHUP_S
+        seen = set()
+        added = []
+        # мониторы, чья норма задержки больше не действует: монитор -> был ли в регрессии
+        forgotten: dict[int, bool] = {}
+        overdue = 0
+        spread: list[tuple[float, MonitorSpec]] = []
+        for *fields, last_ts in rows:
+            spec = MonitorSpec(*fields)
+            seen.add(spec.id)
+            cur = self.scheduler.get(spec.id)
+            if cur is None:
+                added.append(spec.id)
+                if last_ts is None:
+                    overdue += 1
+                    self.scheduler.upsert(spec, now + random.uniform(0, min(spec.interval_s, window)))
+                    continue
+                due = last_ts.timestamp() + spec.interval_s
+                if due > now:
+                    self.scheduler.upsert(spec, due)
+                    continue
+                overdue += 1
+                if spec.interval_s <= window:
+                    self.scheduler.upsert(spec, now + (due - now) % spec.interval_s)
+                else:
+                    spread.append((due, spec))
+            elif cur != spec:
+                if (cur.url, cur.method) != (spec.url, spec.method):
+                    # другая цель — прежняя норма задержки к ней не относится
+                    forgotten[spec.id] = self.anomaly.forget(spec.id)
+                due = self.scheduler.due_of(spec.id)
+                if due is None:
+                    self.scheduler.replace(spec)
+                else:
+                    self.scheduler.upsert(spec, min(due, now + spec.interval_s))
+
+        spread.sort(key=lambda item: item[0])
+        for i, (_, spec) in enumerate(spread):
+            self.scheduler.upsert(spec, now + i * window / len(spread))
+        for mid in known - seen:
+            self.scheduler.remove(mid)
+            self.down.discard(mid)
+            self.up.discard(mid)
+            forgotten[mid] = self.anomaly.forget(mid)
+        self._reload_heartbeats(heartbeats, user_ids, now)
+
+        # свои мониторы — по последнему результату этого воркера (он может быть ещё не записан)
+        down = (set(down_parents) - self.up) | self.down
+        if user_ids is None:
+            transitions = self.dependencies.replace_all(edges, down)
+        else:
+            transitions = self.dependencies.replace_users(user_ids, edges, down)
+        self._apply_suppression(transitions, now)
+        if forgotten:
+            # контрольная точка удаляется (иначе после рестарта вернётся старая норма),
+            # открытая регрессия закрывается событием latency_recovered; событие о ней
+            # может ещё ждать в буфере записи — сначала сбрасываем буфер
+            if any(forgotten.values()):
+                await self.writer.flush()
+            async with self._sessionmaker() as s:
+                events = await anomaly_repo.reset(s, monitor_ids=list(forgotten))
+                await s.commit()
+            for event in events:
+                self.writer.add_event(event)
+        if added:
+            async with self._sessionmaker() as s:
+                self.anomaly.restore(await anomaly_repo.load(s, monitor_ids=added))
+        if user_ids is None:
+            log.info("schedule reloaded: %d monitors, %d overdue", len(self.scheduler), overdue)
+        self._wake.set()
+
+    def _reload_heartbeats(self, rows, user_ids: set[int] | None, now: float) -> None:
+        if user_ids is None:
+            known = self.heartbeats.ids()
+        else:
+            known = set().union(*(self.heartbeats.ids_of_user(u) for u in user_ids))
+        seen = set()
+        for monitor_id, user_id, interval_s, grace_s, created_at, last_ping_at, _ in rows:
+            spec = HeartbeatSpec(monitor_id, user_id, interval_s, grace_s, created_at.timestamp())
+            seen.add(spec.id)
+            last = last_ping_at.timestamp() if last_ping_at is not None else None
+            cur = self.heartbeats.get(spec.id)
+            if cur is None and last is not None:
+                # этот пинг уже мог быть записан до рестарта
+                self.heartbeats.recorded[spec.id] = last
+            if cur != spec:
+                self.heartbeats.upsert(spec, self.heartbeats.deadline(spec, last))
+            elif spec.id in self.down and last is not None and last > self.heartbeats.recorded.get(spec.id, 0.0):
+                # уведомление о восстановлении могло потеряться при переподключении
+                self.heartbeats.arm(spec.id, now)
+        for mid in known - seen:
+            self.heartbeats.remove(mid)
+            self.down.discard(mid)
+            self.up.discard(mid)
+        self._heartbeat_wake.set()
+
+    def _weight_of(self, user_id: int) -> float:
+        # нулевой бюджет не должен останавливать очередь (активных мониторов у такого нет)
+        return max(self.budgets.get(user_id, self.settings.QUOTA_PROBES_PER_S), 0.01)
+
+    # ---------- dependencies ----------
+
+    def _apply_suppression(self, transitions: list[tuple[int, bool]], now: float) -> None:
+        """Record holds/releases of this worker's monitors; released ones are probed soon."""
+        ts = datetime.fromtimestamp(now, tz=timezone.utc)
+        for monitor_id, suppressed in transitions:
+            spec = self.scheduler.get(monitor_id)
+            if spec is None and monitor_id not in self.heartbeats:
+                continue  # другой шард или на паузе
+            self.writer.add_event({
+                "monitor_id": monitor_id, "ts": ts, "kind": SUPPRESSED if suppressed else RELEASED,
+                "latency_ms": None, "baseline_ms": None, "score": None,
+            })
+            if spec is None:
+                if not suppressed:
+                    self.heartbeats.arm(monitor_id, now)
+                    self._heartbeat_wake.set()
+                continue
+            due = self.scheduler.due_of(monitor_id)
+            if not suppressed and due is not None:
+                # не дожидаться отложенного срока, но и не проверять всё поддерево разом
+                self.scheduler.upsert(
+                    spec, min(due, now + random.uniform(0, min(spec.interval_s, self.settings.PROBER_CATCHUP_S)))
+                )
+        if transitions:
+            self._wake.set()
+
+    def _on_monitor_state(self, payload: str) -> None:
+        monitor_id, _, down = payload.partition(":")
+        monitor_id = int(monitor_id)
+        if self.scheduler.get(monitor_id) is not None or monitor_id in self.heartbeats:
+            return  # свой монитор: уже учтён в _write
+        self._apply_suppression(self.dependencies.set_down(monitor_id, down == "1"), time.time())
+
+    # ---------- heartbeats ----------
+
+    def _on_heartbeat_recovered(self, payload: str) -> None:
+        monitor_id = int(payload)
+        if monitor_id in self.heartbeats:
+            self.heartbeats.arm(monitor_id, time.time())
+            self._heartbeat_wake.set()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            self._heartbeat_wake.clear()
+            now = time.time()
+            nxt = self.heartbeats.next_deadline()
+            if nxt is not None and nxt <= now:
+                due = self.heartbeats.pop_due(now, self.settings.PROBER_BATCH_SIZE)
+                try:
+                    await self.evaluate_heartbeats(due, now)
+                except Exception:
+                    log.exception("heartbeat evaluation failed, retrying")
+                    for spec in due:
+                        self.heartbeats.arm(spec.id, now + 1.0)
+                    await asyncio.sleep(1.0)
+                continue
+            # до ближайшего срока; раньше — если срок придвинули (пинг упавшего, синхронизация)
+            timeout = 60.0 if nxt is None else min(60.0, nxt - now)
+            try:
+                await asyncio.wait_for(self._heartbeat_wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def evaluate_heartbeats(self, specs: list[HeartbeatSpec], now: float) -> None:
+        """
+        Evaluate heartbeat monitors whose deadline passed and re-arm them.
+
+        One query reads their latest pings. A monitor that pinged since is recorded as a
+        successful check (timestamped with the ping, once per ping) and re-armed from it;
+        one that did not is recorded as a failed check and re-armed `interval_s` later.
+        A new miss is stored as `heartbeats.down` before it counts (`mark_down`), so a ping
+        flushed at the same moment is not lost. `skip` maintenance windows and a down
+        parent postpone the evaluation; `tag` windows record it flagged.
+        """
+        live = []
+        for spec in specs:
+            mode = self.maintenance.lookup(spec.id, spec.user_id, now)
+            if mode is not None:
+                self.metrics.inc("prober_maintenance_probes_total", mode=mode)
+            if mode == SKIP:
+                self.heartbeats.arm(spec.id, now + spec.interval_s)
+            elif spec.id in self.dependencies.suppressed:
+                self.metrics.inc("prober_suppressed_probes_total")
+                self.heartbeats.arm(spec.id, now + spec.interval_s)
+            else:
+                live.append((spec, mode == TAG))
+        if not live:
+            return
+
+        pinged, missed = [], []
+        new_down = {}
+        async with self._sessionmaker() as s:
+            seen = await heartbeats_repo.last_pings(s, monitor_ids=[spec.id for spec, _ in live])
+            for spec, tagged in live:
+                if spec.id not in seen:
+                    continue  # удалён; уйдёт из расписания при синхронизации
+                last_at = seen[spec.id]
+                last = last_at.timestamp() if last_at is not None else None
+                if self.heartbeats.deadline(spec, last) > now:
+                    pinged.append((spec, tagged, last_at))
+                else:
+                    missed.append((spec, tagged, last))
+                    if not tagged and spec.id not in self.down:
+                        new_down[spec.id] = last_at
+            confirmed = set(await heartbeats_repo.mark_down(s, seen=new_down))
+            await heartbeats_repo.mark_up(s, monitor_ids=[
+                spec.id for spec, tagged, last_at in pinged
+                if not tagged and last_at is not None and spec.id not in self.up
+            ])
+            await s.commit()
+
+        for spec, tagged, last_at in pinged:
+            last = last_at.timestamp() if last_at is not None else None
+            self.heartbeats.arm(spec.id, self.heartbeats.deadline(spec, last))
+            if last is not None and last > self.heartbeats.recorded.get(spec.id, 0.0):
+                self.heartbeats.recorded[spec.id] = last
+                self._write(ping_result(spec, last_at), tagged)
+        for spec, tagged, last in missed:
+            if spec.id in new_down and spec.id not in confirmed:
+                # пинг дошёл до БД, пока решали: перечитать
+                self.heartbeats.arm(spec.id, now)
+                continue
+            self.heartbeats.arm(spec.id, now + spec.interval_s)
+            self.metrics.inc("prober_heartbeat_misses_total")
+            self._write(miss_result(spec, now, last), tagged)
+
+    # ---------- incremental sync ----------
+
+    def _on_monitors_changed(self, payload: str) -> None:
+        self._dirty_users.add(int(payload))
+        self._sync_wake.set()
+
+    def _request_full_sync(self) -> None:
+        self._full_sync = True
+        self._sync_wake.set()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await self._sync_wake.wait()
+            # небольшая задержка склеивает серию уведомлений в один запрос
+            await asyncio.sleep(self.settings.PROBER_SYNC_DEBOUNCE_S)
+            self._sync_wake.clear()
+            full, self._full_sync = self._full_sync, False
+            users, self._dirty_users = self._dirty_users, set()
+            try:
+                if full:
+                    await self.reload()
+                elif users:
+                    await self.reload(users)
+            except Exception:
+                log.exception("schedule sync failed, retrying")
+                self._full_sync |= full
+                self._dirty_users |= users
+                await asyncio.sleep(1.0)
+                self._sync_wake.set()
+
+    async def reconcile(self) -> bool:
+        """Compare the schedule with the table by checksum; request a full reload on mismatch."""
+        async with self._sessionmaker() as s:
+            expected = await monitors_repo.active_checksum(
+                s, shard_index=self.settings.PROBER_SHARD_INDEX, shard_count=self.settings.PROBER_SHARD_COUNT
+            )
+        actual = monitors_repo.probe_spec_checksum(
+            (
+                spec.id, spec.user_id, spec.url, spec.method, spec.expected_status, spec.interval_s, spec.timeout_ms,
+                spec.kind, spec.expect,
+            )
+            for spec in self.scheduler.specs()
+        )
+        if actual == expected:
+            return True
+        log.warning("schedule drifted from monitors table (%d vs %d monitors), full reload", actual[0], expected[0])
+        self._request_full_sync()
+        return False
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.PROBER_RECONCILE_S)
+            try:
+                await self.reconcile()
+            except Exception:
+                log.exception("schedule reconciliation failed")
+
+    async def checkpoint(self) -> int:
+        """Save the detector state of monitors probed since the last checkpoint."""
+        rows = self.anomaly.take_dirty()
+        if not rows:
+            return 0
+        try:
+            async with self._sessionmaker() as s:
+                await anomaly_repo.save_many(s, rows=rows)
+                await s.commit()
+        except Exception:
+            self.anomaly.mark_dirty(r["monitor_id"] for r in rows)
+            raise
+        return len(rows)
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.PROBER_ANOMALY_CHECKPOINT_S)
+            try:
+                await self.checkpoint()
+            except Exception:
+                log.exception("anomaly checkpoint failed")
+
+    async def _probe(self, spec: MonitorSpec, lane: int, tagged: bool = False) -> None:
+        started = time.time()
+        result = None
+        try:
+            result = await probe(self._client, spec)
+        except Exception:
+            log.exception("probe of monitor %d crashed", spec.id)
+        # слот освобождается до перепроверки: она идёт в полосе Confirmer и не задерживает плановые
+        self.admission.done(lane)
+        self.scheduler.reschedule(spec.id, started + self.admission.interval(spec, lane))
+        self._wake.set()
+        if result is None:
+            return
+        try:
+            if spec.id in self._confirming:
+                if not result.ok:
+                    return  # падение уже перепроверяется — исход запишет та перепроверка
+                self._confirming[spec.id] = True
+            elif not tagged and not result.ok and spec.id not in self.down:
+                self._confirming[spec.id] = False
+                try:
+                    result = await self.confirmer.confirm(spec, result)
+                finally:
+                    superseded = self._confirming.pop(spec.id)
+                if superseded:
+                    # за время перепроверки записан более новый успешный результат: только история
+                    self.writer.add(result)
+                    return
+            if self._write(result, tagged) and result.ok:
+                event = self.anomaly.observe(spec.id, result.latency_ms, result.ts)
+                if event is not None:
+                    self.writer.add_event(event)
+                    self.metrics.inc("prober_anomaly_events_total", kind=event["kind"])
+        except Exception:
+            log.exception("recording the probe of monitor %d failed", spec.id)
+
+    def _write(self, result: ProbeResult, tagged: bool) -> bool:
+        """
+        Hand a result to the writer, flipping the monitor's up/down state if it changed.
+
+        Returns False if the result is only recorded: taken in a `tag` maintenance window
+        (flagged, no alerts) or while a parent is down (state unchanged).
+        """
+        monitor_id = result.monitor_id
+        if tagged:
+            # окно обслуживания: только запись, без перепроверок, смены статуса и аномалий
+            result.maintenance = True
+            self.writer.add(result)
+            return False
+        if monitor_id in self.dependencies.suppressed:
+            # родитель упал, пока шла проверка: результат записывается, статус не меняется
+            self.writer.add(result)
+            return False
+        now_in, was_in = (self.up, self.down) if result.ok else (self.down, self.up)
+        if monitor_id not in now_in:
+            now_in.add(monitor_id)
+            was_in.discard(monitor_id)
+            self.writer.status_changed(monitor_id)
+            if self.dependencies.has_children(monitor_id):
+                self._apply_suppression(self.dependencies.set_down(monitor_id, not result.ok), time.time())
+                if self.settings.PROBER_SHARD_COUNT > 1:
+                    self.writer.publish_state(monitor_id, not result.ok)
+        self.writer.add(result)
+        return True
+
+    def _spawn(self, spec: MonitorSpec, lane: int, tagged: bool = False) -> None:
+        task = asyncio.create_task(self._probe(spec, lane, tagged))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    def _dispatch(self) -> None:
+        """
+        Start due probes lane by lane (short first) within each lane's free slots.
+
+        Probes inside a `skip` maintenance window, and of monitors held by a down parent,
+        are rescheduled without running (and without counting as admission lag); `tag`
+        windows mark the probe for the writer.
+        """
+        now = time.time()
+        long_due = self.scheduler.next_due(LONG)
+        long_waiting = long_due is not None and long_due <= now
+        for lane in (SHORT, LONG):
+            for due, spec in self.scheduler.pop_due(now, self.admission.free(lane, long_waiting), lane):
+                mode = self.maintenance.lookup(spec.id, spec.user_id, now)
+                if mode is not None:
+                    self.metrics.inc("prober_maintenance_probes_total", mode=mode)
+                if mode == SKIP:
+                    self.scheduler.reschedule(spec.id, now + spec.interval_s)
+                elif spec.id in self.dependencies.suppressed:
+                    # родитель недоступен; при его восстановлении срок придвигается (_apply_suppression)
+                    self.metrics.inc("prober_suppressed_probes_total")
+                    self.scheduler.reschedule(spec.id, now + spec.interval_s)
+                elif self.admission.admit(lane, due, spec, now):
+                    self._spawn(spec, lane, tagged=mode == TAG)
+                else:
+                    self.scheduler.reschedule(spec.id, now + self.admission.interval(spec, lane))
+
+    async def _control_loop(self) -> None:
+        self.metrics.describe("prober_scheduled_monitors", "gauge", "Monitors in this worker's schedule.")
+        self.metrics.describe("prober_confirm_inflight", "gauge", "Confirmation re-checks in flight.")
+        self.metrics.describe("prober_confirm_dropped_total", "counter", "Peer confirmation requests dropped (lane full or too late).")
+        self.metrics.describe("prober_write_buffer", "gauge", "Check results waiting to be written.")
+        self.metrics.describe("prober_anomalous_monitors", "gauge", "Monitors currently in a latency regression.")
+        self.metrics.describe("prober_suppressed_monitors", "gauge", "Monitors held because a parent is down (all shards).")
+        self.metrics.describe("prober_backlogged_users", "gauge", "Users with due probes waiting for a slot, by lane.")
+        self.metrics.describe("prober_heartbeat_monitors", "gauge", "Heartbeat monitors in this worker's timers.")
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.time()
+            backlog = []
+            for lane in range(len(LANE_NAMES)):
+                nxt = self.scheduler.next_due(lane)
+                backlog.append(max(now - nxt, 0.0) if nxt is not None else 0.0)
+                self.metrics.set("prober_backlogged_users", self.scheduler.backlogged_users(lane), lane=LANE_NAMES[lane])
+            self.admission.adjust(backlog)
+            self.maintenance.extend(now)
+            self.metrics.set("prober_scheduled_monitors", len(self.scheduler))
+            self.metrics.set("prober_confirm_inflight", self.confirmer.inflight)
+            self.metrics.set("prober_confirm_dropped_total", self.confirmer.dropped)
+            self.metrics.set("prober_write_buffer", len(self.writer))
+            self.metrics.set("prober_anomalous_monitors", self.anomaly.anomalous)
+            self.metrics.set("prober_suppressed_monitors", len(self.dependencies.suppressed))
+            self.metrics.set("prober_heartbeat_monitors", len(self.heartbeats))
+
+    async def run(self) -> None:
+        self._client = make_client(self.settings.PROBER_CONCURRENCY)
+        metrics_server = None
+        if self.settings.PROBER_METRICS_PORT:
+            metrics_server = await self.metrics.serve(self.settings.PROBER_METRICS_PORT)
+        # по имени LISTEN-соединения другие воркеры выбирают, кого просить о перепроверке
+        listener = NotificationListener(self.settings.database_dsn, application_name=f"{PEER_PREFIX}{self.worker_id}")
+        self.confirmer.attach(listener)
+        # первое подключение тоже вызывает on_reconnect — с него и начинается полная загрузка
+        listener.subscribe(
+            users_repo.MONITORS_CHANGED_CHANNEL, self._on_monitors_changed, on_reconnect=self._request_full_sync
+        )
+        if self.settings.PROBER_SHARD_COUNT > 1:
+            # смены состояния родителей из других шардов (после переподключения — полная загрузка выше)
+            listener.subscribe(dependencies_repo.MONITOR_STATE_CHANNEL, self._on_monitor_state)
+        # потерянные при переподключении уведомления наверстает полная загрузка (reload)
+        listener.subscribe(heartbeats_repo.HEARTBEAT_RECOVERED_CHANNEL, self._on_heartbeat_recovered)
+        listener.start()
+        background = [
+            asyncio.create_task(self.writer.run(), name="check-writer"),
+            asyncio.create_task(self._sync_loop(), name="schedule-sync"),
+            asyncio.create_task(self._reconcile_loop(), name="schedule-reconcile"),
+            asyncio.create_task(self._control_loop(), name="admission-control"),
+            asyncio.create_task(self._checkpoint_loop(), name="anomaly-checkpoint"),
+            asyncio.create_task(self._heartbeat_loop(), name="heartbeat-timers"),
+            asyncio.create_task(self.reaper.run(), name="history-purge"),
+        ]
+        try:
+            while True:
+                self._wake.clear()
+                self._dispatch()
+
+                # ждём ближайшей проверки только в полосах со свободными слотами;
+                # иначе — завершения одной из текущих (она будит цикл через _wake)
+                heads = [
+                    self.scheduler.next_due(lane)
+                    for lane in range(len(LANE_NAMES))
+                    if self.admission.free(lane) > 0
+                ]
+                nxt = min(filter(None, heads), default=None)
+                timeout = 1.0 if nxt is None else min(1.0, max(0.0, nxt - time.time()))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in [*background, *self._inflight]:
+                task.cancel()
+            await asyncio.gather(*background, *self._inflight, return_exceptions=True)
+            await listener.stop()
+            await self.confirmer.close()
+            if metrics_server is not None:
+                metrics_server.close()
+            try:
+                await self.writer.flush()
+                await self.checkpoint()
+            except Exception:
+                log.exception("final flush failed")
+            # недописанное осталось в журнале — его дозапишет следующий запуск
+            self.writer.close()
+            await self._client.aclose()
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    await Prober(get_settings(), get_sessionmaker()).run()
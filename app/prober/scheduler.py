@@ -0,0 +1,282 @@
+# app/prober/scheduler.py
+"""
+In-memory probe schedule: min-heaps of next-due times with lazy deletion.
+
+Updates and removals do not search the heap: the authoritative due time (and lane) lives
+in dicts and heap entries that no longer match them are skipped when they surface. The
+heaps are rebuilt when stale entries start to dominate.
+
+Monitors are split into lanes (one heap each) by `lane_of`, so the runner can serve
+higher-priority lanes first without scanning lower-priority work.
+
+Within a lane, due probes are handed out by weighted fair queuing across users
+(start-time fair queuing, `_FairQueue`): while there are slots for every due probe the
+order does not matter, but under overload each backlogged user gets slots in proportion
+to `weight_of(user_id)`, so a user with a huge number of monitors only delays their own
+probes and a small user's lag stays near zero. The lane-wide heaps are kept alongside for
+`next_due` (lag measurement and wake-ups).
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(slots=True)
+class MonitorSpec:
+    """What the prober needs to know about one monitor."""
+    id: int
+    user_id: int
+    url: str
+    method: str
+    expected_status: int
+    interval_s: int
+    timeout_ms: int
+    kind: str = "http"
+    expect: str | None = None
+
+
+class _FairQueue:
+    """
+    Due probes of one lane, per user, served in start-time fair queuing order.
+
+    Each user has a heap of (due, monitor_id). Users whose first probe is not due yet wait
+    in `_waiting` keyed by that due time; once due they move to `_ready`, keyed by their
+    virtual start time `max(finish of their previous probe, lane virtual time)`. Serving a
+    probe advances the user's finish time by 1 / weight, so between two backlogged users
+    slots are split in proportion to their weights, and a user that was idle re-enters at
+    the current virtual time (no credit saved up while idle). Stale entries (`is_current`
+    is False) are skipped lazily, like in the lane-wide heaps.
+    """
+
+    def __init__(self, is_current: Callable[[float, int], bool], weight_of: Callable[[int], float]) -> None:
+        self._is_current = is_current
+        self._weight_of = weight_of
+        self._heaps: dict[int, list[tuple[float, int]]] = {}
+        self.size = 0                                     # записей в кучах, включая устаревшие
+        self._waiting: list[tuple[float, int]] = []       # (срок первой проверки, user_id)
+        self._waiting_at: dict[int, float] = {}           # user_id -> срок его актуальной записи в _waiting
+        self._ready: list[tuple[float, int, int]] = []    # (виртуальное время старта, seq, user_id)
+        self.ready_users: set[int] = set()
+        self._finish: dict[int, float] = {}               # user_id -> виртуальное окончание последней проверки
+        self._vtime = 0.0
+        self._seq = itertools.count()
+
+    def push(self, user_id: int, due: float, monitor_id: int) -> None:
+        heapq.heappush(self._heaps.setdefault(user_id, []), (due, monitor_id))
+        self.size += 1
+        if user_id not in self.ready_users:
+            at = self._waiting_at.get(user_id)
+            if at is None or due < at:
+                self._wait(user_id, due)
+
+    def rebuild(self, entries: list[tuple[int, float, int]]) -> None:
+        """Drop stale entries: `entries` are all current (user_id, due, monitor_id) of the lane."""
+        self._heaps = {}
+        for user_id, due, monitor_id in entries:
+            self._heaps.setdefault(user_id, []).append((due, monitor_id))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+        self.size = len(entries)
+        self._waiting, self._waiting_at = [], {}
+        for user_id, heap in self._heaps.items():
+            if user_id not in self.ready_users:
+                self._wait(user_id, heap[0][0])
+
+    def promote(self, now: float) -> None:
+        """Move users whose first probe is due by `now` from waiting to ready."""
+        waiting, at = self._waiting, self._waiting_at
+        while waiting and waiting[0][0] <= now:
+            due, user_id = heapq.heappop(waiting)
+            if at.get(user_id) != due:
+                continue
+            del at[user_id]
+            head = self._head(user_id)
+            if head is None:
+                continue
+            if head > now:
+                self._wait(user_id, head)
+                continue
+            self._make_ready(user_id, max(self._finish.get(user_id, 0.0), self._vtime))
+
+    def pop(self, now: float) -> tuple[float, int] | None:
+        """Next due (due, monitor_id) in fair order; None if nothing is due. Call `promote` first."""
+        while self._ready:
+            start, _, user_id = heapq.heappop(self._ready)
+            self.ready_users.discard(user_id)
+            head = self._head(user_id)
+            if head is None:
+                continue
+            if head > now:
+                self._wait(user_id, head)
+                continue
+            due, monitor_id = heapq.heappop(self._heaps[user_id])
+            self.size -= 1
+            self._vtime = start
+            finish = start + 1.0 / self._weight_of(user_id)
+            self._finish[user_id] = finish
+            head = self._head(user_id)
+            if head is not None and head <= now:
+                self._make_ready(user_id, finish)
+            elif head is not None:
+                self._wait(user_id, head)
+            return due, monitor_id
+        return None
+
+    def _head(self, user_id: int) -> float | None:
+        heap = self._heaps.get(user_id)
+        while heap and not self._is_current(*heap[0]):
+            heapq.heappop(heap)
+            self.size -= 1
+        if heap:
+            return heap[0][0]
+        # у простаивающего пользователя не копится ни долг, ни запас
+        self._heaps.pop(user_id, None)
+        self._finish.pop(user_id, None)
+        return None
+
+    def _wait(self, user_id: int, due: float) -> None:
+        self._waiting_at[user_id] = due
+        heapq.heappush(self._waiting, (due, user_id))
+
+    def _make_ready(self, user_id: int, start: float) -> None:
+        self.ready_users.add(user_id)
+        heapq.heappush(self._ready, (start, next(self._seq), user_id))
+
+
+class Scheduler:
+    """
+    Next-due schedule for monitors.
+
+    A monitor is either scheduled (has a due time) or in flight (popped by `pop_due`
+    and not yet rescheduled). `reschedule` after a probe is a no-op if the monitor was
+    removed or re-upserted while its probe was running.
+    """
+
+    def __init__(
+        self,
+        lanes: int = 1,
+        lane_of: Callable[[MonitorSpec], int] = lambda spec: 0,
+        weight_of: Callable[[int], float] = lambda user_id: 1.0,
+    ) -> None:
+        self._heaps: list[list[tuple[float, int]]] = [[] for _ in range(lanes)]
+        self._fair = [
+            _FairQueue(lambda due, mid, lane=lane: self._due.get(mid) == due and self._lane.get(mid) == lane, weight_of)
+            for lane in range(lanes)
+        ]
+        self.lane_of = lane_of
+        self._specs: dict[int, MonitorSpec] = {}
+        self._due: dict[int, float] = {}
+        self._lane: dict[int, int] = {}
+        self._by_user: dict[int, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, monitor_id: int) -> bool:
+        return monitor_id in self._specs
+
+    def get(self, monitor_id: int) -> MonitorSpec | None:
+        return self._specs.get(monitor_id)
+
+    def ids(self) -> set[int]:
+        return set(self._specs)
+
+    def ids_of_user(self, user_id: int) -> set[int]:
+        return set(self._by_user.get(user_id, ()))
+
+    def specs(self):
+        return self._specs.values()
+
+    def due_of(self, monitor_id: int) -> float | None:
+        return self._due.get(monitor_id)
+
+    def upsert(self, spec: MonitorSpec, due: float) -> None:
+        self._set_spec(spec)
+        self._push(spec.id, due)
+
+    def replace(self, spec: MonitorSpec) -> None:
+        """Update the spec of a known monitor without touching its schedule (e.g. while in flight)."""
+        if spec.id in self._specs:
+            self._set_spec(spec)
+
+    def remove(self, monitor_id: int) -> None:
+        spec = self._specs.pop(monitor_id, None)
+        self._due.pop(monitor_id, None)
+        self._lane.pop(monitor_id, None)
+        if spec is not None:
+            self._unindex(spec)
+
+    def _set_spec(self, spec: MonitorSpec) -> None:
+        old = self._specs.get(spec.id)
+        if old is not None:
+            self._unindex(old)
+        self._specs[spec.id] = spec
+        self._by_user.setdefault(spec.user_id, set()).add(spec.id)
+
+    def _unindex(self, spec: MonitorSpec) -> None:
+        ids = self._by_user.get(spec.user_id)
+        if ids is not None:
+            ids.discard(spec.id)
+            if not ids:
+                del self._by_user[spec.user_id]
+
+    def reschedule(self, monitor_id: int, due: float) -> None:
+        """Schedule the next probe after a finished one (ignored if removed or re-upserted meanwhile)."""
+        if monitor_id in self._specs and monitor_id not in self._due:
+            self._push(monitor_id, due)
+
+    def next_due(self, lane: int | None = None) -> float | None:
+        lanes = range(len(self._heaps)) if lane is None else (lane,)
+        heads = []
+        for i in lanes:
+            self._drop_stale(i)
+            if self._heaps[i]:
+                heads.append(self._heaps[i][0][0])
+        return min(heads, default=None)
+
+    def backlogged_users(self, lane: int) -> int:
+        """Users with probes due in `lane` that are waiting for a slot (as of the last `pop_due`)."""
+        return len(self._fair[lane].ready_users)
+
+    def pop_due(self, now: float, limit: int, lane: int = 0) -> list[tuple[float, MonitorSpec]]:
+        """
+        Pop up to `limit` (due, spec) of `lane` due at `now`, users in fair-share order.
+
+        They stay in flight until `reschedule`; their lane-wide heap entries go stale.
+        """
+        queue = self._fair[lane]
+        queue.promote(now)
+        out: list[tuple[float, MonitorSpec]] = []
+        while len(out) < limit:
+            item = queue.pop(now)
+            if item is None:
+                break
+            due, mid = item
+            del self._due[mid]
+            out.append((due, self._specs[mid]))
+        return out
+
+    def _push(self, monitor_id: int, due: float) -> None:
+        lane = self.lane_of(self._specs[monitor_id])
+        self._due[monitor_id] = due
+        self._lane[monitor_id] = lane
+        heapq.heappush(self._heaps[lane], (due, monitor_id))
+        self._fair[lane].push(self._specs[monitor_id].user_id, due, monitor_id)
+        entries = max(sum(map(len, self._heaps)), sum(queue.size for queue in self._fair))
+        if entries > 2 * len(self._due) + 1024:
+            self._heaps = [[] for _ in self._heaps]
+            by_lane: list[list[tuple[int, float, int]]] = [[] for _ in self._heaps]
+            for m, d in self._due.items():
+                self._heaps[self._lane[m]].append((d, m))
+                by_lane[self._lane[m]].append((self._specs[m].user_id, d, m))
+            for heap in self._heaps:
+                heapq.heapify(heap)
+            for queue, lane_entries in zip(self._fair, by_lane):
+                queue.rebuild(lane_entries)
+
+    def _drop_stale(self, lane: int) -> None:
+        heap, due, lanes = self._heaps[lane], self._due, self._lane
+        while heap and (due.get(heap[0][1]) != heap[0][0] or lanes.get(heap[0][1]) != lane):
+            heapq.heappop(heap)
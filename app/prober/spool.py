@@ -0,0 +1,225 @@
+# app/prober/spool.py
+"""
+Local durable spool of probe results for when the database is down or too slow.
+
+Results the writer cannot hand to Postgres in time go to append-only segment files on
+local disk instead of piling up in memory (see `CheckWriter`); once flushes succeed
+again, segments are replayed oldest first with a binary COPY each
+(`checks_repo.copy_many`) and deleted after the commit. Replay is at-least-once: a crash
+between the commit and the unlink writes that segment twice.
+
+Segment `<seq>.seg` is preallocated to `segment_bytes` and memory-mapped; records are
+appended in place and the map is msync'ed after every spill. A record is
+`<length u32><crc32 u32><payload>`: a zero length marks the end of the data, and a CRC
+mismatch (a write torn by a crash) ends the segment there as well. On start, segments
+left by a previous run are scanned, trimmed to their valid records and queued for replay.
+
+Disk use is bounded by `max_bytes`: when a new segment would exceed it, the oldest one is
+dropped (its results are lost, counted in `prober_spool_dropped_total`) — the most recent
+history is kept. The directory is locked (`flock`) so two workers never share a spool.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.prober.http_probe import ProbeResult
+from app.prober.metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<II")
+# monitor_id, ts (мкс от эпохи), latency_ms, status_code, ok, maintenance, длина error (-1 — NULL)
+_FIXED = struct.Struct("<qqiH??i")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+MAX_ERROR_BYTES = 4096
+
+
+def encode(result: ProbeResult) -> bytes:
+    """One result as a spool payload (the error text is cut to `MAX_ERROR_BYTES`)."""
+    error = None if result.error is None else result.error.encode()[:MAX_ERROR_BYTES]
+    fixed = _FIXED.pack(
+        result.monitor_id, (result.ts - _EPOCH) // _US, result.latency_ms, result.status_code,
+        result.ok, result.maintenance, -1 if error is None else len(error),
+    )
+    return fixed if error is None else fixed + error
+
+
+def decode(payload: bytes) -> tuple:
+    """A spool payload as a `checks` record tuple in `checks_repo.COPY_COLUMNS` order."""
+    monitor_id, ts_us, latency_ms, status_code, ok, maintenance, n = _FIXED.unpack_from(payload)
+    error = None if n < 0 else bytes(payload[_FIXED.size:_FIXED.size + n]).decode(errors="replace")
+    return monitor_id, _EPOCH + ts_us * _US, latency_ms, status_code, ok, error, maintenance
+
+
+def _scan(buf) -> tuple[list[bytes], int]:
+    """Valid payloads of a segment buffer and the offset where valid data ends."""
+    payloads = []
+    pos = 0
+    while pos + _HEADER.size <= len(buf):
+        length, crc = _HEADER.unpack_from(buf, pos)
+        end = pos + _HEADER.size + length
+        if length == 0 or end > len(buf):
+            break
+        payload = bytes(buf[pos + _HEADER.size:end])
+        if zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        pos = end
+    return payloads, pos
+
+
+class _Segment:
+    """The segment being appended to: a preallocated file mapped into memory."""
+
+    def __init__(self, path: Path, size: int) -> None:
+        self.path = path
+        self.records = 0
+        self.offset = 0
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def fits(self, n: int) -> bool:
+        return self.offset + _HEADER.size + n <= len(self.map)
+
+    def append(self, payload: bytes) -> None:
+        end = self.offset + _HEADER.size + len(payload)
+        self.map[self.offset + _HEADER.size:end] = payload
+        # заголовок — последним: до него запись выглядит как конец данных
+        _HEADER.pack_into(self.map, self.offset, len(payload), zlib.crc32(payload))
+        self.offset = end
+        self.records += 1
+
+    def seal(self) -> None:
+        """Sync, unmap and cut the file to its data."""
+        self.map.flush()
+        self.map.close()
+        os.truncate(self.path, self.offset)
+
+
+class CheckSpool:
+    def __init__(self, directory: str | Path, *, segment_bytes: int, max_bytes: int, metrics: Metrics) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = max(segment_bytes, 64 * 1024)
+        self.max_segments = max(max_bytes // self.segment_bytes, 2)
+        self.metrics = metrics
+        metrics.describe("prober_spool_records", "gauge", "Check results waiting in the local spool.")
+        metrics.describe("prober_spool_bytes", "gauge", "Disk used by the local spool.")
+        metrics.describe("prober_spool_spilled_total", "counter", "Check results written to the local spool.")
+        metrics.describe("prober_spool_replayed_total", "counter", "Spooled check results written back to the database.")
+        metrics.describe("prober_spool_dropped_total", "counter", "Spooled check results dropped to stay within the disk bound.")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = open(self.directory / "LOCK", "w")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock.close()
+            raise RuntimeError(f"spool {self.directory} is used by another worker") from None
+        # закрытые сегменты в порядке записи: (путь, записей, байт)
+        self._sealed: deque[tuple[Path, int, int]] = deque()
+        self._active: _Segment | None = None
+        self._seq = 0
+        self._recover()
+
+    def _recover(self) -> None:
+        for path in sorted(self.directory.glob("*.seg")):
+            self._seq = max(self._seq, int(path.stem) + 1)
+            with open(path, "r+b") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        payloads, end = _scan(buf)
+                if not size or not payloads:
+                    path.unlink()
+                    continue
+                f.truncate(end)
+            self._sealed.append((path, len(payloads), end))
+        if self._sealed:
+            log.info("spool: %d results from a previous run waiting for replay", self.records)
+        self._report()
+
+    @property
+    def records(self) -> int:
+        return sum(n for _, n, _ in self._sealed) + (self._active.records if self._active else 0)
+
+    @property
+    def size(self) -> int:
+        return sum(b for _, _, b in self._sealed) + (self._active.offset if self._active else 0)
+
+    def __len__(self) -> int:
+        return self.records
+
+    def _report(self) -> None:
+        self.metrics.set("prober_spool_records", self.records)
+        self.metrics.set("prober_spool_bytes", self.size)
+
+    def _seal_active(self) -> None:
+        if self._active is None:
+            return
+        seg, self._active = self._active, None
+        seg.seal()
+        if seg.records:
+            self._sealed.append((seg.path, seg.records, seg.offset))
+        else:
+            seg.path.unlink()
+
+    def _open_segment(self) -> _Segment:
+        self._seal_active()
+        while len(self._sealed) + 1 > self.max_segments:
+            path, n, _ = self._sealed.popleft()
+            path.unlink(missing_ok=True)
+            self.metrics.inc("prober_spool_dropped_total", n)
+            log.error("spool is full: dropped %d oldest check results (%s)", n, path.name)
+        seg = _Segment(self.directory / f"{self._seq:016d}.seg", self.segment_bytes)
+        self._seq += 1
+        self._active = seg
+        return seg
+
+    def append(self, results: list[ProbeResult]) -> None:
+        """Append results and msync them to disk."""
+        if not results:
+            return
+        seg = self._active or self._open_segment()
+        for result in results:
+            payload = encode(result)
+            if not seg.fits(len(payload)):
+                seg = self._open_segment()
+            seg.append(payload)
+        seg.map.flush()
+        self.metrics.inc("prober_spool_spilled_total", len(results))
+        self._report()
+
+    def oldest(self) -> tuple[Path, list[tuple]] | None:
+        """The oldest segment and its records; the active one is sealed first if it is the only one."""
+        if not self._sealed:
+            if self._active is None or not self._active.records:
+                return None
+            self._seal_active()
+        path = self._sealed[0][0]
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            payloads, _ = _scan(buf)
+        return path, [decode(p) for p in payloads]
+
+    def release(self, path: Path) -> None:
+        """Delete a segment returned by `oldest` once its records are committed."""
+        if self._sealed and self._sealed[0][0] == path:
+            _, n, _ = self._sealed.popleft()
+            path.unlink(missing_ok=True)
+            self.metrics.inc("prober_spool_replayed_total", n)
+            self._report()
+
+    def close(self) -> None:
+        self._seal_active()
+        self._report()
+        self._lock.close()
@@ -0,0 +1,216 @@
+# app/prober/writer.py
+"""
+Batched writer of probe results into `checks`.
+
+Probes only append to an in-memory buffer; a single task flushes it every `flush_s`
+seconds or as soon as `batch_size` results are waiting, in one transaction. The owners'
+`status_version` (ETag source for latest-state reads) is bumped in the same transaction,
+but at most once per `status_version_s` for all monitors checked since the last bump, so
+the `users` rows are not rewritten on every flush. Monitor events
+(latency anomalies, dependency holds) ride along in the same transaction as the checks
+that raised them, and status pages showing a monitor whose state flipped are re-rendered
+there as well. Up/down flips of parent monitors are announced on `monitor_state` on the
+same commit, for probers of other shards that schedule their children.
+
+With a spool (`app.prober.spool`) the writer neither blocks nor grows without bound when
+the database is down or slow: a batch whose flush fails, and the buffer whenever it
+reaches `spill_at` results, go to local disk. After a successful flush that left less
+than a batch waiting, the oldest spooled segment is written back with one COPY.
+
+Spool I/O (mmap writes, msync, segment reads) never runs on the event loop: every spool
+call goes to one dedicated thread, so calls run one at a time in submission order and
+`CheckSpool` needs no locking. `add` only hands the full buffer over and returns.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.prober.http_probe import ProbeResult
+from app.prober.spool import CheckSpool
+from app.repositories import checks as checks_repo
+from app.repositories import monitor_dependencies as dependencies_repo
+from app.repositories import monitor_events as events_repo
+from app.repositories import status_pages as status_pages_repo
+from app.repositories import users as users_repo
+
+log = logging.getLogger(__name__)
+
+
+class CheckWriter:
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        *,
+        batch_size: int,
+        flush_s: float,
+        spool: CheckSpool | None = None,
+        spill_at: int = 0,
+        status_version_s: float = 0.0,
+    ) -> None:
+        self._sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.spool = spool
+        self.spill_at = max(spill_at, batch_size)
+        self.status_version_s = status_version_s
+        self._buffer: list[ProbeResult] = []
+        self._events: list[dict] = []
+        # мониторы, у которых сменилось «up/down» (для перерисовки страниц статуса)
+        self._changed: set[int] = set()
+        # смены состояния родительских мониторов для других шардов: id -> недоступен
+        self._states: dict[int, bool] = {}
+        # мониторы с новыми результатами, владельцам которых ещё не подняли status_version
+        self._stale: set[int] = set()
+        self._bumped_at = float("-inf")
+        self._wake = asyncio.Event()
+        # единственный поток для всех обращений к журналу: порядок вызовов сохраняется
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spool") if spool is not None else None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def add(self, result: ProbeResult) -> None:
+        self._buffer.append(result)
+        if self.spool is not None and len(self._buffer) >= self.spill_at:
+            # запись не успевает (идёт медленный flush): буфер — на диск, а не в память
+            self._spill(self._buffer)
+            self._buffer = []
+        elif len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _spill(self, batch: list[ProbeResult]) -> None:
+        """Queue a batch for the spool thread; does not wait for the disk."""
+        self._io.submit(self.spool.append, batch).add_done_callback(
+            lambda f, n=len(batch): self._spill_done(f, n)
+        )
+
+    @staticmethod
+    def _spill_done(future: Future, n: int) -> None:
+        if future.exception() is not None:
+            log.error("failed to spool %d check results, lost", n, exc_info=future.exception())
+
+    async def _spool_call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    def add_event(self, event: dict) -> None:
+        """Queue a `monitor_events` row; written with the next batch of checks."""
+        self._events.append(event)
+
+    def status_changed(self, monitor_id: int) -> None:
+        """Mark a monitor whose up/down state flipped; its status pages are re-rendered on flush."""
+        self._changed.add(monitor_id)
+
+    def publish_state(self, monitor_id: int, down: bool) -> None:
+        """Queue a parent's up/down flip for the `monitor_state` channel (latest state wins)."""
+        self._states[monitor_id] = down
+
+    def _take_stale(self, monitor_ids: set[int]) -> set[int]:
+        """Add monitors with new results; return all pending ones if a bump is due, else nothing."""
+        self._stale |= monitor_ids
+        if not self._stale or time.monotonic() - self._bumped_at < self.status_version_s:
+            return set()
+        stale, self._stale = self._stale, set()
+        return stale
+
+    async def _bump(self, s, stale: set[int]) -> None:
+        if stale:
+            await users_repo.bump_status_version_for_monitors(s, monitor_ids=list(stale))
+
+    def _bumped(self, stale: set[int], ok: bool) -> None:
+        if not stale:
+            return
+        if ok:
+            self._bumped_at = time.monotonic()
+        else:
+            self._stale |= stale
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far.
+
+        On failure the batch goes to the spool, or is put back for the next attempt without
+        one; events, page refreshes, state flips and pending version bumps are always put
+        back (they are few).
+        """
+        batch, self._buffer = self._buffer, []
+        events, self._events = self._events, []
+        changed, self._changed = self._changed, set()
+        states, self._states = self._states, {}
+        stale = self._take_stale({r.monitor_id for r in batch} | {e["monitor_id"] for e in events})
+        if not batch and not events and not states and not stale:
+            return 0
+        try:
+            async with self._sessionmaker() as s:
+                await checks_repo.insert_many(s, rows=[dataclasses.asdict(r) for r in batch])
+                await events_repo.insert_many(s, rows=events)
+                await self._bump(s, stale)
+                await status_pages_repo.refresh_for_monitors(
+                    s, monitor_ids=changed | {e["monitor_id"] for e in events}
+                )
+                await dependencies_repo.publish_states(s, states=states)
+                await s.commit()
+        except Exception:
+            self._bumped(stale, ok=False)
+            if self.spool is not None:
+                log.exception("failed to write %d check results, spooled", len(batch))
+                self._spill(batch)
+            else:
+                log.exception("failed to write %d check results, will retry", len(batch))
+                self._buffer[:0] = batch
+            self._events[:0] = events
+            self._changed |= changed
+            self._states = states | self._states
+            raise
+        self._bumped(stale, ok=True)
+        return len(batch)
+
+    async def replay(self) -> int:
+        """Write the oldest spooled segment back to `checks`; returns rows inserted."""
+        segment = await self._spool_call(self.spool.oldest) if self.spool is not None else None
+        if segment is None:
+            return 0
+        path, records = segment
+        stale = self._take_stale({r[0] for r in records})
+        try:
+            async with self._sessionmaker() as s:
+                n = await checks_repo.copy_many(s, records=records)
+                await self._bump(s, stale)
+                await s.commit()
+        except Exception:
+            self._bumped(stale, ok=False)
+            log.exception("failed to replay spool segment %s, will retry", path.name)
+            raise
+        self._bumped(stale, ok=True)
+        await self._spool_call(self.spool.release, path)
+        log.info("replayed %d spooled check results (%d of deleted monitors skipped)", n, len(records) - n)
+        return n
+
+    def close(self) -> None:
+        """Close the spool after the batches already handed to it are on disk (blocks)."""
+        if self.spool is not None:
+            self._io.submit(self.spool.close)
+            self._io.shutdown(wait=True)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                # база принимает записи и успевает — дописываем журнал, по сегменту за раз
+                if (
+                    self.spool is not None
+                    and len(self._buffer) < self.batch_size
+                    and await self._spool_call(len, self.spool)
+                ):
+                    await self.replay()
+            except Exception:
+                await asyncio.sleep(self.flush_s)
@@ -0,0 +1,113 @@
+# app/repositories/anomaly_states.py
+"""
+Repository layer for AnomalyState entity (checkpoints of the prober's latency detector).
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence
+from sqlalchemy import select, delete, func, any_, cast, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.anomaly_state import AnomalyState
+from app.models.monitor import Monitor
+from app.models.monitor_event import MonitorEvent
+from app.repositories.monitor_events import ANOMALY_KINDS
+
+
+async def load(db: AsyncSession, *, monitor_ids: list[int]) -> Sequence[tuple]:
+    """
+    Fetch checkpoints of the given monitors.
+
+    Returns:
+        Rows of (monitor_id, samples, mean, var, fast, anomalous, streak); monitors without
+        a checkpoint are absent.
+    """
+    if not monitor_ids:
+        return []
+    res = await db.execute(
+        select(
+            AnomalyState.monitor_id, AnomalyState.samples, AnomalyState.mean,
+            AnomalyState.var, AnomalyState.fast, AnomalyState.anomalous, AnomalyState.streak,
+        ).where(AnomalyState.monitor_id == any_(cast(monitor_ids, ARRAY(Integer))))
+    )
+    return res.all()
+
+
+async def save_many(db: AsyncSession, *, rows: list[dict]) -> None:
+    """
+    Upsert a batch of checkpoints.
+
+    Args:
+        db: Async SQLAlchemy session.
+        rows: Dicts with monitor_id, samples, mean, var, fast, anomalous, streak.
+
+    Notes:
+        Rows of monitors deleted since they were probed must not be written (the state
+        would outlive the monitor or violate the foreign key): the surviving monitors are
+        locked `FOR KEY SHARE` first and the rest are skipped.
+    """
+    if not rows:
+        return
+    alive = set((await db.execute(
+        select(Monitor.id)
+        .where(
+            Monitor.id == any_(cast([r["monitor_id"] for r in rows], ARRAY(Integer))),
+            Monitor.deleted_at.is_(None),
+        )
+        .with_for_update(key_share=True)
+    )).scalars().all())
+    rows = [r for r in rows if r["monitor_id"] in alive]
+    if not rows:
+        return
+    ins = pg_insert(AnomalyState)
+    ins = ins.on_conflict_do_update(
+        index_elements=[AnomalyState.monitor_id],
+        set_={
+            "samples": ins.excluded.samples,
+            "mean": ins.excluded.mean,
+            "var": ins.excluded.var,
+            "fast": ins.excluded.fast,
+            "anomalous": ins.excluded.anomalous,
+            "streak": ins.excluded.streak,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(ins, rows)
+
+
+async def reset(db: AsyncSession, *, monitor_ids: list[int]) -> list[dict]:
+    """
+    Drop checkpoints of monitors whose baseline no longer applies and close open regressions.
+
+    Args:
+        db: Async SQLAlchemy session (caller inserts the returned events and commits).
+        monitor_ids: Monitors whose target changed, or that left the schedule.
+
+    Returns:
+        `latency_recovered` event rows (no latency fields) for live monitors whose latest
+        anomaly event is a regression — otherwise the overview and status pages would
+        report them degraded forever.
+    """
+    if not monitor_ids:
+        return []
+    ids = cast(monitor_ids, ARRAY(Integer))
+    await db.execute(delete(AnomalyState).where(AnomalyState.monitor_id == any_(ids)))
+    latest = (
+        select(MonitorEvent.monitor_id, MonitorEvent.kind)
+        .where(MonitorEvent.monitor_id == any_(ids), MonitorEvent.kind.in_(ANOMALY_KINDS))
+        .order_by(MonitorEvent.monitor_id, MonitorEvent.ts.desc(), MonitorEvent.id.desc())
+        .distinct(MonitorEvent.monitor_id)
+        .subquery()
+    )
+    res = await db.execute(
+        select(Monitor.id, latest.c.kind)
+        .outerjoin(latest, latest.c.monitor_id == Monitor.id)
+        .where(Monitor.id == any_(ids), Monitor.deleted_at.is_(None))
+    )
+    now = datetime.now(timezone.utc)
+    return [
+        {"monitor_id": mid, "ts": now, "kind": "latency_recovered", "latency_ms": None, "baseline_ms": None, "score": None}
+        for mid, kind in res.all()
+        if kind == "latency_regression"
+    ]
@@ -0,0 +1,198 @@
+# app/repositories/checks.py
+"""
+Repository layer for Check entity (probe results history).
+"""
+
+from datetime import datetime
+from typing import Sequence
+from sqlalchemy import or_, select, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.check import Check
+from app.models.monitor import Monitor
+
+
+async def list_for_monitor(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    monitor_id: int,
+    before: datetime | None = None,
+    before_id: int | None = None,
+    limit: int = 100,
+) -> Sequence[Check]:
+    """
+    List checks of a monitor owned by the user, newest first.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        before: Keyset cursor — only checks strictly older than this timestamp.
+        before_id: With `before`, the cursor is `(ts, id)` of the last row of the previous
+            page: checks at exactly `before` with a smaller id are returned too, so rows
+            sharing a timestamp (e.g. replayed from the prober's spool) are not skipped.
+        limit: Max rows to return.
+
+    Returns:
+        Sequence of Check instances (empty if the monitor is not owned by the user).
+
+    Notes:
+        Walks `ix_checks_monitor_ts` backwards; no OFFSET scans. The `(ts, id)` cursor is
+        spelled `ts <= before AND (ts < before OR id < before_id)` so the `ts` bound stays
+        an index condition.
+    """
+    q = _history(select(Check), user_id=user_id, monitor_id=monitor_id, before=before, before_id=before_id)
+    res = await db.execute(q.limit(limit))
+    return res.scalars().all()
+
+
+async def newest_id(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    monitor_id: int,
+    before: datetime | None = None,
+    before_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> int | None:
+    """
+    Id of the newest check a history read would return (ETag source for history pages).
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        before / before_id: Keyset cursor, as in `list_for_monitor`.
+        since / until: Time window [since, until), as in `copy_latency_columns`.
+
+    Returns:
+        Check id, or None if there is none (or the monitor is not owned by the user).
+
+    Notes:
+        One step of the same backwards walk over `ix_checks_monitor_ts` (LIMIT 1).
+    """
+    q = _history(select(Check.id), user_id=user_id, monitor_id=monitor_id, before=before, before_id=before_id)
+    if since is not None:
+        q = q.where(Check.ts >= since)
+    if until is not None:
+        q = q.where(Check.ts < until)
+    res = await db.execute(q.limit(1))
+    return res.scalar_one_or_none()
+
+
+def _history(q, *, user_id: int, monitor_id: int, before: datetime | None, before_id: int | None):
+    """Checks of a live monitor owned by the user, newest first, after the keyset cursor."""
+    q = (
+        q.join(Monitor, Monitor.id == Check.monitor_id)
+        .where(Check.monitor_id == monitor_id, Monitor.user_id == user_id, Monitor.deleted_at.is_(None))
+        .order_by(Check.ts.desc(), Check.id.desc())
+    )
+    if before is not None and before_id is not None:
+        q = q.where(Check.ts <= before, or_(Check.ts < before, Check.id < before_id))
+    elif before is not None:
+        q = q.where(Check.ts < before)
+    return q
+
+
+async def insert_many(db: AsyncSession, *, rows: list[dict]) -> None:
+    """
+    Insert a batch of check results.
+
+    Args:
+        db: Async SQLAlchemy session.
+        rows: Dicts with monitor_id, ts, latency_ms, status_code, ok, error.
+
+    Notes:
+        Executed as one executemany (batched multi-row INSERT by the driver).
+    """
+    if rows:
+        await db.execute(insert(Check), rows)
+
+
+# Порядок столбцов записей для copy_many
+COPY_COLUMNS = ("monitor_id", "ts", "latency_ms", "status_code", "ok", "error", "maintenance")
+
+_CREATE_COPY_TABLE_SQL = text(
+    "CREATE TEMP TABLE checks_copy (monitor_id integer, ts timestamptz, latency_ms integer, "
+    "status_code integer, ok boolean, error text, maintenance boolean) ON COMMIT DROP"
+)
+_INSERT_FROM_COPY_SQL = text(
+    f"INSERT INTO checks ({', '.join(COPY_COLUMNS)}) SELECT {', '.join(f'c.{c}' for c in COPY_COLUMNS)} "
+    "FROM checks_copy c JOIN monitors m ON m.id = c.monitor_id WHERE m.deleted_at IS NULL"
+)
+
+
+async def copy_many(db: AsyncSession, *, records: list[tuple]) -> int:
+    """
+    Bulk-load check results with a binary COPY.
+
+    Args:
+        db: Async SQLAlchemy session (caller commits).
+        records: Tuples in `COPY_COLUMNS` order.
+
+    Returns:
+        Rows inserted; results of monitors deleted meanwhile are skipped.
+
+    Notes:
+        COPY goes into a temporary table dropped on commit, then one INSERT ... SELECT
+        keeps the rows of live monitors: a monitor deleted (or already purged) while its
+        results waited would otherwise fail the whole load on the foreign key. Used to
+        replay the prober's local spool, where batches are tens of thousands of rows.
+    """
+    if not records:
+        return 0
+    # через сессию: открывает транзакцию, в которой живёт временная таблица
+    await db.execute(_CREATE_COPY_TABLE_SQL)
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    await raw.copy_records_to_table("checks_copy", records=records, columns=COPY_COLUMNS)
+    res = await db.execute(_INSERT_FROM_COPY_SQL)
+    return res.rowcount or 0
+
+
+# Столбцы фиксированной ширины и NOT NULL — разбираются app.analytics.heatmap.decode_copy
+_LATENCY_COLUMNS_SQL = (
+    "SELECT c.ts, c.latency_ms, c.ok FROM checks c JOIN monitors m ON m.id = c.monitor_id "
+    "WHERE c.monitor_id = $1 AND m.user_id = $2 AND m.deleted_at IS NULL AND c.ts >= $3 AND c.ts < $4"
+)
+
+
+async def copy_latency_columns(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    monitor_id: int,
+    since: datetime,
+    until: datetime,
+) -> bytes:
+    """
+    Fetch `(ts, latency_ms, ok)` of a monitor's checks in [since, until) as one binary COPY buffer.
+
+    Args:
+        db: Async SQLAlchemy session (primary or replica).
+        user_id: Owner user id (foreign monitors yield an empty result).
+        monitor_id: Target monitor id.
+        since: Window start (inclusive, tz-aware).
+        until: Window end (exclusive, tz-aware).
+
+    Returns:
+        Raw `COPY (...) TO STDOUT (FORMAT binary)` bytes: columnar decoding is left to
+        NumPy, with no per-row Python objects.
+
+    Notes:
+        Runs on the session's asyncpg connection (same transaction); range scan over
+        `ix_checks_monitor_ts`.
+    """
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    chunks: list[bytes] = []
+
+    async def sink(chunk: bytes) -> None:
+        chunks.append(chunk)
+
+    await raw.copy_from_query(
+        _LATENCY_COLUMNS_SQL, monitor_id, user_id, since, until, output=sink, format="binary"
+    )
+    return b"".join(chunks)
@@ -0,0 +1,304 @@
+# app/repositories/heartbeats.py
+"""
+Repository layer for Heartbeat entity (push monitors: the job pings us, nobody probes it).
+
+A heartbeat monitor is a `monitors` row with kind = 'heartbeat' plus a `heartbeats` row
+with its ping token, grace period and last-seen time. Pings are never written one by one:
+API processes keep the latest ping per monitor in memory and `record_pings` stores a whole
+batch in one statement. A ping of a monitor the prober has marked down is announced on
+`heartbeat_recovered`, so the prober re-evaluates it at once instead of at its next deadline.
+"""
+
+import secrets
+from datetime import datetime
+from typing import Any, Sequence
+from sqlalchemy import select, update, func, cast, column, any_, Integer, Float, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.notify import notify
+from app.models.heartbeat import Heartbeat
+from app.models.monitor import HEARTBEAT, Monitor
+from app.repositories.users import bump_monitors_version
+
+# Канал NOTIFY: payload — id heartbeat-монитора, помеченного упавшим, от которого пришёл пинг
+HEARTBEAT_RECOVERED_CHANNEL = "heartbeat_recovered"
+# Канал NOTIFY: payload — отозванный токен (сброс кэша токенов во всех API-процессах)
+HEARTBEAT_TOKEN_REVOKED_CHANNEL = "heartbeat_token_revoked"
+
+# 24 случайных байта — 32 символа base64url
+TOKEN_BYTES = 24
+
+
+def new_token() -> str:
+    """Fresh random ping token (URL-safe)."""
+    return secrets.token_urlsafe(TOKEN_BYTES)
+
+
+def _ids(ids) -> Any:
+    return any_(cast(list(ids), ARRAY(Integer)))
+
+
+async def create(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    name: str,
+    url: str,
+    token: str,
+    interval_s: int,
+    grace_s: int,
+) -> tuple[Monitor, Heartbeat]:
+    """
+    Create a heartbeat monitor for a user.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        name: Human-readable monitor name.
+        url: Ping URL (contains `token`), stored as the monitor's url.
+        token: Ping token (see `new_token`).
+        interval_s: Expected period between pings, in seconds.
+        grace_s: Allowed delay of a ping beyond the period, in seconds.
+
+    Returns:
+        (Monitor, Heartbeat), both persisted and refreshed.
+    """
+    monitor = Monitor(user_id=user_id, name=name, url=url, kind=HEARTBEAT, interval_s=interval_s)
+    db.add(monitor)
+    await db.flush()
+    heartbeat = Heartbeat(monitor_id=monitor.id, token=token, grace_s=grace_s)
+    db.add(heartbeat)
+    await db.flush()
+    await db.refresh(monitor)
+    await db.refresh(heartbeat)
+    await bump_monitors_version(db, user_id=user_id)
+    return monitor, heartbeat
+
+
+async def get_for_user(db: AsyncSession, *, user_id: int, monitor_id: int) -> tuple[Monitor, Heartbeat] | None:
+    """
+    Fetch a heartbeat monitor that belongs to the given user.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+
+    Returns:
+        (Monitor, Heartbeat) if found, else None (also for HTTP monitors).
+    """
+    res = await db.execute(
+        select(Monitor, Heartbeat)
+        .join(Heartbeat, Heartbeat.monitor_id == Monitor.id)
+        .where(Monitor.id == monitor_id, Monitor.user_id == user_id)
+    )
+    row = res.one_or_none()
+    return None if row is None else (row[0], row[1])
+
+
+async def patch(
+    db: AsyncSession, *, user_id: int, monitor_id: int, monitor_fields: dict, grace_s: int | None = None
+) -> tuple[Monitor, Heartbeat] | None:
+    """
+    Partially update a heartbeat monitor owned by a user.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        monitor_fields: `monitors` columns to update (name, interval_s, is_paused).
+        grace_s: New grace period; None — unchanged.
+
+    Returns:
+        Updated (Monitor, Heartbeat) if found, else None.
+    """
+    found = await get_for_user(db, user_id=user_id, monitor_id=monitor_id)
+    if found is None:
+        return None
+    monitor, heartbeat = found
+    for field, value in monitor_fields.items():
+        setattr(monitor, field, value)
+    if grace_s is not None:
+        heartbeat.grace_s = grace_s
+    await db.flush()
+    await bump_monitors_version(db, user_id=user_id)
+    return monitor, heartbeat
+
+
+async def rotate_token(
+    db: AsyncSession, *, user_id: int, monitor_id: int, token: str, url: str
+) -> tuple[Monitor, Heartbeat] | None:
+    """
+    Replace the ping token (and ping URL) of a user's heartbeat monitor.
+
+    Args:
+        db: Async SQLAlchemy session (the old token is revoked on commit).
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        token: New token.
+        url: New ping URL.
+
+    Returns:
+        Updated (Monitor, Heartbeat) if found, else None.
+    """
+    found = await get_for_user(db, user_id=user_id, monitor_id=monitor_id)
+    if found is None:
+        return None
+    monitor, heartbeat = found
+    old = heartbeat.token
+    monitor.url = url
+    heartbeat.token = token
+    await db.flush()
+    await bump_monitors_version(db, user_id=user_id)
+    await notify(db, HEARTBEAT_TOKEN_REVOKED_CHANNEL, old)
+    return monitor, heartbeat
+
+
+async def monitor_id_for_token(db: AsyncSession, *, token: str) -> int | None:
+    """
+    Resolve a ping token.
+
+    Args:
+        db: Async SQLAlchemy session.
+        token: Token from the ping URL.
+
+    Returns:
+        Monitor id, or None for an unknown token.
+    """
+    res = await db.execute(select(Heartbeat.monitor_id).where(Heartbeat.token == token))
+    return res.scalar_one_or_none()
+
+
+async def record_pings(db: AsyncSession, *, pings: dict[int, float]) -> list[int]:
+    """
+    Store the latest ping times of a batch of monitors.
+
+    Args:
+        db: Async SQLAlchemy session (caller commits).
+        pings: monitor id -> Unix time of its latest ping.
+
+    Returns:
+        Ids of pinged monitors currently marked down; they are announced on
+        `HEARTBEAT_RECOVERED_CHANNEL` (delivered on commit).
+
+    Notes:
+        One UPDATE ... FROM unnest(ids, times) for the whole batch. A time never moves
+        backwards (API processes flush independently); unknown ids (deleted monitors)
+        are ignored.
+    """
+    if not pings:
+        return []
+    ids = sorted(pings)
+    src = func.unnest(
+        cast(ids, ARRAY(Integer)), cast([pings[i] for i in ids], ARRAY(Float))
+    ).table_valued(column("id", Integer), column("ts", Float)).render_derived()
+    ts = func.to_timestamp(src.c.ts)
+    res = await db.execute(
+        update(Heartbeat)
+        .where(
+            Heartbeat.monitor_id == src.c.id,
+            Heartbeat.last_ping_at.is_(None) | (Heartbeat.last_ping_at < ts),
+        )
+        .values(last_ping_at=ts)
+        .returning(Heartbeat.monitor_id, Heartbeat.down)
+    )
+    recovered = [monitor_id for monitor_id, down in res.all() if down]
+    for monitor_id in recovered:
+        await notify(db, HEARTBEAT_RECOVERED_CHANNEL, str(monitor_id))
+    return recovered
+
+
+async def list_active(
+    db: AsyncSession,
+    *,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    user_ids: list[int] | None = None,
+) -> Sequence[Any]:
+    """
+    All non-paused heartbeat monitors with the fields the prober needs.
+
+    Args:
+        db: Async SQLAlchemy session.
+        shard_index: This worker's shard (only monitors with `id % shard_count == shard_index`).
+        shard_count: Total number of prober shards.
+        user_ids: Only monitors of these owners (incremental refresh after `monitors_changed`).
+
+    Returns:
+        Rows of (id, user_id, interval_s, grace_s, created_at, last_ping_at, down).
+    """
+    q = (
+        select(
+            Monitor.id, Monitor.user_id, Monitor.interval_s, Heartbeat.grace_s, Monitor.created_at,
+            Heartbeat.last_ping_at, Heartbeat.down,
+        )
+        .join(Heartbeat, Heartbeat.monitor_id == Monitor.id)
+        .where(Monitor.is_paused.is_(False))
+    )
+    if shard_count > 1:
+        q = q.where(Monitor.id % shard_count == shard_index)
+    if user_ids is not None:
+        q = q.where(Monitor.user_id == _ids(user_ids))
+    res = await db.execute(q)
+    return res.all()
+
+
+async def last_pings(db: AsyncSession, *, monitor_ids: list[int]) -> dict[int, datetime | None]:
+    """
+    Latest stored ping of each monitor (None — never pinged); deleted monitors are absent.
+
+    Args:
+        db: Async SQLAlchemy session.
+        monitor_ids: Monitors to read (primary-key lookups).
+    """
+    res = await db.execute(
+        select(Heartbeat.monitor_id, Heartbeat.last_ping_at).where(Heartbeat.monitor_id == _ids(monitor_ids))
+    )
+    return dict(res.all())
+
+
+async def mark_down(db: AsyncSession, *, seen: dict[int, datetime | None]) -> list[int]:
+    """
+    Mark monitors down unless a ping arrived after the one their miss was decided on.
+
+    Args:
+        db: Async SQLAlchemy session (caller commits).
+        seen: monitor id -> the `last_ping_at` read when the miss was decided.
+
+    Returns:
+        Ids actually marked down. The others got a ping meanwhile and should be re-evaluated.
+
+    Notes:
+        The guard on `last_ping_at` runs under the row lock, so a concurrent `record_pings`
+        either lands first (the monitor is not marked down) or sees `down` and announces
+        the ping on `heartbeat_recovered`.
+    """
+    if not seen:
+        return []
+    ids = sorted(seen)
+    src = func.unnest(
+        cast(ids, ARRAY(Integer)), cast([seen[i] for i in ids], ARRAY(DateTime(timezone=True)))
+    ).table_valued(column("id", Integer), column("seen", DateTime(timezone=True))).render_derived()
+    res = await db.execute(
+        update(Heartbeat)
+        .where(Heartbeat.monitor_id == src.c.id, Heartbeat.last_ping_at.is_not_distinct_from(src.c.seen))
+        .values(down=True)
+        .returning(Heartbeat.monitor_id)
+    )
+    return list(res.scalars().all())
+
+
+async def mark_up(db: AsyncSession, *, monitor_ids: list[int]) -> None:
+    """
+    Clear the down flag of monitors that pinged again.
+
+    Args:
+        db: Async SQLAlchemy session (caller commits).
+        monitor_ids: Recovered monitors.
+    """
+    if monitor_ids:
+        await db.execute(
+            update(Heartbeat).where(Heartbeat.monitor_id == _ids(sorted(monitor_ids)), Heartbeat.down.is_(True))
+            .values(down=False)
+        )
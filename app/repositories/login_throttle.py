@@ -0,0 +1,51 @@
+"""
+Repository layer for shared login throttling counters.
+"""
+
+from sqlalchemy import select, delete, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.login_throttle import LoginThrottle
+
+
+async def hit_many(db: AsyncSession, *, keys: list[str], window: int) -> dict[str, tuple[int, int]]:
+    """
+    Count one attempt for each key in the current window.
+
+    Args:
+        db: Async SQLAlchemy session.
+        keys: Throttle keys (account and IP).
+        window: Current fixed window number.
+
+    Returns:
+        Mapping key -> (current window hits including this one, previous window hits).
+
+    Notes:
+        Single round-trip: INSERT ... ON CONFLICT DO UPDATE ... RETURNING in a CTE,
+        joined with the previous window row.
+    """
+    ins = pg_insert(LoginThrottle).values([{"key": k, "window_start": window, "hits": 1} for k in keys])
+    ins = ins.on_conflict_do_update(
+        constraint="pk_login_throttle",
+        set_={"hits": LoginThrottle.hits + 1},
+    ).returning(LoginThrottle.key, LoginThrottle.hits)
+    cur = ins.cte("cur")
+    prev = aliased(LoginThrottle)
+    q = select(cur.c.key, cur.c.hits, func.coalesce(prev.hits, 0)).outerjoin(
+        prev, and_(prev.key == cur.c.key, prev.window_start == window - 1)
+    )
+    res = await db.execute(q)
+    return {key: (hits, prev_hits) for key, hits, prev_hits in res.all()}
+
+
+async def purge_before(db: AsyncSession, *, window: int) -> int:
+    """
+    Delete counters of windows older than `window`.
+
+    Returns:
+        Number of deleted rows.
+    """
+    res = await db.execute(delete(LoginThrottle).where(LoginThrottle.window_start < window))
+    return res.rowcount or 0
@@ -0,0 +1,141 @@
+# app/repositories/maintenance_windows.py
+"""
+Repository layer for MaintenanceWindow entity.
+
+Writes announce the owner on `monitors_changed`: maintenance is part of what the prober
+schedules from, and its per-user sync re-reads the user's windows along with the monitors.
+"""
+
+from datetime import datetime
+from typing import Any, Sequence
+from sqlalchemy import select, delete, or_, and_, any_, cast, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.notify import notify
+from app.models.maintenance_window import MaintenanceWindow
+from app.models.monitor import Monitor
+from app.repositories.users import MONITORS_CHANGED_CHANNEL
+
+# Поля, которые нужны индексу окон в воркере (порядок совпадает с WindowSpec)
+INDEX_FIELDS = ("id", "user_id", "monitor_id", "starts_at", "ends_at", "recurrence", "until", "mode")
+
+
+def _current(now: datetime):
+    """Windows that are active now or may still occur."""
+    return or_(
+        and_(MaintenanceWindow.recurrence.is_(None), MaintenanceWindow.ends_at > now),
+        and_(
+            MaintenanceWindow.recurrence.is_not(None),
+            or_(MaintenanceWindow.until.is_(None), MaintenanceWindow.until > now),
+        ),
+    )
+
+
+async def create(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    monitor_id: int | None,
+    starts_at: datetime,
+    ends_at: datetime,
+    recurrence: str | None,
+    until: datetime | None,
+    mode: str,
+    reason: str | None,
+) -> MaintenanceWindow | None:
+    """
+    Create a maintenance window for the user's monitor or for all of the user's monitors.
+
+    Args:
+        db: Async SQLAlchemy session (the prober is notified on its commit).
+        user_id: Owner user id.
+        monitor_id: Target monitor id, or None for all monitors of the user.
+        starts_at: Start (of the first occurrence for recurring windows).
+        ends_at: End (of the first occurrence for recurring windows).
+        recurrence: None, "daily" or "weekly".
+        until: No occurrence starts after this moment (recurring windows only).
+        mode: "skip" or "tag".
+        reason: Optional comment.
+
+    Returns:
+        Persisted MaintenanceWindow, or None if the monitor is not found or not owned by the user.
+    """
+    if monitor_id is not None:
+        owned = await db.execute(
+            select(Monitor.id).where(Monitor.id == monitor_id, Monitor.user_id == user_id, Monitor.deleted_at.is_(None))
+        )
+        if owned.scalar_one_or_none() is None:
+            return None
+    obj = MaintenanceWindow(
+        user_id=user_id, monitor_id=monitor_id, starts_at=starts_at, ends_at=ends_at,
+        recurrence=recurrence, until=until, mode=mode, reason=reason,
+    )
+    db.add(obj)
+    await db.flush()
+    await db.refresh(obj)
+    await notify(db, MONITORS_CHANGED_CHANNEL, str(user_id))
+    return obj
+
+
+async def list_for_user(
+    db: AsyncSession, *, user_id: int, now: datetime | None = None, monitor_id: int | None = None
+) -> Sequence[MaintenanceWindow]:
+    """
+    List the user's maintenance windows, by start time.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        now: If given, only windows that are active or may still occur after this moment.
+        monitor_id: If given, only windows that apply to this monitor (its own and user-wide ones).
+
+    Returns:
+        Sequence of MaintenanceWindow instances.
+    """
+    q = select(MaintenanceWindow).where(MaintenanceWindow.user_id == user_id)
+    if now is not None:
+        q = q.where(_current(now))
+    if monitor_id is not None:
+        q = q.where(or_(MaintenanceWindow.monitor_id == monitor_id, MaintenanceWindow.monitor_id.is_(None)))
+    res = await db.execute(q.order_by(MaintenanceWindow.starts_at, MaintenanceWindow.id))
+    return res.scalars().all()
+
+
+async def delete_for_user(db: AsyncSession, *, user_id: int, window_id: int) -> bool:
+    """
+    Delete a maintenance window that belongs to the user.
+
+    Args:
+        db: Async SQLAlchemy session (the prober is notified on its commit).
+        user_id: Owner user id.
+        window_id: Target window id.
+
+    Returns:
+        True if a row was deleted, else False.
+    """
+    res = await db.execute(
+        delete(MaintenanceWindow).where(MaintenanceWindow.id == window_id, MaintenanceWindow.user_id == user_id)
+    )
+    if res.rowcount > 0:
+        await notify(db, MONITORS_CHANGED_CHANNEL, str(user_id))
+    return res.rowcount > 0
+
+
+async def list_current(db: AsyncSession, *, now: datetime, user_ids: list[int] | None = None) -> Sequence[Any]:
+    """
+    Windows the prober has to know about: active now or possibly occurring later.
+
+    Args:
+        db: Async SQLAlchemy session.
+        now: Current time; finished one-off and expired recurring windows are skipped.
+        user_ids: Restrict to these owners (incremental sync); None — all users.
+
+    Returns:
+        Rows of `INDEX_FIELDS` (Core select, no ORM entities).
+    """
+    q = select(*(getattr(MaintenanceWindow, f) for f in INDEX_FIELDS)).where(_current(now))
+    if user_ids is not None:
+        q = q.where(MaintenanceWindow.user_id == any_(cast(user_ids, ARRAY(Integer))))
+    res = await db.execute(q)
+    return res.all()
@@ -0,0 +1,185 @@
+# app/repositories/monitor_dependencies.py
+"""
+Repository layer for MonitorDependency entity (parent -> child edges between monitors).
+
+Writes bump the owner's monitors version, which also announces the owner on
+`monitors_changed`: running probers re-read that user's edges along with the monitors.
+Up/down flips of parents are broadcast on `monitor_state` so that probers of other
+shards can hold or release the children they schedule.
+"""
+
+from typing import Any, Sequence
+from sqlalchemy import select, delete, insert, true, any_, cast, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.notify import notify
+from app.models.check import Check
+from app.models.monitor import Monitor
+from app.models.monitor_dependency import MonitorDependency
+from app.repositories.users import bump_monitors_version
+
+# Канал NOTIFY: payload — "<monitor_id>:<1|0>" (родитель недоступен / снова доступен)
+MONITOR_STATE_CHANNEL = "monitor_state"
+
+
+class DependencyCycle(Exception):
+    """The new edges would make a monitor (transitively) depend on itself."""
+
+    def __init__(self, monitor_id: int, parent_id: int) -> None:
+        super().__init__(
+            "A monitor cannot depend on itself" if parent_id == monitor_id
+            else f"Monitor {parent_id} already depends on monitor {monitor_id}"
+        )
+        self.monitor_id = monitor_id
+        self.parent_id = parent_id
+
+
+def _ids(ids) -> Any:
+    return any_(cast(list(ids), ARRAY(Integer)))
+
+
+async def set_parents(
+    db: AsyncSession, *, user_id: int, monitor_id: int, parent_ids: list[int]
+) -> list[int] | None:
+    """
+    Replace the parents of the user's monitor.
+
+    Args:
+        db: Async SQLAlchemy session (the prober is notified on its commit).
+        user_id: Owner user id.
+        monitor_id: Dependent (child) monitor id.
+        parent_ids: Monitors it depends on (empty — no dependencies).
+
+    Returns:
+        Sorted parent ids, or None if the monitor or any parent is not found or not owned by the user.
+
+    Raises:
+        DependencyCycle: a parent is the monitor itself or already depends on it (directly or not).
+
+    Notes:
+        The owner's row is locked first (version bump), so concurrent dependency writes
+        of one user are serialized and two edges cannot close a cycle between them.
+        The check walks only the monitor's descendants (recursive CTE over
+        `ix_monitor_dependencies_parent`).
+    """
+    parent_ids = sorted(set(parent_ids))
+    owned = await db.execute(
+        select(Monitor.id).where(
+            Monitor.id == _ids([monitor_id, *parent_ids]), Monitor.user_id == user_id, Monitor.deleted_at.is_(None)
+        )
+    )
+    if len(owned.all()) != len({monitor_id, *parent_ids}):
+        return None
+    await bump_monitors_version(db, user_id=user_id)
+
+    if monitor_id in parent_ids:
+        raise DependencyCycle(monitor_id, monitor_id)
+    if parent_ids:
+        descendants = (
+            select(MonitorDependency.child_id.label("id"))
+            .where(MonitorDependency.parent_id == monitor_id)
+            .cte("descendants", recursive=True)
+        )
+        edge = aliased(MonitorDependency)
+        # UNION (не UNION ALL) завершается даже на графе с циклом
+        descendants = descendants.union(
+            select(edge.child_id).join(descendants, edge.parent_id == descendants.c.id)
+        )
+        res = await db.execute(select(descendants.c.id).where(descendants.c.id == _ids(parent_ids)).limit(1))
+        offending = res.scalar_one_or_none()
+        if offending is not None:
+            raise DependencyCycle(monitor_id, offending)
+
+    await db.execute(delete(MonitorDependency).where(MonitorDependency.child_id == monitor_id))
+    if parent_ids:
+        await db.execute(
+            insert(MonitorDependency), [{"child_id": monitor_id, "parent_id": p} for p in parent_ids]
+        )
+    return parent_ids
+
+
+async def get_for_monitor(
+    db: AsyncSession, *, user_id: int, monitor_id: int
+) -> tuple[list[int], list[int]] | None:
+    """
+    Direct parents and children of the user's monitor.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+
+    Returns:
+        (parent ids, child ids), both sorted; None if the monitor is not found or not owned by the user.
+    """
+    owned = await db.execute(
+        select(Monitor.id).where(Monitor.id == monitor_id, Monitor.user_id == user_id, Monitor.deleted_at.is_(None))
+    )
+    if owned.scalar_one_or_none() is None:
+        return None
+    res = await db.execute(
+        select(MonitorDependency.parent_id, MonitorDependency.child_id).where(
+            (MonitorDependency.child_id == monitor_id) | (MonitorDependency.parent_id == monitor_id)
+        )
+    )
+    parents, children = [], []
+    for parent_id, child_id in res.all():
+        if child_id == monitor_id:
+            parents.append(parent_id)
+        else:
+            children.append(child_id)
+    return sorted(parents), sorted(children)
+
+
+async def load_graph(db: AsyncSession, *, user_ids: list[int] | None = None) -> tuple[Sequence[Any], list[int]]:
+    """
+    Edges the prober needs and the parents that are down right now.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_ids: Restrict to these owners (incremental sync); None — all users.
+
+    Returns:
+        (rows of (user_id, parent_id, child_id), ids of active parents whose latest
+        non-maintenance check failed). Paused parents are never reported down:
+        nobody probes them, so they must not hold their children forever.
+    """
+    q = (
+        select(Monitor.user_id, MonitorDependency.parent_id, MonitorDependency.child_id)
+        .join(Monitor, Monitor.id == MonitorDependency.child_id)
+    )
+    if user_ids is not None:
+        q = q.where(Monitor.user_id == _ids(user_ids))
+    edges = (await db.execute(q)).all()
+    parent_ids = {parent_id for _, parent_id, _ in edges}
+    if not parent_ids:
+        return edges, []
+
+    latest = (
+        select(Check.ok)
+        .where(Check.monitor_id == Monitor.id, Check.maintenance.is_(False))
+        .order_by(Check.ts.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    res = await db.execute(
+        select(Monitor.id)
+        .select_from(Monitor)
+        .join(latest, true())
+        .where(Monitor.id == _ids(parent_ids), Monitor.is_paused.is_(False), latest.c.ok.is_(False))
+    )
+    return edges, list(res.scalars().all())
+
+
+async def publish_states(db: AsyncSession, *, states: dict[int, bool]) -> None:
+    """
+    Announce parents' up/down flips on `monitor_state` (delivered on commit).
+
+    Args:
+        db: Async SQLAlchemy session.
+        states: monitor id -> True if it went down, False if it recovered.
+    """
+    for monitor_id, down in states.items():
+        await notify(db, MONITOR_STATE_CHANNEL, f"{monitor_id}:{int(down)}")
@@ -0,0 +1,99 @@
+# app/repositories/monitor_events.py
+"""
+Repository layer for MonitorEvent entity (anomalies detected by the prober).
+"""
+
+import json
+from datetime import datetime
+from typing import Sequence
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.notify import notify
+from app.models.monitor import Monitor
+from app.models.monitor_event import MonitorEvent
+
+# Канал NOTIFY: payload — JSON {"id", "monitor_id", "kind"} нового события (для оповещений)
+MONITOR_EVENTS_CHANNEL = "monitor_events"
+
+# Виды событий: аномалии задержки и приостановка из-за родителя
+ANOMALY_KINDS = ("latency_regression", "latency_recovered")
+DEPENDENCY_KINDS = ("suppressed", "released")
+
+
+async def insert_many(db: AsyncSession, *, rows: list[dict]) -> None:
+    """
+    Insert a batch of events and announce each one on `monitor_events`.
+
+    Args:
+        db: Async SQLAlchemy session (notifications are delivered on its commit).
+        rows: Dicts with monitor_id, ts, kind, latency_ms, baseline_ms, score (None for dependency events).
+
+    Notes:
+        Events are rare (state flips only), so one NOTIFY per event is fine.
+    """
+    if not rows:
+        return
+    res = await db.execute(
+        insert(MonitorEvent).returning(MonitorEvent.id, MonitorEvent.monitor_id, MonitorEvent.kind), rows
+    )
+    for event_id, monitor_id, kind in res.all():
+        await notify(
+            db, MONITOR_EVENTS_CHANNEL, json.dumps({"id": event_id, "monitor_id": monitor_id, "kind": kind})
+        )
+
+
+async def list_for_monitor(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    monitor_id: int,
+    before: datetime | None = None,
+    limit: int = 50,
+) -> Sequence[MonitorEvent]:
+    """
+    List events of a monitor owned by the user, newest first.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        before: Keyset cursor — only events strictly older than this timestamp.
+        limit: Max rows to return.
+
+    Returns:
+        Sequence of MonitorEvent instances (empty if the monitor is not owned by the user).
+    """
+    q = _history(select(MonitorEvent), user_id=user_id, monitor_id=monitor_id, before=before)
+    res = await db.execute(q.limit(limit))
+    return res.scalars().all()
+
+
+async def newest_id(db: AsyncSession, *, user_id: int, monitor_id: int, before: datetime | None = None) -> int | None:
+    """
+    Id of the newest event `list_for_monitor` would return (ETag source for event pages).
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        monitor_id: Target monitor id.
+        before: Keyset cursor, as in `list_for_monitor`.
+
+    Returns:
+        Event id, or None if there is none (or the monitor is not owned by the user).
+    """
+    q = _history(select(MonitorEvent.id), user_id=user_id, monitor_id=monitor_id, before=before)
+    res = await db.execute(q.limit(1))
+    return res.scalar_one_or_none()
+
+
+def _history(q, *, user_id: int, monitor_id: int, before: datetime | None):
+    """Events of a live monitor owned by the user, newest first, before the cursor."""
+    q = (
+        q.join(Monitor, Monitor.id == MonitorEvent.monitor_id)
+        .where(MonitorEvent.monitor_id == monitor_id, Monitor.user_id == user_id, Monitor.deleted_at.is_(None))
+        .order_by(MonitorEvent.ts.desc(), MonitorEvent.id.desc())
+    )
+    if before is not None:
+        q = q.where(MonitorEvent.ts < before)
+    return q
@@ -4,11 +4,62 @@ Repository layer for Monitor entity.
 Encapsulates all DB access for monitors to keep routers thin and testable.
 """
 
-from typing import Sequence
-from sqlalchemy import select, update, delete
+import hashlib
+from datetime import datetime
+from typing import Any, Literal, Sequence
+from sqlalchemy import (
+    select, update, func, cast, literal, column, any_, tuple_, true, or_,
+    String, Integer, Boolean, BigInteger,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, BIT, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.monitor import Monitor
+from app.models.check import Check
+from app.models.monitor import PROBED_KINDS, Monitor
+from app.models.monitor_event import MonitorEvent
+from app.repositories import anomaly_states as anomaly_repo
+from app.repositories import monitor_events as events_repo
+from app.repositories.monitor_events import ANOMALY_KINDS, DEPENDENCY_KINDS
+from app.repositories.purge import soft_delete_monitors
+from app.repositories.users import bump_monitors_version
+
+# Поля, которые задаёт пользователь (ключ синхронизации — name)
+SPEC_FIELDS = ("url", "method", "expected_status", "interval_s", "timeout_ms", "is_paused", "kind", "expect")
+
+# Поля, которые нужны планировщику проверок (порядок совпадает с MonitorSpec)
+PROBE_FIELDS = ("id", "user_id", "url", "method", "expected_status", "interval_s", "timeout_ms", "kind", "expect")
+
+_probed = Monitor.kind.in_(PROBED_KINDS)
+# удалённые мониторы ждут очистки истории и нигде не видны
+_alive = Monitor.deleted_at.is_(None)
+
+# md5 спецификации, вычисляемый в SQL; формат совпадает с `spec_hash`
+_SPEC_HASH_SQL = func.md5(
+    func.concat_ws(
+        "|", Monitor.url, Monitor.method, cast(Monitor.expected_status, String),
+        cast(Monitor.interval_s, String), cast(Monitor.timeout_ms, String), cast(Monitor.is_paused, String),
+        Monitor.kind, func.coalesce(Monitor.expect, ""),
+    )
+)
+
+
+class NameTaken(Exception):
+    """Synced names already belong to the user's monitors of another kind (e.g. heartbeats)."""
+
+    def __init__(self, names: list[str]) -> None:
+        super().__init__(f"Names are used by heartbeat monitors: {names[:10]}")
+        self.names = names
+
+
+class UrlMoved(Exception):
+    """Synced URLs belong to other monitors of the user that stay alive after the sync."""
+
+    def __init__(self, moves: list[tuple[str, str]]) -> None:
+        super().__init__(
+            "URLs cannot move between monitors in one sync (rename or delete the old monitor first): "
+            + ", ".join(f"{old} -> {new}" for old, new in moves[:10])
+        )
+        self.moves = moves
 
 
 async def get_by_id_for_user(db: AsyncSession, *, user_id: int, monitor_id: int) -> Monitor | None:
@@ -23,7 +74,7 @@ async def get_by_id_for_user(db: AsyncSession, *, user_id: int, monitor_id: int)
     Returns:
         Monitor instance if found, otherwise None.
     """
-    q = select(Monitor).where(Monitor.id == monitor_id, Monitor.user_id == user_id)
+    q = select(Monitor).where(Monitor.id == monitor_id, Monitor.user_id == user_id, _alive)
     res = await db.execute(q)
     return res.scalar_one_or_none()
 
@@ -45,7 +96,7 @@ async def list_for_user(
     """
     q = (
         select(Monitor)
-        .where(Monitor.user_id == user_id)
+        .where(Monitor.user_id == user_id, _alive)
         .order_by(Monitor.id)
         .limit(limit)
         .offset(offset)
@@ -54,6 +105,173 @@ async def list_for_user(
     return res.scalars().all()
 
 
+async def list_page_with_status(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 50,
+    paused: bool | None = None,
+    failing: bool | None = None,
+    name_prefix: str | None = None,
+) -> Sequence[Any]:
+    """
+    Keyset page of monitors with each monitor's latest check embedded, in one query.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        after: Cursor — (created_at, id) of the last row of the previous page.
+        limit: Max rows to return.
+        paused: Filter by `is_paused` if not None.
+        failing: True — latest check failed; False — latest check ok or no checks yet.
+        name_prefix: Filter by name prefix (LIKE wildcards are escaped).
+
+    Returns:
+        Rows of (Monitor, ts, ok, status_code, latency_ms, error, event_kind, hold_kind) ordered
+        by (created_at, id); check columns are None for monitors without checks, `event_kind`
+        is the kind of the latest latency anomaly event and `hold_kind` of the latest
+        dependency event (None if there were none).
+
+    Notes:
+        Order matches `ix_monitor_user_created`; the latest check and events come from
+        `LEFT JOIN LATERAL (... ORDER BY ts DESC LIMIT 1)` over `ix_checks_monitor_ts`
+        and `ix_monitor_events_monitor_ts`.
+    """
+    latest = (
+        select(Check.ts, Check.ok, Check.status_code, Check.latency_ms, Check.error)
+        .where(Check.monitor_id == Monitor.id)
+        .order_by(Check.ts.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    latest_event = (
+        select(MonitorEvent.kind)
+        .where(MonitorEvent.monitor_id == Monitor.id, MonitorEvent.kind.in_(ANOMALY_KINDS))
+        .order_by(MonitorEvent.ts.desc(), MonitorEvent.id.desc())
+        .limit(1)
+        .lateral("latest_event")
+    )
+    latest_hold = (
+        select(MonitorEvent.kind)
+        .where(MonitorEvent.monitor_id == Monitor.id, MonitorEvent.kind.in_(DEPENDENCY_KINDS))
+        .order_by(MonitorEvent.ts.desc(), MonitorEvent.id.desc())
+        .limit(1)
+        .lateral("latest_hold")
+    )
+    q = (
+        select(
+            Monitor, latest.c.ts, latest.c.ok, latest.c.status_code, latest.c.latency_ms, latest.c.error,
+            latest_event.c.kind, latest_hold.c.kind,
+        )
+        .select_from(Monitor)
+        .outerjoin(latest, true())
+        .outerjoin(latest_event, true())
+        .outerjoin(latest_hold, true())
+        .where(Monitor.user_id == user_id, _alive)
+        .order_by(Monitor.created_at, Monitor.id)
+        .limit(limit)
+    )
+    if after is not None:
+        q = q.where(tuple_(Monitor.created_at, Monitor.id) > tuple_(*after))
+    if paused is not None:
+        q = q.where(Monitor.is_paused.is_(paused))
+    if failing is True:
+        q = q.where(latest.c.ok.is_(False))
+    elif failing is False:
+        q = q.where(or_(latest.c.ok.is_(True), latest.c.ok.is_(None)))
+    if name_prefix:
+        q = q.where(Monitor.name.startswith(name_prefix, autoescape=True))
+    res = await db.execute(q)
+    return res.all()
+
+
+def _active_filter(shard_index: int, shard_count: int) -> list:
+    cond = [Monitor.is_paused.is_(False), _probed, _alive]
+    if shard_count > 1:
+        cond.append(Monitor.id % shard_count == shard_index)
+    return cond
+
+
+async def list_active(
+    db: AsyncSession,
+    *,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    with_last_check: bool = False,
+    user_ids: list[int] | None = None,
+) -> Sequence[Any]:
+    """
+    All non-paused probed (http, tcp, dns) monitors with the fields the prober needs
+    (heartbeats: `heartbeats.list_active`).
+
+    Args:
+        db: Async SQLAlchemy session.
+        shard_index: This worker's shard (only monitors with `id % shard_count == shard_index`).
+        shard_count: Total number of prober shards.
+        with_last_check: Also return the time of each monitor's latest check.
+        user_ids: Only monitors of these owners (incremental refresh after `monitors_changed`).
+
+    Returns:
+        Rows of (id, user_id, url, method, expected_status, interval_s, timeout_ms, kind, expect),
+        plus `last_ts` (None if never checked) when `with_last_check` is set.
+
+    Notes:
+        `last_ts` is a correlated `max(ts)` answered from the end of `ix_checks_monitor_ts`,
+        so the whole schedule is rebuilt in one statement.
+    """
+    cols = [getattr(Monitor, f) for f in PROBE_FIELDS]
+    if with_last_check:
+        cols.append(
+            select(func.max(Check.ts)).where(Check.monitor_id == Monitor.id).scalar_subquery().label("last_ts")
+        )
+    q = select(*cols).where(*_active_filter(shard_index, shard_count))
+    if user_ids is not None:
+        q = q.where(Monitor.user_id == any_(cast(user_ids, ARRAY(Integer))))
+    res = await db.execute(q)
+    return res.all()
+
+
+def probe_spec_checksum(rows) -> tuple[int, int]:
+    """
+    (count, checksum) of probe specs; matches `active_checksum` for the same set of rows.
+
+    Args:
+        rows: Iterables of `PROBE_FIELDS` values.
+    """
+    total = count = 0
+    for row in rows:
+        # NULL пропускается в concat_ws — пустая строка на его месте даёт тот же разделитель
+        raw = "|".join("" if v is None else str(v) for v in row)
+        total += int(hashlib.md5(raw.encode()).hexdigest()[:15], 16)
+        count += 1
+    return count, total
+
+
+async def active_checksum(db: AsyncSession, *, shard_index: int = 0, shard_count: int = 1) -> tuple[int, int]:
+    """
+    Order-independent checksum of what `list_active` would return, computed in the DB.
+
+    Args:
+        db: Async SQLAlchemy session.
+        shard_index: This worker's shard.
+        shard_count: Total number of prober shards.
+
+    Returns:
+        (count, sum of the first 60 bits of md5 over `PROBE_FIELDS`) — two numbers instead
+        of the whole table, for periodic reconciliation of the prober's in-memory schedule.
+    """
+    row_md5 = func.md5(
+        func.concat_ws("|", *(func.coalesce(cast(getattr(Monitor, f), String), "") for f in PROBE_FIELDS))
+    )
+    head = cast(cast(literal("x").op("||")(func.substr(row_md5, 1, 15)), BIT(60)), BigInteger)
+    res = await db.execute(
+        select(func.count(), func.coalesce(func.sum(head), 0)).where(*_active_filter(shard_index, shard_count))
+    )
+    count, total = res.one()
+    return count, int(total)
+
+
 async def exists_url_for_user(db: AsyncSession, *, user_id: int, url: str) -> bool:
     """
     Check if a monitor with the same URL already exists for a user.
@@ -66,7 +284,7 @@ async def exists_url_for_user(db: AsyncSession, *, user_id: int, url: str) -> bo
     Returns:
         True if such monitor exists, else False.
     """
-    q = select(Monitor.id).where(Monitor.user_id == user_id, Monitor.url == url).limit(1)
+    q = select(Monitor.id).where(Monitor.user_id == user_id, Monitor.url == url, _alive).limit(1)
     res = await db.execute(q)
     return res.scalar_one_or_none() is not None
 
@@ -81,6 +299,8 @@ async def create(
     expected_status: int,
     interval_s: int,
     timeout_ms: int,
+    kind: str = "http",
+    expect: str | None = None,
 ) -> Monitor:
     """
     Create a new monitor for a user.
@@ -94,12 +314,15 @@ async def create(
         expected_status: Expected HTTP status code.
         interval_s: Check interval in seconds.
         timeout_ms: Request timeout in milliseconds.
+        kind: Probe type (http / tcp / dns).
+        expect: Expected banner substring (tcp) or records (dns); None — no comparison.
 
     Returns:
         Persisted Monitor instance (refreshed).
 
     Notes:
         Uses flush+refresh to populate autogenerated fields before commit.
+        Every mutation here also bumps the owner's `monitors_version` (ETag source).
     """
     obj = Monitor(
         user_id=user_id,
@@ -109,10 +332,13 @@ async def create(
         expected_status=expected_status,
         interval_s=interval_s,
         timeout_ms=timeout_ms,
+        kind=kind,
+        expect=expect,
     )
     db.add(obj)
     await db.flush()
     await db.refresh(obj)
+    await bump_monitors_version(db, user_id=user_id)
     return obj
 
 
@@ -136,12 +362,15 @@ async def patch(
     """
     q = (
         update(Monitor)
-        .where(Monitor.id == monitor_id, Monitor.user_id == user_id)
+        .where(Monitor.id == monitor_id, Monitor.user_id == user_id, _alive)
         .values(**fields)
         .returning(Monitor)
     )
     res = await db.execute(q)
-    return res.scalar_one_or_none()
+    obj = res.scalar_one_or_none()
+    if obj is not None:
+        await bump_monitors_version(db, user_id=user_id)
+    return obj
 
 
 async def delete_for_user(db: AsyncSession, *, user_id: int, monitor_id: int) -> bool:
@@ -154,8 +383,156 @@ async def delete_for_user(db: AsyncSession, *, user_id: int, monitor_id: int) ->
         monitor_id: Target monitor id.
 
     Returns:
-        True if a row was deleted, else False.
+        True if the monitor was deleted, else False.
+
+    Notes:
+        Soft delete (`purge.soft_delete_monitors`): the monitor disappears and stops being
+        probed on commit, its history is purged in the background by the prober.
     """
-    q = delete(Monitor).where(Monitor.id == monitor_id, Monitor.user_id == user_id)
-    res = await db.execute(q)
-    return res.rowcount > 0
+    deleted = await soft_delete_monitors(db, user_id=user_id, monitor_ids=[monitor_id])
+    if deleted:
+        await bump_monitors_version(db, user_id=user_id)
+    return bool(deleted)
+
+
+def spec_hash(item: dict) -> str:
+    """
+    Hash of the user-controlled monitor spec; matches `_SPEC_HASH_SQL` for the stored row.
+    """
+    raw = "|".join([
+        item["url"], item["method"], str(item["expected_status"]), str(item["interval_s"]),
+        str(item["timeout_ms"]), "true" if item["is_paused"] else "false", item["kind"], item["expect"] or "",
+    ])
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+async def sync_for_user(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    items: list[dict],
+    missing: Literal["delete", "pause", "keep"] = "delete",
+) -> list[tuple[str, str, int | None]]:
+    """
+    Make the user's monitors match the desired set (keyed by name).
+
+    Args:
+        db: Async SQLAlchemy session (caller commits; everything runs in one transaction).
+        user_id: Owner user id.
+        items: Desired monitors as dicts with `name` and all `SPEC_FIELDS`; names/urls unique.
+        missing: What to do with existing monitors absent from `items`.
+
+    Returns:
+        List of (name, action, id) where action is one of
+        created / updated / unchanged / deleted / paused / kept.
+
+    Raises:
+        NameTaken: an item's name belongs to a heartbeat monitor (only probed monitors are synced).
+        UrlMoved: an item takes the URL of another monitor that stays alive (swapped URLs, or
+            a rename keeping the URL with `missing` pause/keep); nothing is written.
+
+    Notes:
+        A fixed number of statements regardless of set size:
+        1. SELECT name, id, url, method, md5(spec) of existing rows;
+        2. with `missing="delete"`, soft delete of missing ones (`purge.soft_delete_monitors`)
+           first, so a renamed monitor's URL is free for the new row;
+        3. INSERT ... SELECT FROM unnest(arrays) ON CONFLICT (user_id, name) DO UPDATE ... RETURNING
+           for new and changed items only;
+        4. UPDATE ... RETURNING for missing ones with `missing="pause"`.
+        Items whose url or method changed also get their latency baseline reset
+        (`anomaly_states.reset`, two statements plus one per closed regression).
+        `uq_monitor_user_url` is not deferrable, so a URL moving to another name while its
+        current holder stays alive would fail the upsert row by row; it is rejected up front.
+        Arrays are passed as a handful of bind parameters, so the statement size does not
+        hit the driver's parameter limit for large sets.
+    """
+    res = await db.execute(
+        select(Monitor.name, Monitor.id, Monitor.url, Monitor.method, _SPEC_HASH_SQL)
+        .where(Monitor.user_id == user_id, _probed, _alive)
+    )
+    rows = res.all()
+    existing = {name: (mid, h) for name, mid, _, _, h in rows}
+    targets = {name: (url, method) for name, _, url, method, _ in rows}
+    url_owner = {url: name for name, _, url, _, _ in rows}
+    desired = {i["name"] for i in items}
+    gone = [name for name in existing if name not in desired]
+
+    report: list[tuple[str, str, int | None]] = []
+    changed = []
+    for item in items:
+        cur = existing.get(item["name"])
+        if cur is not None and cur[1] == spec_hash(item):
+            report.append((item["name"], "unchanged", cur[0]))
+        else:
+            changed.append(item)
+
+    # URL переходит к другому имени, а прежний владелец остаётся жив — уникальный индекс не пропустит
+    moves = [
+        (owner, item["name"])
+        for item in changed
+        if (owner := url_owner.get(item["url"])) not in (None, item["name"])
+        and (owner in desired or missing != "delete")
+    ]
+    if moves:
+        raise UrlMoved(moves)
+
+    if gone and missing == "delete":
+        deleted = set(await soft_delete_monitors(
+            db, user_id=user_id, monitor_ids=[existing[name][0] for name in gone]
+        ))
+        report.extend((name, "deleted", existing[name][0]) for name in gone if existing[name][0] in deleted)
+
+    if changed:
+        src = func.unnest(
+            cast([i["name"] for i in changed], ARRAY(String)),
+            cast([i["url"] for i in changed], ARRAY(String)),
+            cast([i["method"] for i in changed], ARRAY(String)),
+            cast([i["expected_status"] for i in changed], ARRAY(Integer)),
+            cast([i["interval_s"] for i in changed], ARRAY(Integer)),
+            cast([i["timeout_ms"] for i in changed], ARRAY(Integer)),
+            cast([i["is_paused"] for i in changed], ARRAY(Boolean)),
+            cast([i["kind"] for i in changed], ARRAY(String)),
+            cast([i["expect"] for i in changed], ARRAY(String)),
+        ).table_valued(
+            column("name", String), *(column(f) for f in SPEC_FIELDS)
+        ).render_derived()
+        ins = pg_insert(Monitor).from_select(
+            ["user_id", "name", *SPEC_FIELDS],
+            select(literal(user_id), src.c.name, *(src.c[f] for f in SPEC_FIELDS)),
+        )
+        ins = ins.on_conflict_do_update(
+            index_elements=[Monitor.user_id, Monitor.name],
+            index_where=_alive,
+            set_={f: ins.excluded[f] for f in SPEC_FIELDS},
+            where=_probed,
+        ).returning(Monitor.name, Monitor.id)
+        res = await db.execute(ins)
+        written = res.all()
+        if len(written) < len(changed):
+            taken = {name for name, _ in written}
+            raise NameTaken([i["name"] for i in changed if i["name"] not in taken])
+        for name, mid in written:
+            report.append((name, "updated" if name in existing else "created", mid))
+        # другая цель — прежняя норма задержки к ней не относится
+        retargeted = [
+            existing[i["name"]][0] for i in changed
+            if i["name"] in targets and targets[i["name"]] != (i["url"], i["method"])
+        ]
+        if retargeted:
+            await events_repo.insert_many(db, rows=await anomaly_repo.reset(db, monitor_ids=retargeted))
+
+    if gone:
+        if missing == "pause":
+            res = await db.execute(
+                update(Monitor)
+                .where(Monitor.user_id == user_id, Monitor.name == any_(cast(gone, ARRAY(String))), _alive)
+                .values(is_paused=True)
+                .returning(Monitor.name, Monitor.id)
+            )
+            report.extend((name, "paused", mid) for name, mid in res.all())
+        elif missing == "keep":
+            report.extend((name, "kept", existing[name][0]) for name in gone)
+
+    if any(action not in ("unchanged", "kept") for _, action, _ in report):
+        await bump_monitors_version(db, user_id=user_id)
+    return report
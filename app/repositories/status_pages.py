@@ -0,0 +1,334 @@
+# app/repositories/status_pages.py
+"""
+Repository layer for StatusPage entity (public status pages).
+
+A page's public JSON is rendered here, in the writer's transaction, whenever something it
+shows may have changed: the page itself, its owner's monitors, or a monitor's up/down or
+latency-anomaly state. Readers fetch the stored `snapshot` by slug and never touch checks.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+from sqlalchemy import select, update, delete, bindparam, any_, cast, true, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.notify import notify
+from app.models.check import Check
+from app.models.monitor import Monitor
+from app.models.monitor_event import MonitorEvent
+from app.repositories.monitor_events import ANOMALY_KINDS
+from app.models.status_page import StatusPage, StatusPageMonitor
+
+# Канал NOTIFY: payload — slug страницы, снимок которой изменился (сброс кэшей API)
+STATUS_PAGE_CHANGED_CHANNEL = "status_page_changed"
+
+# Статусы мониторов на публичной странице
+OPERATIONAL, DEGRADED, DOWN, PAUSED, UNKNOWN = "operational", "degraded", "down", "paused", "unknown"
+
+_update_snapshot = (
+    update(StatusPage.__table__)
+    .where(StatusPage.__table__.c.id == bindparam("page_id"))
+    .values(snapshot=bindparam("body"), snapshot_version=StatusPage.__table__.c.snapshot_version + 1)
+)
+
+
+def _ids(values: Iterable[int]):
+    return any_(cast(list(values), ARRAY(Integer)))
+
+
+async def create(
+    db: AsyncSession, *, user_id: int, slug: str, title: str, monitor_ids: list[int]
+) -> StatusPage | None:
+    """
+    Create a status page over the user's monitors and render its first snapshot.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        slug: Public page id (unique across all users).
+        title: Page title.
+        monitor_ids: Monitors to show, in display order.
+
+    Returns:
+        Persisted StatusPage, or None if some monitor does not exist or is not owned by the user
+        (the caller must roll back).
+    """
+    obj = StatusPage(user_id=user_id, slug=slug, title=title)
+    db.add(obj)
+    await db.flush()
+    if not await _set_monitors(db, user_id=user_id, page_id=obj.id, monitor_ids=monitor_ids):
+        return None
+    await refresh(db, page_ids=[obj.id])
+    await db.refresh(obj)
+    return obj
+
+
+async def _set_monitors(db: AsyncSession, *, user_id: int, page_id: int, monitor_ids: list[int]) -> bool:
+    """Replace the page's monitor list; False if some id is not a monitor of `user_id`."""
+    await db.execute(delete(StatusPageMonitor).where(StatusPageMonitor.page_id == page_id))
+    if not monitor_ids:
+        return True
+    owned = set((await db.execute(
+        select(Monitor.id).where(
+            Monitor.id == _ids(monitor_ids), Monitor.user_id == user_id, Monitor.deleted_at.is_(None)
+        )
+    )).scalars().all())
+    if owned != set(monitor_ids):
+        return False
+    db.add_all(
+        StatusPageMonitor(page_id=page_id, monitor_id=mid, position=i) for i, mid in enumerate(monitor_ids)
+    )
+    await db.flush()
+    return True
+
+
+async def list_for_user(db: AsyncSession, *, user_id: int) -> Sequence[StatusPage]:
+    """
+    List the user's status pages, oldest first.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+
+    Returns:
+        Sequence of StatusPage instances.
+    """
+    res = await db.execute(select(StatusPage).where(StatusPage.user_id == user_id).order_by(StatusPage.id))
+    return res.scalars().all()
+
+
+async def get_for_user(db: AsyncSession, *, user_id: int, page_id: int) -> StatusPage | None:
+    """
+    Fetch a status page ensuring it belongs to the user.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        page_id: Target page id.
+
+    Returns:
+        StatusPage if found and owned by the user, else None.
+    """
+    res = await db.execute(select(StatusPage).where(StatusPage.id == page_id, StatusPage.user_id == user_id))
+    return res.scalar_one_or_none()
+
+
+async def monitor_ids_of(db: AsyncSession, *, page_ids: list[int]) -> dict[int, list[int]]:
+    """
+    Monitor ids of each page, in display order.
+
+    Args:
+        db: Async SQLAlchemy session.
+        page_ids: Target page ids.
+
+    Returns:
+        Mapping page id -> monitor ids (every requested page is present).
+    """
+    out: dict[int, list[int]] = {pid: [] for pid in page_ids}
+    if not page_ids:
+        return out
+    res = await db.execute(
+        select(StatusPageMonitor.page_id, StatusPageMonitor.monitor_id)
+        .where(StatusPageMonitor.page_id == _ids(page_ids))
+        .order_by(StatusPageMonitor.page_id, StatusPageMonitor.position)
+    )
+    for page_id, monitor_id in res.all():
+        out[page_id].append(monitor_id)
+    return out
+
+
+async def patch(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    page_id: int,
+    title: str | None = None,
+    monitor_ids: list[int] | None = None,
+) -> StatusPage | None:
+    """
+    Update title and/or monitor list of the user's page and re-render its snapshot.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        page_id: Target page id.
+        title: New title, if given.
+        monitor_ids: New monitor list, if given.
+
+    Returns:
+        Updated StatusPage; None if the page is not found or a monitor is not owned by the user
+        (the caller must roll back).
+    """
+    obj = await get_for_user(db, user_id=user_id, page_id=page_id)
+    if obj is None:
+        return None
+    if title is not None:
+        obj.title = title
+        await db.flush()
+    if monitor_ids is not None and not await _set_monitors(
+        db, user_id=user_id, page_id=page_id, monitor_ids=monitor_ids
+    ):
+        return None
+    await refresh(db, page_ids=[page_id])
+    await db.refresh(obj)
+    return obj
+
+
+async def delete_for_user(db: AsyncSession, *, user_id: int, page_id: int) -> bool:
+    """
+    Delete a status page that belongs to the user.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Owner user id.
+        page_id: Target page id.
+
+    Returns:
+        True if a page was deleted, else False.
+    """
+    res = await db.execute(
+        delete(StatusPage).where(StatusPage.id == page_id, StatusPage.user_id == user_id).returning(StatusPage.slug)
+    )
+    slug = res.scalar_one_or_none()
+    if slug is None:
+        return False
+    await notify(db, STATUS_PAGE_CHANGED_CHANNEL, slug)
+    return True
+
+
+async def get_snapshot(db: AsyncSession, *, slug: str) -> tuple[int, int, str] | None:
+    """
+    Fetch the rendered snapshot of a page by slug.
+
+    Args:
+        db: Async SQLAlchemy session.
+        slug: Public page id.
+
+    Returns:
+        (page id, snapshot_version, snapshot JSON), or None if there is no such page.
+        The id is part of the version: a page re-created under the same slug starts over at 1.
+
+    Notes:
+        Core select over the unique slug index — no ORM entity is loaded.
+    """
+    res = await db.execute(
+        select(StatusPage.id, StatusPage.snapshot_version, StatusPage.snapshot).where(StatusPage.slug == slug)
+    )
+    row = res.first()
+    return (row[0], row[1], row[2]) if row is not None and row[2] is not None else None
+
+
+def _monitor_status(is_paused: bool, ok: bool | None, event_kind: str | None) -> str:
+    if is_paused:
+        return PAUSED
+    if ok is None:
+        return UNKNOWN
+    if not ok:
+        return DOWN
+    return DEGRADED if event_kind == "latency_regression" else OPERATIONAL
+
+
+def _overall_status(statuses: list[str]) -> str:
+    active = [s for s in statuses if s not in (PAUSED, UNKNOWN)]
+    down = active.count(DOWN)
+    if down and down == len(active):
+        return "major_outage"
+    if down:
+        return "partial_outage"
+    if DEGRADED in active:
+        return "degraded"
+    return OPERATIONAL
+
+
+async def refresh(db: AsyncSession, *, page_ids: Iterable[int]) -> int:
+    """
+    Re-render snapshots of the given pages and announce them on `status_page_changed`.
+
+    Args:
+        db: Async SQLAlchemy session (notifications are delivered on its commit).
+        page_ids: Pages to re-render; missing ids are ignored.
+
+    Returns:
+        Number of pages re-rendered.
+
+    Notes:
+        Pages are locked `FOR UPDATE` (in id order) before monitor states are read, so two
+        concurrent writers are serialized and the one committing last renders what it saw
+        after the other's commit — a snapshot never goes back to an older state.
+        Monitor state is the latest check outside maintenance (`ix_checks_monitor_ts`) and
+        the latest event (`ix_monitor_events_monitor_ts`), one LATERAL lookup each.
+    """
+    page_ids = sorted(set(page_ids))
+    if not page_ids:
+        return 0
+    pages = (await db.execute(
+        select(StatusPage.id, StatusPage.slug, StatusPage.title)
+        .where(StatusPage.id == _ids(page_ids))
+        .order_by(StatusPage.id)
+        .with_for_update()
+    )).all()
+    if not pages:
+        return 0
+
+    latest = (
+        select(Check.ok)
+        .where(Check.monitor_id == Monitor.id, Check.maintenance.is_(False))
+        .order_by(Check.ts.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    latest_event = (
+        select(MonitorEvent.kind)
+        .where(MonitorEvent.monitor_id == Monitor.id, MonitorEvent.kind.in_(ANOMALY_KINDS))
+        .order_by(MonitorEvent.ts.desc(), MonitorEvent.id.desc())
+        .limit(1)
+        .lateral("latest_event")
+    )
+    res = await db.execute(
+        select(StatusPageMonitor.page_id, Monitor.name, Monitor.is_paused, latest.c.ok, latest_event.c.kind)
+        .select_from(StatusPageMonitor)
+        .join(Monitor, Monitor.id == StatusPageMonitor.monitor_id)
+        .outerjoin(latest, true())
+        .outerjoin(latest_event, true())
+        .where(StatusPageMonitor.page_id == _ids(p.id for p in pages))
+        .order_by(StatusPageMonitor.page_id, StatusPageMonitor.position)
+    )
+    monitors: dict[int, list[dict]] = {p.id: [] for p in pages}
+    for page_id, name, is_paused, ok, event_kind in res.all():
+        monitors[page_id].append({"name": name, "status": _monitor_status(is_paused, ok, event_kind)})
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for page_id, slug, title in pages:
+        items = monitors[page_id]
+        body = {
+            "slug": slug,
+            "title": title,
+            "status": _overall_status([m["status"] for m in items]),
+            "updated_at": updated_at,
+            "monitors": items,
+        }
+        rows.append({"page_id": page_id, "body": json.dumps(body, ensure_ascii=False, separators=(",", ":"))})
+    await db.execute(_update_snapshot, rows)
+    for _, slug, _ in pages:
+        await notify(db, STATUS_PAGE_CHANGED_CHANNEL, slug)
+    return len(pages)
+
+
+async def refresh_for_monitors(db: AsyncSession, *, monitor_ids: Iterable[int]) -> int:
+    """Re-render every page that shows one of the monitors (call after their state changed)."""
+    monitor_ids = list(monitor_ids)
+    if not monitor_ids:
+        return 0
+    res = await db.execute(
+        select(StatusPageMonitor.page_id).distinct().where(StatusPageMonitor.monitor_id == _ids(monitor_ids))
+    )
+    return await refresh(db, page_ids=res.scalars().all())
+
+
+async def refresh_for_user(db: AsyncSession, *, user_id: int) -> int:
+    """Re-render every page of the user (call after the user's monitors changed)."""
+    res = await db.execute(select(StatusPage.id).where(StatusPage.user_id == user_id))
+    return await refresh(db, page_ids=res.scalars().all())
@@ -4,10 +4,21 @@ Encapsulates DB access so routers stay thin and testable.
 """
 
 from typing import Sequence
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, func, any_, cast, Float, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.notify import notify
+from app.core.quota import Quota, Usage
+from app.models.monitor import HEARTBEAT, Monitor
 from app.models.user import User
+from app.repositories import status_pages as status_pages_repo
+from app.repositories.purge import soft_delete_user
+
+# Канал NOTIFY: payload — id пользователя, чей кэш нужно сбросить во всех воркерах
+INVALIDATION_CHANNEL = "user_invalidated"
+# Канал NOTIFY: payload — id пользователя, чьи мониторы изменились (для расписания проверок)
+MONITORS_CHANGED_CHANNEL = "monitors_changed"
 
 
 async def create(db: AsyncSession, *, email: str, tg_id: int | None, hashed_password: str, is_active: bool = True) -> User:
@@ -40,9 +51,10 @@ async def get_by_id(db: AsyncSession, *, user_id: int) -> User | None:
         user_id: Target user id.
 
     Returns:
-        User if found, else None.
+        User if found and not deleted, else None.
     """
-    return await db.get(User, user_id)
+    res = await db.execute(select(User).where(User.id == user_id, User.deleted_at.is_(None)))
+    return res.scalar_one_or_none()
 
 
 async def get_by_email(db: AsyncSession, *, email: str) -> User | None:
@@ -54,9 +66,9 @@ async def get_by_email(db: AsyncSession, *, email: str) -> User | None:
         email: User email.
 
     Returns:
-        User if found, else None.
+        User if found and not deleted, else None.
     """
-    res = await db.execute(select(User).where(User.email == email))
+    res = await db.execute(select(User).where(User.email == email, User.deleted_at.is_(None)))
     return res.scalar_one_or_none()
 
 
@@ -75,7 +87,7 @@ async def list_users(
         Sequence of User objects.
     """
     res = await db.execute(
-        select(User).order_by(User.id).limit(limit).offset(offset)
+        select(User).where(User.deleted_at.is_(None)).order_by(User.id).limit(limit).offset(offset)
     )
     return res.scalars().all()
 
@@ -93,14 +105,21 @@ async def patch(
 
     Returns:
         Updated User if found, else None.
+
+    Notes:
+        Covers deactivation too (`is_active=False`). Emits a cache invalidation
+        NOTIFY that is delivered to all workers on commit.
     """
     res = await db.execute(
         update(User)
-        .where(User.id == user_id)
+        .where(User.id == user_id, User.deleted_at.is_(None))
         .values(**fields)
         .returning(User)
     )
-    return res.scalar_one_or_none()
+    obj = res.scalar_one_or_none()
+    if obj is not None:
+        await notify(db, INVALIDATION_CHANNEL, str(user_id))
+    return obj
 
 
 async def delete_by_id(db: AsyncSession, *, user_id: int) -> bool:
@@ -112,8 +131,117 @@ async def delete_by_id(db: AsyncSession, *, user_id: int) -> bool:
         user_id: Target user id.
 
     Returns:
-        True if a row was deleted, else False.
+        True if the user was deleted, else False.
+
+    Notes:
+        Soft delete (`purge.soft_delete_user`): the user and their monitors disappear at
+        once, the rows go after the prober has purged the monitors' history. Emits cache
+        invalidation and monitors-changed NOTIFYs that are delivered to all workers on commit.
+    """
+    deleted = await soft_delete_user(db, user_id=user_id)
+    if deleted:
+        await notify(db, INVALIDATION_CHANNEL, str(user_id))
+        await notify(db, MONITORS_CHANGED_CHANNEL, str(user_id))
+    return deleted
+
+
+async def get_versions(db: AsyncSession, *, user_id: int) -> tuple[int, int]:
+    """
+    Fetch the user's change counters used for ETags.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Target user id.
+
+    Returns:
+        (monitors_version, status_version); (0, 0) if the user does not exist.
+
+    Notes:
+        Core select by primary key — no ORM entity is loaded.
+    """
+    res = await db.execute(
+        select(User.monitors_version, User.status_version).where(User.id == user_id)
+    )
+    row = res.first()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+async def bump_monitors_version(db: AsyncSession, *, user_id: int) -> None:
+    """
+    Increment the user's monitors counter; call in the same transaction as any monitor change.
+
+    Also queues a `monitors_changed` NOTIFY, so running probers re-read this user's
+    monitors after commit, and re-renders the user's status pages (names, pauses, deletions).
+    """
+    await db.execute(
+        update(User).where(User.id == user_id).values(monitors_version=User.monitors_version + 1)
+    )
+    await notify(db, MONITORS_CHANGED_CHANNEL, str(user_id))
+    await status_pages_repo.refresh_for_user(db, user_id=user_id)
+
+
+async def bump_status_version_for_monitors(db: AsyncSession, *, monitor_ids: list[int]) -> None:
+    """
+    Increment status counters of all owners of the given monitors.
+
+    Rewrites the owners' rows, so the prober coalesces calls (see `PROBER_STATUS_VERSION_S`).
+    """
+    owners = select(Monitor.user_id).where(Monitor.id == any_(cast(monitor_ids, ARRAY(Integer))))
+    await db.execute(
+        update(User).where(User.id.in_(owners)).values(status_version=User.status_version + 1)
+    )
+
+
+def _usage_columns(user_id) -> tuple:
+    # нагрузка считается только по активным мониторам; heartbeat-мониторы никто не проверяет
+    of_user = select().select_from(Monitor).where(Monitor.user_id == user_id, Monitor.deleted_at.is_(None))
+    probed = Monitor.is_paused.is_(False) & (Monitor.kind != HEARTBEAT)
+    return (
+        of_user.add_columns(func.count()).scalar_subquery(),
+        of_user.add_columns(
+            func.coalesce(func.sum(1.0 / cast(Monitor.interval_s, Float)).filter(probed), 0.0)
+        ).scalar_subquery(),
+    )
+
+
+async def get_quota(db: AsyncSession, *, user_id: int) -> tuple[Quota, Usage]:
+    """
+    Read the user's effective quota and current monitor usage.
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_id: Target user id.
+
+    Returns:
+        (quota, usage) — usage counts all monitors and the probes/s of the active probed
+        (non-heartbeat) ones.
+
+    Notes:
+        To check a write, read this after it in the same transaction: every monitor write
+        locks the user's row (`bump_monitors_version`), so concurrent writes of one user
+        are checked one after another and each sees the monitors of the others.
+    """
+    res = await db.execute(
+        select(User.quota_max_monitors, User.quota_min_interval_s, User.quota_probes_per_s, *_usage_columns(User.id))
+        .where(User.id == user_id)
+    )
+    max_monitors, min_interval_s, probes_per_s, count, rate = res.one()
+    return Quota.resolve(max_monitors, min_interval_s, probes_per_s), Usage(count, float(rate))
+
+
+async def probe_budgets(db: AsyncSession, *, user_ids: list[int] | None = None) -> dict[int, float]:
+    """
+    Per-user probe budget overrides (users without one use `QUOTA_PROBES_PER_S`).
+
+    Args:
+        db: Async SQLAlchemy session.
+        user_ids: Restrict to these users; None — all users with an override.
+
+    Returns:
+        user id -> probes/s.
     """
-    res = await db.execute(delete(User).where(User.id == user_id))
-    affected = res.rowcount or 0
-    return affected > 0
+    q = select(User.id, User.quota_probes_per_s).where(User.quota_probes_per_s.is_not(None))
+    if user_ids is not None:
+        q = q.where(User.id == any_(cast(user_ids, ARRAY(Integer))))
+    res = await db.execute(q)
+    return {user_id: budget for user_id, budget in res.all()}
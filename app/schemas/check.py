@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional, TypedDict
 from datetime import datetime
 
 
@@ -17,4 +17,42 @@ class CheckOut(BaseModel):
     latency_ms: int = Field(description="Задержка отклика сервера, в миллисекундах.")
     status_code: int = Field(description="HTTP-код ответа.")
     ok: bool = Field(description="Флаг успешности проверки.")
-    error: Optional[str] = Field(default=None, description="Описание ошибки, если она возникла.")
\ No newline at end of file
+    error: Optional[str] = Field(default=None, description="Описание ошибки, если она возникла.")
+    maintenance: bool = Field(default=False, description="Проверка выполнена в окне обслуживания (режим tag).")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CheckRow(TypedDict):
+    """Плоская схема CheckOut для быстрой сериализации (app/api/fast_json.py)."""
+    id: int
+    monitor_id: int
+    ts: datetime
+    latency_ms: int
+    status_code: int
+    ok: bool
+    error: Optional[str]
+    maintenance: bool
+
+
+# ========================== Latency heatmap ========================== #
+
+class LatencyHeatmap(BaseModel):
+    """
+    Тепловая карта задержек монитора: корзины времени × корзины задержки.
+
+    `counts[i][j]` — число проверок в i-й корзине времени с задержкой
+    в [latency_edges_ms[j], latency_edges_ms[j + 1]); последняя корзина открыта справа.
+    """
+    monitor_id: int = Field(description="ID монитора.")
+    since: datetime = Field(description="Начало окна (выровнено по bucket_s).")
+    until: datetime = Field(description="Конец окна, не включительно (выровнен по bucket_s).")
+    bucket_s: int = Field(description="Ширина корзины времени, в секундах.")
+    latency_edges_ms: List[int] = Field(description="Левые границы корзин задержки, в миллисекундах.")
+    counts: List[List[int]] = Field(description="Матрица: строки — корзины времени, столбцы — корзины задержки.")
+    failures: List[int] = Field(description="Число неуспешных проверок в каждой корзине времени.")
+    histogram: List[int] = Field(description="Гистограмма задержек за всё окно.")
+    total: int = Field(description="Всего проверок в окне.")
+    p50_ms: Optional[float] = Field(default=None, description="Медиана задержки.")
+    p95_ms: Optional[float] = Field(default=None, description="95-й перцентиль задержки.")
+    p99_ms: Optional[float] = Field(default=None, description="99-й перцентиль задержки.")
@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+
+# ========================== Heartbeat Schemas ========================== #
+
+class HeartbeatCreate(BaseModel):
+    """
+    Схема создания heartbeat-монитора.
+
+    Монитор не проверяется воркером: задача сама вызывает адрес пинга не реже чем раз
+    в `interval_s` секунд. Пропуск фиксируется, если пинга нет дольше `interval_s + grace_s`.
+    """
+    name: str = Field(min_length=1, max_length=200, description="Имя монитора, отображаемое пользователю.")
+    interval_s: int = Field(default=3600, ge=10, le=86400, description="Ожидаемый период пингов, в секундах.")
+    grace_s: int = Field(default=60, ge=0, le=86400, description="Допустимое опоздание пинга, в секундах.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class HeartbeatUpdate(BaseModel):
+    """Схема обновления heartbeat-монитора; все поля опциональны."""
+    name: Optional[str] = Field(default=None, min_length=1, max_length=200, description="Новое имя монитора.")
+    interval_s: Optional[int] = Field(default=None, ge=10, le=86400, description="Ожидаемый период пингов, в секундах.")
+    grace_s: Optional[int] = Field(default=None, ge=0, le=86400, description="Допустимое опоздание пинга, в секундах.")
+    is_paused: Optional[bool] = Field(default=None, description="Флаг паузы: пинги принимаются, пропуски не фиксируются.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class HeartbeatOut(BaseModel):
+    """
+    Heartbeat-монитор с адресом пинга.
+
+    `ping_url` содержит секретный токен: любой, кто его знает, может отмечать задачу живой.
+    Поддерживаются GET, POST и HEAD; при утечке токен заменяется через /token.
+    """
+    id: int = Field(description="Уникальный идентификатор монитора.")
+    user_id: int = Field(description="ID пользователя-владельца монитора.")
+    name: str = Field(description="Имя монитора.")
+    ping_url: str = Field(description="Адрес пинга (GET, POST или HEAD).")
+    interval_s: int = Field(description="Ожидаемый период пингов, в секундах.")
+    grace_s: int = Field(description="Допустимое опоздание пинга, в секундах.")
+    is_paused: bool = Field(description="Флаг паузы.")
+    last_ping_at: Optional[datetime] = Field(
+        default=None, description="Последний сохранённый пинг (с задержкой до нескольких секунд); пусто — пингов не было."
+    )
+    down: bool = Field(description="Последний срок пропущен, пинга после него не было.")
+    created_at: datetime = Field(description="Дата и время создания монитора.")
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, AwareDatetime, Field, ConfigDict
+from datetime import datetime
+from typing import Literal, Optional
+
+
+# ========================== Maintenance window Schemas ========================== #
+
+class MaintenanceWindowCreate(BaseModel):
+    """
+    Схема создания окна обслуживания.
+
+    Без `monitor_id` окно действует для всех мониторов пользователя. Для повторяющегося
+    окна `starts_at`/`ends_at` задают первое вхождение; длительность не больше периода.
+    """
+    monitor_id: Optional[int] = Field(default=None, description="ID монитора; пусто — все мониторы пользователя.")
+    starts_at: AwareDatetime = Field(description="Начало окна (с часовым поясом).")
+    ends_at: AwareDatetime = Field(description="Конец окна (с часовым поясом).")
+    recurrence: Optional[Literal["daily", "weekly"]] = Field(default=None, description="Повторение; пусто — разовое окно.")
+    until: Optional[AwareDatetime] = Field(default=None, description="Последнее вхождение начинается не позже; только для повторяющихся.")
+    mode: Literal["skip", "tag"] = Field(
+        default="skip", description="skip — не проверять; tag — проверять, помечать результаты и не оповещать."
+    )
+    reason: Optional[str] = Field(default=None, max_length=200, description="Комментарий.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class MaintenanceWindowOut(BaseModel):
+    """Окно обслуживания."""
+    id: int = Field(description="Уникальный идентификатор окна.")
+    monitor_id: Optional[int] = Field(default=None, description="ID монитора; пусто — все мониторы пользователя.")
+    starts_at: datetime = Field(description="Начало окна (первого вхождения).")
+    ends_at: datetime = Field(description="Конец окна (первого вхождения).")
+    recurrence: Optional[Literal["daily", "weekly"]] = Field(default=None, description="Повторение.")
+    until: Optional[datetime] = Field(default=None, description="Граница повторений.")
+    mode: Literal["skip", "tag"] = Field(description="Режим окна.")
+    reason: Optional[str] = Field(default=None, description="Комментарий.")
+    created_at: datetime = Field(description="Дата и время создания окна.")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,10 @@
-from pydantic import BaseModel, AnyHttpUrl, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, AnyHttpUrl, Field, ConfigDict, TypeAdapter, model_validator
+from datetime import datetime
+from typing import List, Literal, Optional, TypedDict
+
+from app.core.targets import parse_dns, parse_tcp
+
+_http_url = TypeAdapter(AnyHttpUrl)
 
 
 # ========================== Monitor Schemas ========================== #
@@ -10,16 +15,41 @@ class MonitorCreate(BaseModel):
 
     Используется при добавлении нового URL для проверки.
     Содержит все параметры, которые задаёт пользователь вручную.
+
+    Для `tcp` и `dns` в `url` — цель проверки (`tcp://host:port`, `dns:name?type=A`,
+    `dns://server/name?type=MX`), `method` и `expected_status` не используются.
     """
     name: str = Field(min_length=1, max_length=200, description="Имя монитора, отображаемое пользователю.")
-    url: AnyHttpUrl = Field(description="Проверяемый URL-адрес.")
+    url: str = Field(max_length=2048, description="Проверяемый URL-адрес (для tcp/dns — цель проверки).")
     method: str = Field(default="GET", description="HTTP-метод, используемый при проверке.")
     expected_status: int = Field(default=200, description="HTTP-статус, считающийся успешным.")
     interval_s: int = Field(default=60, description="Интервал проверки в секундах.")
-    timeout_ms: int = Field(default=2500, description="Тайм-аут HTTP-запроса в миллисекундах.")
+    timeout_ms: int = Field(default=2500, description="Тайм-аут проверки в миллисекундах.")
+    kind: Literal["http", "tcp", "dns"] = Field(default="http", description="Тип проверки.")
+    expect: Optional[str] = Field(
+        default=None,
+        max_length=1000,
+        description="tcp: подстрока, которую должен содержать баннер сервера; "
+                    "dns: ожидаемые записи через запятую (порядок не важен). Пусто — без сравнения.",
+    )
 
     model_config = ConfigDict(extra="forbid")
 
+    @model_validator(mode="after")
+    def _check_target(self):
+        try:
+            if self.kind == "tcp":
+                parse_tcp(self.url)
+            elif self.kind == "dns":
+                parse_dns(self.url)
+            else:
+                self.url = str(_http_url.validate_python(self.url))
+        except ValueError as e:
+            raise ValueError(f"Invalid {self.kind} target: {e}") from None
+        if self.kind == "http" and self.expect:
+            raise ValueError("expect applies to tcp and dns monitors only")
+        return self
+
 
 class MonitorOut(MonitorCreate):
     """
@@ -29,10 +59,41 @@ class MonitorOut(MonitorCreate):
     """
     id: int = Field(description="Уникальный идентификатор монитора.")
     user_id: int = Field(default=None, description="ID пользователя-владельца монитора.")
+    kind: Literal["http", "tcp", "dns", "heartbeat"] = Field(
+        default="http", description="Тип монитора: http, tcp, dns — проверяются воркером, heartbeat — присылает пинги сам."
+    )
 
     model_config = ConfigDict(extra="forbid", from_attributes=True)
 
 
+class MonitorLatestCheck(BaseModel):
+    """Последняя проверка монитора (встраивается в список мониторов)."""
+    ts: datetime = Field(description="Время выполнения проверки.")
+    ok: bool = Field(description="Флаг успешности проверки.")
+    status_code: int = Field(description="HTTP-код ответа.")
+    latency_ms: int = Field(description="Задержка отклика сервера, в миллисекундах.")
+    error: Optional[str] = Field(default=None, description="Описание ошибки, если она возникла.")
+
+
+class MonitorWithStatus(MonitorOut):
+    """
+    Монитор вместе с последним статусом.
+
+    Используется на дашборде: одна страница списка — один запрос к БД.
+    """
+    is_paused: bool = Field(description="Флаг паузы мониторинга.")
+    created_at: datetime = Field(description="Дата и время создания монитора.")
+    last_check: Optional[MonitorLatestCheck] = Field(default=None, description="Последняя проверка, если была.")
+    latency_anomaly: bool = Field(default=False, description="Задержка сейчас аномально высока (последнее событие — latency_regression).")
+    suppressed: bool = Field(default=False, description="Проверки приостановлены: недоступен родительский монитор.")
+
+
+class MonitorPage(BaseModel):
+    """Страница списка мониторов с курсором на следующую страницу."""
+    items: List[MonitorWithStatus]
+    next_cursor: Optional[str] = Field(default=None, description="Курсор следующей страницы; None — это последняя.")
+
+
 class MonitorUpdate(BaseModel):
     """
     Схема обновления монитора.
@@ -44,6 +105,126 @@ class MonitorUpdate(BaseModel):
     expected_status: Optional[int] = Field(default=200, description="Ожидаемый статус ответа.")
     interval_s: Optional[int] = Field(default=60, description="Интервал проверки в секундах.")
     timeout_ms: Optional[int] = Field(default=2500, description="Тайм-аут HTTP-запроса в миллисекундах.")
+    expect: Optional[str] = Field(default=None, max_length=1000, description="Ожидаемый баннер / DNS-записи (tcp, dns); пустая строка — без сравнения.")
     is_paused: Optional[bool] = Field(default=False, description="Флаг паузы мониторинга.")
 
-    model_config = ConfigDict(extra="forbid")
\ No newline at end of file
+    model_config = ConfigDict(extra="forbid")
+
+
+# ========================== Events ========================== #
+
+class MonitorEventOut(BaseModel):
+    """
+    Событие монитора, обнаруженное воркером проверок.
+
+    `latency_regression` — задержка устойчиво выше обычной, `latency_recovered` — снова в норме;
+    `suppressed` — проверки приостановлены из-за недоступного родителя, `released` — возобновлены
+    (поля задержки у них пустые).
+    """
+    id: int = Field(description="Уникальный идентификатор события.")
+    monitor_id: int = Field(description="ID монитора.")
+    ts: datetime = Field(description="Время проверки, на которой событие было зафиксировано.")
+    kind: Literal["latency_regression", "latency_recovered", "suppressed", "released"] = Field(description="Тип события.")
+    latency_ms: Optional[int] = Field(default=None, description="Задержка этой проверки, в миллисекундах.")
+    baseline_ms: Optional[int] = Field(default=None, description="Обычная задержка монитора на момент события, в миллисекундах.")
+    score: Optional[float] = Field(default=None, description="Отклонение от нормы в стандартных отклонениях (по логарифму задержки).")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ========================== Dependencies ========================== #
+
+class MonitorDependenciesUpdate(BaseModel):
+    """
+    Родители монитора (заменяют прежний набор).
+
+    Пока любой родитель подтверждённо недоступен, монитор не проверяется и не поднимает
+    оповещений. Циклы запрещены.
+    """
+    parent_ids: List[int] = Field(max_length=50, description="ID мониторов, от которых зависит этот; пусто — без зависимостей.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class MonitorDependenciesOut(BaseModel):
+    """Прямые зависимости монитора."""
+    parent_ids: List[int] = Field(description="ID родительских мониторов.")
+    child_ids: List[int] = Field(description="ID мониторов, зависящих от этого.")
+
+
+# ========================== Bulk sync ========================== #
+
+class MonitorSyncItem(MonitorCreate):
+    """
+    Элемент желаемого набора мониторов для массовой синхронизации.
+
+    Ключ синхронизации — `name`: мониторы с тем же именем обновляются, новые создаются.
+    """
+    is_paused: bool = Field(default=False, description="Флаг паузы мониторинга.")
+
+
+class MonitorSyncResult(BaseModel):
+    """Результат синхронизации одного монитора."""
+    name: str
+    action: Literal["created", "updated", "unchanged", "deleted", "paused", "kept"]
+    id: Optional[int] = None
+
+
+class MonitorSyncReport(BaseModel):
+    """Отчёт массовой синхронизации: сводка по действиям и результат по каждому монитору."""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    paused: int = 0
+    kept: int = 0
+    items: List[MonitorSyncResult]
+
+
+
+# ========================== Fast serialization rows ========================== #
+# Плоские схемы для сериализации строк БД сразу в JSON без повторной валидации
+# (см. app/api/fast_json.py). Порядок ключей совпадает с порядком полей в *Out-схемах.
+
+class MonitorRow(TypedDict):
+    name: str
+    url: str
+    method: str
+    expected_status: int
+    interval_s: int
+    timeout_ms: int
+    kind: str
+    expect: Optional[str]
+    id: int
+    user_id: int
+
+
+class MonitorLatestCheckRow(TypedDict):
+    ts: datetime
+    ok: bool
+    status_code: int
+    latency_ms: int
+    error: Optional[str]
+
+
+class MonitorWithStatusRow(MonitorRow):
+    is_paused: bool
+    created_at: datetime
+    last_check: Optional[MonitorLatestCheckRow]
+    latency_anomaly: bool
+    suppressed: bool
+
+
+class MonitorEventRow(TypedDict):
+    id: int
+    monitor_id: int
+    ts: datetime
+    kind: str
+    latency_ms: Optional[int]
+    baseline_ms: Optional[int]
+    score: Optional[float]
+
+
+class MonitorPageRow(TypedDict):
+    items: List[MonitorWithStatusRow]
+    next_cursor: Optional[str]
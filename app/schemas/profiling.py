@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+# ========================== Profiling Schemas ========================== #
+
+class ProfileOut(BaseModel):
+    """Сохранённый профиль запроса (сам профиль — GET /debug/profiles/{id})."""
+    id: str = Field(description="Идентификатор профиля (он же в заголовке X-Profile-Id ответа).")
+    created_at: float = Field(description="Время сохранения, unix-время.")
+    trigger: Literal["header", "sample"] = Field(description="header — по заголовку X-Profile; sample — случайная выборка.")
+    method: str = Field(description="HTTP-метод запроса.")
+    path: str = Field(description="Путь запроса.")
+    route: str = Field(description="Шаблон маршрута, обработавшего запрос.")
+    status: int = Field(description="Код ответа.")
+    duration_ms: float = Field(description="Длительность обработки под профилировщиком, мс.")
+    queries: int = Field(description="Число запросов к БД (их тексты и время — в ?format=json).")
+
+
+class SlowQueryOut(BaseModel):
+    """Медленный запрос к БД."""
+    ts: float = Field(description="Время завершения, unix-время.")
+    route: Optional[str] = Field(default=None, description="Метод и маршрут HTTP-запроса; пусто — вне запроса.")
+    ms: float = Field(description="Длительность выполнения, мс.")
+    statement: str = Field(description="Текст SQL (обрезан до 2000 символов).")
+    params: str = Field(description="Типы параметров без значений; `N x (...)` — пакетное выполнение.")
@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import List, Literal, Optional
+
+# slug попадает в публичный URL: только строчные латинские буквы, цифры и дефисы
+SLUG_PATTERN = r"^[a-z0-9](?:[a-z0-9-]{0,98}[a-z0-9])?$"
+
+
+# ========================== Status page Schemas ========================== #
+
+class StatusPageCreate(BaseModel):
+    """
+    Схема создания страницы статуса.
+
+    Страница показывает статусы перечисленных мониторов пользователя в заданном порядке.
+    """
+    slug: str = Field(pattern=SLUG_PATTERN, description="Публичный идентификатор страницы: /status/<slug>.")
+    title: str = Field(min_length=1, max_length=200, description="Заголовок страницы.")
+    monitor_ids: List[int] = Field(
+        description="ID мониторов пользователя в порядке вывода (не больше STATUS_PAGE_MAX_MONITORS)."
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatusPageUpdate(BaseModel):
+    """Схема обновления страницы статуса; все поля опциональны, slug не меняется."""
+    title: Optional[str] = Field(default=None, min_length=1, max_length=200, description="Новый заголовок.")
+    monitor_ids: Optional[List[int]] = Field(default=None, description="Новый список мониторов.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatusPageOut(BaseModel):
+    """Страница статуса в кабинете владельца."""
+    id: int = Field(description="Уникальный идентификатор страницы.")
+    slug: str = Field(description="Публичный идентификатор страницы.")
+    title: str = Field(description="Заголовок страницы.")
+    monitor_ids: List[int] = Field(description="ID мониторов в порядке вывода.")
+    snapshot_version: int = Field(description="Версия опубликованного снимка.")
+    created_at: datetime = Field(description="Дата и время создания страницы.")
+
+
+# ========================== Public snapshot ========================== #
+
+MonitorPublicStatus = Literal["operational", "degraded", "down", "paused", "unknown"]
+
+
+class StatusPageMonitorOut(BaseModel):
+    """Монитор на публичной странице: только имя и статус (URL и задержки не раскрываются)."""
+    name: str = Field(description="Имя монитора.")
+    status: MonitorPublicStatus = Field(
+        description="operational — работает; degraded — задержка аномально высока; down — недоступен; "
+                    "paused — мониторинг на паузе; unknown — проверок ещё не было."
+    )
+
+
+class StatusPageSnapshot(BaseModel):
+    """
+    Публичная страница статуса (GET /status/{slug}).
+
+    Формируется заранее при каждом изменении статусов и отдаётся из кэша как готовый JSON.
+    """
+    slug: str = Field(description="Публичный идентификатор страницы.")
+    title: str = Field(description="Заголовок страницы.")
+    status: Literal["operational", "degraded", "partial_outage", "major_outage"] = Field(
+        description="Общий статус: major_outage — недоступны все активные мониторы, partial_outage — часть."
+    )
+    updated_at: datetime = Field(description="Время формирования снимка.")
+    monitors: List[StatusPageMonitorOut] = Field(description="Мониторы в порядке вывода.")
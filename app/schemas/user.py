@@ -37,4 +37,13 @@ class UserOut(BaseModel):
     email: EmailStr
     tg_id: Optional[int] = None
     is_active: bool
-    model_config = ConfigDict(extra="forbid", from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(extra="forbid", from_attributes=True)
+
+
+class UserQuotaOut(BaseModel):
+    """Квоты пользователя на мониторы и текущее использование."""
+    max_monitors: int = Field(description="Максимум мониторов.")
+    min_interval_s: int = Field(description="Минимальный интервал проверки, в секундах.")
+    probes_per_s: float = Field(description="Бюджет проверок в секунду по активным мониторам.")
+    monitors: int = Field(description="Мониторов сейчас (включая приостановленные).")
+    used_probes_per_s: float = Field(description="Проверок в секунду нужно активным мониторам сейчас.")
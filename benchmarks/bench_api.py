@@ -0,0 +1,329 @@
+"""
+API hot-path benchmark suite with per-route SQL statement budgets.
+
+Drives the real FastAPI app (`main.app`, lifespan included) in-process through the httpx
+ASGI transport against the Postgres from `.env`. A throwaway user is registered, given
+`--monitors` monitors with `--checks` history rows each and a status page, and deleted at
+the end (the `request_logs` rows the middleware wrote are left in place).
+
+Scenarios cover auth (login, refresh, /api/users/me), monitor CRUD, list pages, history reads,
+the logging middleware on its own (POST /checks/stub) and the public status page. For
+each one: requests/s, p50/p99 latency and the number of SQL statements per request, counted
+with a SQLAlchemy `before_cursor_execute` hook and attributed to the request through a
+context variable (so concurrent requests do not mix, and the middleware's INSERT counts).
+
+Fails (exit status 1) when:
+    - a request returns an unexpected status;
+    - a route's median number of statements exceeds its budget in `SCENARIOS` (catches N+1
+      regressions; the max is only reported, as it includes periodic reloads of expired
+      caches such as the authenticated user's snapshot);
+    - p50 or throughput (best of `--rounds` for repeatable scenarios) is worse than the
+      stored baseline by more than `--threshold`,
+      or p99 by more than `--p99-threshold`.
+
+Baselines are machine-specific: record them on the machine that runs the comparison with
+`--update-baseline` (written to `benchmarks/baselines/api.json`).
+
+Usage:
+    python -m benchmarks.bench_api [--requests 300] [--concurrency 10] [--monitors 200] [--checks 500]
+                                   [--rounds 3] [--only lists,history] [--threshold 0.35] [--p99-threshold 1.0]
+                                   [--update-baseline]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+# Бенчмарк логинится сотни раз с одного адреса: ограничение частоты здесь не измеряется
+os.environ.setdefault("LOGIN_RATE_LIMIT_BACKEND", "memory")
+os.environ.setdefault("LOGIN_RATE_PER_ACCOUNT", "1000000")
+os.environ.setdefault("LOGIN_RATE_PER_IP", "1000000")
+
+import httpx
+from sqlalchemy import event, text
+
+import main
+from app.core.db import get_engine, get_replicas, get_sessionmaker
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "api.json"
+PASSWORD = "bench-password"
+
+# SQL-запросы, выполненные в контексте текущего HTTP-запроса (None — вне измерения)
+_statements: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar("bench_statements", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    box = _statements.get()
+    if box is not None:
+        box[0] += 1
+
+
+@dataclass
+class Ctx:
+    """State shared by the scenarios: the bench user and the ids they operate on."""
+    headers: dict[str, str]
+    email: str
+    refresh_token: str
+    monitor_ids: list[int]
+    slug: str
+    checks_before: str
+    overview_cursor: str | None = None
+    created: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    budget: int                                   # медиана SQL-запросов на запрос, включая INSERT логирования
+    request: Callable[[Ctx, int], tuple[str, str, dict[str, Any]]]  # (ctx, i) -> (method, url, httpx kwargs)
+    expect: int = 200
+    idempotent: bool = True                       # можно прогревать и повторять
+    requests: int | None = None                   # своё число запросов (медленные сценарии)
+    concurrency: int | None = None
+    on_response: Callable[[Ctx, httpx.Response], None] | None = None
+
+
+def _pick(ctx: Ctx, i: int) -> int:
+    return ctx.monitor_ids[i % len(ctx.monitor_ids)]
+
+
+SCENARIOS = [
+    # логин: хэш пароля в пуле из HASH_WORKERS потоков — мало запросов и низкий параллелизм
+    Scenario("auth.login", 2, lambda c, i: ("POST", "/auth/login", {"data": {"username": c.email, "password": PASSWORD}}),
+             requests=40, concurrency=2),
+    Scenario("auth.refresh", 2, lambda c, i: ("POST", "/auth/refresh", {"json": {"refresh_token": c.refresh_token}})),
+    Scenario("users.me", 1, lambda c, i: ("GET", "/api/users/me", {"headers": c.headers})),
+    Scenario("monitors.create", 12,
+             lambda c, i: ("POST", "/api/monitors/", {"headers": c.headers, "json": {
+                 "name": f"bench-new-{i:05d}", "url": f"https://bench.invalid/new/{i}"}}),
+             expect=201, idempotent=False, on_response=lambda c, r: c.created.append(r.json()["id"])),
+    Scenario("monitors.get", 3, lambda c, i: ("GET", f"/api/monitors/{_pick(c, i)}", {"headers": c.headers})),
+    Scenario("monitors.patch", 11,
+             lambda c, i: ("PATCH", f"/api/monitors/{_pick(c, i)}", {"headers": c.headers, "json": {
+                 "name": f"bench-{i % len(c.monitor_ids):05d}", "interval_s": 60 + 60 * (i % 2)}})),
+    Scenario("monitors.delete", 9, lambda c, i: ("DELETE", f"/api/monitors/{c.created[i]}", {"headers": c.headers}),
+             expect=204, idempotent=False),
+    Scenario("lists.monitors", 3, lambda c, i: ("GET", "/api/monitors/?limit=50", {"headers": c.headers})),
+    Scenario("lists.overview", 3, lambda c, i: ("GET", "/api/monitors/overview?limit=50", {"headers": c.headers})),
+    Scenario("lists.overview_next", 3,
+             lambda c, i: ("GET", f"/api/monitors/overview?limit=50&cursor={c.overview_cursor}", {"headers": c.headers})),
+    Scenario("lists.overview_failing", 3,
+             lambda c, i: ("GET", "/api/monitors/overview?limit=50&failing=true", {"headers": c.headers})),
+    Scenario("history.checks", 3, lambda c, i: ("GET", f"/checks/{_pick(c, i)}?limit=100", {"headers": c.headers})),
+    Scenario("history.checks_before", 3,
+             lambda c, i: ("GET", f"/checks/{_pick(c, i)}", {"headers": c.headers,
+                                                                 "params": {"before": c.checks_before, "limit": 100}})),
+    Scenario("history.heatmap", 2, lambda c, i: ("GET", f"/checks/{_pick(c, i)}/heatmap", {"headers": c.headers})),
+    Scenario("history.events", 3, lambda c, i: ("GET", f"/api/monitors/{_pick(c, i)}/events", {"headers": c.headers})),
+    Scenario("middleware.stub", 1, lambda c, i: ("POST", "/checks/stub", {})),
+    Scenario("status.public", 0, lambda c, i: ("GET", f"/status/{c.slug}", {})),
+]
+
+
+async def timed(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple[httpx.Response, float, int]:
+    """One request: (response, latency ms, SQL statements it ran)."""
+    box = [0]
+    token = _statements.set(box)
+    t0 = time.perf_counter()
+    try:
+        r = await client.request(method, url, **kwargs)
+    finally:
+        _statements.reset(token)
+    return r, (time.perf_counter() - t0) * 1000, box[0]
+
+
+async def register(client: httpx.AsyncClient) -> tuple[str, dict]:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    tg_id = random.randrange(1_000_000_000, 2**31 - 1)
+    r = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "tg_id": tg_id})
+    r.raise_for_status()
+    return email, r.json()
+
+
+async def seed(client: httpx.AsyncClient, email: str, tokens: dict, args: argparse.Namespace) -> Ctx:
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    async with get_sessionmaker()() as s:
+        # квоты не должны ограничивать размер прогона
+        await s.execute(text(
+            "UPDATE users SET quota_max_monitors = :n, quota_probes_per_s = :rate WHERE email = :email"
+        ), {"n": 10 * (args.monitors + args.requests), "rate": float(args.monitors + args.requests), "email": email})
+        await s.commit()
+
+    items = [{"name": f"bench-{i:05d}", "url": f"https://bench.invalid/{i}"} for i in range(args.monitors)]
+    r = await client.put("/api/monitors/sync", json=items, headers=headers)
+    r.raise_for_status()
+    ids = {item["name"]: item["id"] for item in r.json()["items"]}
+    monitor_ids = [ids[item["name"]] for item in items]
+
+    async with get_sessionmaker()() as s:
+        # история: каждая 17-я проверка неуспешна, задержки — псевдослучайные 20..420 мс
+        await s.execute(text(
+            "INSERT INTO checks (monitor_id, ts, ok, status_code, latency_ms) "
+            "SELECT m.id, now() - g * interval '1 minute', g % 17 <> 0, CASE WHEN g % 17 = 0 THEN 500 ELSE 200 END, "
+            "20 + (m.id * 7919 + g * 104729) % 400 "
+            "FROM monitors m, generate_series(1, :n) g WHERE m.id = ANY(:ids)"
+        ), {"n": args.checks, "ids": monitor_ids})
+        await s.execute(text("ANALYZE checks"))
+        await s.commit()
+
+    slug = f"bench-{uuid.uuid4().hex[:12]}"
+    r = await client.post("/api/status-pages/", headers=headers,
+                          json={"slug": slug, "title": "Bench", "monitor_ids": monitor_ids[:20]})
+    r.raise_for_status()
+
+    before = (await client.get(f"/checks/{monitor_ids[0]}?limit=100", headers=headers)).json()[-1]["ts"]
+    ctx = Ctx(headers, email, tokens["refresh_token"], monitor_ids, slug, before)
+    ctx.overview_cursor = (await client.get("/api/monitors/overview?limit=50", headers=headers)).json()["next_cursor"]
+    return ctx
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Ctx, sc: Scenario, args: argparse.Namespace) -> dict:
+    n = min(sc.requests or args.requests, args.requests)
+    if sc.name == "monitors.delete":
+        n = len(ctx.created)
+    if sc.idempotent:
+        for i in range(min(5, n)):  # прогрев: кэши пользователя, снимков, планы запросов
+            method, url, kwargs = sc.request(ctx, i)
+            await client.request(method, url, **kwargs)
+
+    lat: list[float] = []
+    statements: list[int] = []
+    bad: list[str] = []
+    it = iter(range(n))
+
+    async def worker() -> None:
+        for i in it:
+            method, url, kwargs = sc.request(ctx, i)
+            r, ms, sql = await timed(client, method, url, **kwargs)
+            if r.status_code != sc.expect:
+                bad.append(f"{r.status_code} {r.text[:100]}")
+                continue
+            if sc.on_response is not None:
+                sc.on_response(ctx, r)
+            lat.append(ms)
+            statements.append(sql)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(sc.concurrency or args.concurrency)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "n": len(lat),
+        "rps": round(len(lat) / elapsed, 1) if lat else 0.0,
+        "p50_ms": round(statistics.median(lat), 2) if lat else 0.0,
+        "p99_ms": round(_pct(lat, 0.99), 2) if lat else 0.0,
+        "sql_p50": int(statistics.median_low(statements)) if statements else 0,
+        "sql_max": max(statements, default=0),
+        "errors": bad,
+    }
+
+
+def best_of(a: dict, b: dict) -> dict:
+    # лучший из раундов: на общей машине шум только замедляет, поэтому берётся минимум
+    return {
+        "n": a["n"] + b["n"],
+        "rps": max(a["rps"], b["rps"]),
+        "p50_ms": min(a["p50_ms"], b["p50_ms"]),
+        "p99_ms": min(a["p99_ms"], b["p99_ms"]),
+        "sql_p50": max(a["sql_p50"], b["sql_p50"]),
+        "sql_max": max(a["sql_max"], b["sql_max"]),
+        "errors": a["errors"] + b["errors"],
+    }
+
+
+def compare(name: str, cur: dict, base: dict | None, args: argparse.Namespace) -> list[str]:
+    if not base:
+        return []
+    out = []
+    if cur["p50_ms"] > base["p50_ms"] * (1 + args.threshold):
+        out.append(f"p50 {cur['p50_ms']:.2f}ms vs {base['p50_ms']:.2f}ms")
+    if cur["p99_ms"] > base["p99_ms"] * (1 + args.p99_threshold):
+        out.append(f"p99 {cur['p99_ms']:.2f}ms vs {base['p99_ms']:.2f}ms")
+    if cur["rps"] < base["rps"] / (1 + args.threshold):
+        out.append(f"{cur['rps']:.0f} req/s vs {base['rps']:.0f}")
+    return out
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    engines = [get_engine(), *get_replicas().engines]
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    only = set(filter(None, args.only.split(","))) if args.only else None
+    scenarios = [sc for sc in SCENARIOS if only is None or sc.name in only or sc.name.split(".")[0] in only]
+    if any(sc.name == "monitors.delete" for sc in scenarios) and not any(sc.name == "monitors.create" for sc in scenarios):
+        scenarios = [sc for sc in scenarios if sc.name != "monitors.delete"]
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+
+    results: dict[str, dict] = {}
+    failures: list[str] = []
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            email, tokens = await register(client)
+            try:
+                ctx = await seed(client, email, tokens, args)
+                print(f"{'scenario':<24} {'n':>5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'sql p50/max/budget':>18}  vs baseline")
+                for sc in scenarios:
+                    res = await run_scenario(client, ctx, sc, args)
+                    for _ in range(args.rounds - 1 if sc.idempotent else 0):
+                        res = best_of(res, await run_scenario(client, ctx, sc, args))
+                    results[sc.name] = {k: res[k] for k in ("rps", "p50_ms", "p99_ms")}
+                    problems = compare(sc.name, res, baseline.get(sc.name), args)
+                    if res["sql_p50"] > sc.budget:
+                        problems.append(f"{res['sql_p50']} SQL statements > budget {sc.budget}")
+                    if res["errors"]:
+                        problems.append(f"{len(res['errors'])} unexpected responses, e.g. {res['errors'][0]}")
+                    failures += [f"{sc.name}: {p}" for p in problems]
+                    verdict = "n/a" if sc.name not in baseline else "ok"
+                    print(f"{sc.name:<24} {res['n']:5d} {res['rps']:8.0f} {res['p50_ms']:8.2f} {res['p99_ms']:8.2f} "
+                          f"{f"{res['sql_p50']}/{res['sql_max']}/{sc.budget}":>18}  {'; '.join(problems) if problems else verdict}")
+            finally:
+                await client.delete("/api/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    for engine in engines:
+        await engine.dispose()
+
+    if args.update_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        merged = {**baseline, **results}
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+        print(f"baseline written to {BASELINE_PATH}")
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    return 0
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients per scenario")
+    parser.add_argument("--monitors", type=int, default=200, help="monitors of the bench user")
+    parser.add_argument("--checks", type=int, default=500, help="history rows per monitor")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per read scenario, best one is reported")
+    parser.add_argument("--only", default="", help="comma-separated scenarios or groups (e.g. lists,history.checks)")
+    parser.add_argument("--threshold", type=float, default=0.35, help="allowed p50 / throughput regression")
+    parser.add_argument("--p99-threshold", type=float, default=1.0, help="allowed p99 regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,107 @@
+"""
+Dependency holds: incremental subtree propagation vs recomputing the whole graph.
+
+Pure in-process benchmark (no database). Builds `--users` random DAGs (each user owns
+`--monitors / --users` monitors; every non-root has 1-2 parents among earlier monitors),
+then flips random parents down and up again and reports:
+    - build:  time to load all edges (`DependencyGraph.replace_all`);
+    - flip:   µs per `set_down` (what the prober does on a parent's state change), with the
+              average number of held/released monitors per flip;
+    - full:   µs per full recompute (what a stateless "re-derive everything" would cost);
+    - user:   µs per per-user reload (`replace_users`, after `monitors_changed`);
+    - gateway: one root with `--fanout` children going down and up;
+with the incremental state cross-checked against the full recompute after every flip.
+
+Usage:
+    python -m benchmarks.bench_dependencies [--users 500] [--monitors 100000] [--flips 2000] [--fanout 5000]
+"""
+
+import argparse
+import random
+import time
+
+from app.prober.dependencies import DependencyGraph
+
+
+def make_edges(args: argparse.Namespace, rnd: random.Random) -> list[tuple[int, int, int]]:
+    per_user = args.monitors // args.users
+    edges = []
+    for user_id in range(args.users):
+        base = user_id * per_user
+        for i in range(1, per_user):
+            if rnd.random() < 0.2:
+                continue  # корень
+            for parent in {rnd.randrange(i) for _ in range(rnd.choice((1, 1, 2)))}:
+                edges.append((user_id, base + parent, base + i))
+    return edges
+
+
+def expected_suppressed(children: dict[int, list[int]], down: set[int]) -> set[int]:
+    out: set[int] = set()
+    stack = [n for n in down if n in children]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in out:
+                out.add(child)
+                stack.append(child)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--monitors", type=int, default=100_000)
+    parser.add_argument("--flips", type=int, default=2_000)
+    parser.add_argument("--fanout", type=int, default=5_000)
+    args = parser.parse_args()
+    rnd = random.Random(1)
+    edges = make_edges(args, rnd)
+
+    graph = DependencyGraph()
+    t0 = time.perf_counter()
+    graph.replace_all(edges, ())
+    print(f"build:   {(time.perf_counter() - t0) * 1000:8.1f} ms for {len(edges)} edges")
+
+    children: dict[int, list[int]] = {}
+    for _, parent, child in edges:
+        children.setdefault(parent, []).append(child)
+    parents = sorted(children)
+    down: set[int] = set()
+    moved = mismatches = 0
+    dt_flip = dt_full = 0.0
+    for _ in range(args.flips):
+        node = rnd.choice(parents)
+        state = node not in down
+        t0 = time.perf_counter()
+        moved += len(graph.set_down(node, state))
+        dt_flip += time.perf_counter() - t0
+        (down.add if state else down.discard)(node)
+        t0 = time.perf_counter()
+        expected = expected_suppressed(children, down)
+        dt_full += time.perf_counter() - t0
+        mismatches += graph.suppressed != expected
+    print(f"flip:    {dt_flip / args.flips * 1e6:8.1f} µs ({moved / args.flips:.1f} monitors held/released per flip)")
+    print(f"full:    {dt_full / args.flips * 1e6:8.1f} µs per recompute ({mismatches} mismatches)")
+
+    # per-user reload (monitors_changed) with parents already down must land in the same state
+    by_user: dict[int, list[tuple[int, int, int]]] = {}
+    for e in edges:
+        by_user.setdefault(e[0], []).append(e)
+    t0 = time.perf_counter()
+    for user_id in range(100):
+        graph.replace_users([user_id], by_user.get(user_id, []), down)
+    dt_user = (time.perf_counter() - t0) / 100
+    print(f"user:    {dt_user * 1e6:8.1f} µs per user reload "
+          f"({int(graph.suppressed != expected_suppressed(children, down))} mismatches)")
+
+    gateway = args.monitors + 1
+    fan = [(args.users, gateway, gateway + 1 + i) for i in range(args.fanout)]
+    graph.replace_users([], fan, ())
+    t0 = time.perf_counter()
+    held = graph.set_down(gateway, True)
+    released = graph.set_down(gateway, False)
+    print(f"gateway: {(time.perf_counter() - t0) * 1000:8.2f} ms to hold and release {len(held)}/{len(released)} children")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Fair-share probe scheduling under overload: due-time order vs weighted fair queuing.
+
+Pure in-process simulation of one lane on a virtual clock (no database, no network).
+Two heavy users own `--heavy` and `--heavy // 2` monitors at 10 s, `--users` small users
+own `--per-user` monitors at 30 s each; the worker starts at most `--capacity` probes per
+second, well below the heavy users' demand alone. Probes complete instantly and are
+rescheduled at `start + interval_s`, like in the prober. Reports, per strategy, the start
+lag (start - due) of each class over the second half of the run, its share of the started
+probes and the scheduler cost per started probe:
+    fifo — earliest due first across everyone (all monitors under one user, i.e. the
+           scheduler before per-user queuing);
+    fair — equal weights (default quotas): small users are served in full, the heavy ones
+           split the rest evenly;
+    heavy×4 — the first heavy user has a 4× larger probe budget, hence weight.
+
+Usage:
+    python -m benchmarks.bench_fair_queue [--heavy 50000] [--users 200] [--per-user 10] [--capacity 1000] [--seconds 120]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.prober.scheduler import MonitorSpec, Scheduler
+
+HEAVY, SECOND = 0, 1
+CLASSES = (("heavy", HEAVY), ("second", SECOND), ("small", None))
+TICK_S = 0.1
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def simulate(args: argparse.Namespace, name: str, one_user: bool, heavy_weight: float) -> None:
+    rnd = random.Random(1)
+    weights = {HEAVY: heavy_weight}
+    sched = Scheduler(weight_of=lambda user_id: weights.get(user_id, 1.0))
+    owner: dict[int, int] = {}
+    mid = 0
+    users = [(HEAVY, args.heavy, 10), (SECOND, args.heavy // 2, 10)]
+    users += [(u, args.per_user, 30) for u in range(2, args.users + 2)]
+    for user_id, count, interval in users:
+        for _ in range(count):
+            mid += 1
+            owner[mid] = user_id
+            spec = MonitorSpec(mid, HEAVY if one_user else user_id, "http://x", "GET", 200, interval, 1000)
+            sched.upsert(spec, rnd.uniform(0, interval))
+
+    per_tick = int(args.capacity * TICK_S)
+    lag: dict[int | None, list[float]] = {HEAVY: [], SECOND: [], None: []}
+    dt = 0.0
+    popped = 0
+    now = 0.0
+    while now < args.seconds:
+        t0 = time.perf_counter()
+        batch = sched.pop_due(now, per_tick)
+        for due, spec in batch:
+            sched.reschedule(spec.id, now + spec.interval_s)
+        dt += time.perf_counter() - t0
+        popped += len(batch)
+        if now >= args.seconds / 2:
+            for due, spec in batch:
+                user_id = owner[spec.id]
+                lag[user_id if user_id in lag else None].append(now - due)
+        now += TICK_S
+
+    total = sum(map(len, lag.values()))
+    for label, key in CLASSES:
+        values = lag[key]
+        print(f"{name:8s} {label:6s}: lag p50 {statistics.median(values) if values else 0:7.2f} s, "
+              f"p99 {_pct(values, 0.99):7.2f} s, {len(values) / max(total, 1):6.1%} of starts")
+    print(f"{name:8s} {dt / max(popped, 1) * 1e6:.2f} µs per started probe")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--heavy", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=1_000)
+    parser.add_argument("--seconds", type=int, default=120)
+    args = parser.parse_args()
+    demand = (args.heavy + args.heavy // 2) / 10 + args.users * args.per_user / 30
+    print(f"demand {demand:.0f} probes/s, capacity {args.capacity} probes/s")
+    simulate(args, "fifo", one_user=True, heavy_weight=1.0)
+    simulate(args, "fair", one_user=False, heavy_weight=1.0)
+    simulate(args, "heavy×4", one_user=False, heavy_weight=4.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Heartbeat ping path: per-ping cost, batched last-seen flush and the prober's timer heap.
+
+    ping   — `--pings` GET /hb/{token} spread over `--monitors` heartbeat monitors, sent
+             straight into `main.app` (lifespan included) as raw ASGI calls: an HTTP client
+             would cost more than the ping itself. Reports µs per ping, pings/s of one
+             process and the SQL statements issued while pinging (warm token cache: 0).
+    flush  — one `LastSeenTable.flush` of `--monitors` distinct pinged monitors (one
+             UPDATE ... FROM unnest), best of 5.
+    timers — `HeartbeatTimers` with `--timers` monitors: arm all, then pop and re-arm all
+             (what the prober does at each deadline), µs per monitor. No database.
+
+A throwaway user owns the heartbeat monitors and is deleted at the end.
+
+Usage:
+    python -m benchmarks.bench_heartbeat [--monitors 1000] [--pings 50000] [--timers 1000000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import event
+
+import main
+from app.api import heartbeat_ping
+from app.core.db import get_engine, get_sessionmaker
+from app.prober.heartbeats import HeartbeatSpec, HeartbeatTimers
+from app.repositories import heartbeats as heartbeats_repo
+from app.repositories import users as users_repo
+
+
+async def seed(count: int) -> tuple[int, list[int], list[str]]:
+    async with get_sessionmaker()() as s:
+        user = await users_repo.create(
+            s, email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            tg_id=random.randrange(1_000_000_000, 2**31 - 1), hashed_password="-",
+        )
+        ids, tokens = [], []
+        for i in range(count):
+            token = heartbeats_repo.new_token()
+            monitor, _ = await heartbeats_repo.create(
+                s, user_id=user.id, name=f"bench-hb-{i:05d}", url=f"http://bench.invalid/hb/{token}",
+                token=token, interval_s=60, grace_s=60,
+            )
+            ids.append(monitor.id)
+            tokens.append(token)
+        await s.commit()
+    return user.id, ids, tokens
+
+
+async def bench_ping(tokens: list[str], pings: int) -> None:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    def scope(token: str) -> dict:
+        path = f"/hb/{token}"
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+
+    scopes = [scope(t) for t in tokens]
+    for sc in scopes:  # прогрев кэша токенов
+        await main.app(dict(sc), receive, send)
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(get_engine().sync_engine, "before_cursor_execute", count)
+    statuses.clear()
+    t0 = time.perf_counter()
+    for i in range(pings):
+        await main.app(dict(scopes[i % len(scopes)]), receive, send)
+    dt = time.perf_counter() - t0
+    event.remove(get_engine().sync_engine, "before_cursor_execute", count)
+
+    bad = sum(1 for st in statuses if st != 200)
+    print(f"ping   : {dt / pings * 1e6:7.1f} µs/ping, {pings / dt:8.0f} pings/s, "
+          f"{statements} SQL statements, {bad} non-200, {len(heartbeat_ping.get_last_seen())} monitors pending")
+
+
+async def bench_flush(ids: list[int]) -> None:
+    best = float("inf")
+    for _ in range(5):
+        now = time.time()
+        for monitor_id in ids:
+            heartbeat_ping.get_last_seen().record(monitor_id, now)
+        t0 = time.perf_counter()
+        await heartbeat_ping.get_last_seen().flush()
+        best = min(best, time.perf_counter() - t0)
+    print(f"flush  : {best * 1000:7.1f} ms for {len(ids)} monitors ({best / len(ids) * 1e6:.1f} µs/monitor)")
+
+
+def bench_timers(count: int) -> None:
+    rnd = random.Random(1)
+    timers = HeartbeatTimers(slack_s=5.0)
+    specs = [HeartbeatSpec(i, i % 1000, rnd.choice((60, 300, 3600)), 60, 0.0) for i in range(count)]
+    t0 = time.perf_counter()
+    for spec in specs:
+        timers.upsert(spec, rnd.uniform(0, spec.interval_s))
+    armed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    popped = 0
+    now = 0.0
+    while popped < count:
+        now += 1.0
+        for spec in timers.pop_due(now, 10_000):
+            timers.arm(spec.id, timers.deadline(spec, now))
+            popped += 1
+    cycled = time.perf_counter() - t0
+    print(f"timers : arm {armed / count * 1e6:.2f} µs, pop+re-arm {cycled / popped * 1e6:.2f} µs per monitor "
+          f"({count} monitors)")
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with main.lifespan(main.app):
+        user_id, ids, tokens = await seed(args.monitors)
+        try:
+            await bench_ping(tokens, args.pings)
+            await bench_flush(ids)
+        finally:
+            async with get_sessionmaker()() as s:
+                await users_repo.delete_by_id(s, user_id=user_id)
+                await s.commit()
+    await get_engine().dispose()
+    bench_timers(args.timers)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--monitors", type=int, default=1_000)
+    parser.add_argument("--pings", type=int, default=50_000)
+    parser.add_argument("--timers", type=int, default=1_000_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
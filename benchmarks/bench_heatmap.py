@@ -0,0 +1,137 @@
+"""
+Latency heatmap benchmark over a large synthetic check history.
+
+Seeds one monitor with `--rows` checks spread over `--days` days (skip with
+`--monitor-id` to reuse a seeded one) and builds the same 1-hour × latency-bucket heatmap
+three ways:
+    - rows:      ORM-style `SELECT ts, latency_ms, ok` + a Python loop (run on the first
+                 `--row-limit` rows and extrapolated linearly — the full run takes minutes);
+    - array_agg: three `array_agg` columns → Python lists → NumPy arrays → same binning;
+    - copy:      binary COPY → `np.frombuffer` → `bincount` (what the endpoint does).
+
+Needs a migrated database (regular DB_* settings). The seeded user is deleted at the end
+unless `--keep` is given.
+
+Usage:
+    python -m benchmarks.bench_heatmap [--rows 10000000] [--days 28] [--row-limit 1000000]
+"""
+
+import argparse
+import asyncio
+import bisect
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import text
+
+from app.analytics import heatmap
+from app.core.db import get_sessionmaker
+from app.repositories import checks as checks_repo
+
+
+async def seed(rows: int, days: int) -> tuple[int, int]:
+    async with get_sessionmaker()() as s:
+        user_id = (await s.execute(text(
+            "INSERT INTO users (tg_id, email, hashed_password, is_active) VALUES (:tg, :email, 'x', true) RETURNING id"
+        ), {"tg": random.randint(10**9, 2 * 10**9), "email": f"heatmap-{uuid.uuid4().hex[:8]}@example.com"})).scalar_one()
+        monitor_id = (await s.execute(text(
+            "INSERT INTO monitors (user_id, name, url, method, expected_status, interval_s, timeout_ms, is_paused) "
+            "VALUES (:u, 'heatmap', 'http://127.0.0.1:9/heatmap', 'GET', 200, 60, 1000, true) RETURNING id"
+        ), {"u": user_id})).scalar_one()
+        await s.execute(text("SET LOCAL statement_timeout = 0"))
+        # логнормальная задержка (~медиана 60 мс) и 2 % неуспешных проверок
+        await s.execute(text(
+            "INSERT INTO checks (monitor_id, ts, latency_ms, status_code, ok) "
+            "SELECT :m, now() - make_interval(secs => i * :step), "
+            "least(60000, exp(4.1 + 0.8 * sqrt(-2 * ln(1 - random())) * cos(2 * pi() * random())))::int, "
+            "200, random() > 0.02 FROM generate_series(1, :n) AS i"
+        ), {"m": monitor_id, "n": rows, "step": days * 86400 / rows})
+        await s.commit()
+    return user_id, monitor_id
+
+
+def bin_rows(rows, t0_us: int, bucket_s: int, n_buckets: int) -> int:
+    edges = heatmap.LATENCY_EDGES_MS
+    counts = [[0] * len(edges) for _ in range(n_buckets)]
+    for ts, latency_ms, ok in rows:
+        t = (int(ts.timestamp() * 1_000_000) - t0_us) // (bucket_s * 1_000_000)
+        if 0 <= t < n_buckets:
+            counts[t][max(bisect.bisect_right(edges, latency_ms) - 1, 0)] += 1
+    return sum(map(sum, counts))
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.monitor_id:
+        monitor_id = args.monitor_id
+        async with get_sessionmaker()() as s:
+            user_id = (await s.execute(text("SELECT user_id FROM monitors WHERE id = :m"), {"m": monitor_id})).scalar_one()
+    else:
+        t0 = time.perf_counter()
+        user_id, monitor_id = await seed(args.rows, args.days)
+        print(f"seeded {args.rows} checks for monitor {monitor_id} in {time.perf_counter() - t0:.1f} s")
+
+    bucket_s = 3600
+    end_s = -(-int(time.time()) // bucket_s) * bucket_s
+    start_s = end_s - (args.days + 1) * 86400
+    since, until = datetime.fromtimestamp(start_s, timezone.utc), datetime.fromtimestamp(end_s, timezone.utc)
+    n_buckets = (end_s - start_s) // bucket_s
+    t0_us = start_s * 1_000_000
+    try:
+        async with get_sessionmaker()() as s:
+            await s.execute(text("SET LOCAL statement_timeout = 0"))
+            # rows
+            t0 = time.perf_counter()
+            res = await s.execute(text(
+                "SELECT ts, latency_ms, ok FROM checks WHERE monitor_id = :m AND ts >= :a AND ts < :b LIMIT :lim"
+            ), {"m": monitor_id, "a": since, "b": until, "lim": args.row_limit})
+            fetched = res.all()
+            total = bin_rows(fetched, t0_us, bucket_s, n_buckets)
+            row_s = time.perf_counter() - t0
+            scale = args.rows / max(len(fetched), 1)
+            print(f"rows:      {row_s:7.2f} s for {total} rows  (≈ {row_s * scale:.1f} s for {args.rows})")
+
+            # array_agg
+            t0 = time.perf_counter()
+            ts_l, lat_l, ok_l = (await s.execute(text(
+                "SELECT array_agg((extract(epoch FROM ts) * 1000000)::int8), array_agg(latency_ms), array_agg(ok) "
+                "FROM checks WHERE monitor_id = :m AND ts >= :a AND ts < :b"
+            ), {"m": monitor_id, "a": since, "b": until})).one()
+            hm = heatmap.build(
+                np.array(ts_l, dtype=np.int64), np.array(lat_l, dtype=np.int32), np.array(ok_l, dtype=bool),
+                t0_us=t0_us, bucket_s=bucket_s, n_buckets=n_buckets,
+            )
+            print(f"array_agg: {time.perf_counter() - t0:7.2f} s for {hm.total} rows")
+
+            # binary COPY
+            t0 = time.perf_counter()
+            buf = await checks_repo.copy_latency_columns(
+                s, user_id=user_id, monitor_id=monitor_id, since=since, until=until
+            )
+            t1 = time.perf_counter()
+            hm = heatmap.build(*heatmap.decode_copy(buf), t0_us=t0_us, bucket_s=bucket_s, n_buckets=n_buckets)
+            t2 = time.perf_counter()
+            print(f"copy:      {t2 - t0:7.2f} s for {hm.total} rows  (COPY {t1 - t0:.2f} s, "
+                  f"{len(buf) / 2**20:.0f} MiB; decode+bin {t2 - t1:.2f} s)")
+            print(f"heatmap {n_buckets}×{len(heatmap.LATENCY_EDGES_MS)}, p50 {hm.p50_ms:.0f} ms, p99 {hm.p99_ms:.0f} ms")
+    finally:
+        if not args.keep and not args.monitor_id:
+            async with get_sessionmaker()() as s:
+                await s.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+                await s.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--row-limit", type=int, default=1_000_000)
+    parser.add_argument("--monitor-id", type=int, default=0, help="reuse an already seeded monitor")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded data")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
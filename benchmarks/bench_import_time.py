@@ -0,0 +1,107 @@
+"""
+Cold-start budget for the API and worker entry points.
+
+Each entry point is imported in a fresh interpreter (`python -X importtime -c "import ..."`)
+several times; the best wall time is compared with its budget, and the module graph is
+checked for imports that do not belong to that process:
+    - api    (`import main`):               no prober code, NumPy, httpx, passlib or jose at import time;
+    - worker (`import app.prober.runner`):  no FastAPI/Starlette, routers, passlib or jose.
+
+Neither entry point may construct `Settings` at import (`get_settings()` must still be
+uncached afterwards): settings, caches, limiters and pools are built on first use.
+
+Exits with status 1 if a budget, a forbidden-import rule or the Settings rule is violated,
+so it can run in CI.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--api-budget-ms 1500] [--worker-budget-ms 1200]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ENV = {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "bench", "DB_PASS": "bench",
+       "DB_NAME": "bench", "JWT_SECRET": "bench"}
+
+ENTRY_POINTS = {
+    "api": ("main", ("app.prober", "app.analytics", "numpy", "httpx", "passlib", "jose")),
+    "worker": ("app.prober.runner", ("fastapi", "starlette", "app.api", "passlib", "jose")),
+}
+
+
+def _env() -> dict[str, str]:
+    return {**os.environ, **{k: os.environ.get(k, v) for k, v in ENV.items()}}
+
+
+def wall_ms(module: str) -> float:
+    """Wall time of a fresh interpreter importing `module` (interpreter startup included)."""
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], env=_env(), check=True)
+    return (time.perf_counter() - t0) * 1000
+
+
+def import_graph(module: str) -> tuple[set[str], dict[str, int]]:
+    """Modules imported by `module` and cumulative µs of each direct import (from `-X importtime`)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules: set[str] = set()
+    top: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # уровень вложенности кодируется отступом: корневые импорты идут с одним пробелом
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.add(name.strip())
+        if depth <= 1:
+            top[name.strip()] = int(cumulative)
+    return modules, top
+
+
+def settings_built(module: str) -> bool:
+    """Whether importing `module` in a fresh interpreter constructed `Settings`."""
+    code = f"import sys, {module}; from app.core.settings import get_settings; sys.exit(get_settings.cache_info().currsize)"
+    return subprocess.run([sys.executable, "-c", code], env=_env()).returncode != 0
+
+
+def forbidden(modules: set[str], prefixes: tuple[str, ...]) -> list[str]:
+    return sorted(m for m in modules if any(m == p or m.startswith(p + ".") for p in prefixes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--api-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--worker-budget-ms", type=float, default=1200.0)
+    parser.add_argument("--top", type=int, default=8, help="show the N heaviest top-level imports")
+    args = parser.parse_args()
+    budgets = {"api": args.api_budget_ms, "worker": args.worker_budget_ms}
+
+    failed = False
+    for name, (module, banned) in ENTRY_POINTS.items():
+        best = min(wall_ms(module) for _ in range(args.runs))
+        modules, top = import_graph(module)
+        bad = forbidden(modules, banned)
+        over = best > budgets[name]
+        eager = settings_built(module)
+        failed |= over or bool(bad) or eager
+
+        print(f"{name:6s} import {module}: best {best:7.1f} ms of {args.runs} "
+              f"(budget {budgets[name]:.0f} ms){'  OVER BUDGET' if over else ''}, {len(modules)} modules")
+        for mod, us in sorted(top.items(), key=lambda kv: -kv[1])[: args.top]:
+            print(f"         {us / 1000:7.1f} ms  {mod}")
+        if bad:
+            print(f"         forbidden imports: {', '.join(bad[:10])}{' ...' if len(bad) > 10 else ''}")
+        if eager:
+            print("         Settings() is constructed at import")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Login storm benchmark: latency of an unrelated endpoint while password hashes run.
+
+Drives a minimal FastAPI app in-process (httpx ASGI transport, no DB needed) with:
+    - /ping        — cheap endpoint whose latency we measure;
+    - /login-*     — endpoints that verify a password inline or through the hashing pool.
+
+Usage:
+    python -m benchmarks.bench_login_storm [--storm 64] [--pings 200]
+
+Expected result: with `inline` hashing /ping p99 grows to seconds (the loop is blocked),
+with `pool` it stays flat and excess logins are rejected fast with 503.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Настройки нужны только для импорта app.core.*; БД в бенчмарке не используется
+for _k, _v in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "bench", "DB_PASS": "bench",
+               "DB_NAME": "bench", "JWT_SECRET": "bench"}.items():
+    os.environ.setdefault(_k, _v)
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.core.security import HashingPoolSaturated, get_hashing_pool, hash_password, verify_password
+
+
+def build_app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.post("/login-inline")
+    async def login_inline() -> dict:
+        return {"ok": verify_password("correct horse", hashed)}
+
+    @app.post("/login-pool")
+    async def login_pool() -> dict:
+        try:
+            return {"ok": await get_hashing_pool().run(verify_password, "correct horse", hashed)}
+        except HashingPoolSaturated:
+            raise HTTPException(status_code=503)
+
+    return app
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def _timed_ping(client: httpx.AsyncClient, t0: float) -> float:
+    await client.get("/ping")
+    return (time.perf_counter() - t0) * 1000
+
+
+async def _pinger(client: httpx.AsyncClient, n: int, every_s: float = 0.01) -> list[float]:
+    # Пинги отправляются по расписанию; задержка считается от запланированного момента,
+    # поэтому время, пока event loop заблокирован хэшированием, тоже попадает в замер.
+    start = time.perf_counter()
+    tasks = []
+    for i in range(n):
+        due = start + i * every_s
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        tasks.append(asyncio.create_task(_timed_ping(client, due)))
+    return list(await asyncio.gather(*tasks))
+
+
+async def run_case(app: FastAPI, path: str | None, storm: int, pings: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        logins = [client.post(path) for _ in range(storm)] if path else []
+        t0 = time.perf_counter()
+        results = await asyncio.gather(_pinger(client, pings), *logins)
+        elapsed = time.perf_counter() - t0
+
+    lat = results[0]
+    codes = [r.status_code for r in results[1:]]
+    print(
+        f"{path or 'idle':<14} ping p50={statistics.median(lat):8.2f}ms "
+        f"p99={_pct(lat, 0.99):8.2f}ms max={max(lat):8.2f}ms | "
+        f"logins 200={codes.count(200)} 503={codes.count(503)} | {elapsed:.2f}s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm", type=int, default=64, help="concurrent login requests")
+    parser.add_argument("--pings", type=int, default=200, help="/ping requests during the storm")
+    args = parser.parse_args()
+
+    app = build_app(hash_password("correct horse"))
+    await run_case(app, None, 0, args.pings)
+    await run_case(app, "/login-inline", args.storm, args.pings)
+    await run_case(app, "/login-pool", args.storm, args.pings)
+    get_hashing_pool().shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
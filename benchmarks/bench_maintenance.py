@@ -0,0 +1,89 @@
+"""
+Maintenance window lookup: interval index vs scanning the owner's windows.
+
+Pure in-process benchmark (no database). Generates `--windows` random windows (one-off,
+daily and weekly; per monitor or user-wide) over `--users` users owning `--monitors`
+monitors and reports:
+    - build:  time to expand and index everything (`MaintenanceIndex.replace_all`);
+    - update: time to re-index one user (`replace_users`, the incremental sync path);
+    - lookup: ns per "is this monitor in maintenance now" for the index and for a scan
+              over the owner's windows (what a per-probe query would have to evaluate),
+              with the answers cross-checked.
+
+Usage:
+    python -m benchmarks.bench_maintenance [--windows 50000] [--users 5000] [--monitors 100000] [--lookups 100000]
+"""
+
+import argparse
+import random
+import time
+
+from app.prober.maintenance import SKIP, TAG, MaintenanceIndex, WindowSpec, occurrences
+
+DAY = 86_400.0
+
+
+def make_windows(args: argparse.Namespace, now: float, rnd: random.Random) -> list[WindowSpec]:
+    windows = []
+    for i in range(args.windows):
+        monitor = rnd.randrange(args.monitors)
+        start = now + rnd.uniform(-3 * DAY, 2 * DAY)
+        windows.append(WindowSpec(
+            i, monitor % args.users, rnd.choice([None, monitor]), start, start + rnd.uniform(60, 6 * 3600),
+            rnd.choice([None, None, "daily", "weekly"]), None, rnd.choice([SKIP, TAG]),
+        ))
+    return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--monitors", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+    rnd = random.Random(1)
+    now = time.time()
+    windows = make_windows(args, now, rnd)
+
+    index = MaintenanceIndex()
+    t0 = time.perf_counter()
+    index.replace_all(windows, now)
+    print(f"build:  {(time.perf_counter() - t0) * 1000:8.1f} ms for {len(windows)} windows")
+
+    by_user: dict[int, list[WindowSpec]] = {}
+    for w in windows:
+        by_user.setdefault(w.user_id, []).append(w)
+    t0 = time.perf_counter()
+    for user_id in range(100):
+        index.replace_users([user_id], by_user.get(user_id, []))
+    print(f"update: {(time.perf_counter() - t0) / 100 * 1e6:8.1f} µs per user")
+
+    def scan(monitor_id: int, user_id: int, t: float) -> str | None:
+        modes = {
+            w.mode for w in by_user.get(user_id, ())
+            if w.monitor_id in (None, monitor_id)
+            and any(s <= t < e for s, e in occurrences(w, now, now + index.horizon_s))
+        }
+        return SKIP if SKIP in modes else TAG if TAG in modes else None
+
+    queries = []
+    for _ in range(args.lookups):
+        monitor = rnd.randrange(args.monitors)
+        queries.append((monitor, monitor % args.users, now + rnd.uniform(0, DAY)))
+
+    lookup = index.lookup
+    t0 = time.perf_counter()
+    got = [lookup(m, u, t) for m, u, t in queries]
+    dt_index = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    expected = [scan(m, u, t) for m, u, t in queries]
+    dt_scan = time.perf_counter() - t0
+    hits = sum(g is not None for g in got)
+    mismatches = sum(g != e for g, e in zip(got, expected))
+    print(f"lookup: index {dt_index / len(queries) * 1e9:7.0f} ns, scan {dt_scan / len(queries) * 1e9:7.0f} ns "
+          f"({hits} of {len(queries)} in maintenance, {mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    main()
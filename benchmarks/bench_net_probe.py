@@ -0,0 +1,142 @@
+"""
+TCP-connect and DNS probes vs HTTP probes: CPU time, memory and throughput per probe.
+
+Local targets run in a child process, so only the prober's side is measured:
+    http     — keep-alive HTTP/1.1 server answering 200 (probed through the shared
+               keep-alive client, as the prober does: the cheapest case for HTTP);
+    tcp      — TCP server that accepts and closes;
+    tcp+bnr  — TCP server sending an SSH-style banner, probed with `expect`;
+    dns      — UDP DNS stub answering A records, probed with and without `expect`.
+
+Each kind runs `--probes` probes in waves of `--concurrency` and reports µs of process CPU
+per probe, wall probes/s, and the peak Python heap per in-flight probe (tracemalloc over one
+wave, measured separately). No database needed.
+
+Usage:
+    python -m benchmarks.bench_net_probe [--probes 5000] [--concurrency 100]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+import tracemalloc
+
+import dns.message
+import dns.rcode
+import dns.rrset
+
+from app.prober.http_probe import make_client
+from app.prober.net_probe import probe
+from app.prober.scheduler import MonitorSpec
+
+BANNER = b"SSH-2.0-OpenSSH_9.6\r\n"
+HTTP_RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nOK"
+
+
+async def _http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(HTTP_RESPONSE)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+
+
+async def _accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    writer.close()
+
+
+async def _banner(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    writer.write(BANNER)
+    writer.close()
+
+
+class _DnsStub(asyncio.DatagramProtocol):
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        query = dns.message.from_wire(data)
+        response = dns.message.make_response(query)
+        response.answer.append(dns.rrset.from_text(query.question[0].name, 60, "IN", "A", "10.0.0.1", "10.0.0.2"))
+        self.transport.sendto(response.to_wire(), addr)
+
+
+def _serve(ports) -> None:
+    async def main() -> None:
+        servers = [await asyncio.start_server(h, "127.0.0.1", 0, backlog=1024) for h in (_http, _accept, _banner)]
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(_DnsStub, local_addr=("127.0.0.1", 0))
+        ports.put([s.sockets[0].getsockname()[1] for s in servers] + [transport.get_extra_info("sockname")[1]])
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def _wave(client, specs: list[MonitorSpec]) -> int:
+    results = await asyncio.gather(*(probe(client, spec) for spec in specs))
+    return sum(r.ok for r in results)
+
+
+async def bench_kind(client, label: str, spec: MonitorSpec, probes: int, concurrency: int) -> None:
+    wave = [spec] * concurrency
+    await _wave(client, wave)  # прогрев (соединения HTTP-клиента, резолвер)
+
+    waves = max(probes // concurrency, 1)
+    ok = 0
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    for _ in range(waves):
+        ok += await _wave(client, wave)
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - t0
+    n = waves * concurrency
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    await _wave(client, wave)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    print(f"{label:<9} {cpu / n * 1e6:9.1f} {n / wall:9.0f} {peak / concurrency / 1024:9.1f} {ok:>6}/{n}")
+
+
+async def run(args: argparse.Namespace, ports: list[int]) -> None:
+    http_port, tcp_port, banner_port, dns_port = ports
+
+    def spec(url: str, kind: str, expect: str | None = None) -> MonitorSpec:
+        return MonitorSpec(1, 1, url, "GET", 200, 60, 5000, kind, expect)
+
+    cases = [
+        ("http", spec(f"http://127.0.0.1:{http_port}/", "http")),
+        ("tcp", spec(f"tcp://127.0.0.1:{tcp_port}", "tcp")),
+        ("tcp+bnr", spec(f"tcp://127.0.0.1:{banner_port}", "tcp", "SSH-2.0")),
+        ("dns", spec(f"dns://127.0.0.1:{dns_port}/example.com?type=A", "dns")),
+        ("dns+exp", spec(f"dns://127.0.0.1:{dns_port}/example.com?type=A", "dns", "10.0.0.1,10.0.0.2")),
+    ]
+    print(f"{'kind':<9} {'cpu µs':>9} {'probes/s':>9} {'heap KiB':>9} {'ok':>6}")
+    client = make_client(args.concurrency)
+    try:
+        for label, case in cases:
+            await bench_kind(client, label, case, args.probes, args.concurrency)
+    finally:
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--probes", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(ports,), daemon=True)
+    server.start()
+    try:
+        asyncio.run(run(args, ports.get(timeout=10)))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
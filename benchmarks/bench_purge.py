@@ -0,0 +1,118 @@
+"""
+Deleting a monitor with a long history: one cascading DELETE vs soft delete + batched purge.
+
+A throwaway user gets two monitors with `--checks` checks each (inserted with
+generate_series), then:
+    cascade — `DELETE FROM monitors WHERE id = :id` (the old delete path): the whole history
+              goes in the request's transaction; reports its duration.
+    soft    — `monitors.delete_for_user` (what DELETE /api/monitors/{id} runs now), then
+              `purge.purge_batch` with `--batch` rows until the history is empty (what
+              `HistoryReaper` does at duty 1.0);
+              reports the request's transaction, the number of batches, the longest batch
+              (the longest any lock is held and the largest WAL burst) and rows/s.
+
+At the default duty (PROBER_PURGE_DUTY) the purge takes about 1/duty times longer in wall
+time than reported, with the database idle for the rest.
+
+Usage:
+    python -m benchmarks.bench_purge [--checks 200000] [--batch 5000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import delete, text
+
+from app.core.db import get_engine, get_sessionmaker
+from app.models.monitor import Monitor
+from app.repositories import monitors as monitors_repo
+from app.repositories import purge as purge_repo
+from app.repositories import users as users_repo
+
+_FILL_SQL = text(
+    "INSERT INTO checks (monitor_id, ts, latency_ms, status_code, ok) "
+    "SELECT :monitor_id, now() - g * interval '1 minute', 100 + g % 50, 200, true FROM generate_series(1, :n) g"
+)
+
+
+async def seed(checks: int) -> tuple[int, list[int]]:
+    async with get_sessionmaker()() as s:
+        user = await users_repo.create(
+            s, email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            tg_id=random.randrange(1_000_000_000, 2**31 - 1), hashed_password="-",
+        )
+        ids = []
+        for i in range(2):
+            monitor = await monitors_repo.create(
+                s, user_id=user.id, name=f"bench-purge-{i}", url=f"https://bench.invalid/purge/{i}",
+                method="GET", expected_status=200, interval_s=60, timeout_ms=2500,
+            )
+            await s.execute(_FILL_SQL, {"monitor_id": monitor.id, "n": checks})
+            ids.append(monitor.id)
+        await s.commit()
+        await s.execute(text("ANALYZE checks"))
+    return user.id, ids
+
+
+async def bench_cascade(monitor_id: int, checks: int) -> None:
+    async with get_sessionmaker()() as s:
+        t0 = time.perf_counter()
+        await s.execute(delete(Monitor).where(Monitor.id == monitor_id))
+        await s.commit()
+        dt = time.perf_counter() - t0
+    print(f"cascade: one transaction of {dt * 1000:8.1f} ms for {checks} rows ({checks / dt:9.0f} rows/s)")
+
+
+async def bench_soft(user_id: int, monitor_id: int, batch: int) -> None:
+    sessionmaker = get_sessionmaker()
+    async with sessionmaker() as s:
+        t0 = time.perf_counter()
+        await monitors_repo.delete_for_user(s, user_id=user_id, monitor_id=monitor_id)
+        await s.commit()
+        request = time.perf_counter() - t0
+
+    longest = 0.0
+    batches = rows = 0
+    t0 = time.perf_counter()
+    while True:
+        b0 = time.perf_counter()
+        async with sessionmaker() as s:
+            n = await purge_repo.purge_batch(s, monitor_id=monitor_id, batch_size=batch)
+            await s.commit()
+        longest = max(longest, time.perf_counter() - b0)
+        batches += 1
+        rows += n
+        if n < batch:
+            break
+    purge = time.perf_counter() - t0
+    async with sessionmaker() as s:
+        await purge_repo.finalize_monitor(s, monitor_id=monitor_id, grace_s=0)
+        await s.commit()
+    print(f"soft   : request transaction {request * 1000:6.1f} ms; purge {batches} batches, "
+          f"longest {longest * 1000:6.1f} ms, {purge:6.2f} s total ({rows / purge:9.0f} rows/s)")
+
+
+async def run(args: argparse.Namespace) -> None:
+    user_id, (cascade_id, soft_id) = await seed(args.checks)
+    try:
+        await bench_cascade(cascade_id, args.checks)
+        await bench_soft(user_id, soft_id, args.batch)
+    finally:
+        async with get_sessionmaker()() as s:
+            await s.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            await s.commit()
+    await get_engine().dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
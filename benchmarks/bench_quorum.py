@@ -0,0 +1,130 @@
+"""
+Quorum confirmation check: several local worker processes against a flaky local target.
+
+Starts an HTTP target that answers 500 with probability `--fail-rate` (independently per
+request, i.e. pure noise: the target is never really down), creates `--monitors` monitors
+pointing at it, runs `--workers` prober processes (`python worker.py`, one shard each) for
+`--duration` seconds and compares:
+    - raw failure rate seen by the target;
+    - failure rate recorded in `checks`.
+
+With quorum confirmation the recorded rate should be close to
+`fail_rate * P(majority of votes fail)` — e.g. 0.2 * 0.2² = 0.8 % for 2 votes — instead of
+the raw 20 %. Needs a migrated database (uses the regular DB_* settings); monitors already
+in that database are probed as well, so prefer a scratch database.
+
+Usage:
+    python -m benchmarks.bench_quorum [--workers 3] [--monitors 200] [--fail-rate 0.2] [--duration 40]
+"""
+
+import argparse
+import asyncio
+import http.server
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import uuid
+
+from sqlalchemy import text
+
+from app.core.db import get_sessionmaker
+
+
+class FlakyTarget(http.server.BaseHTTPRequestHandler):
+    fail_rate = 0.0
+    requests = 0
+    failures = 0
+
+    def do_GET(self) -> None:
+        failed = random.random() < self.fail_rate
+        FlakyTarget.requests += 1
+        FlakyTarget.failures += failed
+        self.send_response(500 if failed else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+async def setup(port: int, n: int) -> tuple[int, list[int]]:
+    async with get_sessionmaker()() as s:
+        tag = uuid.uuid4().hex[:8]
+        user_id = (await s.execute(text(
+            "INSERT INTO users (tg_id, email, hashed_password, is_active) "
+            "VALUES (:tg, :email, 'x', true) RETURNING id"
+        ), {"tg": random.randint(10**9, 2 * 10**9), "email": f"quorum-{tag}@example.com"})).scalar_one()
+        ids = (await s.execute(text(
+            "INSERT INTO monitors (user_id, name, url, method, expected_status, interval_s, timeout_ms, is_paused) "
+            "SELECT :u, 'quorum-' || i, :base || i, 'GET', 200, 10, 1000, false FROM generate_series(1, :n) AS i "
+            "RETURNING id"
+        ), {"u": user_id, "base": f"http://127.0.0.1:{port}/m", "n": n})).scalars().all()
+        await s.commit()
+    return user_id, list(ids)
+
+
+async def collect(user_id: int, ids: list[int]) -> tuple[int, int]:
+    async with get_sessionmaker()() as s:
+        total, failed = (await s.execute(text(
+            "SELECT count(*), count(*) FILTER (WHERE NOT ok) FROM checks WHERE monitor_id = ANY(:ids)"
+        ), {"ids": ids})).one()
+        await s.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        await s.commit()
+    return total, failed
+
+
+async def run(args: argparse.Namespace) -> None:
+    FlakyTarget.fail_rate = args.fail_rate
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FlakyTarget)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    user_id, ids = await setup(server.server_address[1], args.monitors)
+
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "worker.py"],
+            env={
+                **os.environ,
+                "PROBER_WORKER_ID": f"bench-{i}",
+                "PROBER_SHARD_INDEX": str(i),
+                "PROBER_SHARD_COUNT": str(args.workers),
+                "PROBER_CONFIRM_VOTES": str(args.votes),
+                "PROBER_FLUSH_S": "0.5",
+            },
+            stderr=subprocess.DEVNULL,
+        )
+        for i in range(args.workers)
+    ]
+    try:
+        await asyncio.sleep(args.duration)
+    finally:
+        for p in procs:
+            p.send_signal(signal.SIGINT)
+        for p in procs:
+            await asyncio.to_thread(p.wait, 30)
+        server.shutdown()
+
+    total, failed = await collect(user_id, ids)
+    raw = FlakyTarget.failures / max(FlakyTarget.requests, 1)
+    k, p = args.votes, args.fail_rate
+    majority = sum(math.comb(k, j) * p**j * (1 - p) ** (k - j) for j in range(k // 2 + 1, k + 1))
+    print(f"workers={args.workers} votes={k} monitors={args.monitors}")
+    print(f"target:   {FlakyTarget.requests} requests, {raw:.1%} answered 500")
+    print(f"recorded: {total} checks, {failed / max(total, 1):.1%} failed (expected ≈ {p * majority:.1%} for pure noise)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--monitors", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--votes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=40.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
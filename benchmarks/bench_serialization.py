@@ -0,0 +1,83 @@
+"""
+Response serialization benchmark: regular Pydantic double pass vs the fast JSON path.
+
+Both variants run as real FastAPI endpoints in-process (httpx ASGI transport, no DB)
+over the same 1,000 ORM-like rows:
+    - regular: `[MonitorOut.model_validate(r) for r in rows]` + FastAPI `response_model`;
+    - fast:    `RowSerializer(MonitorRow).dump_many(rows)` in a `RawJSONResponse`.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 1000] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import List
+
+for _k, _v in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "bench", "DB_PASS": "bench",
+               "DB_NAME": "bench", "JWT_SECRET": "bench"}.items():
+    os.environ.setdefault(_k, _v)
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.fast_json import RawJSONResponse, RowSerializer
+from app.schemas.monitor import MonitorOut, MonitorRow
+
+
+def make_rows(n: int) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=i, user_id=1, name=f"service-{i}", url=f"https://service-{i}.example.com/health",
+            method="GET", expected_status=200, interval_s=60, timeout_ms=2500,
+        )
+        for i in range(n)
+    ]
+
+
+def build_app(rows: list[SimpleNamespace]) -> FastAPI:
+    app = FastAPI()
+    serializer = RowSerializer(MonitorRow)
+
+    @app.get("/regular", response_model=List[MonitorOut])
+    async def regular() -> List[MonitorOut]:
+        return [MonitorOut.model_validate(r) for r in rows]
+
+    @app.get("/fast", response_model=List[MonitorOut])
+    async def fast() -> RawJSONResponse:
+        return RawJSONResponse(serializer.dump_many(rows))
+
+    return app
+
+
+async def bench(client: httpx.AsyncClient, path: str, n: int) -> tuple[float, bytes]:
+    body = (await client.get(path)).content  # прогрев
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await client.get(path)
+    return (time.perf_counter() - t0) / n * 1000, body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    app = build_app(make_rows(args.rows))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        regular_ms, regular_body = await bench(client, "/regular", args.requests)
+        fast_ms, fast_body = await bench(client, "/fast", args.requests)
+
+    assert regular_body == fast_body, "fast path must produce byte-identical JSON"
+    print(f"rows={args.rows} requests={args.requests}")
+    print(f"regular: {regular_ms:8.3f} ms/request")
+    print(f"fast:    {fast_ms:8.3f} ms/request  (x{regular_ms / fast_ms:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Local spool of check results: spill speed, and replay with COPY vs the writer's INSERT.
+
+`--results` results of two throwaway monitors are
+    spilled  — appended to a `CheckSpool` in batches of `--batch` (msync after each batch,
+               as the writer does); reports results/s and bytes per result;
+    replayed — the spooled segments written back with `checks_repo.copy_many` (what
+               `CheckWriter.replay` runs), against the same rows written with
+               `checks_repo.insert_many` in batches of `--batch` (the regular flush path).
+The replay rate is how fast a backlog built up during an outage drains once the
+database is back.
+
+Usage:
+    python -m benchmarks.bench_spool [--results 200000] [--batch 500] [--dir /tmp/bench-spool]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import random
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.db import get_engine, get_sessionmaker
+from app.prober.http_probe import ProbeResult
+from app.prober.metrics import Metrics
+from app.prober.spool import CheckSpool
+from app.repositories import checks as checks_repo
+from app.repositories import monitors as monitors_repo
+from app.repositories import users as users_repo
+
+
+async def seed() -> tuple[int, list[int]]:
+    async with get_sessionmaker()() as s:
+        user = await users_repo.create(
+            s, email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            tg_id=random.randrange(1_000_000_000, 2**31 - 1), hashed_password="-",
+        )
+        ids = []
+        for i in range(2):
+            monitor = await monitors_repo.create(
+                s, user_id=user.id, name=f"bench-spool-{i}", url=f"https://bench.invalid/spool/{i}",
+                method="GET", expected_status=200, interval_s=60, timeout_ms=2500,
+            )
+            ids.append(monitor.id)
+        await s.commit()
+    return user.id, ids
+
+
+def make_results(monitor_id: int, n: int) -> list[ProbeResult]:
+    t0 = datetime.now(timezone.utc) - timedelta(seconds=n)
+    return [
+        ProbeResult(monitor_id, t0 + timedelta(seconds=i), 50 + i % 200, 200 if i % 50 else 503, bool(i % 50),
+                    None if i % 50 else "unexpected status 503")
+        for i in range(n)
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    user_id, (copy_id, insert_id) = await seed()
+    shutil.rmtree(args.dir, ignore_errors=True)
+    spool = CheckSpool(args.dir, segment_bytes=4 << 20, max_bytes=1 << 40, metrics=Metrics())
+    try:
+        results = make_results(copy_id, args.results)
+        t0 = time.perf_counter()
+        for i in range(0, len(results), args.batch):
+            spool.append(results[i:i + args.batch])
+        dt = time.perf_counter() - t0
+        print(f"spill  : {len(results) / dt:9.0f} results/s, {spool.size / len(results):.0f} bytes/result")
+
+        sessionmaker = get_sessionmaker()
+        t0 = time.perf_counter()
+        segments = 0
+        while (segment := spool.oldest()) is not None:
+            path, records = segment
+            async with sessionmaker() as s:
+                await checks_repo.copy_many(s, records=records)
+                await s.commit()
+            spool.release(path)
+            segments += 1
+        dt = time.perf_counter() - t0
+        print(f"copy   : {args.results / dt:9.0f} rows/s ({segments} segments, {dt:6.2f} s)")
+
+        rows = [dataclasses.asdict(r) | {"monitor_id": insert_id} for r in results]
+        t0 = time.perf_counter()
+        for i in range(0, len(rows), args.batch):
+            async with sessionmaker() as s:
+                await checks_repo.insert_many(s, rows=rows[i:i + args.batch])
+                await s.commit()
+        dt = time.perf_counter() - t0
+        print(f"insert : {args.results / dt:9.0f} rows/s (batches of {args.batch}, {dt:6.2f} s)")
+    finally:
+        spool.close()
+        shutil.rmtree(args.dir, ignore_errors=True)
+        async with get_sessionmaker()() as s:
+            await s.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            await s.commit()
+    await get_engine().dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--dir", default="/tmp/bench-spool")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
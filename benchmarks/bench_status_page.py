@@ -0,0 +1,131 @@
+"""
+Status page benchmark: public GET /status/{slug} under a traffic spike with frequent changes.
+
+Drives the real `public_router` in-process (httpx ASGI transport, no DB needed). The DB read
+behind the snapshot cache is replaced by a stub that sleeps `--db-ms` and counts calls, and the
+page is invalidated every `--change-ms` (as the `status_page_changed` NOTIFY would do during
+an incident). Compared with a route that reads the snapshot from the "DB" on every request.
+
+Reports requests/s, p50/p99 latency and DB loads per 1000 requests.
+
+Usage:
+    python -m benchmarks.bench_status_page [--requests 20000] [--concurrency 200] [--db-ms 5] [--change-ms 100]
+
+Expected result: `per-request` needs one DB read per request and its latency follows the DB;
+`swr` stays at ~1 load per change regardless of traffic (single-flight), and no request
+waits for the DB once the page is warm.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Настройки нужны только для импорта app.*; БД в бенчмарке не используется
+for _k, _v in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "bench", "DB_PASS": "bench",
+               "DB_NAME": "bench", "JWT_SECRET": "bench"}.items():
+    os.environ.setdefault(_k, _v)
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.etag import make_etag
+from app.api.fast_json import RawJSONResponse
+from app.api.routers import status_pages
+from app.core.cache import SWRCache
+from app.core.settings import get_settings
+
+BODY = (
+    '{"slug":"acme","title":"Acme","status":"operational","updated_at":"2026-01-01T00:00:00+00:00",'
+    '"monitors":[' + ",".join(f'{{"name":"service-{i}","status":"operational"}}' for i in range(30)) + "]}"
+)
+
+
+class FakeDB:
+    def __init__(self, delay_s: float) -> None:
+        self.delay_s = delay_s
+        self.loads = 0
+        self.version = 1
+
+    async def load(self, slug: str) -> tuple[str, bytes]:
+        self.loads += 1
+        await asyncio.sleep(self.delay_s)
+        return make_etag("status-page", 1, self.version), BODY.encode()
+
+
+def build_app(db: FakeDB, mode: str) -> FastAPI:
+    app = FastAPI()
+    if mode == "swr":
+        s = get_settings()
+        cache = SWRCache(
+            db.load, maxsize=s.STATUS_PAGE_CACHE_SIZE, fresh_s=s.STATUS_PAGE_FRESH_S,
+            max_stale_s=s.STATUS_PAGE_MAX_STALE_S, cache_misses=False,
+        )
+        status_pages.get_snapshot_cache = lambda: cache
+        app.include_router(status_pages.public_router)
+    else:
+        @app.get("/status/{slug}")
+        async def per_request(slug: str) -> RawJSONResponse:
+            etag, body = await db.load(slug)
+            return RawJSONResponse(body, headers={"ETag": etag})
+    return app
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run_case(mode: str, args: argparse.Namespace) -> None:
+    db = FakeDB(args.db_ms / 1000)
+    app = build_app(db, mode)
+    lat: list[float] = []
+    left = [args.requests]
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while left[0] > 0:
+            left[0] -= 1
+            t0 = time.perf_counter()
+            r = await client.get("/status/acme")
+            assert r.status_code == 200
+            lat.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0)  # попадание в кэш не уступает управление, а changes() должна работать
+
+    async def changes() -> None:
+        while True:
+            await asyncio.sleep(args.change_ms / 1000)
+            db.version += 1
+            if mode == "swr":
+                status_pages.on_status_page_changed("acme")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.get("/status/acme")  # прогрев
+        db.loads = 0
+        changer = asyncio.create_task(changes())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+        changer.cancel()
+
+    print(
+        f"{mode:<12} {len(lat) / elapsed:8.0f} req/s  p50={statistics.median(lat):7.2f}ms "
+        f"p99={_pct(lat, 0.99):7.2f}ms | DB loads {db.loads:6d} ({db.loads / len(lat) * 1000:6.1f} per 1000 req, "
+        f"{db.version - 1} changes)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="simulated snapshot read latency")
+    parser.add_argument("--change-ms", type=float, default=100.0, help="interval between page changes")
+    args = parser.parse_args()
+    await run_case("per-request", args)
+    await run_case("swr", args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Warm restart of the prober schedule: startup storm vs catch-up window.
+
+Seeds `--monitors` monitors (mixed intervals) with one historical check each, as if the
+prober had run normally and then been down for `--downtime` seconds. Then:
+    1. times `Prober.reload()` — the single set-based query plus heap build;
+    2. replays the rebuilt schedule on a virtual clock (probes complete instantly and are
+       rescheduled at `start + interval_s`) and reports, per strategy:
+         - peak probe rate (max over 1 s buckets);
+         - time to steady state: after it every 5 s bucket stays within 1.25× the
+           steady-state rate (sum of 1 / interval_s).
+
+Strategies:
+    cold  — everything due at startup (what a restart without state does);
+    naive — `last_ts + interval_s`, overdue ones due immediately;
+    warm  — the prober's schedule (phase kept for short intervals, long ones spread over
+            PROBER_CATCHUP_S).
+
+Needs a migrated database (regular DB_* settings); the seeded user is deleted at the end.
+
+Usage:
+    python -m benchmarks.bench_warm_restart [--monitors 100000] [--downtime 120] [--horizon 600]
+"""
+
+import argparse
+import asyncio
+import heapq
+import random
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import text
+
+from app.core.db import get_sessionmaker
+from app.core.settings import get_settings
+from app.prober.runner import Prober
+
+INTERVALS = (10, 30, 60, 300)
+
+
+async def seed(n: int, downtime: float) -> int:
+    """User with `n` monitors; each monitor's last check lies within one interval before the outage."""
+    async with get_sessionmaker()() as s:
+        user_id = (await s.execute(text(
+            "INSERT INTO users (tg_id, email, hashed_password, is_active) VALUES (:tg, :email, 'x', true) RETURNING id"
+        ), {"tg": random.randint(10**9, 2 * 10**9), "email": f"warm-{uuid.uuid4().hex[:8]}@example.com"})).scalar_one()
+        await s.execute(text(
+            "INSERT INTO monitors (user_id, name, url, method, expected_status, interval_s, timeout_ms, is_paused) "
+            "SELECT :u, 'warm-' || i, 'http://127.0.0.1:9/m' || i, 'GET', 200, "
+            "(CAST(:intervals AS int[]))[1 + i % cardinality(CAST(:intervals AS int[]))], 1000, false FROM generate_series(1, :n) AS i"
+        ), {"u": user_id, "n": n, "intervals": list(INTERVALS)})
+        await s.execute(text(
+            "INSERT INTO checks (monitor_id, ts, latency_ms, status_code, ok) "
+            "SELECT id, now() - make_interval(secs => :down + random() * interval_s), 10, 200, true "
+            "FROM monitors WHERE user_id = :u"
+        ), {"u": user_id, "down": downtime})
+        await s.commit()
+    return user_id
+
+
+async def cleanup(user_id: int) -> None:
+    async with get_sessionmaker()() as s:
+        await s.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        await s.commit()
+
+
+def replay(due: dict[int, float], interval: dict[int, int], start: float, horizon: float) -> Counter:
+    """Probe starts per 1 s bucket (relative to `start`) on a virtual clock."""
+    heap = [(d, mid) for mid, d in due.items()]
+    heapq.heapify(heap)
+    buckets: Counter = Counter()
+    end = start + horizon
+    while heap and heap[0][0] < end:
+        d, mid = heapq.heappop(heap)
+        t = max(d, start)
+        buckets[int(t - start)] += 1
+        heapq.heappush(heap, (t + interval[mid], mid))
+    return buckets
+
+
+def report(name: str, buckets: Counter, steady: float, horizon: int) -> None:
+    peak = max(buckets.values(), default=0)
+    per5 = [sum(buckets[s + i] for i in range(5)) / 5 for s in range(0, horizon - 4, 5)]
+    settled = 0
+    for i in range(len(per5) - 1, -1, -1):
+        if per5[i] > 1.25 * steady:
+            settled = (i + 1) * 5
+            break
+    print(f"{name:6s} peak {peak:7d} probes/s ({peak / steady:5.1f}× steady), steady after {settled:4d} s")
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    user_id = await seed(args.monitors, args.downtime)
+    try:
+        prober = Prober(settings, get_sessionmaker())
+        t0 = time.perf_counter()
+        await prober.reload()
+        load_s = time.perf_counter() - t0
+        start = time.time()
+
+        sched = prober.scheduler
+        ids = sched.ids()
+        interval = {mid: sched.get(mid).interval_s for mid in ids}
+        async with get_sessionmaker()() as s:
+            last = dict((await s.execute(text(
+                "SELECT monitor_id, extract(epoch FROM max(ts))::float FROM checks "
+                "WHERE monitor_id = ANY(:ids) GROUP BY monitor_id"
+            ), {"ids": list(ids)})).all())
+        await prober.confirmer.close()
+
+        steady = sum(1 / i for i in interval.values())
+        print(f"{len(ids)} monitors, downtime {args.downtime:.0f} s, catch-up window {settings.PROBER_CATCHUP_S:.0f} s")
+        print(f"reload (query + heap): {load_s * 1000:.0f} ms; steady rate {steady:.0f} probes/s")
+        strategies = {
+            "cold": {mid: start for mid in ids},
+            "naive": {mid: max(start, last.get(mid, start) + interval[mid]) for mid in ids},
+            "warm": {mid: sched.due_of(mid) for mid in ids},
+        }
+        for name, due in strategies.items():
+            report(name, replay(due, interval, start, args.horizon), steady, args.horizon)
+    finally:
+        await cleanup(user_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--monitors", type=int, default=100_000)
+    parser.add_argument("--downtime", type=float, default=120.0)
+    parser.add_argument("--horizon", type=int, default=600)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
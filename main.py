@@ -1,19 +1,121 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from app.api.routers import monitors, users, checks, auth
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from app.api import deps, heartbeat_ping
+from app.api.routers import monitors, users, checks, auth, status_pages, maintenance, heartbeats, debug
+
+from app.core.db import get_engine, get_replicas
 from app.core.logging_middleware import DBLoggingMiddleware
+from app.core.notify import NotificationListener
+from app.core.profiling import ProfileStore, ProfilingMiddleware, QueryTimer
+from app.core.security import HashingPoolSaturated, get_hashing_pool
+from app.core.settings import get_settings
+from app.repositories import users as users_repo
+from app.repositories import status_pages as status_pages_repo
+from app.repositories import heartbeats as heartbeats_repo
 
 # from app.api.deps.views import router as demo_router
 
+async def hashing_saturated_handler(request: Request, exc: HashingPoolSaturated) -> JSONResponse:
+    # Быстрый отказ вместо ожидания в очереди: клиент повторит запрос позже
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Межворкерная инвалидация кэшей через LISTEN/NOTIFY.
+    # При переподключении уведомления могли потеряться — сбрасываем кэш целиком.
+    listener = NotificationListener(get_settings().database_dsn)
+    listener.subscribe(users_repo.INVALIDATION_CHANNEL, deps.on_user_invalidated, on_reconnect=deps.get_user_cache().clear)
+    listener.subscribe(deps.PIN_CHANNEL, deps.on_primary_pinned, on_reconnect=deps.on_pin_listener_reconnect)
+    listener.subscribe(
+        status_pages_repo.STATUS_PAGE_CHANGED_CHANNEL,
+        status_pages.on_status_page_changed,
+        on_reconnect=status_pages.on_listener_reconnect,
+    )
+    listener.subscribe(
+        heartbeats_repo.HEARTBEAT_TOKEN_REVOKED_CHANNEL,
+        heartbeat_ping.on_token_revoked,
+        on_reconnect=heartbeat_ping.on_listener_reconnect,
+    )
+    listener.start()
+    app.state.listener = listener
+    replicas = get_replicas()
+    replicas.start()
+    # хуки замера SQL — только если включено профилирование или поиск медленных запросов
+    _, query_timer = _profiling_setup()
+    if query_timer is not None:
+        for engine in (get_engine(), *replicas.engines):
+            query_timer.install(engine)
+    # время последних пингов пишется в БД пачками; последняя пачка — при остановке
+    last_seen = heartbeat_ping.get_last_seen()
+    last_seen.start()
+    yield
+    await last_seen.stop()
+    if query_timer is not None:
+        query_timer.remove_all()
+    await replicas.stop()
+    await listener.stop()
+    get_hashing_pool().shutdown()
+
+
+@lru_cache
+def _profiling_setup() -> tuple[ProfileStore | None, QueryTimer | None]:
+    """Profile store and SQL timer from settings; (None, None) when both features are off."""
+    settings = get_settings()
+    profiling = bool(settings.PROFILE_TOKEN) or settings.PROFILE_SAMPLE_RATE > 0
+    store = ProfileStore(settings.PROFILE_DIR, max_artifacts=settings.PROFILE_MAX_ARTIFACTS) if profiling else None
+    if not profiling and settings.SLOW_QUERY_MS <= 0:
+        return store, None
+    return store, QueryTimer(threshold_ms=settings.SLOW_QUERY_MS, buffer_size=settings.SLOW_QUERY_BUFFER)
+
+
+def _profiling(inner, *, app: FastAPI):
+    """
+    Middleware factory for profiling and slow-query capture.
+
+    Starlette calls it when it builds the middleware stack (the first ASGI event, i.e.
+    startup), so settings are read then rather than at import. With both features off it
+    returns `inner` itself: no middleware and no /debug routes.
+    """
+    settings = get_settings()
+    app.state.profiles, app.state.query_timer = _profiling_setup()
+    if settings.PROFILE_TOKEN:
+        app.include_router(debug.router)
+    if app.state.query_timer is None:
+        return inner
+    return ProfilingMiddleware(
+        inner, token=settings.PROFILE_TOKEN, sample_rate=settings.PROFILE_SAMPLE_RATE, store=app.state.profiles
+    )
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="API Health Checker")
-    app.add_middleware(DBLoggingMiddleware)
+    app = FastAPI(title="API Health Checker", lifespan=lifespan)
+    app.add_middleware(DBLoggingMiddleware, skip_prefixes=("/status/",))
+    # Профилирование и медленные запросы: выключены — ни middleware, ни хуков, ни /debug.
+    # Снаружи логирования: запись лога запроса тоже попадает в профиль
+    app.state.profiles = None
+    app.state.query_timer = None
+    app.add_middleware(_profiling, app=app)
+    # добавлена последней — внешняя: пинги /hb/ не проходят ни маршрутизацию, ни логирование
+    app.add_middleware(heartbeat_ping.HeartbeatPingMiddleware)
+    app.add_exception_handler(HashingPoolSaturated, hashing_saturated_handler)
     app.include_router(users.router)
     app.include_router(monitors.router)
     app.include_router(checks.router)
     # app.include_router(demo_router)
     app.include_router(auth.router)
+    app.include_router(status_pages.router)
+    app.include_router(status_pages.public_router)
+    app.include_router(maintenance.router)
+    app.include_router(heartbeats.router)
     return app
 
 app = create_app()
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Prober worker entry point: `python worker.py`.
+
+Imports only the prober graph (no FastAPI, routers, passlib or jose), so cold start
+stays cheap when workers are restarted or scaled out.
+"""
+
+import asyncio
+
+
+def main() -> None:
+    from app.prober.runner import main as run
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()